@@ -164,20 +164,30 @@ async def run_scraper(args: dict[str, Any]) -> dict[str, Any]:
         result_text += f"   Mode: {mode_str}\n"
         result_text += f"   Target ZIPs: {len(target_zips)}\n\n"
 
-        # Run the scraper
+        # Run the scraper - batches stream in per ZIP while the event loop stays free
         dealers = []
-        for i, zip_code in enumerate(target_zips, 1):
-            result_text += f"   [{i}/{len(target_zips)}] Scraping ZIP {zip_code}...\n"
-            zip_dealers = scraper.scrape_zip(zip_code)
-            dealers.extend(zip_dealers)
-
-        # Deduplicate by phone
-        unique_dealers = scraper.deduplicate_by_phone(dealers)
-
+        failed_zips = []
+        async for batch in scraper.astream_multiple(target_zips, verbose=False):
+            if batch.error is not None:
+                failed_zips.append(batch.zip_code)
+                result_text += f"   [{batch.index}/{batch.total}] ZIP {batch.zip_code}: ❌ {batch.error}\n"
+            else:
+                result_text += f"   [{batch.index}/{batch.total}] ZIP {batch.zip_code}: {len(batch.dealers)} dealers\n"
+            dealers.extend(batch.dealers)
+
+        # Multi-signal deduplication (phone, domain, fuzzy name + state)
+        scraper.dealers = dealers
+        scraper.deduplicate_by_phone()
+        unique_dealers = scraper.dealers
+
+        dedup_rate = (len(dealers) - len(unique_dealers)) / len(dealers) * 100 if dealers else 0.0
         result_text += f"\n✅ Scraping complete!\n"
         result_text += f"   Total dealers found: {len(dealers)}\n"
         result_text += f"   Unique dealers (after deduplication): {len(unique_dealers)}\n"
-        result_text += f"   Deduplication rate: {((len(dealers) - len(unique_dealers)) / len(dealers) * 100):.1f}%\n\n"
+        result_text += f"   Deduplication rate: {dedup_rate:.1f}%\n"
+        if failed_zips:
+            result_text += f"   Failed ZIPs: {', '.join(failed_zips)}\n"
+        result_text += "\n"
         result_text += f"💡 Use 'analyze_contractors' to find multi-OEM contractors or 'score_leads' to apply ICP scoring."
 
         return {
@@ -20,15 +20,24 @@ Usage:
         'license_category': 'HVAC'
     })
 
+    # Bulk import (dedup keys loaded once, batched commits)
+    with db.import_session(source='FL_License') as session:
+        for record in records:
+            session.add_contractor(record)
+
     # Get statistics
     stats = db.get_stats(state='FL')
     print(f"Multi-license contractors: {stats['multi_license']}")
 
-    # Export multi-license to CSV
+    # Export multi-license to CSV (streamed; .gz paths are gzip-compressed)
     db.export_multi_license('output/fl_multi_license.csv', state='FL')
+    db.export_contractors('output/contractors.jsonl.gz')
 """
 
 from database.pipeline_db import PipelineDB, get_db
+from database.async_db import AsyncPipelineDB
+from database.import_session import ImportSession
+from database.export import write_csv, write_jsonl, write_json, write_rows
 from database.models import (
     Contractor,
     Contact,
@@ -42,6 +51,10 @@ from database.models import (
     extract_domain,
     normalize_company_name,
     fuzzy_match_ratio,
+    fts_match_expression,
+    normalize_city,
+    normalize_street,
+    normalize_zip,
     FL_LICENSE_CATEGORIES,
     CA_LICENSE_CATEGORIES,
     TX_LICENSE_CATEGORIES,
@@ -56,7 +69,15 @@ from database.audit import (
 __all__ = [
     # Main database class
     'PipelineDB',
+    'AsyncPipelineDB',
     'get_db',
+    'ImportSession',
+
+    # Streaming exporters
+    'write_csv',
+    'write_jsonl',
+    'write_json',
+    'write_rows',
 
     # Data models
     'Contractor',
@@ -78,6 +99,10 @@ __all__ = [
     'extract_domain',
     'normalize_company_name',
     'fuzzy_match_ratio',
+    'fts_match_expression',
+    'normalize_city',
+    'normalize_street',
+    'normalize_zip',
 
     # Constants
     'FL_LICENSE_CATEGORIES',
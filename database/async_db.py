@@ -0,0 +1,182 @@
+"""
+Async Access Layer for PipelineDB
+
+Agent tools (agent/tools) and plugins (plugins/scraper_tools) are async, but
+PipelineDB is blocking sqlite3: a slow query called from a tool stalls the
+event loop and every other tool call with it.  AsyncPipelineDB runs PipelineDB
+on its own worker thread(s) and hands back awaitables.
+
+Request batching: read calls made in the same event-loop iteration (e.g. the
+tools of one agent turn awaited with asyncio.gather) are collected and run as
+one worker job, in one transaction on the worker's persistent connection -
+one thread hop instead of one per call.  Writes are never batched: each runs
+as its own job, in submission order on the default single worker.
+
+Usage:
+    from database.async_db import AsyncPipelineDB
+
+    async with AsyncPipelineDB() as db:
+        stats, matches = await asyncio.gather(
+            db.get_stats(state='FL'),
+            db.search_contractors('sunshine roofing'),
+        )
+        contractor_id, is_new = await db.add_contractor(record)
+
+    # Dashboards / read-only agents: serve from the published replica
+    reader = AsyncPipelineDB(PipelineDB().open_replica())
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from database.pipeline_db import PipelineDB
+
+# Read-only PipelineDB methods: batched
+READ_METHODS = frozenset({
+    'get_stats', 'get_multi_license_contractors', 'get_contractor_by_id',
+    'search_contractors', 'find_matching_contractor', 'get_pipeline_runs',
+    'check_file_imported', 'get_contractor_history',
+})
+
+# Methods that write or run long jobs: one worker job per call
+WRITE_METHODS = frozenset({
+    'initialize', 'add_contractor', 'add_contractors_bulk', 'add_license',
+    'add_contact', 'add_oem_certification', 'update_source_type',
+    'create_contractor_from_oem', 'link_cross_state_contractors',
+    'start_pipeline_run', 'complete_pipeline_run', 'export_multi_license',
+    'export_unicorns', 'export_to_json', 'export_contractors',
+    'export_columnar_snapshot', 'export_stats_to_json', 'publish_replica',
+    'start_file_import', 'complete_file_import', 'fail_file_import',
+    'add_contractor_with_audit', 'soft_delete_contractor', 'rollback_import',
+})
+
+# Batched read: (method, args, kwargs, future)
+_Request = Tuple[str, Tuple, Dict[str, Any], asyncio.Future]
+
+
+class AsyncPipelineDB:
+    """
+    Awaitable facade over a PipelineDB running on dedicated worker threads.
+
+    Every READ_METHODS / WRITE_METHODS name is available as a coroutine
+    method with PipelineDB's signature (await db.get_stats(state='FL')).
+    Generators and context managers (iter_*, import_session,
+    performance_profile) are not: they would run on the event loop.
+    """
+
+    def __init__(
+        self,
+        db: Optional[PipelineDB] = None,
+        workers: int = 1,
+        max_batch: int = 256
+    ):
+        """
+        Args:
+            db: PipelineDB to wrap (default: PipelineDB() on output/pipeline.db)
+            workers: Worker threads, each with its own connection.  One keeps
+                every call in submission order; more let reads overlap on a
+                WAL database (sqlite3 releases the GIL while a query runs)
+            max_batch: Most reads run in one batched job
+        """
+        if workers < 1:
+            raise ValueError(f"workers must be >= 1, got {workers}")
+        if max_batch < 1:
+            raise ValueError(f"max_batch must be >= 1, got {max_batch}")
+        self.db = db if db is not None else PipelineDB()
+        self.max_batch = max_batch
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='pipeline-db')
+        self._pending: List[_Request] = []
+        self.stats = {'reads': 0, 'read_batches': 0, 'writes': 0}
+
+    async def __aenter__(self) -> "AsyncPipelineDB":
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> bool:
+        await self.aclose()
+        return False
+
+    def __getattr__(self, name: str) -> Callable[..., Any]:
+        if name in READ_METHODS or name in WRITE_METHODS:
+            async def method(*args, **kwargs):
+                return await self.call(name, *args, **kwargs)
+            method.__name__ = name
+            method.__doc__ = getattr(PipelineDB, name).__doc__
+            return method
+        raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+
+    async def call(self, method: str, *args, **kwargs) -> Any:
+        """
+        Run PipelineDB.<method>(*args, **kwargs) on a worker thread.
+
+        Reads in READ_METHODS join the current batch; WRITE_METHODS run as
+        their own job.
+
+        Raises:
+            AttributeError: If method is in neither READ_METHODS nor WRITE_METHODS
+            Whatever the PipelineDB method raises
+        """
+        if method not in READ_METHODS and method not in WRITE_METHODS:
+            raise AttributeError(f"PipelineDB.{method} is not available asynchronously")
+        loop = asyncio.get_running_loop()
+
+        if method not in READ_METHODS:
+            self.stats['writes'] += 1
+            bound = getattr(self.db, method)
+            return await loop.run_in_executor(self._executor, lambda: bound(*args, **kwargs))
+
+        future = loop.create_future()
+        if not self._pending:
+            # Flush after every call made in this loop iteration has queued
+            loop.call_soon(self._flush)
+        self._pending.append((method, args, kwargs, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        return await future
+
+    def _flush(self) -> None:
+        """Submit the queued reads as one worker job."""
+        if not self._pending:
+            return
+        requests, self._pending = self._pending, []
+
+        self.stats['reads'] += len(requests)
+        self.stats['read_batches'] += 1
+        plan = [(method, args, kwargs) for method, args, kwargs, _ in requests]
+        job = asyncio.get_running_loop().run_in_executor(self._executor, self._run_reads, plan)
+
+        def deliver(job: asyncio.Future) -> None:
+            if job.cancelled() or job.exception() is not None:
+                error = job.exception() if not job.cancelled() else asyncio.CancelledError()
+                for _, _, _, future in requests:
+                    if not future.done():
+                        future.set_exception(error)
+                return
+            for (_, _, _, future), (ok, value) in zip(requests, job.result()):
+                if future.done():  # Caller was cancelled
+                    continue
+                if ok:
+                    future.set_result(value)
+                else:
+                    future.set_exception(value)
+
+        job.add_done_callback(deliver)
+
+    def _run_reads(self, plan: List[Tuple[str, Tuple, Dict[str, Any]]]) -> List[Tuple[bool, Any]]:
+        """Worker thread: run a batch of reads in one transaction."""
+        outcomes = []
+        with self.db._get_connection() as conn:
+            if not conn.in_transaction:
+                conn.execute("BEGIN")  # One read snapshot for the whole batch
+            for method, args, kwargs in plan:
+                try:
+                    outcomes.append((True, getattr(self.db, method)(*args, **kwargs)))
+                except Exception as e:
+                    # One failing read must not fail the rest of the batch
+                    outcomes.append((False, e))
+        return outcomes
+
+    async def aclose(self) -> None:
+        """Finish queued work and stop the worker threads (their connections close with them)."""
+        self._flush()
+        await asyncio.get_running_loop().run_in_executor(None, self._executor.shutdown, True)
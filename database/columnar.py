@@ -0,0 +1,227 @@
+"""
+Columnar Snapshot Export for PipelineDB
+
+Writes the contractor graph - contractors, licenses, contacts, OEM
+certifications and dedup matches - as one typed Parquet file per table, so
+analytics jobs load only the columns they need instead of re-reading CSVs or
+re-querying SQLite through pandas on every run.
+
+Column types:
+- int / float - int64 / float64
+- category    - dictionary-encoded strings (states, license categories,
+                sources, match types...): a few distinct values stored once
+- timestamp   - timestamp[s], parsed from SQLite's text timestamps
+- str         - plain strings
+
+Every table is read in one transaction (a consistent snapshot of the graph)
+and streamed in row groups of batch_size, so memory stays bounded by one
+batch.  Files are written under temporary names and renamed into place, and
+manifest.json (row counts, creation time) is written last, so a reader never
+sees a half-written snapshot.
+
+Requires pyarrow (optional dependency): pip install pyarrow
+
+Usage:
+    from database import PipelineDB
+    from database.columnar import load_snapshot_table
+
+    db = PipelineDB()
+    db.export_columnar_snapshot('output/snapshot')
+
+    licenses = load_snapshot_table('output/snapshot', 'licenses',
+                                   columns=['contractor_id', 'state', 'license_category'])
+    df = licenses.to_pandas()
+"""
+
+import json
+import os
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - depends on environment
+    pa = None
+    pc = None
+    pq = None
+
+if TYPE_CHECKING:  # pragma: no cover
+    from database.pipeline_db import PipelineDB
+
+MANIFEST_NAME = 'manifest.json'
+
+# table: [(column, kind)] - kinds as described in the module docstring
+SNAPSHOT_TABLES: Dict[str, List[Tuple[str, str]]] = {
+    'contractors': [
+        ('id', 'int'), ('company_name', 'str'), ('normalized_name', 'str'),
+        ('street', 'str'), ('city', 'category'), ('state', 'category'), ('zip', 'category'),
+        ('primary_phone', 'str'), ('primary_email', 'str'), ('primary_domain', 'str'),
+        ('source_type', 'category'), ('created_at', 'timestamp'), ('updated_at', 'timestamp'),
+        ('is_deleted', 'int'),
+    ],
+    'licenses': [
+        ('id', 'int'), ('contractor_id', 'int'), ('state', 'category'),
+        ('license_type', 'category'), ('license_category', 'category'), ('license_number', 'str'),
+        ('license_status', 'category'), ('source_file', 'category'), ('created_at', 'timestamp'),
+    ],
+    'contacts': [
+        ('id', 'int'), ('contractor_id', 'int'), ('name', 'str'), ('email', 'str'),
+        ('phone', 'str'), ('title', 'category'), ('source', 'category'), ('confidence', 'int'),
+        ('created_at', 'timestamp'),
+    ],
+    'oem_certifications': [
+        ('id', 'int'), ('contractor_id', 'int'), ('oem_name', 'category'),
+        ('certification_tier', 'category'), ('scraped_from_zip', 'category'), ('source_url', 'str'),
+        ('created_at', 'timestamp'),
+    ],
+    'dedup_matches': [
+        ('id', 'int'), ('master_contractor_id', 'int'), ('duplicate_record_hash', 'str'),
+        ('match_type', 'category'), ('match_value', 'str'), ('match_confidence', 'float'),
+        ('source_file', 'category'), ('created_at', 'timestamp'),
+    ],
+}
+
+
+def _require_pyarrow() -> None:
+    if pa is None:
+        raise ImportError("Columnar snapshots need pyarrow: pip install pyarrow")
+
+
+def _arrow_type(kind: str):
+    return {
+        'int': pa.int64(),
+        'float': pa.float64(),
+        'str': pa.string(),
+        'category': pa.dictionary(pa.int32(), pa.string()),
+        'timestamp': pa.timestamp('s'),
+    }[kind]
+
+
+def snapshot_schema(table: str):
+    """pyarrow schema of a snapshot table."""
+    _require_pyarrow()
+    return pa.schema([(column, _arrow_type(kind)) for column, kind in SNAPSHOT_TABLES[table]])
+
+
+def _column_array(values: Sequence, kind: str):
+    """One batch of a column as an Arrow array of the snapshot type."""
+    if kind == 'category':
+        return pa.array(values, pa.string()).dictionary_encode()
+    if kind == 'timestamp':
+        # The SELECT normalizes every timestamp with datetime(), so one format parses all
+        return pc.strptime(pa.array(values, pa.string()), format='%Y-%m-%d %H:%M:%S', unit='s')
+    return pa.array(values, _arrow_type(kind))
+
+
+def _write_table(db: "PipelineDB", conn: sqlite3.Connection, table: str, path: Path,
+                 batch_size: int, compression: str) -> int:
+    """Stream one table into a Parquet file from conn; returns rows written."""
+    columns = SNAPSHOT_TABLES[table]
+    schema = snapshot_schema(table)
+    select = ", ".join(f"datetime({column}) AS {column}" if kind == 'timestamp' else column
+                       for column, kind in columns)
+
+    count = 0
+    batch = []
+    with pq.ParquetWriter(str(path), schema, compression=compression) as writer:
+        def flush():
+            arrays = [_column_array(values, kind)
+                      for values, (_, kind) in zip(zip(*batch), columns)]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            batch.clear()
+
+        for row in db._stream(f"SELECT {select} FROM {table} ORDER BY id", batch_size=batch_size, conn=conn):
+            batch.append(tuple(row))
+            count += 1
+            if len(batch) >= batch_size:
+                flush()
+        if batch:
+            flush()
+    return count
+
+
+def export_columnar_snapshot(
+    db: "PipelineDB",
+    output_dir: Path,
+    tables: Optional[Sequence[str]] = None,
+    batch_size: int = 65536,
+    compression: str = 'zstd'
+) -> Dict[str, int]:
+    """
+    Write SNAPSHOT_TABLES as Parquet files in output_dir.
+
+    Args:
+        db: Source database
+        output_dir: Snapshot directory (created; existing files are replaced)
+        tables: Subset of SNAPSHOT_TABLES (default: all)
+        batch_size: Rows per row group
+        compression: Parquet codec ('zstd', 'snappy', 'gzip', 'none')
+
+    Returns:
+        Rows written per table
+
+    Raises:
+        ImportError: If pyarrow is not installed
+        ValueError: For a table not in SNAPSHOT_TABLES
+    """
+    _require_pyarrow()
+    tables = list(tables or SNAPSHOT_TABLES)
+    unknown = set(tables) - set(SNAPSHOT_TABLES)
+    if unknown:
+        raise ValueError(f"Unknown snapshot tables {sorted(unknown)}; expected {sorted(SNAPSHOT_TABLES)}")
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = output_dir / MANIFEST_NAME
+    if manifest_path.exists():
+        manifest_path.unlink()  # Incomplete until the new manifest is written
+
+    counts = {}
+    conn = db._connect()  # Own connection, so the snapshot never wraps the thread's writes
+    try:
+        conn.execute("BEGIN")  # One read snapshot across every table
+        for table in tables:
+            path = output_dir / f"{table}.parquet"
+            tmp_path = path.with_name(f".{path.name}.tmp")
+            try:
+                counts[table] = _write_table(db, conn, table, tmp_path, batch_size, compression)
+                os.replace(tmp_path, path)
+            finally:
+                if tmp_path.exists():
+                    tmp_path.unlink()
+    finally:
+        conn.close()
+
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'created_at': datetime.now().isoformat(),
+            'source': str(db.db_path),
+            'compression': compression,
+            'tables': counts,
+        }, f, indent=2)
+    return counts
+
+
+def load_snapshot_table(
+    snapshot_dir: Path,
+    table: str,
+    columns: Optional[Sequence[str]] = None
+):
+    """
+    Read one snapshot table as a pyarrow.Table (.to_pandas() for a DataFrame).
+
+    Only the requested columns are read from disk.
+
+    Raises:
+        ImportError: If pyarrow is not installed
+        FileNotFoundError: If the snapshot is missing or incomplete
+    """
+    _require_pyarrow()
+    snapshot_dir = Path(snapshot_dir)
+    if not (snapshot_dir / MANIFEST_NAME).exists():
+        raise FileNotFoundError(f"No complete snapshot in {snapshot_dir} (missing {MANIFEST_NAME})")
+    return pq.read_table(snapshot_dir / f"{table}.parquet", columns=list(columns) if columns else None)
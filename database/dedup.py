@@ -0,0 +1,726 @@
+"""
+Shared Deduplication Engine
+
+One implementation of the phone / email / domain / fuzzy-name matching used by
+PipelineDB and the merge scripts (deduplicate_master_list, merge_to_master,
+consolidate_all_leads, crossref_licenses_to_dealers).
+
+Matching semantics (first signal that fires wins):
+1. Phone  - exact normalized 10-digit match
+2. Email  - exact normalized match
+3. Domain - exact company domain, confirmed by >= 50% name similarity
+4. Fuzzy name - >= 85% SequenceMatcher similarity within the same block
+   (same state by default)
+
+Every signal is a hash lookup or an indexed fuzzy lookup
+(utils.fuzzy_index.FuzzyNameIndex), so matching N records costs roughly
+O(N) instead of comparing each record against every earlier one.  Blocks
+never compare against each other, so large jobs can score them across a
+process pool (match_name_blocks, ShardedNameBlockIndex, cluster_records
+with workers=N) and get the same result as a single-process run.
+
+Usage:
+    from database.dedup import DedupIndex
+
+    index = DedupIndex()
+    for record in records:
+        keys = index.keys(record)
+        match = index.find(keys)
+        if match:
+            merge(match.entity, record)      # match.match_type, match.similarity
+        else:
+            index.add(keys, record)
+
+Signals are pluggable - pass your own list to DedupIndex(signals=[...]).
+"""
+
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from difflib import SequenceMatcher
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from database.models import (
+    normalize_phone, normalize_email, extract_domain, normalize_company_name
+)
+from utils.fuzzy_index import FuzzyNameIndex
+
+
+# Fuzzy match threshold for company name matching
+FUZZY_THRESHOLD = 0.85
+
+# Name similarity required to accept a shared-domain match
+DOMAIN_NAME_THRESHOLD = 0.5
+
+
+def name_similarity(name1: str, name2: str) -> float:
+    """
+    SequenceMatcher ratio between two already-normalized names.
+
+    Returns 0.0 when either name is empty.
+    """
+    if not name1 or not name2:
+        return 0.0
+    return SequenceMatcher(None, name1, name2).ratio()
+
+
+def normalize_domain(value: str) -> str:
+    """Lowercase a domain or URL and strip scheme, www. and path."""
+    if not value:
+        return ""
+    domain = str(value).strip().lower()
+    if "://" in domain:
+        domain = domain.split("://", 1)[1]
+    domain = domain.split("/")[0].split(":")[0]
+    if domain.startswith("www."):
+        domain = domain[4:]
+    return domain
+
+
+def first_name_match(
+    name: str,
+    candidates: Iterable[Tuple[Any, str]],
+    threshold: float = FUZZY_THRESHOLD
+) -> Optional[Tuple[Any, float]]:
+    """
+    First (value, normalized_name) candidate whose name is >= threshold similar.
+
+    Candidates are screened in bulk (rapidfuzz when installed) and verified
+    with SequenceMatcher, so the result equals checking them one by one.
+
+    Returns:
+        (value, similarity) or None
+    """
+    if not name:
+        return None
+    index = FuzzyNameIndex(threshold=threshold)
+    for value, candidate_name in candidates:
+        if candidate_name:
+            index.add(candidate_name, value=value)
+    return index.find_first(name)
+
+
+def name_trigrams(name: str) -> Counter:
+    """Trigram multiset of a normalized name (as stored in contractor_name_trigrams)."""
+    return Counter(name[i:i + 3] for i in range(len(name) - 2))
+
+
+def partner_length_range(length: int, threshold: float = FUZZY_THRESHOLD) -> Tuple[int, int]:
+    """Name lengths that can reach threshold similarity with a name of this length."""
+    lo = length
+    while lo > 1 and 2.0 * (lo - 1) / (length + lo - 1) >= threshold:
+        lo -= 1
+    hi = length
+    while 2.0 * length / (length + hi + 1) >= threshold:
+        hi += 1
+    return lo, hi
+
+
+def min_shared_trigrams(len_a: int, len_b: int, threshold: float = FUZZY_THRESHOLD) -> Optional[int]:
+    """
+    Fewest trigrams two names of these lengths share when similarity >= threshold.
+
+    SequenceMatcher's M matched characters form k blocks with
+    k - 1 <= (len_a - M) + (len_b - M), and a block of length L shares L - 2
+    trigrams, so a match shares at least 5*M - 2*(len_a + len_b) - 2.
+
+    Returns:
+        The bound (<= 0 means trigrams cannot rule the pair out), or None
+        when no match is possible at these lengths
+    """
+    total = len_a + len_b
+    if total == 0:
+        return 0
+    m = max(int(threshold * total / 2) - 1, 0)
+    while 2.0 * m / total < threshold:
+        m += 1
+    if m > min(len_a, len_b):
+        return None
+    return 5 * m - 2 * total - 2
+
+
+# ============================================================================
+# KEYS AND MATCHES
+# ============================================================================
+
+@dataclass
+class DedupKeys:
+    """Normalized matching keys for one record."""
+    phone: str = ""
+    email: str = ""
+    domain: str = ""
+    name: str = ""   # Normalized company name
+    state: str = ""
+
+
+@dataclass
+class SignalMatch:
+    """A duplicate found by one signal."""
+    entity: Any
+    match_type: str          # 'phone' | 'email' | 'domain' | 'fuzzy_name' | custom
+    match_value: str
+    similarity: float = 1.0
+
+
+# ============================================================================
+# SIGNALS
+# ============================================================================
+
+class ExactKeySignal:
+    """
+    Exact match on one DedupKeys field (phone, email, ...).
+
+    The first entity indexed under a key keeps it.
+    """
+
+    def __init__(self, field: str, match_type: Optional[str] = None):
+        self.field = field
+        self.match_type = match_type or field
+        self._index: Dict[str, Any] = {}
+
+    def find(self, keys: DedupKeys) -> Optional[SignalMatch]:
+        value = getattr(keys, self.field)
+        if value and value in self._index:
+            return SignalMatch(self._index[value], self.match_type, value)
+        return None
+
+    def add(self, keys: DedupKeys, entity: Any) -> None:
+        value = getattr(keys, self.field)
+        if value:
+            self._index.setdefault(value, entity)
+
+
+class DomainSignal:
+    """
+    Shared company domain, accepted only when the names are also similar.
+
+    Guards against franchise/parent domains matching unrelated companies.
+    """
+
+    match_type = "domain"
+
+    def __init__(self, name_threshold: float = DOMAIN_NAME_THRESHOLD):
+        self.name_threshold = name_threshold
+        self._index: Dict[str, Tuple[Any, str]] = {}
+
+    def find(self, keys: DedupKeys) -> Optional[SignalMatch]:
+        if not keys.domain or keys.domain not in self._index:
+            return None
+        entity, existing_name = self._index[keys.domain]
+        similarity = name_similarity(keys.name, existing_name)
+        if similarity >= self.name_threshold:
+            return SignalMatch(entity, self.match_type, keys.domain, similarity)
+        return None
+
+    def add(self, keys: DedupKeys, entity: Any) -> None:
+        if keys.domain:
+            self._index.setdefault(keys.domain, (entity, keys.name))
+
+
+class NameBlockIndex:
+    """
+    FuzzyNameIndex per block (state, city, ZIP, ...).
+
+    Names are only compared within a block; lookups return the earliest
+    added match, exactly like a pairwise scan of that block.
+    """
+
+    def __init__(self, threshold: float = FUZZY_THRESHOLD):
+        self.threshold = threshold
+        self._blocks: Dict[Any, FuzzyNameIndex] = {}
+
+    def __len__(self) -> int:
+        return sum(len(index) for index in self._blocks.values())
+
+    def prime(self, block: Any, names: Iterable[str]) -> None:
+        """Learn bigram frequencies for a block before adding to it (optional, faster)."""
+        if block not in self._blocks:
+            self._blocks[block] = FuzzyNameIndex(threshold=self.threshold, corpus=list(names))
+
+    def add(self, block: Any, name: str, value: Any = None) -> None:
+        index = self._blocks.get(block)
+        if index is None:
+            index = self._blocks[block] = FuzzyNameIndex(threshold=self.threshold)
+        index.add(name, value=value)
+
+    def find_first(self, block: Any, name: str) -> Optional[Tuple[Any, float]]:
+        index = self._blocks.get(block)
+        return index.find_first(name) if index is not None else None
+
+    def find_all(self, block: Any, name: str, symmetric: bool = False) -> List[Tuple[Any, float]]:
+        index = self._blocks.get(block)
+        return index.find_all(name, symmetric=symmetric) if index is not None else []
+
+
+# ============================================================================
+# SHARDED MATCHING
+# ============================================================================
+
+# Query names per process-pool task.  Big blocks (CA, TX) are split into
+# several shards so one state cannot pin a single core.
+SHARD_QUERIES = 2000
+
+
+def map_shards(
+    func: Callable[..., Any],
+    shards: Sequence[Tuple[Any, ...]],
+    workers: Optional[int] = None
+) -> List[Any]:
+    """
+    Call func(*shard) for every shard, across a process pool.
+
+    Results come back in shard order no matter which worker finishes first,
+    so merging them is deterministic.
+
+    Args:
+        func: Module-level function (it is pickled to the workers)
+        shards: Argument tuple per call
+        workers: Worker processes; None or 1 runs serially in this process
+
+    Returns:
+        [func(*shard) for shard in shards]
+
+    Example:
+        >>> map_shards(find_all_matches, [(queries, names, 0.85), ...], workers=8)
+    """
+    if workers is not None and workers < 1:
+        raise ValueError(f"workers must be >= 1, got {workers}")
+    if workers is None or workers == 1 or len(shards) <= 1:
+        return [func(*shard) for shard in shards]
+
+    workers = min(workers, len(shards))
+    # A few tasks per worker: balances uneven shards without paying IPC per shard
+    chunksize = max(1, len(shards) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(func, *zip(*shards), chunksize=chunksize))
+
+
+def _score_name_shard(
+    names: List[str],
+    start: int,
+    stop: int,
+    threshold: float,
+    symmetric: bool
+) -> List[List[Tuple[int, float]]]:
+    """Matches of names[start:stop] among all names of one block (worker side)."""
+    index = FuzzyNameIndex(threshold=threshold, corpus=names)
+    for position, name in enumerate(names):
+        index.add(name, value=position)
+    return [index.find_all(names[i], symmetric=symmetric) for i in range(start, stop)]
+
+
+def match_name_blocks(
+    blocks: Dict[Any, Sequence[str]],
+    threshold: float = FUZZY_THRESHOLD,
+    symmetric: bool = False,
+    workers: Optional[int] = None,
+    shard_size: int = SHARD_QUERIES
+) -> Dict[Any, List[List[Tuple[int, float]]]]:
+    """
+    Every fuzzy match within each block, scored in parallel.
+
+    Blocks (states, or any other name block) never compare against each
+    other, so each block is cut into shards of at most shard_size query
+    names and the shards are scored in a process pool.  A name's matches
+    are exactly FuzzyNameIndex(block names).find_all(name), itself included.
+
+    Args:
+        blocks: Names per block (already normalized)
+        threshold: Minimum SequenceMatcher ratio
+        symmetric: Score pairs in sorted string order (see FuzzyNameIndex.find_all)
+        workers: Worker processes; None or 1 scores every block in this process
+        shard_size: Query names per pool task
+
+    Returns:
+        {block: [[(position, similarity), ...] for each name in the block]}
+    """
+    if workers is None or workers == 1:
+        shard_size = max(len(names) for names in blocks.values()) if blocks else 1
+
+    shards = []
+    owners = []
+    for block, names in blocks.items():
+        names = list(names)
+        for start in range(0, len(names), shard_size):
+            shards.append((names, start, min(start + shard_size, len(names)), threshold, symmetric))
+            owners.append(block)
+
+    # Biggest shards first so the pool does not end waiting on one straggler
+    order = sorted(range(len(shards)), key=lambda i: -(shards[i][2] - shards[i][1]) * len(shards[i][0]))
+    scored = map_shards(_score_name_shard, [shards[i] for i in order], workers=workers)
+    by_shard = dict(zip(order, scored))
+
+    results: Dict[Any, List[List[Tuple[int, float]]]] = {block: [] for block in blocks}
+    for i, block in enumerate(owners):
+        results[block].extend(by_shard[i])
+    return results
+
+
+class ShardedNameBlockIndex:
+    """
+    NameBlockIndex for a name list known up front, scored across processes.
+
+    All pairwise matches inside each block are computed in parallel when the
+    index is built (match_name_blocks); add() and find_first() are then
+    dictionary lookups.  find_first() returns the earliest added match,
+    exactly like NameBlockIndex, so a first-match-wins pass gives the same
+    result with either index.
+
+    Example:
+        >>> names = ShardedNameBlockIndex({'FL': fl_names, 'TX': tx_names}, workers=8)
+        >>> names.find_first('FL', 'abc solar')
+    """
+
+    def __init__(
+        self,
+        blocks: Dict[Any, Iterable[str]],
+        threshold: float = FUZZY_THRESHOLD,
+        workers: Optional[int] = None
+    ):
+        """
+        Args:
+            blocks: Every name that will be added or looked up, per block
+            threshold: Minimum SequenceMatcher ratio
+            workers: Worker processes for the up-front scoring
+        """
+        self.threshold = threshold
+
+        # Distinct names per block, in first-seen order
+        self._slots: Dict[Tuple[Any, str], int] = {}
+        distinct: Dict[Any, List[str]] = {}
+        for block, names in blocks.items():
+            block_names = distinct.setdefault(block, [])
+            for name in names:
+                if (block, name) not in self._slots:
+                    self._slots[(block, name)] = len(block_names)
+                    block_names.append(name)
+
+        self._matches = match_name_blocks(distinct, threshold=threshold, workers=workers)
+        # (insertion order, value) of the first entry added under each name
+        self._added: Dict[Tuple[Any, int], Tuple[int, Any]] = {}
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def prime(self, block: Any, names: Iterable[str]) -> None:
+        """No-op; blocks are scored when the index is built."""
+
+    def add(self, block: Any, name: str, value: Any = None) -> None:
+        slot = self._slots[(block, name)]
+        self._added.setdefault((block, slot), (self._count, name if value is None else value))
+        self._count += 1
+
+    def find_first(self, block: Any, name: str) -> Optional[Tuple[Any, float]]:
+        slot = self._slots[(block, name)]
+        best = None
+        for other, similarity in self._matches[block][slot]:
+            added = self._added.get((block, other))
+            if added is not None and (best is None or added[0] < best[0][0]):
+                best = (added, similarity)
+        if best is None:
+            return None
+        (_, value), similarity = best
+        return value, similarity
+
+
+class FuzzyNameSignal:
+    """
+    Fuzzy company name match within a block.
+
+    Args:
+        threshold: Minimum name similarity (default 0.85)
+        scope: DedupKeys field that defines the block ('state'), or None to
+            compare all names.  Records with an empty scope value never
+            fuzzy-match.
+    """
+
+    match_type = "fuzzy_name"
+
+    def __init__(self, threshold: float = FUZZY_THRESHOLD, scope: Optional[str] = "state"):
+        self.scope = scope
+        self.names = NameBlockIndex(threshold=threshold)
+
+    def _block(self, keys: DedupKeys) -> Optional[str]:
+        if not keys.name:
+            return None
+        if self.scope is None:
+            return ""
+        return getattr(keys, self.scope) or None
+
+    def find(self, keys: DedupKeys) -> Optional[SignalMatch]:
+        block = self._block(keys)
+        if block is None:
+            return None
+        match = self.names.find_first(block, keys.name)
+        if match is None:
+            return None
+        entity, similarity = match
+        return SignalMatch(entity, self.match_type, f"{keys.name}:{similarity:.2f}", similarity)
+
+    def add(self, keys: DedupKeys, entity: Any) -> None:
+        block = self._block(keys)
+        if block is not None:
+            self.names.add(block, keys.name, value=entity)
+
+
+def default_signals(
+    fuzzy_threshold: float = FUZZY_THRESHOLD,
+    domain_name_threshold: float = DOMAIN_NAME_THRESHOLD,
+    fuzzy_scope: Optional[str] = "state"
+) -> list:
+    """The standard phone -> email -> domain -> fuzzy name chain."""
+    return [
+        ExactKeySignal("phone"),
+        ExactKeySignal("email"),
+        DomainSignal(name_threshold=domain_name_threshold),
+        FuzzyNameSignal(threshold=fuzzy_threshold, scope=fuzzy_scope),
+    ]
+
+
+# ============================================================================
+# INDEX
+# ============================================================================
+
+class DedupIndex:
+    """
+    In-memory multi-signal duplicate index.
+
+    Entities are whatever the caller wants returned on a match (a master
+    record dict, a contractor id, a row index, ...).
+    """
+
+    def __init__(
+        self,
+        signals: Optional[list] = None,
+        normalize_name: Callable[[str], str] = normalize_company_name
+    ):
+        """
+        Args:
+            signals: Signals in priority order (default: default_signals())
+            normalize_name: Company name normalizer used by keys()
+        """
+        self.signals = signals if signals is not None else default_signals()
+        self.normalize_name = normalize_name
+
+    def keys(self, record: Dict[str, Any]) -> DedupKeys:
+        """
+        Normalized keys from a record dict.
+
+        Reads company_name (or name), phone, email, domain (or website,
+        falling back to the email domain) and state.
+        """
+        email = normalize_email(record.get('email') or '')
+        domain = normalize_domain(record.get('domain') or record.get('website') or '')
+        return DedupKeys(
+            phone=normalize_phone(record.get('phone') or ''),
+            email=email,
+            domain=domain or extract_domain(email),
+            name=self.normalize_name(record.get('company_name') or record.get('name') or ''),
+            state=(record.get('state') or '').upper().strip(),
+        )
+
+    def find(self, keys: DedupKeys) -> Optional[SignalMatch]:
+        """First signal match for these keys, or None."""
+        for signal in self.signals:
+            match = signal.find(keys)
+            if match is not None:
+                return match
+        return None
+
+    def add(self, keys: DedupKeys, entity: Any, match_types: Optional[Sequence[str]] = None) -> None:
+        """
+        Index an entity under its keys.
+
+        Args:
+            keys: Keys to index
+            entity: Value returned by future matches
+            match_types: Only index these signals (e.g. ('phone', 'email')
+                when recording extra keys of a merged duplicate)
+        """
+        for signal in self.signals:
+            if match_types is None or signal.match_type in match_types:
+                signal.add(keys, entity)
+
+
+# ============================================================================
+# CLUSTERING
+# ============================================================================
+
+class UnionFind:
+    """
+    Disjoint sets over 0..n-1 with path halving and union by smallest root.
+
+    The root of every set is its smallest member, so cluster labels do not
+    depend on the order edges are added.
+    """
+
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+
+    def find(self, item: int) -> int:
+        parent = self.parent
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    def union(self, a: int, b: int) -> bool:
+        """Merge the sets of a and b; returns False if already merged."""
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a == root_b:
+            return False
+        if root_b < root_a:
+            root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        return True
+
+    def labels(self) -> List[int]:
+        return [self.find(i) for i in range(len(self.parent))]
+
+
+@dataclass
+class EntityClusters:
+    """Result of cluster_records()."""
+    labels: List[int]                       # Cluster id per record (smallest member index)
+    merges: Dict[str, int] = field(default_factory=dict)  # Edges that joined two clusters, by type
+
+    def groups(self) -> List[List[int]]:
+        """Record indexes per cluster, clusters ordered by their first record."""
+        groups: Dict[int, List[int]] = {}
+        for position, label in enumerate(self.labels):
+            groups.setdefault(label, []).append(position)
+        return list(groups.values())
+
+    @property
+    def cluster_count(self) -> int:
+        return len(set(self.labels))
+
+
+def _link_similar_names(
+    sets: UnionFind,
+    entries: List[Tuple[int, Any, str]],
+    threshold: float,
+    match_type: str,
+    merges: Counter,
+    workers: Optional[int] = None
+) -> None:
+    """
+    Union every pair of (position, block, name) entries in the same block
+    whose names are >= threshold similar.
+
+    Each distinct name is indexed once; repeats of a name join its first
+    occurrence directly, which keeps large blocks of identical names linear.
+    With workers > 1 the blocks are scored in a process pool
+    (match_name_blocks); the partition and merge counts are the same.
+    """
+    if workers is not None and workers > 1:
+        first_by_name: Dict[Tuple[Any, str], int] = {}
+        by_block: Dict[Any, List[str]] = {}
+        for position, block, name in entries:
+            first = first_by_name.setdefault((block, name), position)
+            if first != position:
+                if sets.union(first, position):
+                    merges[match_type] += 1
+            else:
+                by_block.setdefault(block, []).append(name)
+
+        matches = match_name_blocks(by_block, threshold=threshold, symmetric=True, workers=workers)
+        for block, block_names in by_block.items():
+            for slot, found in enumerate(matches[block]):
+                position = first_by_name[(block, block_names[slot])]
+                for other, _ in found:
+                    if other < slot and sets.union(first_by_name[(block, block_names[other])], position):
+                        merges[match_type] += 1
+        return
+
+    names = NameBlockIndex(threshold=threshold)
+    by_block = {}
+    for _, block, name in entries:
+        by_block.setdefault(block, []).append(name)
+    for block, block_names in by_block.items():
+        names.prime(block, block_names)
+
+    first_by_name = {}
+    for position, block, name in entries:
+        first = first_by_name.get((block, name))
+        if first is not None:
+            if sets.union(first, position):
+                merges[match_type] += 1
+            continue
+        first_by_name[(block, name)] = position
+        for other, _ in names.find_all(block, name, symmetric=True):
+            if sets.union(other, position):
+                merges[match_type] += 1
+        names.add(block, name, value=position)
+
+
+def cluster_records(
+    records: Sequence[Dict[str, Any]],
+    fuzzy_threshold: float = FUZZY_THRESHOLD,
+    domain_name_threshold: float = DOMAIN_NAME_THRESHOLD,
+    fuzzy_scope: Optional[str] = "state",
+    normalize_name: Callable[[str], str] = normalize_company_name,
+    keys: Optional[Sequence[DedupKeys]] = None,
+    workers: Optional[int] = None
+) -> EntityClusters:
+    """
+    Resolve records into entities using ALL match edges, transitively.
+
+    Unlike the first-match-wins DedupIndex pass, A~B by phone and B~C by
+    domain put A, B and C in one entity, and the resulting partition is the
+    same for any input order.  Edges use the DedupIndex rules:
+    shared phone, shared email, shared domain with >= 50% name similarity,
+    and >= 85% name similarity within the same state.
+
+    Exact keys are grouped by hash (linear); fuzzy edges come from an
+    indexed FuzzyNameIndex lookup per record, so the cost is proportional
+    to the number of candidate pairs, not n^2.  With workers > 1 the
+    name blocks are sharded across a process pool; the result is identical.
+
+    Args:
+        records: Record dicts (same fields as DedupIndex.keys)
+        keys: Precomputed DedupKeys per record (skips normalization)
+        workers: Worker processes for fuzzy scoring (None = this process)
+
+    Returns:
+        EntityClusters with one label per record
+
+    Example:
+        >>> clusters = cluster_records(records)
+        >>> for members in clusters.groups():
+        ...     master = merge([records[i] for i in members])
+    """
+    if keys is None:
+        key_builder = DedupIndex(signals=[], normalize_name=normalize_name)
+        keys = [key_builder.keys(record) for record in records]
+
+    sets = UnionFind(len(keys))
+    merges: Counter = Counter()
+
+    # Exact keys: link every record to the first record with the same key
+    for match_type in ("phone", "email"):
+        first_seen: Dict[str, int] = {}
+        for position, record_keys in enumerate(keys):
+            value = getattr(record_keys, match_type)
+            if not value:
+                continue
+            first = first_seen.setdefault(value, position)
+            if first != position and sets.union(first, position):
+                merges[match_type] += 1
+
+    # Domain: same domain AND >= 50% name similarity
+    _link_similar_names(sets, [
+        (position, record_keys.domain, record_keys.name)
+        for position, record_keys in enumerate(keys)
+        if record_keys.domain and record_keys.name
+    ], domain_name_threshold, "domain", merges, workers=workers)
+
+    # Fuzzy name within a block (same state by default)
+    _link_similar_names(sets, [
+        (position, "" if fuzzy_scope is None else getattr(record_keys, fuzzy_scope), record_keys.name)
+        for position, record_keys in enumerate(keys)
+        if record_keys.name and (fuzzy_scope is None or getattr(record_keys, fuzzy_scope))
+    ], fuzzy_threshold, "fuzzy_name", merges, workers=workers)
+
+    return EntityClusters(labels=sets.labels(), merges=dict(merges))
@@ -0,0 +1,378 @@
+"""
+Persisted Entity Index for Incremental Deduplication
+
+DedupIndex and cluster_records keep every key in memory, so each run of the
+merge scripts re-normalizes and re-indexes the whole corpus before it can
+match a single new record.  An EntityIndex stores the same keys in a small
+SQLite file:
+
+- entity_keys          phone / email (/ exact name) -> entity (first entity keeps the key)
+- entity_domains       domain -> (entity, name) for the name-confirmed domain match
+- entity_names         normalized name per block (state) -> entity
+- entity_name_trigrams trigram postings over entity_names (fuzzy candidates)
+- entities             one row per entity; its id is the stable cluster id
+
+Matching follows DedupIndex (phone -> email -> domain -> fuzzy name in the
+same state) and returns the earliest-added match, so an incremental run
+assigns the same entities as rebuilding the index would.  Every lookup is
+an indexed query, so adding one OEM's 2k dealers to a large master costs
+time proportional to the 2k records, not to the corpus.
+
+Usage:
+    from database.entity_index import EntityIndex
+
+    with EntityIndex("output/master/entity_index.db") as index:
+        for record in new_records:
+            entity_id, match = index.resolve(record, source="Generac")
+"""
+
+import sqlite3
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from database.dedup import (
+    FUZZY_THRESHOLD, DOMAIN_NAME_THRESHOLD, DedupIndex, DedupKeys, SignalMatch,
+    min_shared_trigrams, name_similarity, name_trigrams, partner_length_range
+)
+from database.models import normalize_company_name
+from utils.fuzzy_index import find_all_matches
+
+
+# Default index location (next to the master list outputs)
+DEFAULT_ENTITY_INDEX_PATH = Path(__file__).parent.parent / "output" / "master" / "entity_index.db"
+
+ENTITY_INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entities (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT,
+    state TEXT,
+    source TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS entity_keys (
+    key_type TEXT NOT NULL,        -- 'phone' | 'email' | 'name' (exact_keys)
+    key_value TEXT NOT NULL,
+    entity_id INTEGER NOT NULL REFERENCES entities(id),
+    PRIMARY KEY (key_type, key_value)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS entity_domains (
+    domain TEXT PRIMARY KEY,
+    entity_id INTEGER NOT NULL REFERENCES entities(id),
+    name TEXT
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS entity_names (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,   -- insertion order (earliest match wins)
+    block TEXT NOT NULL,
+    name TEXT NOT NULL,
+    entity_id INTEGER NOT NULL REFERENCES entities(id)
+);
+CREATE INDEX IF NOT EXISTS idx_entity_names_length ON entity_names(block, length(name));
+
+CREATE TABLE IF NOT EXISTS entity_name_trigrams (
+    block TEXT NOT NULL,
+    trigram TEXT NOT NULL,
+    name_id INTEGER NOT NULL,
+    occurrences INTEGER NOT NULL,
+    PRIMARY KEY (block, trigram, name_id)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS entity_sources (
+    entity_id INTEGER NOT NULL REFERENCES entities(id),
+    source TEXT NOT NULL,
+    records INTEGER NOT NULL DEFAULT 1,
+    PRIMARY KEY (entity_id, source)
+) WITHOUT ROWID;
+"""
+
+
+class EntityIndex:
+    """
+    SQLite-backed DedupIndex whose entities are persisted integer ids.
+
+    Has the DedupIndex interface (keys / find / add), with the entity being
+    the entity id, plus resolve() for the usual match-or-create step.
+
+    Example:
+        >>> with EntityIndex(path) as index:
+        >>>     entity_id, match = index.resolve({'company_name': 'ABC Solar', 'state': 'FL'})
+        >>>     index.sources(entity_id)
+        {'FL_License': 3, 'Generac': 1}
+    """
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        fuzzy_threshold: float = FUZZY_THRESHOLD,
+        domain_name_threshold: float = DOMAIN_NAME_THRESHOLD,
+        fuzzy_scope: Optional[str] = "state",
+        normalize_name: Callable[[str], str] = normalize_company_name,
+        exact_keys: Sequence[str] = ("phone", "email")
+    ):
+        """
+        Args:
+            path: SQLite file (default: DEFAULT_ENTITY_INDEX_PATH; ':memory:' works)
+            fuzzy_threshold: Minimum name similarity for a fuzzy match
+            domain_name_threshold: Name similarity required to accept a shared domain
+            fuzzy_scope: DedupKeys field that blocks fuzzy matching ('state'),
+                or None to compare all names
+            normalize_name: Company name normalizer used by keys()
+            exact_keys: DedupKeys fields matched exactly, in order, before the
+                domain and fuzzy name signals (add 'name' to match identical
+                normalized names across blocks)
+        """
+        self.path = path if path == ":memory:" else Path(path or DEFAULT_ENTITY_INDEX_PATH)
+        self.fuzzy_threshold = fuzzy_threshold
+        self.domain_name_threshold = domain_name_threshold
+        self.fuzzy_scope = fuzzy_scope
+        self.exact_keys = tuple(exact_keys)
+        self._key_builder = DedupIndex(signals=[], normalize_name=normalize_name)
+        self.conn: Optional[sqlite3.Connection] = None
+
+    # ------------------------------------------------------------------------
+    # Connection
+    # ------------------------------------------------------------------------
+
+    def open(self) -> "EntityIndex":
+        if self.conn is None:
+            if isinstance(self.path, Path):
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.conn = sqlite3.connect(str(self.path), timeout=30.0)
+            self.conn.row_factory = sqlite3.Row
+            self.conn.executescript(ENTITY_INDEX_SCHEMA)
+        return self
+
+    def close(self) -> None:
+        if self.conn is not None:
+            self.conn.commit()
+            self.conn.close()
+            self.conn = None
+
+    def commit(self) -> None:
+        self.conn.commit()
+
+    def __enter__(self) -> "EntityIndex":
+        return self.open()
+
+    def __exit__(self, exc_type, exc_value, traceback) -> bool:
+        if exc_type is not None and self.conn is not None:
+            self.conn.rollback()
+        self.close()
+        return False
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM entities").fetchone()[0]
+
+    # ------------------------------------------------------------------------
+    # Matching
+    # ------------------------------------------------------------------------
+
+    def keys(self, record: Dict[str, Any]) -> DedupKeys:
+        """Normalized keys from a record dict (same fields as DedupIndex.keys)."""
+        return self._key_builder.keys(record)
+
+    def _block(self, keys: DedupKeys) -> Optional[str]:
+        if not keys.name:
+            return None
+        if self.fuzzy_scope is None:
+            return ""
+        return getattr(keys, self.fuzzy_scope) or None
+
+    def find(self, keys: DedupKeys) -> Optional[SignalMatch]:
+        """First signal match for these keys, or None (entity = entity id)."""
+        cursor = self.conn.cursor()
+        for key_type in self.exact_keys:
+            value = getattr(keys, key_type)
+            if value:
+                row = cursor.execute(
+                    "SELECT entity_id FROM entity_keys WHERE key_type = ? AND key_value = ?",
+                    (key_type, value)
+                ).fetchone()
+                if row:
+                    return SignalMatch(row['entity_id'], key_type, value)
+
+        if keys.domain:
+            row = cursor.execute(
+                "SELECT entity_id, name FROM entity_domains WHERE domain = ?", (keys.domain,)
+            ).fetchone()
+            if row:
+                similarity = name_similarity(keys.name, row['name'] or '')
+                if similarity >= self.domain_name_threshold:
+                    return SignalMatch(row['entity_id'], "domain", keys.domain, similarity)
+
+        block = self._block(keys)
+        if block is not None:
+            candidates = self._name_candidates(cursor, block, keys.name)
+            # One bulk screen + verify over the candidates; the first hit is the earliest added
+            found = find_all_matches([keys.name], [name for _, name in candidates], self.fuzzy_threshold)[0]
+            if found:
+                position, similarity = found[0]
+                return SignalMatch(
+                    candidates[position][0], "fuzzy_name", f"{keys.name}:{similarity:.2f}", similarity
+                )
+        return None
+
+    def _name_candidates(self, cursor: sqlite3.Cursor, block: str, name: str) -> List[Tuple[int, str]]:
+        """
+        (entity_id, name) rows in a block that could reach the fuzzy threshold,
+        in insertion order.
+
+        Same bounds as PipelineDB._fuzzy_name_candidates: rows sharing at least
+        min_shared_trigrams() trigrams, plus a length scan where that bound
+        is uninformative.  Never drops a true match.
+        """
+        length = len(name)
+        lo, hi = partner_length_range(length, self.fuzzy_threshold)
+
+        scan_lengths = []
+        required = []
+        for other in range(lo, hi + 1):
+            need = min_shared_trigrams(length, other, self.fuzzy_threshold)
+            if need is None:
+                continue
+            if need <= 0:
+                scan_lengths.append(other)
+            else:
+                required.append(need)
+
+        candidates: Dict[int, Tuple[int, str]] = {}
+        if scan_lengths:
+            cursor.execute(
+                """SELECT id, entity_id, name FROM entity_names
+                   WHERE block = ? AND length(name) BETWEEN ? AND ?""",
+                (block, min(scan_lengths), max(scan_lengths))
+            )
+            candidates.update((row['id'], (row['entity_id'], row['name'])) for row in cursor.fetchall())
+
+        trigrams = name_trigrams(name)
+        if required and trigrams:
+            values = ", ".join(["(?, ?)"] * len(trigrams))
+            params = [value for item in trigrams.items() for value in item]
+            cursor.execute(
+                f"""WITH query(trigram, occurrences) AS (VALUES {values})
+                    SELECT n.id, n.entity_id, n.name FROM entity_names n
+                    JOIN (
+                        SELECT t.name_id
+                        FROM query q
+                        JOIN entity_name_trigrams t
+                          ON t.block = ? AND t.trigram = q.trigram
+                        GROUP BY t.name_id
+                        HAVING SUM(MIN(t.occurrences, q.occurrences)) >= ?
+                    ) shared ON shared.name_id = n.id""",
+                (*params, block, min(required))
+            )
+            candidates.update((row['id'], (row['entity_id'], row['name'])) for row in cursor.fetchall())
+
+        return [candidates[name_id] for name_id in sorted(candidates)]
+
+    # ------------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------------
+
+    def add(
+        self,
+        keys: DedupKeys,
+        entity: Optional[int] = None,
+        match_types: Optional[Sequence[str]] = None,
+        source: str = ""
+    ) -> int:
+        """
+        Index keys under an entity, creating the entity when none is given.
+
+        Args:
+            keys: Keys to index
+            entity: Existing entity id (None = create a new entity)
+            match_types: Only index these signals (e.g. ('phone', 'email')
+                when recording extra keys of a merged duplicate)
+            source: Source label recorded for a new entity
+
+        Returns:
+            The entity id
+        """
+        cursor = self.conn.cursor()
+        if entity is None:
+            cursor.execute(
+                "INSERT INTO entities (name, state, source) VALUES (?, ?, ?)",
+                (keys.name, keys.state, source)
+            )
+            entity = cursor.lastrowid
+
+        def wanted(match_type: str) -> bool:
+            return match_types is None or match_type in match_types
+
+        for key_type in self.exact_keys:
+            value = getattr(keys, key_type)
+            if value and wanted(key_type):
+                cursor.execute(
+                    "INSERT OR IGNORE INTO entity_keys (key_type, key_value, entity_id) VALUES (?, ?, ?)",
+                    (key_type, value, entity)
+                )
+        if keys.domain and wanted("domain"):
+            cursor.execute(
+                "INSERT OR IGNORE INTO entity_domains (domain, entity_id, name) VALUES (?, ?, ?)",
+                (keys.domain, entity, keys.name)
+            )
+
+        block = self._block(keys)
+        if block is not None and wanted("fuzzy_name"):
+            cursor.execute(
+                "INSERT INTO entity_names (block, name, entity_id) VALUES (?, ?, ?)",
+                (block, keys.name, entity)
+            )
+            name_id = cursor.lastrowid
+            cursor.executemany(
+                "INSERT INTO entity_name_trigrams (block, trigram, name_id, occurrences) VALUES (?, ?, ?, ?)",
+                [(block, trigram, name_id, count) for trigram, count in name_trigrams(keys.name).items()]
+            )
+        return entity
+
+    def _count_source(self, entity_id: int, source: str) -> None:
+        if source:
+            self.conn.execute("""
+                INSERT INTO entity_sources (entity_id, source) VALUES (?, ?)
+                ON CONFLICT (entity_id, source) DO UPDATE SET records = records + 1
+            """, (entity_id, source))
+
+    def resolve(self, record: Dict[str, Any], source: str = "") -> Tuple[Optional[int], Optional[SignalMatch]]:
+        """
+        Match a record against the index, or add it as a new entity.
+
+        A matched record's phone and email (its exact_keys) are added to its
+        entity (as DeduplicationEngine does for merged duplicates).  Records without
+        any usable key are skipped.
+
+        Args:
+            record: Record dict (same fields as DedupIndex.keys)
+            source: Source label counted in entity_sources
+
+        Returns:
+            (entity_id, match) - match is None for a new entity;
+            (None, None) when the record has no keys
+        """
+        keys = self.keys(record)
+        if not (keys.phone or keys.email or keys.domain or keys.name):
+            return None, None
+
+        match = self.find(keys)
+        if match is None:
+            entity_id = self.add(keys, source=source)
+        else:
+            entity_id = match.entity
+            self.add(keys, entity_id, match_types=self.exact_keys)
+        self._count_source(entity_id, source)
+        return entity_id, match
+
+    def resolve_all(self, records: Iterable[Dict[str, Any]], source: str = "") -> List[Optional[int]]:
+        """Entity id per record (see resolve), committed as one transaction."""
+        entity_ids = [self.resolve(record, source=source)[0] for record in records]
+        self.commit()
+        return entity_ids
+
+    def sources(self, entity_id: int) -> Dict[str, int]:
+        """Records seen per source for an entity."""
+        rows = self.conn.execute(
+            "SELECT source, records FROM entity_sources WHERE entity_id = ? ORDER BY source", (entity_id,)
+        ).fetchall()
+        return {row['source']: row['records'] for row in rows}
@@ -0,0 +1,338 @@
+"""
+Cross-State Entity Linkage (MinHash / LSH)
+
+Dedup only fuzzy-matches names within one state, so a contractor licensed in
+FL and TX under different phones and emails stays two contractors, and
+v_cross_state / v_multi_license never see it as one company.  This module
+finds likely same-company pairs across ALL states without comparing every
+pair:
+
+1. Each contractor becomes a set of shingles: character 3-grams of its
+   normalized name plus normalized street, city and ZIP tokens.
+2. Each distinct name gets a MinHash signature (NUM_PERMUTATIONS values)
+   of its name shingles, which estimates the Jaccard similarity of two
+   names.  Shingles shared by more than MAX_SHINGLE_SHARE of the records
+   ("ele", "ric") are left out so "smith electric" and "jones electric"
+   do not look alike.  Address tokens are not hashed: offices of one
+   company in different states rarely share an address.
+3. Signatures are cut into bands; names that agree on every row of some
+   band land in the same bucket and become candidates.  With 32 bands of
+   4 rows a pair at Jaccard 0.6 collides with probability ~0.98, a pair
+   at 0.2 with ~0.05.
+4. Records of candidate names in different states are scored exactly -
+   name SequenceMatcher ratio, and Jaccard of the full name + address
+   shingles - and kept above both thresholds.
+
+PipelineDB.link_cross_state_contractors() stores the kept pairs in
+entity_links, which feeds the v_entity_* views.
+
+Usage:
+    from database.entity_links import find_entity_links
+
+    links = find_entity_links(records)   # [EntityLink(...), ...]
+"""
+
+import logging
+import random
+import zlib
+from collections import Counter
+from dataclasses import dataclass
+from difflib import SequenceMatcher
+from itertools import combinations
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from database.models import normalize_city, normalize_street, normalize_zip
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on environment
+    np = None
+
+logger = logging.getLogger('pipeline_db')
+
+# Signature length and banding (NUM_BANDS * BAND_ROWS == NUM_PERMUTATIONS)
+NUM_PERMUTATIONS = 128
+NUM_BANDS = 32
+BAND_ROWS = 4
+
+# A cross-state link needs a near-identical name AND overlapping shingles.
+# Stricter than in-state fuzzy dedup (0.85) because state no longer blocks.
+LINK_NAME_THRESHOLD = 0.9
+LINK_SHINGLE_THRESHOLD = 0.5
+
+# Name shingles found in more than this share of records say nothing about
+# identity ("ele", "ric"); they are left out of signatures, not of scoring
+MAX_SHINGLE_SHARE = 0.02
+
+# Buckets with more distinct names than this, and names held by more records
+# than MAX_NAME_RECORDS ("johnson electric" in every state), are generic;
+# pairing them all would be quadratic and mostly wrong
+MAX_BUCKET_SIZE = 100
+MAX_NAME_RECORDS = 50
+
+# Universal hashing h(x) = (a*x + b) mod p over 31-bit shingle hashes, so
+# a*x + b stays inside int64 for the numpy path
+_PRIME = (1 << 31) - 1
+_SIGNATURE_CHUNK = 1 << 16
+
+
+@dataclass
+class EntityLink:
+    """A likely same-entity pair found by find_entity_links()."""
+    first: int                  # Record position (first < second)
+    second: int
+    name_similarity: float
+    shingle_similarity: float
+
+
+def contractor_shingles(
+    normalized_name: str,
+    street: str = "",
+    city: str = "",
+    zip_code: str = ""
+) -> Set[str]:
+    """
+    Name 3-grams plus normalized address word tokens ('@' prefixed, so they
+    never collide with name grams).
+
+    Example:
+        >>> sorted(contractor_shingles('abc air', city='Tampa'))
+        [' ai', '@tampa', 'abc', 'air', 'bc ', 'c a']
+    """
+    shingles = {normalized_name[i:i + 3] for i in range(len(normalized_name) - 2)}
+    if 0 < len(normalized_name) < 3:
+        shingles.add(normalized_name)
+    address = f"{normalize_street(street)} {normalize_city(city)} {normalize_zip(zip_code)}"
+    shingles.update(f"@{token}" for token in address.split())
+    return shingles
+
+
+def jaccard(a: Set[str], b: Set[str]) -> float:
+    """|a & b| / |a | b| (0.0 for two empty sets)."""
+    if not a and not b:
+        return 0.0
+    shared = len(a & b)
+    return shared / (len(a) + len(b) - shared)
+
+
+def _similarity_at_least(name1: str, name2: str, threshold: float) -> Optional[float]:
+    """name_similarity(name1, name2) if it reaches threshold, else None (cheap bounds first)."""
+    total = len(name1) + len(name2)
+    if not total or 2.0 * min(len(name1), len(name2)) / total < threshold:
+        return None
+    matcher = SequenceMatcher(None, name1, name2)
+    if matcher.quick_ratio() < threshold:
+        return None
+    similarity = matcher.ratio()
+    return similarity if similarity >= threshold else None
+
+
+def _shingle_hash(shingle: str) -> int:
+    # crc32 is stable across processes (unlike hash()) and cheap
+    return zlib.crc32(shingle.encode("utf-8")) & _PRIME
+
+
+class MinHasher:
+    """
+    MinHash signatures with a fixed, seeded set of hash permutations.
+
+    Example:
+        >>> hasher = MinHasher()
+        >>> signatures = hasher.signatures([{'abc', 'bc '}, {'abc', 'xyz'}])
+    """
+
+    def __init__(self, num_permutations: int = NUM_PERMUTATIONS, seed: int = 1):
+        rng = random.Random(seed)
+        self.num_permutations = num_permutations
+        self._a = [rng.randrange(1, _PRIME) for _ in range(num_permutations)]
+        self._b = [rng.randrange(0, _PRIME) for _ in range(num_permutations)]
+
+    def signature(self, shingles: Iterable[str]) -> Tuple[int, ...]:
+        """Signature of one shingle set (all _PRIME for an empty set)."""
+        hashes = [_shingle_hash(shingle) for shingle in shingles]
+        if not hashes:
+            return (_PRIME,) * self.num_permutations
+        return tuple(
+            min((a * x + b) % _PRIME for x in hashes)
+            for a, b in zip(self._a, self._b)
+        )
+
+    def signatures(self, shingle_sets: Sequence[Iterable[str]]) -> List[Tuple[int, ...]]:
+        """Signatures of many sets; vectorized with numpy when it is installed."""
+        if np is None:
+            return [self.signature(shingles) for shingles in shingle_sets]
+        return [tuple(row) for row in self._signature_matrix(shingle_sets).tolist()]
+
+    def _signature_matrix(self, shingle_sets: Sequence[Iterable[str]]) -> "np.ndarray":
+        """(sets x permutations) int64 signature matrix (numpy only)."""
+        hashed = [[_shingle_hash(shingle) for shingle in shingles] for shingles in shingle_sets]
+        a = np.array(self._a, dtype=np.int64)[:, None]
+        b = np.array(self._b, dtype=np.int64)[:, None]
+        matrix = np.full((len(hashed), self.num_permutations), _PRIME, dtype=np.int64)
+
+        start = 0
+        while start < len(hashed):
+            # Records whose shingles fit in one (permutations x chunk) block
+            stop, total = start, 0
+            while stop < len(hashed) and (total == 0 or total + len(hashed[stop]) <= _SIGNATURE_CHUNK):
+                total += len(hashed[stop])
+                stop += 1
+
+            block = hashed[start:stop]
+            lengths = np.array([len(h) for h in block], dtype=np.int64)
+            values = np.fromiter((x for h in block for x in h), dtype=np.int64, count=int(lengths.sum()))
+            filled = np.flatnonzero(lengths > 0)
+            if values.size:
+                permuted = (a * values[None, :] + b) % _PRIME
+                offsets = np.concatenate(([0], np.cumsum(lengths[filled])[:-1]))
+                matrix[start + filled] = np.minimum.reduceat(permuted, offsets, axis=1).T
+            start = stop
+
+        return matrix
+
+
+def _band_buckets(
+    signatures: Sequence[Tuple[int, ...]],
+    bands: int,
+    rows: int
+) -> Iterator[List[int]]:
+    """Positions that agree on every row of a band, per bucket of 2 or more."""
+    if np is not None and len(signatures):
+        # Sort each band's rows and cut runs of equal rows (no Python dict per record)
+        matrix = np.asarray(signatures, dtype=np.int64)
+        for band in range(bands):
+            keys = matrix[:, band * rows:(band + 1) * rows]
+            order = np.lexsort(keys.T[::-1])
+            ordered = keys[order]
+            breaks = np.flatnonzero(np.any(ordered[1:] != ordered[:-1], axis=1)) + 1
+            starts = np.concatenate(([0], breaks))
+            ends = np.concatenate((breaks, [len(order)]))
+            for start, end in zip(starts.tolist(), ends.tolist()):
+                if end - start > 1:
+                    yield sorted(order[start:end].tolist())
+        return
+
+    for band in range(bands):
+        lo, hi = band * rows, (band + 1) * rows
+        buckets: Dict[Tuple[int, ...], List[int]] = {}
+        for position, signature in enumerate(signatures):
+            buckets.setdefault(signature[lo:hi], []).append(position)
+        for members in buckets.values():
+            if len(members) > 1:
+                yield members
+
+
+def lsh_candidate_pairs(
+    signatures: Sequence[Tuple[int, ...]],
+    bands: int = NUM_BANDS,
+    rows: int = BAND_ROWS,
+    max_bucket_size: int = MAX_BUCKET_SIZE,
+    groups: Optional[Sequence[Any]] = None
+) -> Set[Tuple[int, int]]:
+    """
+    Position pairs that share at least one LSH band bucket.
+
+    Args:
+        signatures: MinHash signatures, one per record (tuples or a numpy matrix)
+        bands: Number of bands
+        rows: Signature rows per band
+        max_bucket_size: Skip buckets with more members than this
+        groups: Optional group per record (e.g. state); pairs within the
+            same group are dropped
+
+    Returns:
+        {(i, j), ...} with i < j
+    """
+    pairs: Set[Tuple[int, int]] = set()
+    skipped = 0
+    for members in _band_buckets(signatures, bands, rows):
+        if len(members) > max_bucket_size:
+            skipped += 1
+            continue
+        for i, j in combinations(members, 2):
+            if groups is None or groups[i] != groups[j]:
+                pairs.add((i, j))
+    if skipped:
+        logger.info(f"LSH: skipped {skipped:,} oversized buckets (> {max_bucket_size} records)")
+    return pairs
+
+
+def find_entity_links(
+    records: Sequence[Dict[str, Any]],
+    min_name_similarity: float = LINK_NAME_THRESHOLD,
+    min_shingle_similarity: float = LINK_SHINGLE_THRESHOLD,
+    cross_state_only: bool = True,
+    hasher: Optional[MinHasher] = None
+) -> List[EntityLink]:
+    """
+    Likely same-entity pairs among records, in sub-quadratic time.
+
+    Args:
+        records: Dicts with normalized_name, street, city, zip, state
+        min_name_similarity: Minimum SequenceMatcher ratio of the names
+        min_shingle_similarity: Minimum Jaccard of name + address shingles
+        cross_state_only: Only pair records from different states
+        hasher: MinHasher to use (default: NUM_PERMUTATIONS, seed 1)
+
+    Returns:
+        EntityLinks sorted by (first, second)
+
+    Example:
+        >>> links = find_entity_links(contractors)
+        >>> [(contractors[l.first]['id'], contractors[l.second]['id']) for l in links]
+    """
+    hasher = hasher or MinHasher()
+    bands = hasher.num_permutations // BAND_ROWS
+
+    # Record positions per distinct name, in first-seen order
+    by_name: Dict[str, List[int]] = {}
+    for position, record in enumerate(records):
+        name = record.get('normalized_name') or ''
+        if name:
+            by_name.setdefault(name, []).append(position)
+    names = [name for name, positions in by_name.items() if len(positions) <= MAX_NAME_RECORDS]
+    states = [record.get('state') or '' for record in records]
+    shingles = [
+        contractor_shingles(
+            record.get('normalized_name') or '', record.get('street') or '',
+            record.get('city') or '', record.get('zip') or ''
+        )
+        for record in records
+    ]
+
+    name_shingles = [contractor_shingles(name) for name in names]
+    frequency = Counter()
+    for name, grams in zip(names, name_shingles):
+        for gram in grams:
+            frequency[gram] += len(by_name[name])
+    # Small inputs keep every shingle (a floor of 100 records)
+    limit = max(MAX_SHINGLE_SHARE * len(records), 100)
+    common = {gram for gram, count in frequency.items() if count > limit}
+    # A name made only of common shingles keeps them all
+    shingle_sets = [(grams - common) or grams for grams in name_shingles]
+
+    if np is not None:
+        signatures = hasher._signature_matrix(shingle_sets)
+    else:
+        signatures = hasher.signatures(shingle_sets)
+    candidates = lsh_candidate_pairs(signatures, bands=bands, rows=BAND_ROWS)
+    # Records sharing a name are always candidates
+    candidates.update((k, k) for k, name in enumerate(names) if len(by_name[name]) > 1)
+
+    scored: Dict[Tuple[int, int], Tuple[float, float]] = {}
+    for a, b in candidates:
+        similarity = 1.0 if a == b else _similarity_at_least(names[a], names[b], min_name_similarity)
+        if similarity is None:
+            continue
+        for i in by_name[names[a]]:
+            for j in by_name[names[b]]:
+                if i == j or (cross_state_only and states[i] == states[j]):
+                    continue
+                overlap = jaccard(shingles[i], shingles[j])
+                if overlap >= min_shingle_similarity:
+                    scored[(min(i, j), max(i, j))] = (similarity, overlap)
+
+    links = [EntityLink(i, j, similarity, overlap) for (i, j), (similarity, overlap) in sorted(scored.items())]
+    logger.info(f"Entity linkage: {len(records):,} records, {len(names):,} names, "
+                f"{len(candidates):,} LSH candidates, {len(links):,} links")
+    return links
@@ -0,0 +1,173 @@
+"""
+Streaming Exporters for PipelineDB
+
+The exporters take any iterable of row dicts - normally a PipelineDB
+iter_*() generator that reads its cursor in fetchmany() batches - and write
+each row as it arrives, so memory stays constant however many rows are
+exported and the first rows reach the file immediately.
+
+Formats:
+- csv   - header from the first row (or fieldnames=)
+- jsonl - one JSON object per line
+- json  - one JSON object: header fields, the rows array, then total_count
+          (written last, since the count is only known once the rows are out)
+
+Any path ending in .gz is gzip-compressed (or pass compress=True/False).
+
+Usage:
+    from database import PipelineDB
+    from database.export import write_jsonl
+
+    db = PipelineDB()
+    write_jsonl(db.iter_multi_license_contractors(state='FL'), 'output/fl.jsonl.gz')
+
+    db.export_contractors('output/all_contractors.csv.gz')
+"""
+
+import csv
+import gzip
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Sequence, TextIO
+
+EXPORT_FORMATS = ('csv', 'jsonl', 'json')
+
+
+def export_format(path: Path) -> str:
+    """
+    Format implied by a file name ('contractors.jsonl.gz' -> 'jsonl').
+
+    Raises:
+        ValueError: If the suffix is not one of EXPORT_FORMATS
+    """
+    suffixes = [s.lstrip('.').lower() for s in Path(path).suffixes]
+    if suffixes and suffixes[-1] == 'gz':
+        suffixes.pop()
+    fmt = suffixes[-1] if suffixes else ''
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Cannot infer export format from {str(path)!r}; expected one of {EXPORT_FORMATS}")
+    return fmt
+
+
+def open_export(path: Path, compress: Optional[bool] = None) -> TextIO:
+    """
+    Open an export file for text writing, creating parent directories.
+
+    Args:
+        path: Output path
+        compress: gzip the output (default: when the path ends in .gz)
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if compress is None:
+        compress = path.suffix.lower() == '.gz'
+    if compress:
+        return gzip.open(path, 'wt', newline='', encoding='utf-8')
+    return open(path, 'w', newline='', encoding='utf-8')
+
+
+def write_csv(
+    rows: Iterable[Dict[str, Any]],
+    path: Path,
+    fieldnames: Optional[Sequence[str]] = None,
+    compress: Optional[bool] = None
+) -> int:
+    """
+    Stream rows to CSV.
+
+    Without fieldnames the header comes from the first row, and no rows
+    leaves an empty file.
+
+    Returns:
+        Number of rows written
+    """
+    count = 0
+    with open_export(path, compress) as f:
+        writer = None
+        if fieldnames is not None:
+            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer.writeheader()
+        for row in rows:
+            if writer is None:
+                writer = csv.DictWriter(f, fieldnames=list(row.keys()))
+                writer.writeheader()
+            writer.writerow(row)
+            count += 1
+    return count
+
+
+def write_jsonl(
+    rows: Iterable[Dict[str, Any]],
+    path: Path,
+    compress: Optional[bool] = None
+) -> int:
+    """
+    Stream rows as JSON Lines.
+
+    Returns:
+        Number of rows written
+    """
+    count = 0
+    with open_export(path, compress) as f:
+        for row in rows:
+            f.write(json.dumps(row, default=str))
+            f.write('\n')
+            count += 1
+    return count
+
+
+def write_json(
+    rows: Iterable[Dict[str, Any]],
+    path: Path,
+    header: Optional[Dict[str, Any]] = None,
+    key: str = 'records',
+    compress: Optional[bool] = None
+) -> int:
+    """
+    Stream rows into a JSON document: {**header, key: [rows...], 'total_count': n}.
+
+    Rows are indented as json.dump(indent=2) would write them, so the file
+    reads the same as the old all-in-memory exports.
+
+    Returns:
+        Number of rows written
+    """
+    count = 0
+    with open_export(path, compress) as f:
+        f.write('{\n')
+        for name, value in (header or {}).items():
+            f.write(f"  {json.dumps(name)}: {json.dumps(value, default=str)},\n")
+        f.write(f"  {json.dumps(key)}: [")
+        for row in rows:
+            body = json.dumps(row, indent=2, default=str).replace('\n', '\n    ')
+            f.write(f"{',' if count else ''}\n    {body}")
+            count += 1
+        f.write('\n  ],\n' if count else '],\n')
+        f.write(f'  "total_count": {count}\n}}\n')
+    return count
+
+
+def write_rows(
+    rows: Iterable[Dict[str, Any]],
+    path: Path,
+    fmt: Optional[str] = None,
+    compress: Optional[bool] = None,
+    **options: Any
+) -> int:
+    """
+    Stream rows in fmt (default: from the file name, see export_format).
+
+    Extra options go to the format's writer (fieldnames= for csv; header=
+    and key= for json).
+
+    Returns:
+        Number of rows written
+    """
+    fmt = fmt or export_format(path)
+    if fmt == 'csv':
+        return write_csv(rows, path, compress=compress, **options)
+    if fmt == 'jsonl':
+        return write_jsonl(rows, path, compress=compress, **options)
+    if fmt == 'json':
+        return write_json(rows, path, compress=compress, **options)
+    raise ValueError(f"Unknown export format {fmt!r}; expected one of {EXPORT_FORMATS}")
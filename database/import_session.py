@@ -0,0 +1,370 @@
+"""
+Bulk Import Session for PipelineDB
+
+PipelineDB.add_contractor() opens a connection per record and runs up to seven
+SELECTs in _find_duplicate() before writing anything, which caps state license
+imports at a few hundred rows/sec.  An ImportSession loads the dedup keys of
+every existing contractor and contact ONCE into in-memory indexes
+(database.dedup), keeps them updated as it inserts and merges, and commits in
+batches on a single connection.
+
+Matching is the same as add_contractor():
+1. Phone  - contractors.primary_phone, then contacts.phone
+2. Email  - contractors.primary_email, then contacts.email
+3. Domain - contractors.primary_domain, confirmed by >= 50% name similarity
+4. Fuzzy name - >= 85% similarity within the same state
+
+Ties resolve to the lowest id, as the indexed SELECTs do, so a session writes
+exactly what the same add_contractor() calls would.
+
+Only contractor rows are inserted as they arrive (their ids are needed for
+matching).  Contacts, licenses, dedup matches and updated_at touches are
+buffered in input order and written with executemany when the batch commits,
+so every table gets the same rows and ids as the per-row path.  Whether a
+merged contact is new (contacts UNIQUE(contractor_id, email)) is answered
+from an in-memory key set instead of cursor.rowcount.
+
+The session assumes it is the only writer while it is open (hold an
+ImportLock when other processes may import at the same time).
+
+Usage:
+    from database import PipelineDB
+
+    db = PipelineDB()
+    with db.import_session(source='FL_License') as session:
+        for record in records:
+            contractor_id, is_new = session.add_contractor(record)
+
+    print(session.stats)   # {'records_input': ..., 'records_new': ..., ...}
+
+    # Or in one call, with (contractor_id, is_new, match_type) per record
+    results = db.add_contractors_bulk(records, source='FL_License')
+"""
+
+import logging
+import sqlite3
+import sys
+from contextlib import ExitStack
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from database.audit import AuditTrail
+from database.dedup import (
+    FUZZY_THRESHOLD, DOMAIN_NAME_THRESHOLD, DedupIndex, DedupKeys, DomainSignal,
+    ExactKeySignal, FuzzyNameSignal
+)
+from database.models import normalize_company_name
+
+logger = logging.getLogger('pipeline_db')
+
+
+class ImportSession:
+    """
+    Single-connection, in-memory-deduplicated contractor import.
+
+    Example:
+        >>> with ImportSession(db, source='CA_CSLB', batch_size=10000) as session:
+        >>>     for record in records:
+        >>>         session.add_contractor(record)
+        >>> db.complete_pipeline_run(run_id, records_new=session.stats['records_new'])
+    """
+
+    def __init__(
+        self,
+        db,
+        source: str = "unknown",
+        batch_size: int = 5000,
+        file_import_id: Optional[int] = None,
+        progress: Optional[Callable[[int], None]] = None,
+        profile: Optional[str] = None,
+        publish_replica: bool = False
+    ):
+        """
+        Args:
+            db: PipelineDB to import into
+            source: Source identifier (e.g., 'FL_License', 'CA_CSLB')
+            batch_size: Records per transaction commit
+            file_import_id: When set, log INSERT/MERGE to the audit trail
+                like add_contractor_with_audit()
+            progress: Called with stats['records_input'] after every commit
+            profile: Run under db.performance_profile(profile) (e.g.
+                'bulk_import'); indexes are rebuilt after the final commit
+            publish_replica: Call db.publish_replica() after a successful
+                final commit, so readers see the import
+        """
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be >= 1, got {batch_size}")
+
+        self.db = db
+        self.source = source
+        self.batch_size = batch_size
+        self.file_import_id = file_import_id
+        self.progress = progress
+        self.profile = profile
+        self.publish_replica = publish_replica
+
+        self.stats = {'records_input': 0, 'records_new': 0, 'records_merged': 0}
+
+        # Contractor keys and contact keys are separate signals so that a
+        # contractor match always wins over a contact match, as in SQL
+        self._phone = ExactKeySignal('phone')
+        self._contact_phone = ExactKeySignal('phone')
+        self._email = ExactKeySignal('email')
+        self._contact_email = ExactKeySignal('email')
+        self._domain = DomainSignal(name_threshold=DOMAIN_NAME_THRESHOLD)
+        self._names = FuzzyNameSignal(threshold=FUZZY_THRESHOLD, scope='state')
+        self.index = DedupIndex(signals=[
+            self._phone, self._contact_phone, self._email, self._contact_email,
+            self._domain, self._names,
+        ])
+
+        self._contexts: Optional[ExitStack] = None
+        self.conn: Optional[sqlite3.Connection] = None
+        # Savepoint of the session's block when nested in a caller's transaction
+        self._savepoint: Optional[str] = None
+        self._cursor: Optional[sqlite3.Cursor] = None
+        self._audit: Optional[AuditTrail] = None
+        self._pending = 0
+
+        # Child rows waiting for the batch commit, in input order
+        self._contacts: List[Tuple] = []
+        self._licenses: List[Tuple] = []
+        self._dedup_matches: List[Tuple] = []
+        self._touched: Dict[int, None] = {}
+        # (contractor_id, email) of every contact row, for the UNIQUE check
+        self._contact_keys: Set[Tuple[int, str]] = set()
+
+    # ------------------------------------------------------------------------
+    # Context manager
+    # ------------------------------------------------------------------------
+
+    def __enter__(self) -> "ImportSession":
+        self._contexts = ExitStack()
+        if self.profile is not None:
+            self._contexts.enter_context(self.db.performance_profile(self.profile))
+        self.conn = self._contexts.enter_context(self.db._get_connection())
+        depth = self.db._local.depth
+        self._savepoint = f"nested_{depth - 1}" if depth > 1 else None
+        self._cursor = self.conn.cursor()
+        if self.file_import_id is not None:
+            self._audit = AuditTrail(self.conn, source=self.source, file_import_id=self.file_import_id)
+        self._load_index()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> bool:
+        try:
+            if exc_type is None:
+                self._flush()
+        except Exception:
+            # Rolls back the open batch; the flush error propagates
+            self._contexts.__exit__(*sys.exc_info())
+            raise
+        else:
+            # Commits on success, rolls back the open batch on error
+            self._contexts.__exit__(exc_type, exc_value, traceback)
+        finally:
+            self.conn = None
+            self._cursor = None
+            self._savepoint = None
+        if exc_type is None and self.progress is not None and self._pending:
+            self.progress(self.stats['records_input'])
+        self._pending = 0
+        if exc_type is None and self.publish_replica:
+            self.db.publish_replica()
+        return False
+
+    def _load_index(self) -> None:
+        """Index every existing contractor and contact, lowest id first."""
+        cursor = self._cursor
+        cursor.execute("""
+            SELECT id, company_name, normalized_name, state,
+                   primary_phone, primary_email, primary_domain
+            FROM contractors ORDER BY id
+        """)
+        contractors = 0
+        for row in cursor:
+            normalized_name = row['normalized_name'] or ''
+            keys = DedupKeys(
+                phone=row['primary_phone'] or '',
+                email=row['primary_email'] or '',
+                domain=row['primary_domain'] or '',
+                name=normalized_name,
+                state=row['state'] or '',
+            )
+            self._phone.add(keys, row['id'])
+            self._email.add(keys, row['id'])
+            self._names.add(keys, row['id'])
+            if keys.domain:
+                # Domain guard compares against the stored name, as in SQL
+                keys.name = normalized_name or normalize_company_name(row['company_name'] or '')
+                self._domain.add(keys, row['id'])
+            contractors += 1
+
+        cursor.execute("SELECT contractor_id, phone, email FROM contacts ORDER BY id")
+        for row in cursor:
+            keys = DedupKeys(phone=row['phone'] or '', email=row['email'] or '')
+            self._contact_phone.add(keys, row['contractor_id'])
+            self._contact_email.add(keys, row['contractor_id'])
+            if row['email'] is not None:
+                self._contact_keys.add((row['contractor_id'], row['email']))
+
+        logger.info(f"Import session ({self.source}): indexed {contractors:,} existing contractors")
+
+    # ------------------------------------------------------------------------
+    # Import
+    # ------------------------------------------------------------------------
+
+    def add_contractor(self, record: Dict[str, Any]) -> Tuple[int, bool]:
+        """
+        Add a contractor with deduplication (same contract as PipelineDB.add_contractor).
+
+        Args:
+            record: Dict with keys: company_name, contact_name, email, phone,
+                   address, city, state, zip, license_type, license_number
+
+        Returns:
+            (contractor_id, is_new) - ID and whether this was a new record
+        """
+        contractor_id, is_new, _ = self.add_contractor_with_match(record)
+        return contractor_id, is_new
+
+    def add_contractor_with_match(self, record: Dict[str, Any]) -> Tuple[int, bool, str]:
+        """
+        Like add_contractor(), also reporting which signal matched.
+
+        Returns:
+            (contractor_id, is_new, match_type) - match_type is '' for new
+            contractors, else 'phone', 'email', 'domain' or 'fuzzy_name'
+        """
+        if self.conn is None:
+            raise RuntimeError("ImportSession must be used as a context manager")
+
+        db = self.db
+        fields = db._normalize_record(record)
+        keys = DedupKeys(
+            phone=fields['phone'], email=fields['email'], domain=fields['domain'],
+            name=fields['normalized_name'], state=fields['state'],
+        )
+        match = self.index.find(keys)
+
+        # The contractor INSERT is the only immediate write; it either lands or
+        # raises, so the indexes (updated only afterwards) never disagree with
+        # the database
+        if match is not None:
+            contractor_id = match.entity
+            confidence = 70
+            self._dedup_matches.append((
+                contractor_id, db._record_hash(record), match.match_type,
+                match.match_value, 1.0, self.source
+            ))
+            self._touched[contractor_id] = None
+        else:
+            if not self.conn.in_transaction:
+                self.conn.execute("BEGIN")
+            self._cursor.execute(db.INSERT_CONTRACTOR_SQL, (
+                fields['company_name'], fields['normalized_name'], fields['street'],
+                fields['city'], fields['state'], fields['zip'],
+                fields['phone'], fields['email'], fields['domain']
+            ))
+            contractor_id = self._cursor.lastrowid
+            confidence = 80
+
+        contact_added = False
+        if fields['contact_name'] or fields['email']:
+            contact_key = (contractor_id, fields['email'])
+            if contact_key not in self._contact_keys:
+                self._contact_keys.add(contact_key)
+                contact_added = True
+            # Queued even when it already exists: INSERT OR IGNORE drops it
+            # exactly as the per-row path would
+            self._contacts.append((
+                contractor_id, fields['contact_name'], fields['email'],
+                fields['phone'], self.source, confidence
+            ))
+        if fields['license_type'] and fields['state']:
+            self._licenses.append((
+                contractor_id, fields['state'], fields['license_type'],
+                fields['license_category'], fields['license_number'], self.source
+            ))
+
+        is_new = match is None
+        if is_new:
+            for signal in (self._phone, self._email, self._domain, self._names):
+                signal.add(keys, contractor_id)
+        if contact_added:
+            contact_keys = DedupKeys(phone=fields['phone'], email=fields['email'])
+            self._contact_phone.add(contact_keys, contractor_id)
+            self._contact_email.add(contact_keys, contractor_id)
+
+        if self._audit is not None:
+            self._log_audit(record, contractor_id, is_new)
+
+        self.stats['records_input'] += 1
+        self.stats['records_new' if is_new else 'records_merged'] += 1
+        self._pending += 1
+        if self._pending >= self.batch_size:
+            self.commit()
+
+        return contractor_id, is_new, '' if is_new else match.match_type
+
+    def commit(self) -> None:
+        """
+        Write the buffered child rows and commit the current batch.
+
+        Inside a caller's db._get_connection() block the batch is released
+        into the caller's transaction instead, which commits it.
+        """
+        self._flush()
+        if self._savepoint is None:
+            self.conn.commit()
+        else:
+            # Committing would end the caller's transaction and its savepoints
+            self.conn.execute(f"RELEASE {self._savepoint}")
+            self.conn.execute(f"SAVEPOINT {self._savepoint}")
+        if self.progress is not None and self._pending:
+            self.progress(self.stats['records_input'])
+        self._pending = 0
+
+    def _flush(self) -> None:
+        """executemany the buffered contacts, licenses, matches and audit rows."""
+        cursor = self._cursor
+        db = self.db
+        if self._contacts:
+            cursor.executemany(db.INSERT_CONTACT_SQL, self._contacts)
+            self._contacts = []
+        if self._licenses:
+            cursor.executemany(db.INSERT_LICENSE_SQL, self._licenses)
+            self._licenses = []
+        if self._dedup_matches:
+            cursor.executemany(db.INSERT_DEDUP_MATCH_SQL, self._dedup_matches)
+            self._dedup_matches = []
+        if self._touched:
+            cursor.executemany(db.TOUCH_CONTRACTOR_SQL, [(cid,) for cid in self._touched])
+            self._touched = {}
+        if self._audit is not None:
+            self._audit.flush(commit=False)
+
+    def _log_audit(self, record: Dict[str, Any], contractor_id: int, is_new: bool) -> None:
+        """Audit entries matching add_contractor_with_audit()."""
+        if is_new:
+            self._audit.log_insert(
+                contractor_id=contractor_id,
+                new_values={
+                    'company_name': record.get('company_name', ''),
+                    'city': record.get('city', ''),
+                    'state': record.get('state', ''),
+                    'phone': record.get('phone', ''),
+                    'email': record.get('email', ''),
+                    'license_type': record.get('license_type', ''),
+                    'license_number': record.get('license_number', '')
+                }
+            )
+        else:
+            self._audit.log_merge(
+                master_id=contractor_id,
+                merged_id=0,  # Duplicate was never created
+                merged_values={
+                    'company_name': record.get('company_name', ''),
+                    'phone': record.get('phone', ''),
+                    'email': record.get('email', '')
+                }
+            )
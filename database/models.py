@@ -173,6 +173,132 @@ def fuzzy_match_ratio(name1: str, name2: str) -> float:
     return SequenceMatcher(None, n1, n2).ratio()
 
 
+def fts_match_expression(query: str) -> str:
+    """
+    FTS5 MATCH expression for free-text search: every word as a quoted prefix.
+
+    Quoting keeps user input from being parsed as FTS5 syntax (AND, NEAR, ...).
+    Returns empty string when the query has no words.
+
+    Example:
+        >>> fts_match_expression("ABC Sol")
+        '"abc"* "sol"*'
+    """
+    return ' '.join(f'"{word}"*' for word in re.findall(r'\w+', (query or '').lower()))
+
+
+# ============================================================================
+# ADDRESS NORMALIZATION
+# ============================================================================
+
+# USPS Publication 28 street suffixes (the common ones) -> standard abbreviation
+STREET_SUFFIXES = {
+    'street': 'st', 'str': 'st', 'avenue': 'ave', 'av': 'ave', 'boulevard': 'blvd',
+    'road': 'rd', 'drive': 'dr', 'lane': 'ln', 'court': 'ct', 'place': 'pl',
+    'circle': 'cir', 'terrace': 'ter', 'highway': 'hwy', 'parkway': 'pkwy',
+    'expressway': 'expy', 'freeway': 'fwy', 'trail': 'trl', 'square': 'sq',
+    'center': 'ctr', 'plaza': 'plz', 'point': 'pt', 'suite': 'ste',
+}
+
+DIRECTIONALS = {
+    'north': 'n', 'south': 's', 'east': 'e', 'west': 'w',
+    'northeast': 'ne', 'northwest': 'nw', 'southeast': 'se', 'southwest': 'sw',
+}
+
+# Unit designators - the designator and the unit number after it are dropped,
+# since 'Suite 200' vs 'Ste. 200' vs nothing at all is the same business location
+UNIT_DESIGNATORS = frozenset({'ste', 'apt', 'unit', 'rm', 'room', 'bldg', 'fl', 'floor', 'no', '#'})
+
+# A designator followed by one of these is part of the street name ('45 Fl Ave')
+_SUFFIX_ABBREVIATIONS = frozenset(STREET_SUFFIXES.values()) - UNIT_DESIGNATORS
+
+# City-name abbreviations -> spelled-out word ('St. Petersburg' == 'Saint Petersburg')
+CITY_WORDS = {
+    'st': 'saint', 'ste': 'sainte', 'ft': 'fort', 'mt': 'mount', 'pt': 'point',
+    'n': 'north', 's': 'south', 'e': 'east', 'w': 'west', 'hts': 'heights',
+    'spgs': 'springs', 'bch': 'beach', 'vlg': 'village', 'twp': 'township',
+}
+
+_ADDRESS_TOKEN = re.compile(r"[a-z0-9]+|#")
+
+
+def normalize_city(city: str) -> str:
+    """
+    Normalize a city name for blocking and matching.
+
+    Lowercases, drops punctuation and spells out common abbreviations.
+
+    Examples:
+        'St. Petersburg' -> 'saint petersburg'
+        'FT LAUDERDALE'  -> 'fort lauderdale'
+        'N. Miami Beach' -> 'north miami beach'
+    """
+    if not city or not isinstance(city, str):
+        return ""
+    tokens = _ADDRESS_TOKEN.findall(city.lower().replace("'", ""))
+    return ' '.join(CITY_WORDS.get(token, token) for token in tokens if token != '#')
+
+
+def normalize_street(street: str) -> str:
+    """
+    Normalize a street address to USPS-style abbreviations.
+
+    Lowercases, drops punctuation and unit designators followed by a unit
+    number (Suite 200, Apt B, #3...), and abbreviates suffixes and
+    directionals.  A designator that is part of the street name is kept.
+
+    Examples:
+        '123 North Main Street, Suite 200' -> '123 n main st'
+        '45 W. Oak Ave #3'                 -> '45 w oak ave'
+        '123 No Name Rd'                   -> '123 no name rd'
+    """
+    if not street or not isinstance(street, str):
+        return ""
+    tokens = [STREET_SUFFIXES.get(token, token) for token in _ADDRESS_TOKEN.findall(street.lower())]
+    words = []
+    position = 0
+    while position < len(tokens):
+        token = tokens[position]
+        if token in UNIT_DESIGNATORS:
+            unit, after = (tokens[position + 1:position + 3] + [None, None])[:2]
+            is_unit_number = unit is not None and (
+                any(char.isdigit() for char in unit) or (len(unit) == 1 and unit.isalpha()))
+            if is_unit_number and after not in _SUFFIX_ABBREVIATIONS:
+                position += 2
+                continue
+            if token == '#':
+                position += 1
+                continue
+        words.append(DIRECTIONALS.get(token, token))
+        position += 1
+    return ' '.join(words)
+
+
+def normalize_zip(zip_code) -> str:
+    """
+    Normalize a ZIP code to 5 digits.
+
+    Examples:
+        '33701-1234' -> '33701'
+        '2134'       -> '02134' (leading zero lost in a spreadsheet)
+        33701.0      -> '33701'
+    """
+    if zip_code is None or zip_code != zip_code:  # None or NaN
+        return ""
+    text = str(zip_code).strip()
+    if text.endswith('.0'):
+        text = text[:-2]
+    digits = re.match(r'\d+', text)
+    if not digits:
+        return ""
+    digits = digits.group()
+    if len(digits) == 9:
+        digits = digits[:5]
+    if 3 <= len(digits) <= 4:
+        digits = digits.zfill(5)
+    return digits[:5] if len(digits) >= 5 else ""
+
+
 @dataclass
 class Contractor:
     """
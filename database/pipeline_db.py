@@ -7,7 +7,7 @@ Handles:
 - License tracking across states
 - Contact management from multiple sources
 - Pipeline run history
-- Export to CSV for outreach
+- Streaming export to CSV / JSONL / JSON (optionally gzipped) for outreach
 
 Usage:
     from database import PipelineDB
@@ -24,14 +24,14 @@ Usage:
 
 import sqlite3
 import hashlib
-import csv
 import json
 import logging
 import socket
 import os
+import threading
 from pathlib import Path
 from datetime import datetime
-from typing import Optional, Tuple, List, Dict, Any
+from typing import Optional, Tuple, List, Dict, Any, Callable, Iterable, Iterator
 from contextlib import contextmanager
 
 # Configure logging
@@ -45,66 +45,236 @@ from database.models import (
     Contractor, Contact, License, OEMCertification,
     PipelineRun, DedupMatch, SPWRanking,
     normalize_phone, normalize_email, extract_domain,
-    normalize_company_name, fuzzy_match_ratio
+    normalize_company_name, fts_match_expression
 )
 from database.audit import FileFingerprint, ImportLock, AuditTrail
+from database.dedup import (
+    FUZZY_THRESHOLD, DOMAIN_NAME_THRESHOLD, first_name_match, min_shared_trigrams,
+    name_similarity, name_trigrams, partner_length_range
+)
+from database.import_session import ImportSession
+from database.export import export_format, write_csv, write_json, write_rows
+from database.columnar import export_columnar_snapshot
+from database.replica import connect_replica, publish_replica, replica_path_for
+from database.entity_links import LINK_NAME_THRESHOLD, LINK_SHINGLE_THRESHOLD, find_entity_links
 
 
 # Default database location
 DEFAULT_DB_PATH = Path(__file__).parent.parent / "output" / "pipeline.db"
 
-# Fuzzy match threshold for company name matching
-FUZZY_THRESHOLD = 0.85
+# Connection tuning, selected per PipelineDB (profile=) or per import
+# (performance_profile / import_session(profile=)):
+# - bulk_import: no fsync (an OS crash can lose the import, an app crash
+#   cannot), big page cache and mmap, secondary indexes of the import tables
+#   dropped and rebuilt in one pass afterwards, then ANALYZE
+# - serving: WAL-safe synchronous=NORMAL, large cache and mmap for readers
+PERFORMANCE_PROFILES = {
+    'bulk_import': {
+        'pragmas': {
+            'synchronous': 'OFF',
+            'cache_size': -262144,      # KiB -> 256 MB
+            'mmap_size': 1 << 30,       # 1 GB
+            'temp_store': 'MEMORY',
+        },
+        'defer_indexes': True,
+        'analyze': True,
+    },
+    'serving': {
+        'pragmas': {
+            'synchronous': 'NORMAL',
+            'cache_size': -65536,       # KiB -> 64 MB
+            'mmap_size': 1 << 28,       # 256 MB
+            'temp_store': 'MEMORY',
+        },
+        'defer_indexes': False,
+        'analyze': False,
+    },
+}
+
+# Tables an import writes; their secondary indexes are deferred by bulk_import
+IMPORT_TABLES = (
+    'contractors', 'contacts', 'licenses', 'dedup_matches',
+    'contractor_name_trigrams', 'contractor_history',
+)
 
 
 class PipelineDB:
     """
     SQLite database for contractor pipeline.
 
-    Thread-safe via connection per call pattern.
+    Thread-safe via one persistent connection per thread (see _get_connection).
     Uses WAL mode for better concurrent read performance.
     """
 
-    def __init__(self, db_path: Optional[Path] = None):
+    # Write statements shared by the per-row and bulk (ImportSession) paths
+    INSERT_CONTRACTOR_SQL = """
+        INSERT INTO contractors
+        (company_name, normalized_name, street, city, state, zip,
+         primary_phone, primary_email, primary_domain)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """
+    INSERT_CONTACT_SQL = """
+        INSERT OR IGNORE INTO contacts
+        (contractor_id, name, email, phone, source, confidence)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """
+    INSERT_LICENSE_SQL = """
+        INSERT OR IGNORE INTO licenses
+        (contractor_id, state, license_type, license_category,
+         license_number, source_file)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """
+    INSERT_DEDUP_MATCH_SQL = """
+        INSERT INTO dedup_matches
+        (master_contractor_id, duplicate_record_hash, match_type,
+         match_value, match_confidence, source_file)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """
+    TOUCH_CONTRACTOR_SQL = "UPDATE contractors SET updated_at = CURRENT_TIMESTAMP WHERE id = ?"
+
+    def __init__(
+        self,
+        db_path: Optional[Path] = None,
+        profile: Optional[str] = None,
+        read_only: bool = False
+    ):
         """
         Initialize database connection.
 
         Args:
             db_path: Path to SQLite database file. Defaults to output/pipeline.db
+            profile: PERFORMANCE_PROFILES pragmas applied to every connection
+                (e.g. 'serving' for dashboards and agent tools)
+            read_only: db_path is a published replica (see publish_replica):
+                opened immutable, without locks, and reopened when a newer
+                replica is published
         """
+        if profile is not None and profile not in PERFORMANCE_PROFILES:
+            raise ValueError(f"Unknown profile {profile!r}; expected one of {sorted(PERFORMANCE_PROFILES)}")
         self.db_path = Path(db_path) if db_path else DEFAULT_DB_PATH
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.profile = profile
+        self.read_only = read_only
+        self._local = threading.local()
+
+    def __enter__(self) -> "PipelineDB":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> bool:
+        self.close()
+        return False
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open and configure a new connection."""
+        if self.read_only:
+            conn = connect_replica(self.db_path)
+        else:
+            conn = sqlite3.connect(str(self.db_path), timeout=30.0)
+            conn.row_factory = sqlite3.Row  # Dict-like access
+            conn.execute("PRAGMA journal_mode=WAL")  # Better concurrency
+            conn.execute("PRAGMA foreign_keys=ON")   # Enforce FK constraints
+        if self.profile is not None:
+            for pragma, value in PERFORMANCE_PROFILES[self.profile]['pragmas'].items():
+                conn.execute(f"PRAGMA {pragma}={value}")
+        return conn
 
     @contextmanager
     def _get_connection(self):
-        """Get a database connection with proper settings."""
-        conn = sqlite3.connect(str(self.db_path), timeout=30.0)
-        conn.row_factory = sqlite3.Row  # Dict-like access
-        conn.execute("PRAGMA journal_mode=WAL")  # Better concurrency
-        conn.execute("PRAGMA foreign_keys=ON")   # Enforce FK constraints
+        """
+        Get this thread's database connection inside a transaction.
+
+        Each thread keeps one configured connection, opened on first use and
+        reused by every later call, so small lookups don't pay for connect +
+        PRAGMAs each time.  The outermost block commits on success and rolls
+        back on error; nested blocks run in savepoint nested_<depth> of the
+        outer transaction, so code inside one must not call conn.commit().
+        A forked child process opens its own connection instead of reusing
+        the parent's.  A read_only connection is reopened between
+        transactions once a newer replica has been renamed over db_path.
+        """
+        local = self._local
+        if getattr(local, 'pid', None) != os.getpid():
+            # Never touch a connection inherited across fork()
+            local.conn, local.depth, local.pid = None, 0, os.getpid()
+        if self.read_only and local.conn is not None and not local.depth:
+            if self._replica_version() != local.replica_version:
+                local.conn.close()
+                local.conn = None
+        if local.conn is None:
+            if self.read_only:
+                local.replica_version = self._replica_version()
+            local.conn = self._connect()
+
+        conn = local.conn
+        if local.depth:
+            # Nested block: a savepoint, so its failure undoes only its own writes
+            savepoint = f"nested_{local.depth}"
+            if not conn.in_transaction:
+                # Otherwise the savepoint is the outermost transaction and RELEASE commits it
+                conn.execute("BEGIN")
+            conn.execute(f"SAVEPOINT {savepoint}")
+            local.depth += 1
+            try:
+                yield conn
+                conn.execute(f"RELEASE {savepoint}")
+            except BaseException:
+                conn.execute(f"ROLLBACK TO {savepoint}")
+                conn.execute(f"RELEASE {savepoint}")
+                raise
+            finally:
+                local.depth -= 1
+            return
+
+        local.depth = 1
         try:
             yield conn
             conn.commit()
-        except Exception:
+        except BaseException:
             conn.rollback()
             raise
         finally:
+            local.depth = 0
+
+    def _replica_version(self) -> Tuple[int, int]:
+        """Identity of the file at db_path; changes when a replica is published over it."""
+        stat = os.stat(self.db_path)
+        return stat.st_ino, stat.st_mtime_ns
+
+    def close(self) -> None:
+        """
+        Close this thread's connection (reopened on next use).
+
+        Connections of other threads close when their thread exits.
+        """
+        local = self._local
+        conn = getattr(local, 'conn', None)
+        if conn is not None and getattr(local, 'pid', None) == os.getpid():
             conn.close()
+        local.conn, local.depth = None, 0
 
     def initialize(self) -> None:
         """
         Initialize database schema.
 
-        Creates all tables, indexes, and views if they don't exist.
+        Creates all tables, indexes, and views if they don't exist, plus the
+        FTS5 search index (schema_fts.sql) when SQLite was built with FTS5.
         Safe to call multiple times.
         """
         schema_path = Path(__file__).parent / "schema.sql"
         with open(schema_path, 'r') as f:
             schema_sql = f.read()
+        with open(Path(__file__).parent / "schema_fts.sql", 'r') as f:
+            fts_sql = f.read()
 
         with self._get_connection() as conn:
             conn.executescript(schema_sql)
 
+        try:
+            with self._get_connection() as conn:
+                conn.executescript(fts_sql)
+        except sqlite3.OperationalError as e:
+            logger.warning(f"FTS5 unavailable ({e}); search_contractors will use LIKE scans")
+
     def add_contractor(
         self,
         record: Dict[str, Any],
@@ -130,36 +300,23 @@ class PipelineDB:
         Returns:
             (contractor_id, is_new) - ID and whether this was a new record
         """
-        # Normalize input data
-        company_name = record.get('company_name', '').strip()
-        contact_name = record.get('contact_name', '').strip()
-        email = normalize_email(record.get('email', ''))
-        phone = normalize_phone(record.get('phone', ''))
-        domain = extract_domain(email)
-        state = record.get('state', '').upper().strip()
-        city = record.get('city', '').strip()
-        zip_code = record.get('zip', '').strip()
-        street = record.get('address', '') or record.get('street', '')
-        license_type = record.get('license_type', record.get('license_types', '')).strip().upper()
-        license_number = record.get('license_number', '').strip()
-        license_category = record.get('license_category', '')
-
-        normalized_name = normalize_company_name(company_name)
+        fields = self._normalize_record(record)
 
         with self._get_connection() as conn:
             cursor = conn.cursor()
 
             # Check for existing contractor (dedup)
             existing_id, match_type, match_value = self._find_duplicate(
-                cursor, phone, email, domain, normalized_name, state
+                cursor, fields['phone'], fields['email'], fields['domain'],
+                fields['normalized_name'], fields['state']
             )
 
             if existing_id:
                 # Merge into existing
                 self._merge_into_existing(
-                    cursor, existing_id, contact_name, email, phone,
-                    license_type, license_category, license_number,
-                    state, source
+                    cursor, existing_id, fields['contact_name'], fields['email'],
+                    fields['phone'], fields['license_type'], fields['license_category'],
+                    fields['license_number'], fields['state'], source
                 )
 
                 # Log dedup match
@@ -169,37 +326,227 @@ class PipelineDB:
 
                 return existing_id, False
 
-            # Create new contractor
-            cursor.execute("""
-                INSERT INTO contractors
-                (company_name, normalized_name, street, city, state, zip,
-                 primary_phone, primary_email, primary_domain)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                company_name, normalized_name, street, city, state, zip_code,
-                phone, email, domain
-            ))
-            contractor_id = cursor.lastrowid
+            return self._insert_contractor(cursor, fields, source), True
+
+    def add_contractors_bulk(
+        self,
+        records: Iterable[Dict[str, Any]],
+        source: str = "unknown",
+        batch_size: int = 5000,
+        progress: Optional[Callable[[int], None]] = None,
+        profile: Optional[str] = None,
+        publish_replica: bool = False
+    ) -> List[Tuple[int, bool, str]]:
+        """
+        Add many contractors with deduplication in large transactions.
+
+        Same matching and writes as calling add_contractor() for each record
+        in order, but runs through an ImportSession: dedup keys are matched
+        in memory, contacts, licenses and dedup matches are written with
+        executemany, and the transaction is committed every batch_size records.
+
+        Args:
+            records: Iterable of record dicts (see add_contractor)
+            source: Source identifier (e.g., 'FL_License', 'SPW')
+            batch_size: Records per transaction commit
+            progress: Called with the number of records processed after
+                every committed batch
+            profile: Performance profile for the import (e.g. 'bulk_import')
+            publish_replica: Publish the read-only replica after the import
+
+        Returns:
+            [(contractor_id, is_new, match_type), ...] in input order;
+            match_type is '' for new contractors, else 'phone', 'email',
+            'domain' or 'fuzzy_name'
+
+        Example:
+            >>> results = db.add_contractors_bulk(records, source='FL_License',
+            ...                                   progress=lambda n: print(f"{n:,} rows"))
+            >>> new_ids = [cid for cid, is_new, _ in results if is_new]
+        """
+        with self.import_session(source=source, batch_size=batch_size, progress=progress,
+                                 profile=profile, publish_replica=publish_replica) as session:
+            return [session.add_contractor_with_match(record) for record in records]
+
+    def import_session(
+        self,
+        source: str = "unknown",
+        batch_size: int = 5000,
+        file_import_id: Optional[int] = None,
+        progress: Optional[Callable[[int], None]] = None,
+        profile: Optional[str] = None,
+        publish_replica: bool = False
+    ) -> "ImportSession":
+        """
+        Bulk import context with in-memory deduplication.
+
+        Use instead of calling add_contractor() in a loop when loading a
+        license file: dedup keys are loaded once, rows are matched in memory
+        and committed every batch_size records on one connection.
+
+        Args:
+            source: Source identifier (e.g., 'FL_License', 'CA_CSLB')
+            batch_size: Records per transaction commit
+            file_import_id: When set, also write the audit trail
+                (like add_contractor_with_audit)
+            progress: Called with the number of records processed after
+                every committed batch
+            profile: Run the session under performance_profile(profile),
+                e.g. 'bulk_import' for full license files
+            publish_replica: Publish the read-only replica once the session
+                has committed (see publish_replica)
+
+        Returns:
+            ImportSession (use as a context manager)
+
+        Example:
+            >>> with db.import_session(source='TX_TDLR') as session:
+            >>>     for record in records:
+            >>>         contractor_id, is_new = session.add_contractor(record)
+        """
+        return ImportSession(self, source=source, batch_size=batch_size,
+                             file_import_id=file_import_id, progress=progress,
+                             profile=profile, publish_replica=publish_replica)
+
+    def publish_replica(self, replica_path: Optional[Path] = None) -> Dict[str, Any]:
+        """
+        Publish an immutable, ANALYZE'd read replica for dashboards and agents.
+
+        Copies the committed database with the SQLite backup API and renames
+        the copy over the previous replica (see database/replica.py), so
+        readers never wait on import transactions.
+
+        Args:
+            replica_path: Destination (default: <db>_replica.db next to db_path)
+
+        Returns:
+            Dict with path, bytes and seconds
+        """
+        if self.read_only:
+            raise ValueError("publish_replica() needs the primary database, not a replica")
+        return publish_replica(self, replica_path)
+
+    def open_replica(
+        self,
+        replica_path: Optional[Path] = None,
+        profile: Optional[str] = 'serving'
+    ) -> "PipelineDB":
+        """
+        Read-only PipelineDB on the published replica.
+
+        Raises:
+            FileNotFoundError: If no replica has been published yet
+        """
+        replica_path = Path(replica_path) if replica_path else replica_path_for(self.db_path)
+        if not replica_path.exists():
+            raise FileNotFoundError(f"No replica at {replica_path}; call publish_replica() first")
+        return PipelineDB(replica_path, profile=profile, read_only=True)
 
-            # Add contact
-            if contact_name or email:
-                cursor.execute("""
-                    INSERT OR IGNORE INTO contacts
-                    (contractor_id, name, email, phone, source, confidence)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                """, (contractor_id, contact_name, email, phone, source, 80))
-
-            # Add license
-            if license_type and state:
-                cursor.execute("""
-                    INSERT OR IGNORE INTO licenses
-                    (contractor_id, state, license_type, license_category,
-                     license_number, source_file)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                """, (contractor_id, state, license_type, license_category,
-                      license_number, source))
-
-            return contractor_id, True
+    @contextmanager
+    def performance_profile(self, name: str = 'bulk_import'):
+        """
+        Apply a PERFORMANCE_PROFILES entry to this thread's connection.
+
+        Pragmas are set on entry and restored on exit.  With defer_indexes the
+        secondary indexes of IMPORT_TABLES are dropped on entry and rebuilt on
+        exit (also on error), then ANALYZE refreshes planner statistics.  Only
+        ImportSession writes are fast without those indexes: per-row
+        add_contractor() lookups would scan.  If the process dies inside the
+        block, initialize() recreates the missing indexes.
+
+        Args:
+            name: Profile name ('bulk_import' or 'serving')
+
+        Example:
+            >>> with db.performance_profile('bulk_import'):
+            >>>     with db.import_session(source='FL_License') as session:
+            >>>         for record in records:
+            >>>             session.add_contractor(record)
+        """
+        if name not in PERFORMANCE_PROFILES:
+            raise ValueError(f"Unknown profile {name!r}; expected one of {sorted(PERFORMANCE_PROFILES)}")
+        profile = PERFORMANCE_PROFILES[name]
+
+        with self._get_connection() as conn:
+            previous = {
+                pragma: conn.execute(f"PRAGMA {pragma}").fetchone()[0]
+                for pragma in profile['pragmas']
+            }
+            for pragma, value in profile['pragmas'].items():
+                conn.execute(f"PRAGMA {pragma}={value}")
+
+            deferred = []
+            if profile['defer_indexes']:
+                placeholders = ','.join('?' * len(IMPORT_TABLES))
+                deferred = conn.execute(f"""
+                    SELECT name, sql FROM sqlite_master
+                    WHERE type = 'index' AND sql IS NOT NULL AND tbl_name IN ({placeholders})
+                """, IMPORT_TABLES).fetchall()
+                for row in deferred:
+                    conn.execute(f'DROP INDEX "{row["name"]}"')
+        if deferred:
+            logger.info(f"Deferred {len(deferred)} indexes for {name} profile")
+
+        try:
+            yield
+        finally:
+            with self._get_connection() as conn:
+                for row in deferred:
+                    conn.execute(row['sql'])
+                if profile['analyze']:
+                    conn.execute("ANALYZE")
+            with self._get_connection() as conn:
+                for pragma, value in previous.items():
+                    conn.execute(f"PRAGMA {pragma}={value}")
+
+    @staticmethod
+    def _normalize_record(record: Dict[str, Any]) -> Dict[str, str]:
+        """Normalized contractor fields from an input record (see add_contractor)."""
+        email = normalize_email(record.get('email', ''))
+        company_name = record.get('company_name', '').strip()
+        return {
+            'company_name': company_name,
+            'normalized_name': normalize_company_name(company_name),
+            'contact_name': record.get('contact_name', '').strip(),
+            'email': email,
+            'phone': normalize_phone(record.get('phone', '')),
+            'domain': extract_domain(email),
+            'state': record.get('state', '').upper().strip(),
+            'city': record.get('city', '').strip(),
+            'zip': record.get('zip', '').strip(),
+            'street': record.get('address', '') or record.get('street', ''),
+            'license_type': record.get('license_type', record.get('license_types', '')).strip().upper(),
+            'license_number': record.get('license_number', '').strip(),
+            'license_category': record.get('license_category', ''),
+        }
+
+    def _insert_contractor(
+        self,
+        cursor: sqlite3.Cursor,
+        fields: Dict[str, str],
+        source: str
+    ) -> int:
+        """Insert a new contractor with its contact and license; returns its ID."""
+        cursor.execute(self.INSERT_CONTRACTOR_SQL, (
+            fields['company_name'], fields['normalized_name'], fields['street'],
+            fields['city'], fields['state'], fields['zip'],
+            fields['phone'], fields['email'], fields['domain']
+        ))
+        contractor_id = cursor.lastrowid
+
+        # Add contact
+        if fields['contact_name'] or fields['email']:
+            cursor.execute(self.INSERT_CONTACT_SQL, (
+                contractor_id, fields['contact_name'], fields['email'],
+                fields['phone'], source, 80))
+
+        # Add license
+        if fields['license_type'] and fields['state']:
+            cursor.execute(self.INSERT_LICENSE_SQL, (
+                contractor_id, fields['state'], fields['license_type'],
+                fields['license_category'], fields['license_number'], source))
+
+        return contractor_id
 
     def _find_duplicate(
         self,
@@ -217,7 +564,11 @@ class PipelineDB:
         1. Phone (highest confidence - 96%+ accuracy)
         2. Email (exact)
         3. Domain (same company email)
-        4. Fuzzy name + same state (85%+ threshold, prefix-optimized)
+        4. Fuzzy name + same state (85%+ threshold, trigram candidates)
+
+        Thresholds and name scoring come from database.dedup, shared with the
+        merge scripts.  The fuzzy step returns the lowest-id contractor in the
+        state whose name is similar enough.
 
         Returns:
             (contractor_id, match_type, match_value) or (None, '', '')
@@ -262,35 +613,91 @@ class PipelineDB:
         # 3. Domain match (same company email domain)
         if domain:
             cursor.execute(
-                "SELECT id, company_name FROM contractors WHERE primary_domain = ?",
+                "SELECT id, company_name, normalized_name FROM contractors WHERE primary_domain = ?",
                 (domain,)
             )
             row = cursor.fetchone()
             if row:
                 # Verify name similarity (50%+ threshold for domain match)
-                existing_name = row['company_name']
-                ratio = fuzzy_match_ratio(normalized_name, existing_name)
-                if ratio >= 0.5:
+                existing_name = row['normalized_name'] or normalize_company_name(row['company_name'])
+                ratio = name_similarity(normalized_name, existing_name)
+                if ratio >= DOMAIN_NAME_THRESHOLD:
                     return row['id'], 'domain', domain
 
         # 4. Fuzzy name match (same state, 85%+ threshold)
-        # OPTIMIZATION: Use prefix matching to reduce search space dramatically
-        # Only check records that share the first 3 chars of normalized name
-        if normalized_name and state and len(normalized_name) >= 3:
-            prefix = normalized_name[:3]
-            cursor.execute(
-                """SELECT id, company_name, normalized_name FROM contractors
-                   WHERE state = ? AND normalized_name LIKE ?
-                   LIMIT 100""",
-                (state, f"{prefix}%")
+        if normalized_name and state:
+            match = first_name_match(
+                normalized_name,
+                self._fuzzy_name_candidates(cursor, normalized_name, state),
+                threshold=FUZZY_THRESHOLD
             )
-            for row in cursor.fetchall():
-                ratio = fuzzy_match_ratio(normalized_name, row['normalized_name'] or row['company_name'])
-                if ratio >= FUZZY_THRESHOLD:
-                    return row['id'], 'fuzzy_name', f"{normalized_name}:{ratio:.2f}"
+            if match:
+                contractor_id, ratio = match
+                return contractor_id, 'fuzzy_name', f"{normalized_name}:{ratio:.2f}"
 
         return None, '', ''
 
+    def _fuzzy_name_candidates(
+        self,
+        cursor: sqlite3.Cursor,
+        normalized_name: str,
+        state: str
+    ) -> List[Tuple[int, str]]:
+        """
+        Contractors in a state that could be FUZZY_THRESHOLD-similar to a name.
+
+        Uses the contractor_name_trigrams index: a match must share at least
+        min_shared_trigrams() trigrams, so only rows above that count are
+        fetched.  Partner lengths where the bound is uninformative (short
+        names) are fetched by length instead.  Never drops a true match.
+
+        Returns:
+            (contractor_id, normalized_name) pairs in id order
+        """
+        length = len(normalized_name)
+        lo, hi = partner_length_range(length, FUZZY_THRESHOLD)
+
+        scan_lengths = []
+        required = []
+        for other in range(lo, hi + 1):
+            need = min_shared_trigrams(length, other, FUZZY_THRESHOLD)
+            if need is None:
+                continue
+            if need <= 0:
+                scan_lengths.append(other)
+            else:
+                required.append(need)
+
+        candidates = {}
+        if scan_lengths:
+            cursor.execute(
+                """SELECT id, normalized_name FROM contractors
+                   WHERE state = ? AND length(normalized_name) BETWEEN ? AND ?""",
+                (state, min(scan_lengths), max(scan_lengths))
+            )
+            candidates.update((row['id'], row['normalized_name']) for row in cursor.fetchall())
+
+        trigrams = name_trigrams(normalized_name)
+        if required and trigrams:
+            values = ", ".join(["(?, ?)"] * len(trigrams))
+            params = [value for item in trigrams.items() for value in item]
+            cursor.execute(
+                f"""WITH query(trigram, occurrences) AS (VALUES {values})
+                    SELECT c.id, c.normalized_name FROM contractors c
+                    JOIN (
+                        SELECT t.contractor_id
+                        FROM query q
+                        JOIN contractor_name_trigrams t
+                          ON t.state = ? AND t.trigram = q.trigram
+                        GROUP BY t.contractor_id
+                        HAVING SUM(MIN(t.occurrences, q.occurrences)) >= ?
+                    ) shared ON shared.contractor_id = c.id""",
+                (*params, state, min(required))
+            )
+            candidates.update((row['id'], row['normalized_name']) for row in cursor.fetchall())
+
+        return sorted(candidates.items())
+
     def _merge_into_existing(
         self,
         cursor: sqlite3.Cursor,
@@ -303,31 +710,30 @@ class PipelineDB:
         license_number: str,
         state: str,
         source: str
-    ) -> None:
-        """Merge duplicate record into existing contractor."""
+    ) -> bool:
+        """
+        Merge duplicate record into existing contractor.
+
+        Returns:
+            True if a new contact row was added
+        """
         # Add contact if new
+        contact_added = False
         if contact_name or email:
-            cursor.execute("""
-                INSERT OR IGNORE INTO contacts
-                (contractor_id, name, email, phone, source, confidence)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (contractor_id, contact_name, email, phone, source, 70))
+            cursor.execute(self.INSERT_CONTACT_SQL,
+                           (contractor_id, contact_name, email, phone, source, 70))
+            contact_added = cursor.rowcount > 0
 
         # Add license if new
         if license_type and state:
-            cursor.execute("""
-                INSERT OR IGNORE INTO licenses
-                (contractor_id, state, license_type, license_category,
-                 license_number, source_file)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (contractor_id, state, license_type, license_category,
-                  license_number, source))
+            cursor.execute(self.INSERT_LICENSE_SQL, (
+                contractor_id, state, license_type, license_category,
+                license_number, source))
 
         # Update timestamp
-        cursor.execute("""
-            UPDATE contractors SET updated_at = CURRENT_TIMESTAMP
-            WHERE id = ?
-        """, (contractor_id,))
+        cursor.execute(self.TOUCH_CONTRACTOR_SQL, (contractor_id,))
+
+        return contact_added
 
     def _log_dedup_match(
         self,
@@ -339,16 +745,14 @@ class PipelineDB:
         source: str
     ) -> None:
         """Log a deduplication match for debugging."""
-        # Create hash of duplicate record
-        record_str = str(sorted(record.items()))
-        record_hash = hashlib.md5(record_str.encode()).hexdigest()[:16]
+        cursor.execute(self.INSERT_DEDUP_MATCH_SQL, (
+            master_id, self._record_hash(record), match_type, match_value, 1.0, source))
 
-        cursor.execute("""
-            INSERT INTO dedup_matches
-            (master_contractor_id, duplicate_record_hash, match_type,
-             match_value, match_confidence, source_file)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, (master_id, record_hash, match_type, match_value, 1.0, source))
+    @staticmethod
+    def _record_hash(record: Dict[str, Any]) -> str:
+        """Short hash of an input record, as stored in dedup_matches."""
+        record_str = str(sorted(record.items()))
+        return hashlib.md5(record_str.encode()).hexdigest()[:16]
 
     def add_license(
         self,
@@ -537,6 +941,56 @@ class PipelineDB:
             )
             return contractor_id
 
+    def link_cross_state_contractors(
+        self,
+        min_name_similarity: float = LINK_NAME_THRESHOLD,
+        min_shingle_similarity: float = LINK_SHINGLE_THRESHOLD
+    ) -> int:
+        """
+        Link likely same-company contractors across states (MinHash/LSH).
+
+        Rebuilds the 'minhash' rows of entity_links from the current
+        contractors; v_entity_multi_license, v_entity_unicorns and
+        v_entity_cross_state pool licenses across linked contractors.
+
+        Args:
+            min_name_similarity: Minimum name similarity for a link
+            min_shingle_similarity: Minimum name + address shingle Jaccard
+
+        Returns:
+            Number of links stored
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT id, normalized_name, street, city, zip, state
+                FROM contractors
+                WHERE normalized_name IS NOT NULL AND normalized_name != ''
+                  AND COALESCE(is_deleted, 0) = 0
+                ORDER BY id
+            """)
+            records = [dict(row) for row in cursor.fetchall()]
+
+            links = find_entity_links(
+                records,
+                min_name_similarity=min_name_similarity,
+                min_shingle_similarity=min_shingle_similarity
+            )
+
+            cursor.execute("DELETE FROM entity_links WHERE link_type = 'minhash'")
+            cursor.executemany("""
+                INSERT OR REPLACE INTO entity_links
+                (contractor_id, linked_contractor_id, link_type, name_similarity, shingle_similarity)
+                VALUES (?, ?, 'minhash', ?, ?)
+            """, [
+                (records[link.first]['id'], records[link.second]['id'],
+                 round(link.name_similarity, 4), round(link.shingle_similarity, 4))
+                for link in links
+            ])
+
+            logger.info(f"Linked {len(links):,} cross-state contractor pairs")
+            return len(links)
+
     def start_pipeline_run(
         self,
         state: str,
@@ -585,6 +1039,11 @@ class PipelineDB:
         """
         Get pipeline statistics.
 
+        Reads the trigger-maintained stats_* aggregate tables (schema.sql), so
+        the cost is one row plus the state's categories whatever the DB size.
+        Contractor counts filter on contractors.state; multi-license, unicorn
+        and category counts on licenses.state.
+
         Args:
             state: Optional state filter. If None, returns all states.
 
@@ -593,101 +1052,132 @@ class PipelineDB:
         """
         with self._get_connection() as conn:
             cursor = conn.cursor()
+            stats_state = state or '*'
 
-            where_clause = "WHERE state = ?" if state else ""
-            params = (state,) if state else ()
-
-            # Total contractors
-            cursor.execute(f"""
-                SELECT COUNT(*) FROM contractors {where_clause}
-            """, params)
-            total_contractors = cursor.fetchone()[0]
-
-            # With email
-            cursor.execute(f"""
-                SELECT COUNT(*) FROM contractors
-                {where_clause + " AND" if state else "WHERE"}
-                primary_email IS NOT NULL AND primary_email != ''
-            """, params)
-            with_email = cursor.fetchone()[0]
-
-            # With phone
-            cursor.execute(f"""
-                SELECT COUNT(*) FROM contractors
-                {where_clause + " AND" if state else "WHERE"}
-                primary_phone IS NOT NULL AND primary_phone != ''
-            """, params)
-            with_phone = cursor.fetchone()[0]
-
-            # Multi-license (2+)
-            lic_where = "WHERE l.state = ?" if state else ""
-            lic_params = (state,) if state else ()
-            cursor.execute(f"""
-                SELECT COUNT(*) FROM (
-                    SELECT c.id
-                    FROM contractors c
-                    JOIN licenses l ON c.id = l.contractor_id
-                    {lic_where}
-                    GROUP BY c.id
-                    HAVING COUNT(DISTINCT l.license_category) >= 2
-                )
-            """, lic_params)
-            multi_license = cursor.fetchone()[0]
-
-            # Unicorns (3+)
-            cursor.execute(f"""
-                SELECT COUNT(*) FROM (
-                    SELECT c.id
-                    FROM contractors c
-                    JOIN licenses l ON c.id = l.contractor_id
-                    {lic_where}
-                    GROUP BY c.id
-                    HAVING COUNT(DISTINCT l.license_category) >= 3
-                )
-            """, lic_params)
-            unicorns = cursor.fetchone()[0]
-
-            # Multi-license with email
-            cursor.execute(f"""
-                SELECT COUNT(*) FROM (
-                    SELECT c.id
-                    FROM contractors c
-                    JOIN licenses l ON c.id = l.contractor_id
-                    WHERE c.primary_email IS NOT NULL AND c.primary_email != ''
-                    {"AND l.state = ?" if state else ""}
-                    GROUP BY c.id
-                    HAVING COUNT(DISTINCT l.license_category) >= 2
-                )
-            """, lic_params)
-            multi_license_with_email = cursor.fetchone()[0]
+            cursor.execute("""
+                SELECT contractors, with_email, with_phone, multi_license,
+                       unicorns, multi_license_with_email
+                FROM stats_states WHERE state = ?
+            """, (stats_state,))
+            row = cursor.fetchone()
+            counts = dict(row) if row else {}
 
-            # Total dedup matches
-            cursor.execute("SELECT COUNT(*) FROM dedup_matches")
-            total_dedup_matches = cursor.fetchone()[0]
+            # Dedup matches are not tracked per state
+            cursor.execute("SELECT dedup_matches FROM stats_states WHERE state = '*'")
+            row = cursor.fetchone()
+            total_dedup_matches = row[0] if row else 0
 
             # Category distribution
-            cursor.execute(f"""
-                SELECT l.license_category, COUNT(DISTINCT c.id) as count
-                FROM contractors c
-                JOIN licenses l ON c.id = l.contractor_id
-                {lic_where}
-                GROUP BY l.license_category
-                ORDER BY count DESC
-            """, lic_params)
-            categories = {row['license_category']: row['count'] for row in cursor.fetchall()}
+            cursor.execute("""
+                SELECT license_category, contractors FROM stats_categories
+                WHERE state = ? AND contractors > 0
+                ORDER BY contractors DESC
+            """, (stats_state,))
+            categories = {row['license_category']: row['contractors'] for row in cursor.fetchall()}
 
             return {
-                'total_contractors': total_contractors,
-                'with_email': with_email,
-                'with_phone': with_phone,
-                'multi_license': multi_license,
-                'unicorns': unicorns,
-                'multi_license_with_email': multi_license_with_email,
+                'total_contractors': counts.get('contractors', 0),
+                'with_email': counts.get('with_email', 0),
+                'with_phone': counts.get('with_phone', 0),
+                'multi_license': counts.get('multi_license', 0),
+                'unicorns': counts.get('unicorns', 0),
+                'multi_license_with_email': counts.get('multi_license_with_email', 0),
                 'total_dedup_matches': total_dedup_matches,
                 'categories': categories,
                 'state': state or 'ALL'
             }
 
+    def _stream(
+        self,
+        sql: str,
+        params: Tuple = (),
+        batch_size: int = 1000,
+        conn: Optional[sqlite3.Connection] = None
+    ) -> Iterator[sqlite3.Row]:
+        """
+        Yield a query's rows, fetched batch_size at a time.
+
+        The rows come from one read statement (a consistent snapshot) that
+        stays open until the iterator is exhausted or closed.  It runs on
+        a dedicated connection (closed with the iterator) rather than this
+        thread's shared one, so writes made while an iterator is open commit
+        normally instead of landing in its read transaction.  Pass conn to
+        read several queries from one caller-managed snapshot.
+        """
+        own_conn = conn is None
+        if own_conn:
+            conn = self._connect()
+        try:
+            cursor = conn.execute(sql, params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            if own_conn:
+                conn.close()
+
+    def iter_multi_license_contractors(
+        self,
+        state: Optional[str] = None,
+        min_categories: int = 2,
+        require_email: bool = False,
+        batch_size: int = 1000
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream multi-license contractors with full details.
+
+        Same rows and order as get_multi_license_contractors(), read from the
+        cursor in batches instead of materialized as one list.
+
+        Args:
+            state: Optional state filter
+            min_categories: Minimum number of license categories (default 2)
+            require_email: Only return contractors with email
+            batch_size: Rows fetched per cursor round trip
+
+        Yields:
+            Contractor dicts with categories, contacts, etc.
+        """
+        email_clause = "AND c.primary_email IS NOT NULL AND c.primary_email != ''" if require_email else ""
+        state_clause = "AND l.state = ?" if state else ""
+        params = (state,) if state else ()
+
+        rows = self._stream(f"""
+            SELECT
+                c.id,
+                c.company_name,
+                c.city,
+                c.state,
+                c.zip,
+                c.primary_phone,
+                c.primary_email,
+                GROUP_CONCAT(DISTINCT l.license_type) as license_types,
+                GROUP_CONCAT(DISTINCT l.license_category) as categories,
+                COUNT(DISTINCT l.license_category) as category_count
+            FROM contractors c
+            JOIN licenses l ON c.id = l.contractor_id
+            WHERE 1=1 {email_clause} {state_clause}
+            GROUP BY c.id
+            HAVING category_count >= ?
+            ORDER BY category_count DESC, c.company_name
+        """, params + (min_categories,), batch_size)
+
+        for row in rows:
+            yield {
+                'id': row['id'],
+                'company_name': row['company_name'],
+                'city': row['city'],
+                'state': row['state'],
+                'zip': row['zip'],
+                'phone': row['primary_phone'],
+                'email': row['primary_email'],
+                'license_types': row['license_types'],
+                'categories': row['categories'],
+                'category_count': row['category_count']
+            }
+
     def get_multi_license_contractors(
         self,
         state: Optional[str] = None,
@@ -704,100 +1194,83 @@ class PipelineDB:
 
         Returns:
             List of contractor dicts with categories, contacts, etc.
+            (use iter_multi_license_contractors() for large results)
         """
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
+        return list(self.iter_multi_license_contractors(
+            state=state,
+            min_categories=min_categories,
+            require_email=require_email
+        ))
 
-            email_clause = "AND c.primary_email IS NOT NULL AND c.primary_email != ''" if require_email else ""
-            state_clause = "AND l.state = ?" if state else ""
-            params = (state,) if state else ()
+    def iter_contractors(
+        self,
+        state: Optional[str] = None,
+        include_deleted: bool = False,
+        batch_size: int = 1000
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream contractor rows in id order.
 
-            cursor.execute(f"""
-                SELECT
-                    c.id,
-                    c.company_name,
-                    c.city,
-                    c.state,
-                    c.zip,
-                    c.primary_phone,
-                    c.primary_email,
-                    GROUP_CONCAT(DISTINCT l.license_type) as license_types,
-                    GROUP_CONCAT(DISTINCT l.license_category) as categories,
-                    COUNT(DISTINCT l.license_category) as category_count
-                FROM contractors c
-                JOIN licenses l ON c.id = l.contractor_id
-                WHERE 1=1 {email_clause} {state_clause}
-                GROUP BY c.id
-                HAVING category_count >= ?
-                ORDER BY category_count DESC, c.company_name
-            """, params + (min_categories,))
+        Args:
+            state: Optional state filter
+            include_deleted: Include soft-deleted contractors
+            batch_size: Rows fetched per cursor round trip
 
-            results = []
-            for row in cursor.fetchall():
-                results.append({
-                    'id': row['id'],
-                    'company_name': row['company_name'],
-                    'city': row['city'],
-                    'state': row['state'],
-                    'zip': row['zip'],
-                    'phone': row['primary_phone'],
-                    'email': row['primary_email'],
-                    'license_types': row['license_types'],
-                    'categories': row['categories'],
-                    'category_count': row['category_count']
-                })
+        Yields:
+            contractors table rows as dicts
+        """
+        clauses, params = [], []
+        if not include_deleted:
+            clauses.append("is_deleted = 0")
+        if state:
+            clauses.append("state = ?")
+            params.append(state)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
 
-            return results
+        for row in self._stream(f"SELECT * FROM contractors {where} ORDER BY id", tuple(params), batch_size):
+            yield dict(row)
 
     def export_multi_license(
         self,
         output_path: Path,
         state: Optional[str] = None,
         min_categories: int = 2,
-        require_email: bool = True
+        require_email: bool = True,
+        compress: Optional[bool] = None
     ) -> int:
         """
-        Export multi-license contractors to CSV.
+        Export multi-license contractors to CSV, streaming from the cursor.
 
         Args:
-            output_path: Path for output CSV
+            output_path: Path for output CSV (gzip-compressed if it ends in .gz)
             state: Optional state filter
             min_categories: Minimum categories (default 2)
             require_email: Only export with email (default True)
+            compress: Force gzip on or off regardless of the file name
 
         Returns:
             Number of records exported
         """
-        contractors = self.get_multi_license_contractors(
+        contractors = self.iter_multi_license_contractors(
             state=state,
             min_categories=min_categories,
             require_email=require_email
         )
-
-        output_path = Path(output_path)
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-
-        with open(output_path, 'w', newline='', encoding='utf-8') as f:
-            if not contractors:
-                return 0
-
-            writer = csv.DictWriter(f, fieldnames=contractors[0].keys())
-            writer.writeheader()
-            writer.writerows(contractors)
-
-        return len(contractors)
+        return write_csv(contractors, output_path, compress=compress)
 
     def export_unicorns(
         self,
         output_path: Path,
-        state: Optional[str] = None
+        state: Optional[str] = None,
+        compress: Optional[bool] = None
     ) -> int:
         """Export unicorn contractors (3+ categories) to CSV."""
         return self.export_multi_license(
             output_path,
             state=state,
             min_categories=3,
-            require_email=True
+            require_email=True,
+            compress=compress
         )
 
     def export_to_json(
@@ -805,41 +1278,101 @@ class PipelineDB:
         output_path: Path,
         state: Optional[str] = None,
         min_categories: int = 2,
-        require_email: bool = True
+        require_email: bool = True,
+        compress: Optional[bool] = None
     ) -> int:
         """
-        Export contractors to JSON format.
+        Export contractors to JSON format, streaming from the cursor.
+
+        total_count follows the contractors array, as it is only known once
+        every row has been written.
 
         Args:
-            output_path: Path for output JSON file
+            output_path: Path for output JSON file (gzip-compressed if it ends in .gz)
             state: Optional state filter
             min_categories: Minimum categories (default 2)
             require_email: Only export with email (default True)
+            compress: Force gzip on or off regardless of the file name
 
         Returns:
             Number of records exported
         """
-        contractors = self.get_multi_license_contractors(
+        contractors = self.iter_multi_license_contractors(
             state=state,
             min_categories=min_categories,
             require_email=require_email
         )
+        count = write_json(contractors, output_path, header={
+            'state': state or 'ALL',
+            'min_categories': min_categories,
+            'require_email': require_email,
+            'export_timestamp': datetime.now().isoformat(),
+        }, key='contractors', compress=compress)
 
-        output_path = Path(output_path)
-        output_path.parent.mkdir(parents=True, exist_ok=True)
+        logger.info(f"Exported {count} contractors to {output_path}")
+        return count
 
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump({
-                'state': state or 'ALL',
-                'min_categories': min_categories,
-                'require_email': require_email,
-                'export_timestamp': datetime.now().isoformat(),
-                'total_count': len(contractors),
-                'contractors': contractors
-            }, f, indent=2, default=str)
+    def export_contractors(
+        self,
+        output_path: Path,
+        state: Optional[str] = None,
+        include_deleted: bool = False,
+        fmt: Optional[str] = None,
+        compress: Optional[bool] = None
+    ) -> int:
+        """
+        Export every contractor row, streaming from the cursor.
+
+        Memory use does not grow with the table, so full-database exports
+        run on small machines.
+
+        Args:
+            output_path: Output file; format and gzip follow its name
+                (contractors.csv, .jsonl.gz, .json, ...)
+            state: Optional state filter
+            include_deleted: Include soft-deleted contractors
+            fmt: 'csv', 'jsonl' or 'json' regardless of the file name
+            compress: Force gzip on or off regardless of the file name
+
+        Returns:
+            Number of records exported
+        """
+        fmt = fmt or export_format(output_path)
+        options = {'header': {'state': state or 'ALL'}, 'key': 'contractors'} if fmt == 'json' else {}
+        count = write_rows(
+            self.iter_contractors(state=state, include_deleted=include_deleted),
+            output_path, fmt=fmt, compress=compress, **options
+        )
+        logger.info(f"Exported {count} contractors to {output_path}")
+        return count
+
+    def export_columnar_snapshot(
+        self,
+        output_dir: Path,
+        tables: Optional[List[str]] = None,
+        compression: str = 'zstd'
+    ) -> Dict[str, int]:
+        """
+        Export contractors, licenses, contacts, OEM certifications and dedup
+        matches as typed Parquet files (see database/columnar.py).
+
+        Categorical columns (state, license category, source...) are
+        dictionary-encoded; read back with columnar.load_snapshot_table().
+
+        Args:
+            output_dir: Snapshot directory
+            tables: Subset of columnar.SNAPSHOT_TABLES (default: all)
+            compression: Parquet codec (default zstd)
 
-        logger.info(f"Exported {len(contractors)} contractors to {output_path}")
-        return len(contractors)
+        Returns:
+            Rows written per table
+
+        Raises:
+            ImportError: If pyarrow is not installed
+        """
+        counts = export_columnar_snapshot(self, output_dir, tables=tables, compression=compression)
+        logger.info(f"Exported columnar snapshot to {output_dir}: {counts}")
+        return counts
 
     def export_stats_to_json(
         self,
@@ -906,36 +1439,109 @@ class PipelineDB:
         state: Optional[str] = None,
         limit: int = 100
     ) -> List[Dict[str, Any]]:
-        """Search contractors by name, phone, or email."""
+        """
+        Search contractors by name, email, city, contacts, or phone.
+
+        Uses the contractors_fts index (schema_fts.sql): every word of the
+        query must match a word prefix in company name, normalized name,
+        email, city or contact names/emails, ranked by BM25 with company
+        name weighted highest (the table's rank setting).  A query that is a phone number also returns
+        exact primary_phone matches, first.  Without FTS5 this falls back to
+        LIKE substring scans.
+
+        Args:
+            query: Free text (e.g. 'abc sol', 'info@abcsolar') or a phone number
+            state: Optional contractors.state filter
+            limit: Maximum results
+
+        Returns:
+            Contractor rows with a comma-separated 'categories' column
+        """
         with self._get_connection() as conn:
             cursor = conn.cursor()
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'contractors_fts'")
+            if cursor.fetchone() is None:
+                return self._search_contractors_like(cursor, query, state, limit)
+
+            state_clause = "AND c.state = ?" if state else ""
+            state_params = [state] if state else []
+            select = """
+                SELECT
+                    c.*,
+                    (SELECT GROUP_CONCAT(DISTINCT l.license_category)
+                     FROM licenses l WHERE l.contractor_id = c.id) as categories
+            """
 
-            query_lower = query.lower()
+            results = []
             query_phone = normalize_phone(query)
-            state_clause = "AND state = ?" if state else ""
-            params = [f"%{query_lower}%", f"%{query_lower}%"]
             if query_phone:
-                params.append(query_phone)
-            if state:
-                params.append(state)
+                cursor.execute(f"""
+                    {select}
+                    FROM contractors c
+                    WHERE c.primary_phone = ? {state_clause}
+                    ORDER BY c.id
+                    LIMIT ?
+                """, [query_phone] + state_params + [limit])
+                results = [dict(row) for row in cursor.fetchall()]
+
+            match = fts_match_expression(query)
+            if match and len(results) < limit:
+                # Rank inside the FTS index first so only `limit` rows are joined
+                seen = {row['id'] for row in results}
+                fts_state_clause = "AND state = ?" if state else ""
+                cursor.execute(f"""
+                    {select}
+                    FROM (
+                        SELECT rowid AS id, rank FROM contractors_fts
+                        WHERE contractors_fts MATCH ? {fts_state_clause}
+                        ORDER BY rank
+                        LIMIT ?
+                    ) hits
+                    JOIN contractors c ON c.id = hits.id
+                    ORDER BY hits.rank, c.id
+                """, [match] + state_params + [limit + len(seen)])
+                for row in cursor.fetchall():
+                    if len(results) >= limit:
+                        break
+                    if row['id'] not in seen:
+                        results.append(dict(row))
 
-            cursor.execute(f"""
-                SELECT
-                    c.*,
-                    GROUP_CONCAT(DISTINCT l.license_category) as categories
-                FROM contractors c
-                LEFT JOIN licenses l ON c.id = l.contractor_id
-                WHERE (
-                    LOWER(c.company_name) LIKE ?
-                    OR LOWER(c.primary_email) LIKE ?
-                    {f"OR c.primary_phone = ?" if query_phone else ""}
-                )
-                {state_clause}
-                GROUP BY c.id
-                LIMIT ?
-            """, params + [limit])
+            return results
 
-            return [dict(row) for row in cursor.fetchall()]
+    @staticmethod
+    def _search_contractors_like(
+        cursor: sqlite3.Cursor,
+        query: str,
+        state: Optional[str],
+        limit: int
+    ) -> List[Dict[str, Any]]:
+        """search_contractors() by LIKE scans, for SQLite builds without FTS5."""
+        query_lower = query.lower()
+        query_phone = normalize_phone(query)
+        state_clause = "AND c.state = ?" if state else ""
+        params = [f"%{query_lower}%", f"%{query_lower}%"]
+        if query_phone:
+            params.append(query_phone)
+        if state:
+            params.append(state)
+
+        cursor.execute(f"""
+            SELECT
+                c.*,
+                GROUP_CONCAT(DISTINCT l.license_category) as categories
+            FROM contractors c
+            LEFT JOIN licenses l ON c.id = l.contractor_id
+            WHERE (
+                LOWER(c.company_name) LIKE ?
+                OR LOWER(c.primary_email) LIKE ?
+                {f"OR c.primary_phone = ?" if query_phone else ""}
+            )
+            {state_clause}
+            GROUP BY c.id
+            LIMIT ?
+        """, params + [limit])
+
+        return [dict(row) for row in cursor.fetchall()]
 
     def get_pipeline_runs(
         self,
@@ -0,0 +1,191 @@
+"""
+Read-Only Replica of pipeline.db for Dashboards and Agent Tools
+
+Readers of pipeline.db share its lock with the writers: a multi-hour import
+keeps committing batches and dashboards wait up to the 30s busy timeout on
+the file they all use.  Publishing a replica separates the two:
+
+1. publish_replica() copies the database with SQLite's online backup API
+   (a consistent snapshot of committed data; writers keep going), switches
+   the copy to a rollback journal, runs ANALYZE, and renames it over the
+   previous replica in one atomic step.
+2. Readers open the replica immutable (no locks, no journal, no WAL
+   index): PipelineDB(replica_path, read_only=True) or connect_reader().
+   A reader already open on the old file keeps its snapshot; the next
+   PipelineDB query notices the rename and switches to the new replica.
+
+Replicas are published after each import (import_session(publish_replica=True)
+/ add_contractors_bulk(publish_replica=True)) or on a schedule with
+ReplicaPublisher.
+
+Usage:
+    from database import PipelineDB
+    from database.replica import ReplicaPublisher
+
+    db = PipelineDB()
+    db.publish_replica()                           # output/pipeline_replica.db
+
+    with ReplicaPublisher(db, interval=900):       # Every 15 minutes
+        run_long_import(db)
+
+    reader = db.open_replica()                     # Read-only PipelineDB
+    stats = reader.get_stats(state='FL')
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Optional
+from urllib.parse import quote
+
+if TYPE_CHECKING:  # pragma: no cover
+    from database.pipeline_db import PipelineDB
+
+logger = logging.getLogger('pipeline_db')
+
+
+def replica_path_for(db_path: Path) -> Path:
+    """Default replica location: output/pipeline.db -> output/pipeline_replica.db."""
+    db_path = Path(db_path)
+    return db_path.with_name(f"{db_path.stem}_replica{db_path.suffix}")
+
+
+def connect_replica(replica_path: Path) -> sqlite3.Connection:
+    """
+    Open a published replica read-only and immutable.
+
+    SQLite skips all locking and change detection for immutable files,
+    which is only safe because publish_replica() never modifies a replica
+    in place - it renames a new file over it.
+    """
+    uri = f"file:{quote(str(Path(replica_path).resolve()))}?mode=ro&immutable=1"
+    conn = sqlite3.connect(uri, uri=True, timeout=30.0)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def connect_reader(db_path: Path) -> sqlite3.Connection:
+    """
+    Read-only connection for dashboards: the replica of db_path when one has
+    been published, db_path itself (read-only) otherwise.
+    """
+    replica_path = replica_path_for(db_path)
+    if replica_path.exists():
+        return connect_replica(replica_path)
+    conn = sqlite3.connect(f"file:{quote(str(Path(db_path).resolve()))}?mode=ro", uri=True, timeout=30.0)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def publish_replica(db: "PipelineDB", replica_path: Optional[Path] = None) -> Dict[str, Any]:
+    """
+    Publish an immutable, ANALYZE'd copy of db for readers.
+
+    The copy is built next to the replica under a temporary name and renamed
+    into place, so readers see either the old or the new replica, never a
+    partial one.
+
+    Args:
+        db: Database to copy (its committed data; open transactions of the
+            calling thread are not included)
+        replica_path: Destination (default: replica_path_for(db.db_path))
+
+    Returns:
+        Dict with path, bytes and seconds
+    """
+    replica_path = Path(replica_path) if replica_path else replica_path_for(db.db_path)
+    replica_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = replica_path.with_name(f".{replica_path.name}.tmp")
+    start = time.perf_counter()
+
+    source = db._connect()
+    try:
+        if tmp_path.exists():
+            tmp_path.unlink()
+        target = sqlite3.connect(str(tmp_path))
+        try:
+            # One step: a single read transaction, so the copy is consistent
+            # and never restarted by writes committed during the backup
+            source.backup(target)
+            target.execute("PRAGMA journal_mode=DELETE")  # Immutable readers can't use a WAL
+            target.execute("ANALYZE")
+            target.commit()
+        finally:
+            target.close()
+        os.replace(tmp_path, replica_path)
+    finally:
+        source.close()
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+    result = {
+        'path': replica_path,
+        'bytes': replica_path.stat().st_size,
+        'seconds': time.perf_counter() - start,
+    }
+    logger.info(f"Published replica {replica_path} ({result['bytes'] / 1e6:.1f} MB "
+                f"in {result['seconds']:.1f}s)")
+    return result
+
+
+class ReplicaPublisher:
+    """
+    Publish a replica every interval seconds from a background thread.
+
+    Example:
+        >>> with ReplicaPublisher(db, interval=900):
+        >>>     run_long_import(db)
+    """
+
+    def __init__(self, db: "PipelineDB", interval: float = 900.0, replica_path: Optional[Path] = None):
+        """
+        Args:
+            db: Database to publish
+            interval: Seconds between publishes (the first runs immediately)
+            replica_path: Destination (default: replica_path_for(db.db_path))
+        """
+        if interval <= 0:
+            raise ValueError(f"interval must be > 0, got {interval}")
+        self.db = db
+        self.interval = interval
+        self.replica_path = replica_path
+        self.published = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self) -> "ReplicaPublisher":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> bool:
+        self.stop()
+        return False
+
+    def start(self) -> None:
+        """Start publishing in a daemon thread."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='replica-publisher', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the thread (waits for a publish in progress to finish)."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                publish_replica(self.db, self.replica_path)
+                self.published += 1
+            except sqlite3.Error as e:
+                # Keep serving the previous replica; try again next interval
+                logger.warning(f"Replica publish failed: {e}")
+            self._stop.wait(self.interval)
@@ -231,7 +231,8 @@ CREATE INDEX IF NOT EXISTS idx_contractors_email ON contractors(primary_email);
 CREATE INDEX IF NOT EXISTS idx_contractors_domain ON contractors(primary_domain);
 CREATE INDEX IF NOT EXISTS idx_contractors_normalized ON contractors(normalized_name);
 CREATE INDEX IF NOT EXISTS idx_contractors_state ON contractors(state);
-CREATE INDEX IF NOT EXISTS idx_contractors_deleted ON contractors(is_deleted);
+-- Covers v_pipeline_health's is_deleted + email/phone counts
+CREATE INDEX IF NOT EXISTS idx_contractors_deleted_contact ON contractors(is_deleted, primary_email, primary_phone);
 CREATE INDEX IF NOT EXISTS idx_contractors_source_type ON contractors(source_type);
 
 -- Contact indexes
@@ -239,12 +240,20 @@ CREATE INDEX IF NOT EXISTS idx_contacts_email ON contacts(email);
 CREATE INDEX IF NOT EXISTS idx_contacts_phone ON contacts(phone);
 CREATE INDEX IF NOT EXISTS idx_contacts_contractor ON contacts(contractor_id);
 
--- License indexes (for multi-license queries)
-CREATE INDEX IF NOT EXISTS idx_licenses_state ON licenses(state);
+-- License indexes (for multi-license queries). The contractor and state
+-- indexes cover category/type so the GROUP BY views and
+-- get_multi_license_contractors() never read license rows
+-- (tests/test_query_plans.py)
+CREATE INDEX IF NOT EXISTS idx_licenses_state_cover ON licenses(state, contractor_id, license_category, license_type);
 CREATE INDEX IF NOT EXISTS idx_licenses_category ON licenses(license_category);
-CREATE INDEX IF NOT EXISTS idx_licenses_contractor ON licenses(contractor_id);
+CREATE INDEX IF NOT EXISTS idx_licenses_contractor_cover ON licenses(contractor_id, state, license_category, license_type);
 CREATE INDEX IF NOT EXISTS idx_licenses_type ON licenses(license_type);
 
+-- Superseded by the covering indexes above
+DROP INDEX IF EXISTS idx_contractors_deleted;
+DROP INDEX IF EXISTS idx_licenses_state;
+DROP INDEX IF EXISTS idx_licenses_contractor;
+
 -- OEM indexes
 CREATE INDEX IF NOT EXISTS idx_oem_contractor ON oem_certifications(contractor_id);
 CREATE INDEX IF NOT EXISTS idx_oem_name ON oem_certifications(oem_name);
@@ -367,14 +376,17 @@ SELECT
     quality_score
 FROM data_inventory;
 
--- Overall pipeline health (for executive dashboard)
-CREATE VIEW IF NOT EXISTS v_pipeline_health AS
+-- Overall pipeline health (for executive dashboard). Multi-license and
+-- unicorn counts come from the stats aggregates (same definition as
+-- v_multi_license / v_unicorns); recreated so existing databases pick that up
+DROP VIEW IF EXISTS v_pipeline_health;
+CREATE VIEW v_pipeline_health AS
 SELECT
     (SELECT COUNT(*) FROM contractors WHERE is_deleted = 0) as total_contractors,
     (SELECT COUNT(*) FROM contractors WHERE is_deleted = 0 AND primary_email IS NOT NULL) as with_email,
     (SELECT COUNT(*) FROM contractors WHERE is_deleted = 0 AND primary_phone IS NOT NULL) as with_phone,
-    (SELECT COUNT(*) FROM v_multi_license) as multi_license_count,
-    (SELECT COUNT(*) FROM v_unicorns) as unicorn_count,
+    (SELECT IFNULL(MAX(multi_license), 0) FROM stats_states WHERE state = '*') as multi_license_count,
+    (SELECT IFNULL(MAX(unicorns), 0) FROM stats_states WHERE state = '*') as unicorn_count,
     (SELECT COUNT(*) FROM v_multi_oem) as multi_oem_count,
     (SELECT COUNT(*) FROM scraper_registry WHERE status = 'WORKING') as working_scrapers,
     (SELECT COUNT(*) FROM scraper_registry WHERE status = 'BROKEN') as broken_scrapers,
@@ -619,3 +631,402 @@ SELECT
         (SELECT COUNT(*) FROM opportunities WHERE stage = 'WON') * 100.0 /
         NULLIF((SELECT COUNT(*) FROM opportunities WHERE stage IN ('WON', 'LOST')), 0), 1
     );
+
+-- ============================================
+-- NAME TRIGRAM INDEX (fuzzy dedup candidates)
+-- ============================================
+
+-- Trigrams of contractors.normalized_name, scoped by state. PipelineDB's
+-- fuzzy name dedup pulls candidates that share enough trigrams with the
+-- incoming name instead of scanning a 3-char prefix, so "the abc electric"
+-- still finds "abc electric". occurrences keeps repeated trigrams countable
+-- ("aaaa" has 'aaa' twice). Maintained by the triggers below for every
+-- writer, including scripts that INSERT into contractors directly.
+CREATE TABLE IF NOT EXISTS contractor_name_trigrams (
+    state TEXT NOT NULL,
+    trigram TEXT NOT NULL,
+    contractor_id INTEGER NOT NULL,
+    occurrences INTEGER NOT NULL DEFAULT 1,
+    PRIMARY KEY (state, trigram, contractor_id)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_name_trigrams_contractor ON contractor_name_trigrams(contractor_id);
+
+-- Short names share too few trigrams to bound a match; they are found by length instead
+CREATE INDEX IF NOT EXISTS idx_contractors_state_name_length ON contractors(state, length(normalized_name));
+
+-- Character positions used to split names into trigrams inside triggers
+-- (names are indexed up to 258 characters)
+CREATE TABLE IF NOT EXISTS name_trigram_positions (
+    n INTEGER PRIMARY KEY
+);
+
+INSERT OR IGNORE INTO name_trigram_positions (n)
+WITH RECURSIVE positions(n) AS (
+    SELECT 1 UNION ALL SELECT n + 1 FROM positions WHERE n < 256
+)
+SELECT n FROM positions;
+
+CREATE TRIGGER IF NOT EXISTS trg_contractors_trigrams_insert
+AFTER INSERT ON contractors
+WHEN NEW.state IS NOT NULL AND NEW.normalized_name IS NOT NULL
+BEGIN
+    INSERT OR IGNORE INTO contractor_name_trigrams (state, trigram, contractor_id, occurrences)
+    SELECT NEW.state, substr(NEW.normalized_name, n, 3), NEW.id, COUNT(*)
+    FROM name_trigram_positions
+    WHERE n <= length(NEW.normalized_name) - 2
+    GROUP BY substr(NEW.normalized_name, n, 3);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_contractors_trigrams_update
+AFTER UPDATE OF normalized_name, state ON contractors
+BEGIN
+    DELETE FROM contractor_name_trigrams WHERE contractor_id = OLD.id;
+    INSERT OR IGNORE INTO contractor_name_trigrams (state, trigram, contractor_id, occurrences)
+    SELECT NEW.state, substr(NEW.normalized_name, n, 3), NEW.id, COUNT(*)
+    FROM name_trigram_positions
+    WHERE NEW.state IS NOT NULL AND NEW.normalized_name IS NOT NULL
+      AND n <= length(NEW.normalized_name) - 2
+    GROUP BY substr(NEW.normalized_name, n, 3);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_contractors_trigrams_delete
+AFTER DELETE ON contractors
+BEGIN
+    DELETE FROM contractor_name_trigrams WHERE contractor_id = OLD.id;
+END;
+
+-- Backfill contractors created before the trigram index existed (no-op afterwards:
+-- skipped without scanning contractors once the index has any rows)
+INSERT OR IGNORE INTO contractor_name_trigrams (state, trigram, contractor_id, occurrences)
+SELECT c.state, substr(c.normalized_name, p.n, 3), c.id, COUNT(*)
+FROM contractors c
+JOIN name_trigram_positions p ON p.n <= length(c.normalized_name) - 2
+WHERE c.state IS NOT NULL
+  AND NOT EXISTS (SELECT 1 FROM contractor_name_trigrams)
+GROUP BY c.id, substr(c.normalized_name, p.n, 3);
+
+-- ============================================
+-- ENTITY LINKS (cross-state linkage)
+-- ============================================
+
+-- Likely same-company pairs in DIFFERENT states that share no phone, email or
+-- domain, so dedup kept them as separate contractors. Found with MinHash/LSH
+-- over name + address shingles by PipelineDB.link_cross_state_contractors()
+-- (database/entity_links.py). contractor_id < linked_contractor_id.
+CREATE TABLE IF NOT EXISTS entity_links (
+    contractor_id INTEGER NOT NULL REFERENCES contractors(id) ON DELETE CASCADE,
+    linked_contractor_id INTEGER NOT NULL REFERENCES contractors(id) ON DELETE CASCADE,
+    link_type TEXT NOT NULL DEFAULT 'minhash',
+    name_similarity REAL,     -- SequenceMatcher ratio of normalized names
+    shingle_similarity REAL,  -- Jaccard of name + address shingles
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (contractor_id, linked_contractor_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_entity_links_linked ON entity_links(linked_contractor_id);
+
+-- Entity of every linked contractor: the smallest contractor id reachable
+-- through entity_links (unlinked contractors are their own entity)
+CREATE VIEW IF NOT EXISTS v_contractor_entities AS
+WITH RECURSIVE
+    edges(a, b) AS (
+        SELECT contractor_id, linked_contractor_id FROM entity_links
+        UNION ALL
+        SELECT linked_contractor_id, contractor_id FROM entity_links
+    ),
+    reach(contractor_id, entity_id) AS (
+        SELECT a, a FROM edges
+        UNION
+        SELECT r.contractor_id, e.b FROM reach r JOIN edges e ON e.a = r.entity_id
+    )
+SELECT contractor_id, MIN(entity_id) AS entity_id
+FROM reach
+GROUP BY contractor_id;
+
+-- Multi-license entities (2+ categories), licenses pooled across linked
+-- contractors. Row details come from the entity's lowest-id contractor.
+CREATE VIEW IF NOT EXISTS v_entity_multi_license AS
+SELECT
+    m.id,
+    m.company_name,
+    m.city,
+    m.state,
+    m.primary_phone,
+    m.primary_email,
+    g.contractor_ids,
+    g.states,
+    g.categories,
+    g.category_count
+FROM (
+    SELECT
+        COALESCE(e.entity_id, c.id) AS entity_id,
+        GROUP_CONCAT(DISTINCT c.id) AS contractor_ids,
+        GROUP_CONCAT(DISTINCT l.state) AS states,
+        GROUP_CONCAT(DISTINCT l.license_category) AS categories,
+        COUNT(DISTINCT l.license_category) AS category_count
+    FROM contractors c
+    JOIN licenses l ON c.id = l.contractor_id
+    LEFT JOIN v_contractor_entities e ON e.contractor_id = c.id
+    GROUP BY COALESCE(e.entity_id, c.id)
+    HAVING category_count >= 2
+) g
+JOIN contractors m ON m.id = g.entity_id;
+
+-- Unicorn entities (3+ categories)
+CREATE VIEW IF NOT EXISTS v_entity_unicorns AS
+SELECT * FROM v_entity_multi_license
+WHERE category_count >= 3;
+
+-- Cross-state entities, including companies linked only by name + address
+CREATE VIEW IF NOT EXISTS v_entity_cross_state AS
+SELECT
+    m.id,
+    m.company_name,
+    m.primary_phone,
+    m.primary_email,
+    g.contractor_ids,
+    g.states,
+    g.state_count,
+    g.categories
+FROM (
+    SELECT
+        COALESCE(e.entity_id, c.id) AS entity_id,
+        GROUP_CONCAT(DISTINCT c.id) AS contractor_ids,
+        GROUP_CONCAT(DISTINCT l.state) AS states,
+        COUNT(DISTINCT l.state) AS state_count,
+        GROUP_CONCAT(DISTINCT l.license_category) AS categories
+    FROM contractors c
+    JOIN licenses l ON c.id = l.contractor_id
+    LEFT JOIN v_contractor_entities e ON e.contractor_id = c.id
+    GROUP BY COALESCE(e.entity_id, c.id)
+    HAVING state_count > 1
+) g
+JOIN contractors m ON m.id = g.entity_id;
+
+-- ============================================
+-- STATS AGGREGATES (PipelineDB.get_stats)
+-- ============================================
+
+-- Counters behind get_stats(), kept current by the triggers below for every
+-- writer, so stats are a per-state lookup instead of GROUP BY scans over
+-- contractors and licenses. state '*' rows aggregate all states. Contractor
+-- counts use contractors.state; license counts use licenses.state, as the
+-- original queries did. Licenses of missing contractors are not counted.
+
+-- Per-state totals (one row per state seen, plus '*')
+CREATE TABLE IF NOT EXISTS stats_states (
+    state TEXT PRIMARY KEY,
+    contractors INTEGER NOT NULL DEFAULT 0,
+    with_email INTEGER NOT NULL DEFAULT 0,
+    with_phone INTEGER NOT NULL DEFAULT 0,
+    multi_license INTEGER NOT NULL DEFAULT 0,             -- 2+ categories
+    unicorns INTEGER NOT NULL DEFAULT 0,                  -- 3+ categories
+    multi_license_with_email INTEGER NOT NULL DEFAULT 0,
+    dedup_matches INTEGER NOT NULL DEFAULT 0              -- Only kept on '*'
+);
+
+-- License rows per (contractor, license state, category)
+CREATE TABLE IF NOT EXISTS stats_contractor_categories (
+    contractor_id INTEGER NOT NULL,
+    state TEXT NOT NULL,
+    license_category TEXT,   -- NULL kept distinct (compared with IS)
+    licenses INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE INDEX IF NOT EXISTS idx_stats_contractor_categories
+    ON stats_contractor_categories(contractor_id, state, license_category);
+
+-- Distinct non-NULL categories per (contractor, license state)
+CREATE TABLE IF NOT EXISTS stats_contractor_states (
+    contractor_id INTEGER NOT NULL,
+    state TEXT NOT NULL,
+    categories INTEGER NOT NULL DEFAULT 0,
+    has_email INTEGER NOT NULL DEFAULT 0,   -- Copy of the contractor's primary_email != ''
+    PRIMARY KEY (contractor_id, state)
+) WITHOUT ROWID;
+
+-- Contractors per (license state, category)
+CREATE TABLE IF NOT EXISTS stats_categories (
+    state TEXT NOT NULL,
+    license_category TEXT,
+    contractors INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE INDEX IF NOT EXISTS idx_stats_categories ON stats_categories(state, license_category);
+
+-- Contractors -> stats_states, stats_contractor_states.has_email
+CREATE TRIGGER IF NOT EXISTS trg_stats_contractors_insert
+AFTER INSERT ON contractors
+BEGIN
+    INSERT OR IGNORE INTO stats_states (state) SELECT NEW.state WHERE NEW.state IS NOT NULL;
+    UPDATE stats_states SET
+        contractors = contractors + 1,
+        with_email = with_email + (IFNULL(NEW.primary_email, '') != ''),
+        with_phone = with_phone + (IFNULL(NEW.primary_phone, '') != '')
+    WHERE state IN ('*', NEW.state);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_stats_contractors_update
+AFTER UPDATE OF state, primary_email, primary_phone ON contractors
+BEGIN
+    UPDATE stats_states SET
+        contractors = contractors - 1,
+        with_email = with_email - (IFNULL(OLD.primary_email, '') != ''),
+        with_phone = with_phone - (IFNULL(OLD.primary_phone, '') != '')
+    WHERE state IN ('*', OLD.state);
+    INSERT OR IGNORE INTO stats_states (state) SELECT NEW.state WHERE NEW.state IS NOT NULL;
+    UPDATE stats_states SET
+        contractors = contractors + 1,
+        with_email = with_email + (IFNULL(NEW.primary_email, '') != ''),
+        with_phone = with_phone + (IFNULL(NEW.primary_phone, '') != '')
+    WHERE state IN ('*', NEW.state);
+    UPDATE stats_contractor_states SET has_email = (IFNULL(NEW.primary_email, '') != '')
+    WHERE contractor_id = NEW.id AND has_email != (IFNULL(NEW.primary_email, '') != '');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_stats_contractors_delete
+AFTER DELETE ON contractors
+BEGIN
+    UPDATE stats_states SET
+        contractors = contractors - 1,
+        with_email = with_email - (IFNULL(OLD.primary_email, '') != ''),
+        with_phone = with_phone - (IFNULL(OLD.primary_phone, '') != '')
+    WHERE state IN ('*', OLD.state);
+END;
+
+-- Licenses -> stats_contractor_categories
+CREATE TRIGGER IF NOT EXISTS trg_stats_licenses_insert
+AFTER INSERT ON licenses
+WHEN EXISTS (SELECT 1 FROM contractors WHERE id = NEW.contractor_id)
+BEGIN
+    INSERT INTO stats_contractor_categories (contractor_id, state, license_category)
+    SELECT NEW.contractor_id, s.state, NEW.license_category
+    FROM (SELECT NEW.state AS state UNION ALL SELECT '*') s
+    WHERE NOT EXISTS (
+        SELECT 1 FROM stats_contractor_categories t
+        WHERE t.contractor_id = NEW.contractor_id AND t.state = s.state
+          AND t.license_category IS NEW.license_category
+    );
+    UPDATE stats_contractor_categories SET licenses = licenses + 1
+    WHERE contractor_id = NEW.contractor_id AND state IN (NEW.state, '*')
+      AND license_category IS NEW.license_category;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_stats_licenses_delete
+AFTER DELETE ON licenses
+BEGIN
+    UPDATE stats_contractor_categories SET licenses = licenses - 1
+    WHERE contractor_id = OLD.contractor_id AND state IN (OLD.state, '*')
+      AND license_category IS OLD.license_category;
+    DELETE FROM stats_contractor_categories
+    WHERE contractor_id = OLD.contractor_id AND state IN (OLD.state, '*')
+      AND license_category IS OLD.license_category AND licenses <= 0;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_stats_licenses_update
+AFTER UPDATE OF contractor_id, state, license_category ON licenses
+BEGIN
+    UPDATE stats_contractor_categories SET licenses = licenses - 1
+    WHERE contractor_id = OLD.contractor_id AND state IN (OLD.state, '*')
+      AND license_category IS OLD.license_category;
+    DELETE FROM stats_contractor_categories
+    WHERE contractor_id = OLD.contractor_id AND state IN (OLD.state, '*')
+      AND license_category IS OLD.license_category AND licenses <= 0;
+    INSERT INTO stats_contractor_categories (contractor_id, state, license_category)
+    SELECT NEW.contractor_id, s.state, NEW.license_category
+    FROM (SELECT NEW.state AS state UNION ALL SELECT '*') s
+    WHERE EXISTS (SELECT 1 FROM contractors WHERE id = NEW.contractor_id)
+      AND NOT EXISTS (
+        SELECT 1 FROM stats_contractor_categories t
+        WHERE t.contractor_id = NEW.contractor_id AND t.state = s.state
+          AND t.license_category IS NEW.license_category
+    );
+    UPDATE stats_contractor_categories SET licenses = licenses + 1
+    WHERE contractor_id = NEW.contractor_id AND state IN (NEW.state, '*')
+      AND license_category IS NEW.license_category;
+END;
+
+-- stats_contractor_categories -> stats_contractor_states, stats_categories
+CREATE TRIGGER IF NOT EXISTS trg_stats_contractor_categories_insert
+AFTER INSERT ON stats_contractor_categories
+BEGIN
+    INSERT OR IGNORE INTO stats_contractor_states (contractor_id, state, has_email)
+    SELECT NEW.contractor_id, NEW.state, IFNULL(c.primary_email, '') != ''
+    FROM contractors c WHERE c.id = NEW.contractor_id;
+    UPDATE stats_contractor_states SET categories = categories + 1
+    WHERE NEW.license_category IS NOT NULL
+      AND contractor_id = NEW.contractor_id AND state = NEW.state;
+
+    INSERT INTO stats_categories (state, license_category)
+    SELECT NEW.state, NEW.license_category
+    WHERE NOT EXISTS (
+        SELECT 1 FROM stats_categories
+        WHERE state = NEW.state AND license_category IS NEW.license_category
+    );
+    UPDATE stats_categories SET contractors = contractors + 1
+    WHERE state = NEW.state AND license_category IS NEW.license_category;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_stats_contractor_categories_delete
+AFTER DELETE ON stats_contractor_categories
+BEGIN
+    UPDATE stats_contractor_states SET categories = categories - 1
+    WHERE OLD.license_category IS NOT NULL
+      AND contractor_id = OLD.contractor_id AND state = OLD.state;
+    UPDATE stats_categories SET contractors = contractors - 1
+    WHERE state = OLD.state AND license_category IS OLD.license_category;
+END;
+
+-- stats_contractor_states -> stats_states multi-license counters
+CREATE TRIGGER IF NOT EXISTS trg_stats_contractor_states_update
+AFTER UPDATE OF categories, has_email ON stats_contractor_states
+BEGIN
+    INSERT OR IGNORE INTO stats_states (state) VALUES (NEW.state);
+    UPDATE stats_states SET
+        multi_license = multi_license + (NEW.categories >= 2) - (OLD.categories >= 2),
+        unicorns = unicorns + (NEW.categories >= 3) - (OLD.categories >= 3),
+        multi_license_with_email = multi_license_with_email
+            + (NEW.categories >= 2 AND NEW.has_email) - (OLD.categories >= 2 AND OLD.has_email)
+    WHERE state = NEW.state;
+END;
+
+-- Dedup matches -> stats_states('*')
+CREATE TRIGGER IF NOT EXISTS trg_stats_dedup_matches_insert
+AFTER INSERT ON dedup_matches
+BEGIN
+    UPDATE stats_states SET dedup_matches = dedup_matches + 1 WHERE state = '*';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_stats_dedup_matches_delete
+AFTER DELETE ON dedup_matches
+BEGIN
+    UPDATE stats_states SET dedup_matches = dedup_matches - 1 WHERE state = '*';
+END;
+
+-- Backfill databases created before the aggregates existed (no-op afterwards):
+-- contractor counters first, then license rows, whose triggers fill the rest
+INSERT INTO stats_states (state, contractors, with_email, with_phone, dedup_matches)
+SELECT state, COUNT(*),
+       SUM(IFNULL(primary_email, '') != ''), SUM(IFNULL(primary_phone, '') != ''), 0
+FROM contractors
+WHERE state IS NOT NULL AND NOT EXISTS (SELECT 1 FROM stats_states WHERE state = '*')
+GROUP BY state;
+
+INSERT INTO stats_states (state, contractors, with_email, with_phone, dedup_matches)
+SELECT '*', COUNT(*),
+       IFNULL(SUM(IFNULL(primary_email, '') != ''), 0),
+       IFNULL(SUM(IFNULL(primary_phone, '') != ''), 0),
+       (SELECT COUNT(*) FROM dedup_matches)
+FROM contractors
+WHERE NOT EXISTS (SELECT 1 FROM stats_states WHERE state = '*')    -- Skip the scan
+HAVING NOT EXISTS (SELECT 1 FROM stats_states WHERE state = '*');  -- and the empty aggregate row
+
+INSERT INTO stats_contractor_categories (contractor_id, state, license_category, licenses)
+SELECT l.contractor_id, CASE WHEN r.rollup THEN '*' ELSE l.state END AS stats_state,
+       l.license_category, COUNT(*)
+FROM licenses l
+JOIN contractors c ON c.id = l.contractor_id
+CROSS JOIN (SELECT 0 AS rollup UNION ALL SELECT 1) r
+WHERE NOT EXISTS (SELECT 1 FROM stats_contractor_categories)
+GROUP BY l.contractor_id, stats_state, l.license_category;
@@ -0,0 +1,90 @@
+-- Full-text search index for PipelineDB.search_contractors
+--
+-- Kept apart from schema.sql because it needs SQLite's FTS5 extension:
+-- PipelineDB.initialize() applies this file only when FTS5 is available and
+-- search_contractors() falls back to LIKE scans otherwise.
+--
+-- One row per contractor (rowid = contractors.id). contacts holds the names
+-- and emails of the contractor's contacts; state is stored unindexed so a
+-- state filter runs inside the ranked FTS scan. Maintained by the triggers
+-- below for every writer, including scripts that INSERT into contractors
+-- directly.
+
+CREATE VIRTUAL TABLE IF NOT EXISTS contractors_fts USING fts5(
+    company_name,
+    normalized_name,
+    email,
+    city,
+    contacts,
+    state UNINDEXED,
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'   -- Short prefix queries ("co"*) read one index entry, not every term
+);
+
+-- ORDER BY rank: BM25 weighted towards the company name
+INSERT INTO contractors_fts (contractors_fts, rank) VALUES ('rank', 'bm25(10.0, 5.0, 3.0, 1.0, 2.0, 0.0)');
+
+CREATE TRIGGER IF NOT EXISTS trg_contractors_fts_insert
+AFTER INSERT ON contractors
+BEGIN
+    INSERT INTO contractors_fts (rowid, company_name, normalized_name, email, city, contacts, state)
+    VALUES (NEW.id, NEW.company_name, NEW.normalized_name, NEW.primary_email, NEW.city, '', NEW.state);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_contractors_fts_update
+AFTER UPDATE OF company_name, normalized_name, primary_email, city, state ON contractors
+BEGIN
+    UPDATE contractors_fts SET
+        company_name = NEW.company_name,
+        normalized_name = NEW.normalized_name,
+        email = NEW.primary_email,
+        city = NEW.city,
+        state = NEW.state
+    WHERE rowid = NEW.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_contractors_fts_delete
+AFTER DELETE ON contractors
+BEGIN
+    DELETE FROM contractors_fts WHERE rowid = OLD.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_contacts_fts_insert
+AFTER INSERT ON contacts
+BEGIN
+    UPDATE contractors_fts SET contacts = (
+        SELECT GROUP_CONCAT(IFNULL(name, '') || ' ' || IFNULL(email, ''), ' ')
+        FROM contacts WHERE contractor_id = NEW.contractor_id
+    )
+    WHERE rowid = NEW.contractor_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_contacts_fts_update
+AFTER UPDATE OF contractor_id, name, email ON contacts
+BEGIN
+    UPDATE contractors_fts SET contacts = IFNULL((
+        SELECT GROUP_CONCAT(IFNULL(name, '') || ' ' || IFNULL(email, ''), ' ')
+        FROM contacts WHERE contractor_id = contractors_fts.rowid
+    ), '')
+    WHERE rowid IN (OLD.contractor_id, NEW.contractor_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_contacts_fts_delete
+AFTER DELETE ON contacts
+BEGIN
+    UPDATE contractors_fts SET contacts = IFNULL((
+        SELECT GROUP_CONCAT(IFNULL(name, '') || ' ' || IFNULL(email, ''), ' ')
+        FROM contacts WHERE contractor_id = OLD.contractor_id
+    ), '')
+    WHERE rowid = OLD.contractor_id;
+END;
+
+-- Backfill contractors created before the index existed (no-op afterwards:
+-- skipped without scanning contractors once the index has any rows)
+INSERT INTO contractors_fts (rowid, company_name, normalized_name, email, city, contacts, state)
+SELECT c.id, c.company_name, c.normalized_name, c.primary_email, c.city, IFNULL((
+    SELECT GROUP_CONCAT(IFNULL(t.name, '') || ' ' || IFNULL(t.email, ''), ' ')
+    FROM contacts t WHERE t.contractor_id = c.id
+), ''), c.state
+FROM contractors c
+WHERE NOT EXISTS (SELECT 1 FROM contractors_fts);
@@ -10,8 +10,15 @@ Usage:
         "zip_code": "53202",
         "radius_miles": 50,  # optional
     })
+
+    # Many ZIPs: consume per-ZIP results while the scrape is still running
+    async for batch_result in tool.stream({"oem": "generac", "zip_codes": [...]}):
+        handle(batch_result.result)
 """
 
+import asyncio
+from typing import AsyncIterator
+
 from plugins.scraper_tools.base import BaseTool, ToolCategory, ToolDefinition, ToolResult
 from scrapers.scraper_factory import ScraperFactory
 
@@ -49,6 +56,14 @@ class DealerLocatorTool(BaseTool):
                         "type": "string",
                         "description": "US ZIP code to search around",
                     },
+                    "zip_codes": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": (
+                            "Additional ZIP codes to scrape after zip_code; "
+                            "results are streamed per ZIP"
+                        ),
+                    },
                     "radius_miles": {
                         "type": "integer",
                         "description": "Search radius in miles (default: 50)",
@@ -73,12 +88,18 @@ class DealerLocatorTool(BaseTool):
         zip_code = arguments.get("zip_code", "")
         radius = arguments.get("radius_miles", 50)
 
+        extra_zips = [z for z in arguments.get("zip_codes", []) if z != zip_code]
+
         try:
             # Create scraper for the OEM
             scraper = ScraperFactory.create(oem)
 
-            # Execute scrape
-            dealers = scraper.scrape_zip_code(zip_code)
+            # Execute scrape off the event loop (sync Playwright)
+            dealers = await asyncio.to_thread(scraper.scrape_zip_code, zip_code)
+
+            if extra_zips:
+                async for batch in scraper.astream_multiple(extra_zips, verbose=False):
+                    dealers.extend(batch.dealers)
 
             return ToolResult(
                 tool_name="dealer_locator",
@@ -106,3 +127,39 @@ class DealerLocatorTool(BaseTool):
                 execution_time_ms=0,
                 error=f"Scrape failed: {str(e)}",
             )
+
+    async def stream(self, arguments: dict) -> AsyncIterator[ToolResult]:
+        """Scrape many ZIP codes, yielding one ToolResult per ZIP as it completes.
+
+        Args:
+            arguments: Must contain 'oem' and 'zip_code' and/or 'zip_codes'
+
+        Yields:
+            ToolResult per ZIP (result is that ZIP's dealers)
+        """
+        oem = arguments.get("oem", "")
+        zip_codes = list(arguments.get("zip_codes", []))
+        if arguments.get("zip_code") and arguments["zip_code"] not in zip_codes:
+            zip_codes.insert(0, arguments["zip_code"])
+
+        try:
+            scraper = ScraperFactory.create(oem)
+        except ValueError:
+            available = ScraperFactory.list_available_oems()
+            yield ToolResult(
+                tool_name="dealer_locator",
+                success=False,
+                result=None,
+                execution_time_ms=0,
+                error=f"OEM '{oem}' not found. Available: {', '.join(available)}",
+            )
+            return
+
+        async for batch in scraper.astream_multiple(zip_codes, verbose=False):
+            yield ToolResult(
+                tool_name="dealer_locator",
+                success=batch.error is None,
+                result=batch.dealers,
+                execution_time_ms=int(batch.seconds * 1000),
+                error=f"Scrape failed for {batch.zip_code}: {batch.error}" if batch.error else None,
+            )
@@ -32,9 +32,15 @@ def handler(job):
                 "options": {}
             }
         }
+
+    A job with {"input": {"metrics": true}} returns browser memory/recycling
+    metrics without running a workflow.
     """
     try:
         job_input = job["input"]
+        if job_input.get("metrics"):
+            return {"status": "success", "browser_metrics": service.metrics()}
+
         workflow = job_input.get("workflow", [])
         options = job_input.get("options", {})
         
@@ -48,7 +54,8 @@ def handler(job):
 
 
 # Start RunPod serverless worker
-# refresh_worker=False keeps browser alive between jobs (CRITICAL for performance)
+# refresh_worker=False keeps browser alive between jobs (CRITICAL for performance);
+# the service's BrowserGovernor relaunches it when memory or errors climb
 runpod.serverless.start({
     "handler": handler,
     "refresh_worker": False  # Reuse browser across jobs
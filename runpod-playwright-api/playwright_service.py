@@ -4,21 +4,42 @@ Manages browser lifecycle and executes workflow-based automation
 """
 
 from playwright.sync_api import sync_playwright, Browser, BrowserContext, Page
+from pathlib import Path
 from typing import Dict, List, Optional, Any
+import os
+import sys
 import time
 
+# Imported as a standalone module, not through the scrapers package (whose
+# __init__ imports every scraper and its dependencies).  The images copy it
+# next to this file; in a checkout it is loaded from ../scrapers.
+try:
+    from browser_governor import BrowserGovernor, GovernorLimits
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scrapers"))
+    from browser_governor import BrowserGovernor, GovernorLimits
+
 
 class PlaywrightService:
     """
     Manages Playwright browser lifecycle using singleton pattern.
     Creates new context per request for clean state while reusing browser for performance.
+
+    The worker runs with refresh_worker=False, so the browser would otherwise
+    live (and grow) forever.  A BrowserGovernor relaunches it when Chromium RSS,
+    jobs-per-browser or the recent error rate cross their limits
+    (env: BROWSER_MAX_RSS_MB, BROWSER_MAX_JOBS, BROWSER_MAX_ERROR_RATE).
     """
     
     def __init__(self):
         """Initialize browser once (singleton pattern for performance)"""
         self.playwright = None
-        self.browser: Optional[Browser] = None
+        self.governor: Optional[BrowserGovernor] = None
         self._initialize_browser()
+
+    @property
+    def browser(self) -> Optional[Browser]:
+        return self.governor.browser if self.governor else None
     
     def _initialize_browser(self):
         """
@@ -27,11 +48,25 @@ class PlaywrightService:
         Uses --no-sandbox and --disable-dev-shm-usage for Docker compatibility.
         """
         self.playwright = sync_playwright().start()
-        self.browser = self.playwright.chromium.launch(
-            headless=True,  # Required in Docker environment
-            args=['--no-sandbox', '--disable-dev-shm-usage']  # Docker optimization
+        self.governor = BrowserGovernor(
+            launch_browser=lambda: self.playwright.chromium.launch(
+                headless=True,  # Required in Docker environment
+                args=['--no-sandbox', '--disable-dev-shm-usage']  # Docker optimization
+            ),
+            limits=GovernorLimits(
+                max_pages_per_context=1,  # Clean context per request
+                max_contexts_per_browser=int(os.environ.get("BROWSER_MAX_JOBS", "200")),
+                max_browser_rss_mb=float(os.environ.get("BROWSER_MAX_RSS_MB", "1500")),
+                max_error_rate=float(os.environ.get("BROWSER_MAX_ERROR_RATE", "0.5")),
+            ),
+            metrics_file=os.environ.get("BROWSER_METRICS_FILE"),
         )
+        self.governor.start()  # Launch eagerly so the first job doesn't pay startup
         print("[PlaywrightService] Browser initialized successfully")
+
+    def metrics(self) -> Dict:
+        """Browser memory / recycling metrics from the governor."""
+        return self.governor.metrics()
     
     def execute_workflow(self, steps: List[Dict], options: Dict = None) -> Dict:
         """
@@ -55,10 +90,10 @@ class PlaywrightService:
             - wait: {"action": "wait", "timeout": 3000}
             - evaluate: {"action": "evaluate", "script": "() => {...}"}
         """
-        context: BrowserContext = self.browser.new_context()  # Clean state per request
-        page: Page = context.new_page()
+        page: Page = self.governor.acquire_page()  # Clean context per request
         results = []
         start_time = time.time()
+        success = False
         
         try:
             for i, step in enumerate(steps):
@@ -114,8 +149,9 @@ class PlaywrightService:
             
             execution_time = time.time() - start_time
             print(f"[PlaywrightService] Workflow completed in {execution_time:.2f}s")
+            success = True
             
-            return {
+            response = {
                 "status": "success",
                 "results": results,
                 "execution_time": execution_time
@@ -124,17 +160,22 @@ class PlaywrightService:
         except Exception as e:
             execution_time = time.time() - start_time
             print(f"[PlaywrightService] Error: {str(e)}")
-            return {
+            response = {
                 "error": str(e),
                 "execution_time": execution_time
             }
         
         finally:
-            context.close()  # Always clean up context
+            # Always clean up context; relaunches the browser if limits are hit
+            self.governor.release(success=success)
+
+        # After release, so the snapshot counts this job and any recycle it caused
+        response["browser_metrics"] = self.governor.metrics()
+        return response
     
     def __del__(self):
         """Cleanup browser resources on shutdown"""
-        if self.browser:
-            self.browser.close()
+        if self.governor:
+            self.governor.close()
         if self.playwright:
             self.playwright.stop()
@@ -9,15 +9,32 @@ Supports Coperniq's partner prospecting system targeting multi-brand contractors
 
 from abc import ABC, abstractmethod
 from enum import Enum
-from typing import Dict, List, Optional, Set
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Set, Tuple
 from dataclasses import dataclass, field
-from difflib import SequenceMatcher
 import re
 import json
+import asyncio
 import logging
+import time
 from datetime import datetime
 from pathlib import Path
 
+from scrapers.zip_scheduler import STATS_FILENAME, ZipScheduler
+from utils.keyword_matcher import KeywordMatcher
+
+
+# Contractor-type keywords for DealerCapabilities.detect_high_value_contractor_types
+# (compiled once - every dealer of every scraper is tagged with them)
+HIGH_VALUE_KEYWORDS = KeywordMatcher({
+    "om": ["operations", "maintenance", "service", "monitoring", "o&m", "o & m"],
+    "mep": ["mep", "mechanical contractor", "full-service", "multi-trade"],
+    "fire_security": [
+        "fire", "fire protection", "fire alarm", "sprinkler",
+        "security", "low voltage", "low-voltage", "access control",
+        "burglar", "alarm", "cctv", "surveillance", "life safety"
+    ],
+})
+
 
 class ScraperMode(Enum):
     """Execution mode for dealer scraping"""
@@ -216,10 +233,10 @@ class DealerCapabilities:
         """
         # Convert to lowercase for case-insensitive matching
         search_text = f"{dealer_name} {' '.join(certifications)} {tier}".lower()
+        found = HIGH_VALUE_KEYWORDS.labels(search_text)
 
         # O&M Detection
-        om_keywords = ["operations", "maintenance", "service", "monitoring", "o&m", "o & m"]
-        self.has_om_capability = any(keyword in search_text for keyword in om_keywords)
+        self.has_om_capability = "om" in found
 
         # MEP+R Detection (two methods)
         # Method 1: Has all four trade capabilities
@@ -231,18 +248,10 @@ class DealerCapabilities:
         )
 
         # Method 2: Has MEP keywords
-        mep_keywords = ["mep", "mechanical contractor", "full-service", "multi-trade"]
-        has_mep_keywords = any(keyword in search_text for keyword in mep_keywords)
-
-        self.is_mep_r_contractor = has_all_mep_r_trades or has_mep_keywords
+        self.is_mep_r_contractor = has_all_mep_r_trades or "mep" in found
 
         # Fire/Security Detection (GOLD signal when combined with HVAC)
-        fire_security_keywords = [
-            "fire", "fire protection", "fire alarm", "sprinkler",
-            "security", "low voltage", "low-voltage", "access control",
-            "burglar", "alarm", "cctv", "surveillance", "life safety"
-        ]
-        self.has_fire_security = any(keyword in search_text for keyword in fire_security_keywords)
+        self.has_fire_security = "fire_security" in found
 
         # Calculate multi-trade score (MUST be called after all trade flags are set)
         self.calculate_multi_trade_score()
@@ -380,6 +389,17 @@ class StandardizedDealer:
         }
 
 
+@dataclass
+class ScrapeBatch:
+    """Dealers scraped from one ZIP code, as yielded by stream_multiple()."""
+    zip_code: str
+    dealers: List[StandardizedDealer]
+    index: int                   # 1-based position in the run
+    total: int                   # ZIP codes in the run
+    seconds: float = 0.0         # Wall-clock time for this ZIP
+    error: Optional[str] = None  # Set when the ZIP failed (dealers is empty)
+
+
 class BaseDealerScraper(ABC):
     """
     Abstract base class for all OEM dealer network scrapers.
@@ -490,31 +510,159 @@ class BaseDealerScraper(ABC):
         else:
             raise ValueError(f"Unknown scraper mode: {self.mode}")
     
+    def stream_multiple(
+        self,
+        zip_codes: List[str],
+        verbose: bool = True,
+        scheduler: Optional[ZipScheduler] = None,
+        time_budget_seconds: Optional[float] = None
+    ) -> Iterator[ScrapeBatch]:
+        """
+        Scrape ZIP codes one at a time, yielding each ZIP's dealers as soon as
+        they are parsed.
+
+        Nothing is accumulated here, so consumers (importers, dedup, agent
+        tools) can process results while the scrape is still running with
+        memory bounded by one ZIP's worth of dealers.  A ZIP that raises is
+        yielded with an empty dealer list and its error message.
+
+        Args:
+            zip_codes: List of ZIP codes to scrape
+            verbose: Print progress messages
+            scheduler: ZipScheduler used to scrape highest-yield ZIPs first
+                (updated with each ZIP's outcome)
+            time_budget_seconds: Stop starting new ZIPs once this much
+                wall-clock time has elapsed
+
+        Yields:
+            ScrapeBatch per ZIP code
+
+        Example:
+            >>> for batch in scraper.stream_multiple(["94102", "10001"]):
+            ...     db_import(batch.dealers)
+        """
+        if scheduler is not None:
+            zip_codes = scheduler.order(zip_codes)
+
+        total = len(zip_codes)
+
+        # Cheap identity keys for counting how many NEW dealers each ZIP added
+        seen_keys: Set[str] = set()
+        run_started = time.monotonic()
+
+        for i, zip_code in enumerate(zip_codes, 1):
+            if time_budget_seconds is not None and time.monotonic() - run_started >= time_budget_seconds:
+                logging.info(
+                    f"Time budget of {time_budget_seconds:.0f}s reached - "
+                    f"skipping {total - i + 1} remaining ZIPs"
+                )
+                if verbose:
+                    print(f"\n⏱  Time budget reached, skipping {total - i + 1} remaining ZIPs")
+                return
+
+            if verbose:
+                print(f"\n[{i}/{total}] Scraping {self.OEM_NAME} dealers for ZIP {zip_code}...")
+
+            logging.info(f"[{i}/{total}] ZIP {zip_code}: Starting")
+            zip_started = time.monotonic()
+
+            try:
+                dealers = self.scrape_zip_code(zip_code)
+            except Exception as e:
+                logging.error(f"[{i}/{total}] ZIP {zip_code}: ERROR - {str(e)}")
+
+                if verbose:
+                    print(f"  ✗ Error: {str(e)}")
+
+                seconds = time.monotonic() - zip_started
+                if scheduler is not None:
+                    scheduler.record(zip_code, failed=True, seconds=seconds)
+
+                yield ScrapeBatch(zip_code=zip_code, dealers=[], index=i, total=total,
+                                  seconds=seconds, error=str(e))
+                continue
+
+            logging.info(f"[{i}/{total}] ZIP {zip_code}: Found {len(dealers)} dealers")
+
+            if verbose:
+                print(f"  ✓ Found {len(dealers)} dealers")
+
+            seconds = time.monotonic() - zip_started
+            if scheduler is not None:
+                new_count = 0
+                for dealer in dealers:
+                    key = dealer.phone or dealer.domain or f"{dealer.name}|{dealer.state}".lower()
+                    if key not in seen_keys:
+                        seen_keys.add(key)
+                        new_count += 1
+                scheduler.record(zip_code, new_dealers=new_count, seconds=seconds)
+
+            yield ScrapeBatch(zip_code=zip_code, dealers=dealers, index=i, total=total,
+                              seconds=seconds)
+
+    async def astream_multiple(
+        self,
+        zip_codes: List[str],
+        **kwargs
+    ) -> AsyncIterator[ScrapeBatch]:
+        """
+        Async version of stream_multiple() for agent tools and plugins.
+
+        Each ZIP is scraped in a worker thread, so the event loop stays
+        responsive and the sync Playwright API is never called from inside it.
+
+        Args:
+            zip_codes: List of ZIP codes to scrape
+            **kwargs: Passed to stream_multiple()
+
+        Yields:
+            ScrapeBatch per ZIP code
+        """
+        stream = self.stream_multiple(zip_codes, **kwargs)
+        done = object()
+
+        while True:
+            batch = await asyncio.to_thread(next, stream, done)
+            if batch is done:
+                break
+            yield batch
+
     def scrape_multiple(
         self,
         zip_codes: List[str],
         verbose: bool = True,
         checkpoint_interval: int = 25,
-        checkpoint_dir: Optional[str] = None
+        checkpoint_dir: Optional[str] = None,
+        scheduler: Optional[ZipScheduler] = None,
+        time_budget_seconds: Optional[float] = None
     ) -> List[StandardizedDealer]:
         """
         Scrape dealers from multiple ZIP codes with automatic checkpoint saving.
 
+        Collects the output of stream_multiple(); use that directly to process
+        dealers as they arrive instead of waiting for the whole run.
+
         Args:
             zip_codes: List of ZIP codes to scrape
             verbose: Print progress messages
             checkpoint_interval: Save checkpoint every N ZIP codes (default: 25)
             checkpoint_dir: Override default checkpoint directory
+            scheduler: ZipScheduler used to scrape highest-yield ZIPs first.
+                Its stats are updated with this run and saved to
+                {checkpoint_dir}/zip_yield_stats.json
+            time_budget_seconds: Stop starting new ZIPs once this much
+                wall-clock time has elapsed
 
         Returns:
             List of all dealers collected
         """
         all_dealers = []
         failed_zips = []
+        scraped_zips = []
 
         # Setup checkpoint directory
+        oem_name_lower = self.OEM_NAME.lower().replace(" ", "_")
         if checkpoint_dir is None:
-            oem_name_lower = self.OEM_NAME.lower().replace(" ", "_")
             checkpoint_dir = f"output/oem_data/{oem_name_lower}"
 
         Path(checkpoint_dir).mkdir(parents=True, exist_ok=True)
@@ -535,43 +683,47 @@ class BaseDealerScraper(ABC):
         logging.info(f"Starting {self.OEM_NAME} scraper with {len(zip_codes)} ZIP codes")
 
         # Main scraping loop
-        for i, zip_code in enumerate(zip_codes, 1):
-            if verbose:
-                print(f"\n[{i}/{len(zip_codes)}] Scraping {self.OEM_NAME} dealers for ZIP {zip_code}...")
-
-            logging.info(f"[{i}/{len(zip_codes)}] ZIP {zip_code}: Starting")
-
-            try:
-                dealers = self.scrape_zip_code(zip_code)
-                all_dealers.extend(dealers)
-
-                logging.info(f"[{i}/{len(zip_codes)}] ZIP {zip_code}: Found {len(dealers)} dealers")
-
-                if verbose:
-                    print(f"  ✓ Found {len(dealers)} dealers")
-
-            except Exception as e:
-                logging.error(f"[{i}/{len(zip_codes)}] ZIP {zip_code}: ERROR - {str(e)}")
-                failed_zips.append(zip_code)
-
-                if verbose:
-                    print(f"  ✗ Error: {str(e)}")
+        completed = 0
+        for batch in self.stream_multiple(zip_codes, verbose=verbose, scheduler=scheduler,
+                                          time_budget_seconds=time_budget_seconds):
+            completed = batch.index
+            all_dealers.extend(batch.dealers)
+            scraped_zips.append(batch.zip_code)
+            if batch.error is not None:
+                failed_zips.append(batch.zip_code)
 
             # Save checkpoint every N zips or at end
-            if (i % checkpoint_interval == 0) or (i == len(zip_codes)):
+            if (batch.index % checkpoint_interval == 0) or (batch.index == batch.total):
                 self._save_checkpoint(
                     checkpoint_dir=checkpoint_dir,
-                    checkpoint_number=i,
+                    checkpoint_number=batch.index,
                     all_dealers=all_dealers,
-                    completed_zips=i,
-                    total_zips=len(zip_codes),
+                    completed_zips=batch.index,
+                    total_zips=batch.total,
                     failed_zips=failed_zips,
+                    scraped_zips=scraped_zips,
                     verbose=verbose
                 )
 
+        # Stopped early (time budget) - checkpoint what we have
+        if completed < len(zip_codes):
+            self._save_checkpoint(
+                checkpoint_dir=checkpoint_dir,
+                checkpoint_number=completed,
+                all_dealers=all_dealers,
+                completed_zips=completed,
+                total_zips=len(zip_codes),
+                failed_zips=failed_zips,
+                scraped_zips=scraped_zips,
+                verbose=verbose
+            )
+
         self.dealers = all_dealers
         logging.info(f"Completed: {len(all_dealers)} dealers total, {len(failed_zips)} failed ZIPs")
 
+        if scheduler is not None:
+            scheduler.save(str(Path(checkpoint_dir) / STATS_FILENAME))
+
         return all_dealers
 
     def _save_checkpoint(
@@ -582,6 +734,7 @@ class BaseDealerScraper(ABC):
         completed_zips: int,
         total_zips: int,
         failed_zips: List[str],
+        scraped_zips: Optional[List[str]] = None,
         verbose: bool = True
     ) -> None:
         """
@@ -594,6 +747,7 @@ class BaseDealerScraper(ABC):
             completed_zips: Number of ZIPs processed
             total_zips: Total ZIPs to process
             failed_zips: List of ZIP codes that errored
+            scraped_zips: ZIP codes processed so far, in scrape order
             verbose: Whether to print status messages
         """
         # Track started_at timestamp (store as instance variable on first call)
@@ -601,41 +755,7 @@ class BaseDealerScraper(ABC):
             self._scrape_started_at = datetime.now().isoformat()
 
         # Deduplicate dealers before saving
-        seen_phones = set()
-        seen_domains = set()
-        seen_names_by_state = {}
-        unique_dealers = []
-
-        for dealer in all_dealers:
-            is_duplicate = False
-
-            # Phone match
-            if dealer.phone and dealer.phone in seen_phones:
-                is_duplicate = True
-            # Domain match
-            elif dealer.domain and dealer.domain in seen_domains:
-                is_duplicate = True
-            # Fuzzy name + same state
-            elif dealer.name and dealer.state:
-                normalized_name = self._normalize_company_name(dealer.name)
-                if dealer.state in seen_names_by_state:
-                    for existing_norm_name, _ in seen_names_by_state[dealer.state]:
-                        similarity = SequenceMatcher(None, normalized_name, existing_norm_name).ratio()
-                        if similarity >= 0.85:
-                            is_duplicate = True
-                            break
-
-            if not is_duplicate:
-                unique_dealers.append(dealer)
-                if dealer.phone:
-                    seen_phones.add(dealer.phone)
-                if dealer.domain:
-                    seen_domains.add(dealer.domain)
-                if dealer.name and dealer.state:
-                    normalized_name = self._normalize_company_name(dealer.name)
-                    if dealer.state not in seen_names_by_state:
-                        seen_names_by_state[dealer.state] = []
-                    seen_names_by_state[dealer.state].append((normalized_name, dealer))
+        unique_dealers, _ = self._find_duplicates(all_dealers)
 
         # Prepare checkpoint filename base
         oem_name_lower = self.OEM_NAME.lower().replace(" ", "_")
@@ -650,6 +770,7 @@ class BaseDealerScraper(ABC):
             "total_zips": total_zips,
             "completed_zips": completed_zips,
             "failed_zips": failed_zips,
+            "scraped_zips": scraped_zips or [],
             "total_dealers": len(all_dealers),
             "dealers_after_dedup": len(unique_dealers),
             "checkpoint_number": checkpoint_number,
@@ -806,72 +927,114 @@ class BaseDealerScraper(ABC):
 
         return normalized
 
-    def deduplicate_by_phone(self) -> None:
+    def _find_duplicates(
+        self,
+        dealers: List[StandardizedDealer],
+        workers: Optional[int] = None
+    ) -> Tuple[List[StandardizedDealer], List[Tuple[StandardizedDealer, str]]]:
         """
-        Multi-signal deduplication using phone, name fuzzy matching, domain, and location.
-
-        This catches duplicates missed by phone-only matching, like:
-        - Same company with multiple locations/phone numbers
-        - Name variations (e.g., "TRI-STATE POWER & PUMP" vs "TRI-STATE POWER & PUMP LLC")
-        - Same domain but different phone numbers
+        Multi-signal first-match-wins deduplication.
 
-        Deduplication signals (in order of precedence):
+        Each dealer is compared against the dealers already accepted as unique:
         1. Phone number (exact match after normalization)
         2. Domain (exact match)
         3. Fuzzy name match (>=85% similar) + same state
+
+        Fuzzy names are looked up through a NameBlockIndex blocked by state,
+        which returns exactly the match a pairwise SequenceMatcher scan would
+        (the earliest accepted dealer at >= 0.85) without comparing every pair.
+        With workers > 1 the states are scored up front across a process pool
+        (ShardedNameBlockIndex) and the pass itself is only lookups; the
+        result is identical.
+
+        Args:
+            dealers: Dealers in scrape order
+            workers: Worker processes for fuzzy scoring (None = this process)
+
+        Returns:
+            (unique_dealers, [(duplicate_dealer, reason), ...])
         """
+        # Imported here: importing the database package configures root
+        # logging (pipeline_db), which would pre-empt scrape_multiple's run log
+        from database.dedup import NameBlockIndex, ShardedNameBlockIndex
+
+        normalized_names = [
+            self._normalize_company_name(d.name) if d.name and d.state else None
+            for d in dealers
+        ]
+
+        names_by_state: Dict[str, List[str]] = {}
+        for dealer, normalized_name in zip(dealers, normalized_names):
+            if normalized_name is not None:
+                names_by_state.setdefault(dealer.state, []).append(normalized_name)
+
+        if workers is not None and workers > 1:
+            name_index = ShardedNameBlockIndex(names_by_state, threshold=0.85, workers=workers)
+        else:
+            name_index = NameBlockIndex(threshold=0.85)
+            for state, names in names_by_state.items():
+                name_index.prime(state, names)
+
         seen_phones = set()
         seen_domains = set()
-        seen_names_by_state = {}  # {state: [(normalized_name, dealer), ...]}
         unique_dealers = []
         duplicates = []
 
-        for dealer in self.dealers:
-            is_duplicate = False
+        for dealer, normalized_name in zip(dealers, normalized_names):
             duplicate_reason = ""
 
             # Signal 1: Phone match
             if dealer.phone and dealer.phone in seen_phones:
-                is_duplicate = True
                 duplicate_reason = f"phone={dealer.phone}"
 
             # Signal 2: Domain match (if not already marked duplicate)
             elif dealer.domain and dealer.domain in seen_domains:
-                is_duplicate = True
                 duplicate_reason = f"domain={dealer.domain}"
 
-            # Signal 3: Fuzzy name + same state
-            elif dealer.name and dealer.state:
-                normalized_name = self._normalize_company_name(dealer.name)
+            # Signal 3: Fuzzy name + same state (85% similarity threshold)
+            elif normalized_name is not None:
+                match = name_index.find_first(dealer.state, normalized_name)
+                if match is not None:
+                    existing_dealer, similarity = match
+                    duplicate_reason = f"fuzzy_name={similarity:.2f} ('{dealer.name}' ≈ '{existing_dealer.name}')"
 
-                # Check against existing names in same state
-                if dealer.state in seen_names_by_state:
-                    for existing_norm_name, existing_dealer in seen_names_by_state[dealer.state]:
-                        similarity = SequenceMatcher(None, normalized_name, existing_norm_name).ratio()
+            if duplicate_reason:
+                duplicates.append((dealer, duplicate_reason))
+                continue
 
-                        # 85% similarity threshold for same state
-                        if similarity >= 0.85:
-                            is_duplicate = True
-                            duplicate_reason = f"fuzzy_name={similarity:.2f} ('{dealer.name}' ≈ '{existing_dealer.name}')"
-                            break
+            # Add to unique list and tracking sets
+            unique_dealers.append(dealer)
 
-            if is_duplicate:
-                duplicates.append((dealer, duplicate_reason))
-            else:
-                # Add to unique list and tracking sets
-                unique_dealers.append(dealer)
+            if dealer.phone:
+                seen_phones.add(dealer.phone)
+
+            if dealer.domain:
+                seen_domains.add(dealer.domain)
 
-                if dealer.phone:
-                    seen_phones.add(dealer.phone)
+            if normalized_name is not None:
+                name_index.add(dealer.state, normalized_name, value=dealer)
 
-                if dealer.domain:
-                    seen_domains.add(dealer.domain)
+        return unique_dealers, duplicates
 
-                if dealer.name and dealer.state:
-                    normalized_name = self._normalize_company_name(dealer.name)
-                    if dealer.state not in seen_names_by_state:
-                        seen_names_by_state[dealer.state] = []
-                    seen_names_by_state[dealer.state].append((normalized_name, dealer))
+    def deduplicate_by_phone(self, workers: Optional[int] = None) -> None:
+        """
+        Multi-signal deduplication using phone, name fuzzy matching, domain, and location.
+
+        This catches duplicates missed by phone-only matching, like:
+        - Same company with multiple locations/phone numbers
+        - Name variations (e.g., "TRI-STATE POWER & PUMP" vs "TRI-STATE POWER & PUMP LLC")
+        - Same domain but different phone numbers
+
+        Deduplication signals (in order of precedence):
+        1. Phone number (exact match after normalization)
+        2. Domain (exact match)
+        3. Fuzzy name match (>=85% similar) + same state
+
+        Args:
+            workers: Worker processes for fuzzy name scoring (None = this
+                process; worth it for sweeps of tens of thousands of dealers)
+        """
+        unique_dealers, duplicates = self._find_duplicates(self.dealers, workers=workers)
 
         removed = len(self.dealers) - len(unique_dealers)
 
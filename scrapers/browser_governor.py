@@ -0,0 +1,372 @@
+"""
+Browser Memory Governor
+
+Keeps long headless runs (264-ZIP sweeps, Trane's ~2,800 detail pages, the
+RunPod worker that never restarts) at flat memory and stable latency.
+
+Chromium leaks steadily when one browser/page is reused for hours.  The
+governor owns the browser -> context -> page lifecycle and recycles:
+  - the CONTEXT after N pages (frees renderer memory, keeps the browser)
+  - the BROWSER when RSS, contexts-per-browser or error rate cross a limit
+
+Callers just ask for a page, do their work, and report the outcome:
+
+    >>> governor = BrowserGovernor(
+    ...     launch_browser=lambda: p.chromium.launch(headless=True),
+    ... )
+    >>> page = governor.acquire_page()
+    >>> ...  # navigate / evaluate
+    >>> governor.release(success=True)
+    >>> governor.metrics()   # RSS, pages, error rate, recycles, latency
+
+Memory is measured from the local process tree (psutil if installed, /proc
+otherwise).  Remote browsers (Browserbase CDP) report no RSS, so only the
+page-count and error-rate limits apply to them.
+"""
+
+import json
+import os
+import time
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    import psutil
+except ImportError:  # pragma: no cover - depends on environment
+    psutil = None
+
+
+@dataclass
+class GovernorLimits:
+    """Thresholds that trigger recycling (None disables a limit)."""
+    max_pages_per_context: Optional[int] = 200
+    max_contexts_per_browser: Optional[int] = 50
+    max_browser_rss_mb: Optional[float] = 1500.0
+    max_error_rate: Optional[float] = 0.5
+    error_window: int = 20  # Rolling window of recent pages for error rate/latency
+
+
+# ============================================================================
+# PROCESS MEMORY
+# ============================================================================
+
+def _read_proc_tree(root_pid: int) -> List[Dict[str, Any]]:
+    """Descendants of root_pid from /proc: [{'pid', 'rss_kb', 'cmdline'}]."""
+    children: Dict[int, List[int]] = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat', 'r') as f:
+                stat = f.read()
+            # Field 4 (ppid) follows the ")" that closes the command name
+            ppid = int(stat.rsplit(')', 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+
+    processes = []
+    stack = list(children.get(root_pid, []))
+    while stack:
+        pid = stack.pop()
+        stack.extend(children.get(pid, []))
+        try:
+            rss_kb = 0
+            with open(f'/proc/{pid}/status', 'r') as f:
+                for line in f:
+                    if line.startswith('VmRSS:'):
+                        rss_kb = int(line.split()[1])
+                        break
+            with open(f'/proc/{pid}/cmdline', 'rb') as f:
+                cmdline = f.read().replace(b'\0', b' ').decode(errors='replace')
+        except (OSError, ValueError):
+            continue
+        processes.append({'pid': pid, 'rss_kb': rss_kb, 'cmdline': cmdline})
+    return processes
+
+
+def browser_memory(root_pid: Optional[int] = None) -> Optional[Dict[str, float]]:
+    """
+    RSS of the Chromium processes launched under this Python process.
+
+    Args:
+        root_pid: Process whose descendants to measure (default: current)
+
+    Returns:
+        {'browser_rss_mb', 'renderer_rss_mb', 'renderer_count'} or None when
+        process memory cannot be read on this platform
+    """
+    root_pid = root_pid or os.getpid()
+    processes = []
+
+    if psutil is not None:
+        try:
+            for child in psutil.Process(root_pid).children(recursive=True):
+                try:
+                    processes.append({
+                        'pid': child.pid,
+                        'rss_kb': child.memory_info().rss // 1024,
+                        'cmdline': ' '.join(child.cmdline()),
+                    })
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    continue
+        except psutil.NoSuchProcess:
+            return None
+    elif os.path.isdir('/proc'):
+        processes = _read_proc_tree(root_pid)
+    else:
+        return None
+
+    chromium = [p for p in processes if 'chrom' in p['cmdline'].lower()]
+    renderers = [p for p in chromium if '--type=renderer' in p['cmdline']]
+
+    return {
+        'browser_rss_mb': sum(p['rss_kb'] for p in chromium) / 1024,
+        'renderer_rss_mb': sum(p['rss_kb'] for p in renderers) / 1024,
+        'renderer_count': len(renderers),
+    }
+
+
+# ============================================================================
+# GOVERNOR
+# ============================================================================
+
+class BrowserGovernor:
+    """
+    Owns a browser/context/page and recycles them before they degrade.
+
+    Works with any Playwright-compatible objects (sync API); the browser is
+    created by the caller-supplied launch_browser factory so local launches,
+    Patchright and Browserbase CDP sessions are all supported.
+    """
+
+    def __init__(
+        self,
+        launch_browser: Callable[[], Any],
+        new_context: Optional[Callable[[Any], Any]] = None,
+        limits: Optional[GovernorLimits] = None,
+        close_contexts: bool = True,
+        metrics_file: Optional[str] = None,
+        memory_probe: Optional[Callable[[], Optional[Dict[str, float]]]] = None,
+        verbose: bool = True
+    ):
+        """
+        Args:
+            launch_browser: Returns a new Browser (launch or connect_over_cdp)
+            new_context: Returns a context for a browser (default: browser.new_context())
+            limits: Recycling thresholds
+            close_contexts: Close contexts when recycling.  Set False for
+                remote browsers whose default context must stay open - the
+                governor then only closes the pages it opened.
+            metrics_file: Append a JSON metrics line here on every recycle
+            memory_probe: Override RSS measurement (default: browser_memory)
+            verbose: Print recycle events
+        """
+        self.launch_browser = launch_browser
+        self.new_context = new_context or (lambda browser: browser.new_context())
+        self.limits = limits or GovernorLimits()
+        self.close_contexts = close_contexts
+        self.metrics_file = metrics_file
+        self.memory_probe = memory_probe or browser_memory
+        self.verbose = verbose
+
+        self.browser = None
+        self.context = None
+        self.page = None
+
+        self._started_at = time.monotonic()
+        self._page_started_at: Optional[float] = None
+        self._pages_in_context = 0
+        self._contexts_in_browser = 0
+        self._recent = deque(maxlen=self.limits.error_window)  # (success, latency)
+        self._memory: Optional[Dict[str, float]] = None
+
+        self.counters = {
+            'browsers_launched': 0,
+            'contexts_created': 0,
+            'pages_served': 0,
+            'errors': 0,
+            'context_recycles': 0,
+            'browser_recycles': 0,
+        }
+        self.last_recycle_reason: Optional[str] = None
+
+    # ------------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------------
+
+    def _log(self, message: str) -> None:
+        if self.verbose:
+            print(f"[BrowserGovernor] {message}")
+
+    def start(self):
+        """Launch the browser if it is not running; returns it."""
+        if self.browser is None:
+            self.browser = self.launch_browser()
+            self.counters['browsers_launched'] += 1
+            self._contexts_in_browser = 0
+        return self.browser
+
+    def acquire_page(self):
+        """Return a live page, creating browser/context/page as needed."""
+        self.start()
+
+        if self.context is None:
+            self.context = self.new_context(self.browser)
+            self.counters['contexts_created'] += 1
+            self._contexts_in_browser += 1
+            self._pages_in_context = 0
+
+        if self.page is None:
+            self.page = self.context.new_page()
+
+        self._page_started_at = time.monotonic()
+        return self.page
+
+    def release(self, success: bool = True) -> Optional[str]:
+        """
+        Report the outcome of the work done on the acquired page.
+
+        Returns:
+            'context' or 'browser' if a recycle happened, else None
+        """
+        latency = None
+        if self._page_started_at is not None:
+            latency = time.monotonic() - self._page_started_at
+            self._page_started_at = None
+
+        self.counters['pages_served'] += 1
+        self._pages_in_context += 1
+        if not success:
+            self.counters['errors'] += 1
+        self._recent.append((success, latency))
+
+        return self.check()
+
+    def check(self) -> Optional[str]:
+        """Recycle the context or browser if any limit is exceeded."""
+        limits = self.limits
+
+        if self.browser is not None:
+            reason = None
+            self._memory = self.memory_probe()
+            rss = self._memory['browser_rss_mb'] if self._memory else None
+
+            if limits.max_browser_rss_mb is not None and rss is not None and rss >= limits.max_browser_rss_mb:
+                reason = f"browser RSS {rss:.0f}MB >= {limits.max_browser_rss_mb:.0f}MB"
+            elif (limits.max_error_rate is not None
+                  and len(self._recent) >= limits.error_window
+                  and self.error_rate() >= limits.max_error_rate):
+                reason = f"error rate {self.error_rate():.0%} over last {len(self._recent)} pages"
+            elif (limits.max_contexts_per_browser is not None
+                  and self._contexts_in_browser >= limits.max_contexts_per_browser
+                  and self._pages_in_context >= (limits.max_pages_per_context or 1)):
+                reason = f"{self._contexts_in_browser} contexts on one browser"
+
+            if reason:
+                self.recycle_browser(reason)
+                return 'browser'
+
+        if (self.context is not None
+                and limits.max_pages_per_context is not None
+                and self._pages_in_context >= limits.max_pages_per_context):
+            # Routine rotation - not worth a log line per context
+            self.recycle_context(f"{self._pages_in_context} pages on one context", log=False)
+            return 'context'
+
+        return None
+
+    def _close_context(self) -> None:
+        try:
+            if self.close_contexts and self.context is not None:
+                self.context.close()
+            elif self.page is not None:
+                self.page.close()
+        except Exception as e:
+            self._log(f"Error closing context: {e}")
+        self.context = None
+        self.page = None
+
+    def recycle_context(self, reason: str = "manual", log: bool = True) -> None:
+        """Close the current context (and its pages); the next acquire opens a fresh one."""
+        if log:
+            self._log(f"Recycling context: {reason}")
+        self._close_context()
+        self.counters['context_recycles'] += 1
+        self.last_recycle_reason = reason
+        self.export_metrics()
+
+    def recycle_browser(self, reason: str = "manual") -> None:
+        """Close the browser; the next acquire launches a fresh one."""
+        self._log(f"Recycling browser: {reason}")
+        self._close_context()
+        try:
+            if self.browser is not None:
+                self.browser.close()
+        except Exception as e:
+            self._log(f"Error closing browser: {e}")
+        self.browser = None
+        self._recent.clear()
+        self.counters['browser_recycles'] += 1
+        self.last_recycle_reason = reason
+        self.export_metrics()
+
+    def close(self) -> None:
+        """Close everything (the governor can be reused afterwards)."""
+        self._close_context()
+        try:
+            if self.browser is not None:
+                self.browser.close()
+        except Exception as e:
+            self._log(f"Error closing browser: {e}")
+        self.browser = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    # ------------------------------------------------------------------------
+    # Metrics
+    # ------------------------------------------------------------------------
+
+    def error_rate(self) -> float:
+        """Fraction of failed pages in the rolling window."""
+        if not self._recent:
+            return 0.0
+        return sum(1 for success, _ in self._recent if not success) / len(self._recent)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Snapshot of memory, throughput and recycling counters."""
+        latencies = [latency for _, latency in self._recent if latency is not None]
+        memory = self._memory or {}
+
+        return {
+            'timestamp': datetime.now().isoformat(),
+            'uptime_seconds': round(time.monotonic() - self._started_at, 1),
+            **self.counters,
+            'pages_in_context': self._pages_in_context,
+            'contexts_in_browser': self._contexts_in_browser,
+            'error_rate': round(self.error_rate(), 3),
+            'avg_latency_seconds': round(sum(latencies) / len(latencies), 3) if latencies else None,
+            'browser_rss_mb': round(memory['browser_rss_mb'], 1) if 'browser_rss_mb' in memory else None,
+            'renderer_rss_mb': round(memory['renderer_rss_mb'], 1) if 'renderer_rss_mb' in memory else None,
+            'renderer_count': memory.get('renderer_count'),
+            'last_recycle_reason': self.last_recycle_reason,
+        }
+
+    def export_metrics(self, path: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Append current metrics as one JSON line to path (or metrics_file)."""
+        path = path or self.metrics_file
+        if not path:
+            return None
+        snapshot = self.metrics()
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'a') as f:
+            f.write(json.dumps(snapshot) + "\n")
+        return snapshot
@@ -36,6 +36,22 @@ from scrapers.base_scraper import (
     ScraperMode,
 )
 from scrapers.scraper_factory import ScraperFactory
+from utils.keyword_matcher import KeywordMatcher
+
+
+# Name and certification signals (compiled once, one scan per dealer)
+NAME_KEYWORDS = KeywordMatcher({
+    "commercial": [
+        "commercial", "industrial", "mechanical", "contractor",
+        "inc", "corp", "llc", "heating", "cooling", "hvac"
+    ],
+    "residential": ["residential", "home", "house"],
+})
+CERTIFICATION_KEYWORDS = KeywordMatcher({
+    "hvac": ["hvac", "heating", "cooling", "air conditioning"],
+    "security": ["security", "alarm", "surveillance"],
+    "plumbing": ["humidifier", "air quality", "water"],
+})
 
 
 class HoneywellHomeScraper(BaseDealerScraper):
@@ -413,31 +429,30 @@ class HoneywellHomeScraper(BaseDealerScraper):
         name = raw_dealer.get("name", "").lower()
         certs = raw_dealer.get("certifications", [])
 
+        name_found = NAME_KEYWORDS.labels(name)
+
         # Commercial signals
-        commercial_signals = [
-            "commercial", "industrial", "mechanical", "contractor",
-            "inc", "corp", "llc", "heating", "cooling", "hvac"
-        ]
-        caps.is_commercial = any(sig in name for sig in commercial_signals)
+        caps.is_commercial = "commercial" in name_found
 
         # Residential (most Honeywell contractors)
-        residential_signals = ["residential", "home", "house"]
-        caps.is_residential = any(sig in name for sig in residential_signals) or not caps.is_commercial
+        caps.is_residential = "residential" in name_found or not caps.is_commercial
 
         # Check certifications for capability expansion
         certs_text = " ".join(certs).lower()
 
+        found = CERTIFICATION_KEYWORDS.labels(certs_text)
+
         # HVAC signals
-        if any(sig in certs_text for sig in ["hvac", "heating", "cooling", "air conditioning"]):
+        if "hvac" in found:
             caps.has_hvac = True
 
         # Security signals (Honeywell also does security)
-        if any(sig in certs_text for sig in ["security", "alarm", "surveillance"]):
+        if "security" in found:
             # Security contractors = electrical + low-voltage capability
             caps.has_electrical = True
 
         # Air quality/plumbing signals
-        if any(sig in certs_text for sig in ["humidifier", "air quality", "water"]):
+        if "plumbing" in found:
             caps.has_plumbing = True  # Water-based HVAC products
 
         return caps
@@ -37,6 +37,23 @@ from scrapers.base_scraper import (
     ScraperMode,
 )
 from scrapers.scraper_factory import ScraperFactory
+from utils.keyword_matcher import KeywordMatcher
+
+
+# Commercial/industrial name signals (JCI is commercial by default)
+COMMERCIAL_SIGNALS = KeywordMatcher([
+    "commercial", "industrial", "mechanical", "contractor",
+    "systems", "solutions", "building", "automation"
+])
+
+# Certification signals (compiled once, one scan per dealer)
+CERTIFICATION_KEYWORDS = KeywordMatcher({
+    "automation": ["automation", "control", "BAS", "BMS"],
+    "fire_safety": ["fire", "safety", "alarm"],
+    "security": ["security", "access control"],
+    "energy": ["energy", "efficiency", "management"],
+    "hvac": ["hvac", "heating", "cooling", "refrigeration"],
+})
 
 
 class JohnsonControlsScraper(BaseDealerScraper):
@@ -398,11 +415,7 @@ class JohnsonControlsScraper(BaseDealerScraper):
         certs = raw_dealer.get("certifications", [])
 
         # Commercial/industrial signals (JCI is commercial by default)
-        commercial_signals = [
-            "commercial", "industrial", "mechanical", "contractor",
-            "systems", "solutions", "building", "automation"
-        ]
-        if any(sig in name for sig in commercial_signals):
+        if COMMERCIAL_SIGNALS.search(name):
             caps.is_commercial = True  # Reinforce
 
         # Residential (rare for JCI, but possible)
@@ -411,27 +424,28 @@ class JohnsonControlsScraper(BaseDealerScraper):
 
         # Check certifications for capability expansion
         certs_text = " ".join(certs).lower()
+        found = CERTIFICATION_KEYWORDS.labels(certs_text)
 
         # Building automation signals
-        if any(sig in certs_text for sig in ["automation", "control", "BAS", "BMS"]):
+        if "automation" in found:
             caps.has_electrical = True  # Controls = electrical
             caps.is_commercial = True  # Building automation = commercial
 
         # Fire safety signals
-        if any(sig in certs_text for sig in ["fire", "safety", "alarm"]):
+        if "fire_safety" in found:
             caps.has_electrical = True  # Fire systems = electrical/low-voltage
 
         # Security signals
-        if any(sig in certs_text for sig in ["security", "access control"]):
+        if "security" in found:
             caps.has_electrical = True  # Security = electrical/low-voltage
 
         # Energy management signals
-        if any(sig in certs_text for sig in ["energy", "efficiency", "management"]):
+        if "energy" in found:
             caps.has_hvac = True  # Energy management includes HVAC optimization
             caps.has_electrical = True  # Energy management includes electrical systems
 
         # HVAC equipment signals
-        if any(sig in certs_text for sig in ["hvac", "heating", "cooling", "refrigeration"]):
+        if "hvac" in found:
             caps.has_hvac = True
 
         return caps
@@ -36,6 +36,22 @@ from scrapers.base_scraper import (
     ScraperMode,
 )
 from scrapers.scraper_factory import ScraperFactory
+from utils.keyword_matcher import KeywordMatcher
+
+
+# Name and certification signals (compiled once, one scan per dealer)
+NAME_KEYWORDS = KeywordMatcher({
+    "commercial": [
+        "commercial", "industrial", "mechanical", "contractor",
+        "inc", "corp", "llc", "heating", "cooling", "hvac"
+    ],
+    "residential": ["residential", "home", "house"],
+})
+CERTIFICATION_KEYWORDS = KeywordMatcher({
+    "hvac": ["hvac", "heating", "cooling", "air conditioning"],
+    "smart_home": ["smart home", "automation", "control"],
+    "plumbing": ["plumbing", "water", "pipe"],
+})
 
 
 class SensiScraper(BaseDealerScraper):
@@ -392,30 +408,29 @@ class SensiScraper(BaseDealerScraper):
         name = raw_dealer.get("name", "").lower()
         certs = raw_dealer.get("certifications", [])
 
+        name_found = NAME_KEYWORDS.labels(name)
+
         # Commercial signals
-        commercial_signals = [
-            "commercial", "industrial", "mechanical", "contractor",
-            "inc", "corp", "llc", "heating", "cooling", "hvac"
-        ]
-        caps.is_commercial = any(sig in name for sig in commercial_signals)
+        caps.is_commercial = "commercial" in name_found
 
         # Residential (most Sensi contractors)
-        residential_signals = ["residential", "home", "house"]
-        caps.is_residential = any(sig in name for sig in residential_signals) or not caps.is_commercial
+        caps.is_residential = "residential" in name_found or not caps.is_commercial
 
         # Check certifications
         certs_text = " ".join(certs).lower()
 
+        found = CERTIFICATION_KEYWORDS.labels(certs_text)
+
         # HVAC signals
-        if any(sig in certs_text for sig in ["hvac", "heating", "cooling", "air conditioning"]):
+        if "hvac" in found:
             caps.has_hvac = True
 
         # Smart home signals
-        if any(sig in certs_text for sig in ["smart home", "automation", "control"]):
+        if "smart_home" in found:
             caps.has_electrical = True  # Smart home = electrical/low-voltage
 
         # Plumbing signals (HVAC often includes plumbing)
-        if any(sig in certs_text for sig in ["plumbing", "water", "pipe"]):
+        if "plumbing" in found:
             caps.has_plumbing = True
 
         return caps
@@ -46,7 +46,24 @@ from scrapers.base_scraper import (
     DealerCapabilities,
     ScraperMode,
 )
+from scrapers.browser_governor import BrowserGovernor, GovernorLimits
 from scrapers.scraper_factory import ScraperFactory
+from utils.keyword_matcher import KeywordMatcher
+
+
+# Capability keywords over name + certifications + expertise (one scan per dealer)
+CAPABILITY_KEYWORDS = KeywordMatcher({
+    "electrical": ["electric", "electrical", "wiring", "panel"],
+    "plumbing": ["plumb", "plumbing", "pipe", "water heater"],
+    "fire_security": ["fire", "alarm", "security", "sprinkler", "low voltage"],
+    "solar": ["solar", "energy", "renewable", "photovoltaic"],
+    "roofing": ["roof", "roofing"],
+    "residential": ["residential", "home", "house"],
+    "om": ["maintenance", "service", "repair", "o&m", "operations"],
+})
+
+# Commercial signals (high value) - checked against the name only
+COMMERCIAL_SIGNALS = KeywordMatcher(["commercial", "industrial", "mechanical", "inc", "corp", "llc"])
 
 
 class TraneScraper(BaseDealerScraper):
@@ -306,6 +323,7 @@ class TraneScraper(BaseDealerScraper):
 
         except Exception as e:
             print(f"    ⚠️ Error on detail page: {e}")
+            enriched['detail_error'] = str(e)
 
         return enriched
 
@@ -347,14 +365,31 @@ class TraneScraper(BaseDealerScraper):
         print(f"{'='*60}\n")
 
         with sync_playwright() as p:
-            # Create Browserbase session
-            session = bb.sessions.create(project_id=project_id)
+            sessions = []
+
+            def connect_browser():
+                # Each (re)launch is a fresh Browserbase session
+                session = bb.sessions.create(project_id=project_id)
+                sessions.append(session)
+                return p.chromium.connect_over_cdp(session.connect_url)
+
+            # One page is reused for thousands of detail pages - rotate it every
+            # CHECKPOINT_INTERVAL pages and start a new session after 10 rotations
+            # or a burst of errors, so memory and latency stay flat.
+            governor = BrowserGovernor(
+                launch_browser=connect_browser,
+                new_context=lambda browser: browser.contexts[0],
+                close_contexts=False,
+                limits=GovernorLimits(
+                    max_pages_per_context=self.CHECKPOINT_INTERVAL,
+                    max_contexts_per_browser=10,
+                    max_browser_rss_mb=None,  # Remote browser - no local RSS
+                ),
+                metrics_file=f"{checkpoint_dir}/trane_browser_metrics.jsonl",
+            )
 
             try:
-                # Connect to cloud browser
-                browser = p.chromium.connect_over_cdp(session.connect_url)
-                context = browser.contexts[0]
-                page = context.pages[0] if context.pages else context.new_page()
+                page = governor.acquire_page()
 
                 # Phase 1: Scrape directory table
                 print("PHASE 1: Scraping master directory table...")
@@ -371,6 +406,7 @@ class TraneScraper(BaseDealerScraper):
                     pass
 
                 directory_dealers = self.scrape_directory_table(page)
+                governor.release(success=bool(directory_dealers))
 
                 if not directory_dealers:
                     print("  ✗ No dealers found in directory table!")
@@ -389,7 +425,10 @@ class TraneScraper(BaseDealerScraper):
                         print(f"  [{i}/{len(directory_dealers)}] {dealer_data.get('name', 'Unknown')[:40]}...", end=" ")
 
                         # Scrape detail page
+                        page = governor.acquire_page()
                         enriched = self.scrape_detail_page(page, detail_url)
+                        governor.release(success='detail_error' not in enriched)
+                        enriched.pop('detail_error', None)
                         dealer_data.update(enriched)
 
                         # Show progress
@@ -418,15 +457,19 @@ class TraneScraper(BaseDealerScraper):
                     checkpoint_dir, len(directory_dealers), dealers, len(directory_dealers), final=True
                 )
 
+                metrics = governor.metrics()
                 print(f"\n{'='*60}")
                 print(f"  COMPLETED: {len(dealers)} dealers scraped")
                 print(f"  With ratings: {sum(1 for d in dealers if d.google_rating > 0)}")
                 print(f"  With phones: {sum(1 for d in dealers if d.phone)}")
+                print(f"  Browser sessions: {metrics['browsers_launched']} | Error rate: {metrics['error_rate']:.0%}")
                 print(f"{'='*60}\n")
 
             finally:
-                browser.close()
-                bb.sessions.update(session.id, status="COMPLETED")
+                governor.export_metrics()
+                governor.close()
+                for session in sessions:
+                    bb.sessions.update(session.id, status="COMPLETED")
 
         return dealers
 
@@ -668,34 +711,34 @@ class TraneScraper(BaseDealerScraper):
         certs = [c.lower() for c in raw_dealer.get('certifications', [])]
         expertise = [e.lower() for e in raw_dealer.get('areas_of_expertise', [])]
         all_text = f"{name} {' '.join(certs)} {' '.join(expertise)}"
+        found = CAPABILITY_KEYWORDS.labels(all_text)
 
         # Trade detection from expertise areas
         # Electrical signals
-        if any(kw in all_text for kw in ['electric', 'electrical', 'wiring', 'panel']):
+        if "electrical" in found:
             caps.has_electrical = True
 
         # Plumbing signals
-        if any(kw in all_text for kw in ['plumb', 'plumbing', 'pipe', 'water heater']):
+        if "plumbing" in found:
             caps.has_plumbing = True
 
         # Fire/Security signals (GOLD when combined with HVAC!)
-        if any(kw in all_text for kw in ['fire', 'alarm', 'security', 'sprinkler', 'low voltage']):
+        if "fire_security" in found:
             caps.has_fire_security = True
 
         # Solar/Energy signals
-        if any(kw in all_text for kw in ['solar', 'energy', 'renewable', 'photovoltaic']):
+        if "solar" in found:
             caps.has_solar = True
 
         # Roofing signals
-        if any(kw in all_text for kw in ['roof', 'roofing']):
+        if "roofing" in found:
             caps.has_roofing = True
 
         # Commercial signals (high value)
-        commercial_signals = ['commercial', 'industrial', 'mechanical', 'inc', 'corp', 'llc']
-        caps.is_commercial = any(sig in name for sig in commercial_signals)
+        caps.is_commercial = COMMERCIAL_SIGNALS.search(name)
 
         # Residential (most Trane dealers)
-        caps.is_residential = any(kw in all_text for kw in ['residential', 'home', 'house']) or not caps.is_commercial
+        caps.is_residential = "residential" in found or not caps.is_commercial
 
         # Resimercial (does BOTH - highest value!)
         if caps.is_commercial and caps.is_residential:
@@ -703,7 +746,7 @@ class TraneScraper(BaseDealerScraper):
             pass
 
         # O&M Detection
-        if any(kw in all_text for kw in ['maintenance', 'service', 'repair', 'o&m', 'operations']):
+        if "om" in found:
             caps.has_om_capability = True
 
         # High ratings = likely larger operations
@@ -0,0 +1,449 @@
+"""
+Yield-Prioritized ZIP Scheduler
+
+Orders ZIP codes by the expected number of NEW unique dealers they return per
+second of scraping, learned from previous runs of the same OEM.
+
+Dealer locators return overlapping radii, so dense metros keep returning the
+same contractors while some suburban ZIPs surface many new ones.  Scraping the
+high-yield ZIPs first means a run that is stopped early (time budget, rate
+limits, crash) still has most of the unique dealers.
+
+Sources of history:
+  - Checkpoint JSONs written by BaseDealerScraper (dealers carry scraped_from_zip)
+  - Run logs written by BaseDealerScraper (per-ZIP start/finish timestamps)
+  - scraper_runs rows in the pipeline database (run_parameters {"zips": [...]})
+  - A persisted stats file (zip_yield_stats.json) updated after each run
+
+Usage:
+    >>> scheduler = ZipScheduler.from_history("output/oem_data/generac")
+    >>> ordered = scheduler.order(ALL_ZIP_CODES)
+    >>> plan = scheduler.plan(ALL_ZIP_CODES, time_budget_seconds=3600)
+"""
+
+import json
+import re
+import sqlite3
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+
+STATS_FILENAME = "zip_yield_stats.json"
+
+# Run log line format: "[2025-11-02 10:00:00,123] [3/264] ZIP 94102: Starting"
+_LOG_LINE = re.compile(
+    r"^\[(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2},\d{3})\] \[\d+/\d+\] ZIP (\d{5}): (.*)$"
+)
+_LOG_TIME_FORMAT = "%Y-%m-%d %H:%M:%S,%f"
+
+# Latency assumed for a ZIP we have never scraped (seconds)
+DEFAULT_SECONDS_PER_ZIP = 30.0
+
+
+@dataclass
+class ZipYieldStats:
+    """Accumulated history for one ZIP code."""
+    zip_code: str
+    attempts: int = 0
+    failures: int = 0
+    new_dealers: int = 0
+    timed_attempts: int = 0
+    total_seconds: float = 0.0
+
+    @property
+    def successes(self) -> int:
+        return max(self.attempts - self.failures, 0)
+
+    @property
+    def avg_seconds(self) -> Optional[float]:
+        if self.timed_attempts == 0:
+            return None
+        return self.total_seconds / self.timed_attempts
+
+    def record(
+        self,
+        new_dealers: int = 0,
+        seconds: Optional[float] = None,
+        failed: bool = False
+    ) -> None:
+        """Add one scrape attempt to the history."""
+        self.attempts += 1
+        if failed:
+            self.failures += 1
+        else:
+            self.new_dealers += new_dealers
+        if seconds is not None and seconds >= 0:
+            self.timed_attempts += 1
+            self.total_seconds += seconds
+
+
+class ZipScheduler:
+    """
+    Ranks ZIP codes by expected new-unique-dealers per second.
+
+    Estimates are smoothed toward the OEM-wide average so that a single lucky
+    (or unlucky) observation does not dominate, and ZIPs with no history are
+    scored at the average - they are neither starved nor prioritized.
+    """
+
+    def __init__(self, prior_weight: float = 1.0):
+        """
+        Args:
+            prior_weight: Pseudo-observations of the OEM-wide average blended
+                into each ZIP's estimate (higher = more conservative)
+        """
+        self.prior_weight = prior_weight
+        self.stats: Dict[str, ZipYieldStats] = {}
+
+    # ========================================================================
+    # RECORDING
+    # ========================================================================
+
+    def _get(self, zip_code: str) -> ZipYieldStats:
+        zip_code = str(zip_code)
+        if zip_code not in self.stats:
+            self.stats[zip_code] = ZipYieldStats(zip_code=zip_code)
+        return self.stats[zip_code]
+
+    def record(
+        self,
+        zip_code: str,
+        new_dealers: int = 0,
+        seconds: Optional[float] = None,
+        failed: bool = False
+    ) -> None:
+        """Record the outcome of scraping one ZIP."""
+        self._get(zip_code).record(new_dealers=new_dealers, seconds=seconds, failed=failed)
+
+    # ========================================================================
+    # SCORING
+    # ========================================================================
+
+    def _priors(self) -> Dict[str, float]:
+        attempts = sum(s.attempts for s in self.stats.values())
+        successes = sum(s.successes for s in self.stats.values())
+        new_dealers = sum(s.new_dealers for s in self.stats.values())
+        timed = sum(s.timed_attempts for s in self.stats.values())
+        seconds = sum(s.total_seconds for s in self.stats.values())
+
+        return {
+            'yield': new_dealers / successes if successes else 1.0,
+            'success_rate': successes / attempts if attempts else 1.0,
+            'seconds': seconds / timed if timed and seconds > 0 else DEFAULT_SECONDS_PER_ZIP,
+        }
+
+    def _estimate(self, zip_code: str, priors: Dict[str, float]) -> Dict[str, float]:
+        stats = self.stats.get(str(zip_code))
+        w = self.prior_weight
+
+        if stats is None:
+            return {
+                'yield': priors['yield'],
+                'success_rate': priors['success_rate'],
+                'seconds': priors['seconds'],
+            }
+
+        expected_yield = (stats.new_dealers + w * priors['yield']) / (stats.successes + w)
+        success_rate = (stats.successes + w * priors['success_rate']) / (stats.attempts + w)
+        seconds = (stats.total_seconds + w * priors['seconds']) / (stats.timed_attempts + w)
+
+        return {
+            'yield': expected_yield,
+            'success_rate': success_rate,
+            'seconds': max(seconds, 0.001),
+        }
+
+    def expected_seconds(self, zip_code: str) -> float:
+        """Expected wall-clock seconds to scrape a ZIP."""
+        return self._estimate(zip_code, self._priors())['seconds']
+
+    def score(self, zip_code: str) -> float:
+        """Expected new unique dealers per second for a ZIP."""
+        est = self._estimate(zip_code, self._priors())
+        return est['yield'] * est['success_rate'] / est['seconds']
+
+    def order(self, zip_codes: Iterable[str]) -> List[str]:
+        """
+        Return ZIP codes sorted by descending expected yield per second.
+
+        Ties keep their input order, so a scheduler with no history returns the
+        list unchanged.
+        """
+        zip_codes = [str(z) for z in zip_codes]
+        priors = self._priors()
+
+        def key(item):
+            index, zip_code = item
+            est = self._estimate(zip_code, priors)
+            return (-(est['yield'] * est['success_rate'] / est['seconds']), index)
+
+        return [z for _, z in sorted(enumerate(zip_codes), key=key)]
+
+    def plan(
+        self,
+        zip_codes: Iterable[str],
+        time_budget_seconds: Optional[float] = None
+    ) -> List[str]:
+        """
+        Highest-yield ZIPs that fit in a time budget.
+
+        Args:
+            zip_codes: Candidate ZIP codes
+            time_budget_seconds: Wall-clock budget (None = no limit)
+
+        Returns:
+            Ordered ZIP codes whose expected latencies sum to <= the budget
+        """
+        ordered = self.order(zip_codes)
+        if time_budget_seconds is None:
+            return ordered
+
+        priors = self._priors()
+        planned = []
+        spent = 0.0
+        for zip_code in ordered:
+            seconds = self._estimate(zip_code, priors)['seconds']
+            if spent + seconds > time_budget_seconds:
+                continue
+            planned.append(zip_code)
+            spent += seconds
+        return planned
+
+    # ========================================================================
+    # LEARNING FROM HISTORY
+    # ========================================================================
+
+    def load_checkpoint(self, checkpoint_file: str) -> int:
+        """
+        Learn per-ZIP yield from a checkpoint JSON.
+
+        Checkpoint dealers are already deduplicated and each carries the ZIP it
+        was first found in, so counting them by scraped_from_zip gives the new
+        unique dealers each ZIP contributed.  ZIPs listed in scraped_zips that
+        contributed none are recorded with zero yield, so they rank below
+        unscraped ZIPs instead of at the average.  (Checkpoints written before
+        scraped_zips was added only yield the ZIPs that found dealers or failed.)
+
+        Returns:
+            Number of ZIPs recorded
+        """
+        with open(checkpoint_file, 'r') as f:
+            data = json.load(f)
+
+        counts: Dict[str, int] = {}
+        for dealer in data.get('dealers', []):
+            zip_code = dealer.get('scraped_from_zip')
+            if zip_code:
+                counts[str(zip_code)] = counts.get(str(zip_code), 0) + 1
+
+        failed = {str(z) for z in data.get('failed_zips', [])}
+        for zip_code in failed:
+            self.record(zip_code, failed=True)
+        for zip_code, count in counts.items():
+            if zip_code not in failed:
+                self.record(zip_code, new_dealers=count)
+
+        empty = {str(z) for z in data.get('scraped_zips', [])} - failed - set(counts)
+        for zip_code in empty:
+            self.record(zip_code, new_dealers=0)
+
+        return len(counts) + len(failed) + len(empty)
+
+    def load_run_log(self, log_file: str, since: Optional[datetime] = None) -> int:
+        """
+        Learn per-ZIP latency from a scrape_multiple run log.
+
+        Only latency is taken from logs (yield comes from checkpoints), so this
+        adds timing to existing observations rather than new attempts.
+
+        Args:
+            log_file: Run log path
+            since: Only ZIPs started after this (local) time
+
+        Returns:
+            Number of ZIP timings recorded
+        """
+        started: Dict[str, datetime] = {}
+        recorded = 0
+
+        with open(log_file, 'r', errors='replace') as f:
+            for line in f:
+                match = _LOG_LINE.match(line.strip())
+                if not match:
+                    continue
+                timestamp, zip_code, message = match.groups()
+                try:
+                    when = datetime.strptime(timestamp, _LOG_TIME_FORMAT)
+                except ValueError:
+                    continue
+
+                if message.startswith("Starting"):
+                    if since is None or when > since:
+                        started[zip_code] = when
+                elif zip_code in started:
+                    seconds = (when - started.pop(zip_code)).total_seconds()
+                    if seconds >= 0:
+                        stats = self._get(zip_code)
+                        stats.timed_attempts += 1
+                        stats.total_seconds += seconds
+                        recorded += 1
+
+        return recorded
+
+    def load_checkpoint_dir(self, checkpoint_dir: str, since: Optional[float] = None) -> int:
+        """
+        Learn from the latest checkpoint and all run logs in an OEM directory.
+
+        Args:
+            checkpoint_dir: OEM output directory
+            since: Only files modified after this time (epoch seconds)
+
+        Returns:
+            Number of observations recorded
+        """
+        directory = Path(checkpoint_dir)
+        if not directory.exists():
+            return 0
+
+        def is_new(path: Path) -> bool:
+            return since is None or path.stat().st_mtime > since
+
+        recorded = 0
+        checkpoints = [p for p in directory.glob("*_checkpoint_*.json") if is_new(p)]
+        if checkpoints:
+            # Each checkpoint is cumulative - the newest one covers the whole run
+            latest = max(checkpoints, key=lambda p: p.stat().st_mtime)
+            recorded += self.load_checkpoint(str(latest))
+
+        # A log can be appended to after an earlier load, so filter its lines too
+        since_time = datetime.fromtimestamp(since) if since is not None else None
+        for log_file in sorted(directory.glob("*_run_*.log")):
+            if is_new(log_file):
+                recorded += self.load_run_log(str(log_file), since=since_time)
+
+        return recorded
+
+    def load_scraper_runs(self, db_path: str, scraper_name: str, since: Optional[datetime] = None) -> int:
+        """
+        Learn from completed scraper_runs rows.
+
+        Runs record totals rather than per-ZIP counts, so records_new and run
+        duration are spread evenly over the ZIPs listed in run_parameters.
+
+        Args:
+            db_path: Pipeline database
+            scraper_name: scraper_runs.scraper_name of the OEM
+            since: Only runs completed after this (local) time
+
+        Returns:
+            Number of ZIP observations recorded
+        """
+        if not Path(db_path).exists():
+            return 0
+
+        conn = sqlite3.connect(db_path)
+        conn.row_factory = sqlite3.Row
+        try:
+            rows = conn.execute("""
+                SELECT status, records_new, run_parameters,
+                       (julianday(run_completed_at) - julianday(run_started_at)) * 86400 AS seconds
+                FROM scraper_runs
+                WHERE scraper_name = ? AND status != 'RUNNING'
+                  AND (? IS NULL OR julianday(run_completed_at) > julianday(?))
+                ORDER BY id
+            """, (scraper_name, since and since.isoformat(), since and since.isoformat())).fetchall()
+        except sqlite3.OperationalError:
+            return 0
+        finally:
+            conn.close()
+
+        recorded = 0
+        for row in rows:
+            try:
+                params = json.loads(row['run_parameters'] or '{}')
+            except (TypeError, ValueError):
+                continue
+            zips = params.get('zips') or []
+            if not zips:
+                continue
+
+            failed = row['status'] == 'FAILED'
+            new_per_zip = (row['records_new'] or 0) / len(zips)
+            seconds = row['seconds']
+            seconds_per_zip = seconds / len(zips) if seconds is not None and seconds >= 0 else None
+
+            for zip_code in zips:
+                stats = self._get(zip_code)
+                stats.attempts += 1
+                if failed:
+                    stats.failures += 1
+                else:
+                    stats.new_dealers += round(new_per_zip)
+                if seconds_per_zip is not None:
+                    stats.timed_attempts += 1
+                    stats.total_seconds += seconds_per_zip
+                recorded += 1
+
+        return recorded
+
+    @classmethod
+    def from_history(
+        cls,
+        checkpoint_dir: str,
+        db_path: Optional[str] = None,
+        scraper_name: Optional[str] = None,
+        prior_weight: float = 1.0
+    ) -> "ZipScheduler":
+        """
+        Build a scheduler from everything known about an OEM's past runs.
+
+        Starts from the persisted stats file if present (scrape_multiple
+        updates it after runs that used a scheduler) and folds in checkpoints,
+        run logs and scraper_runs written since it was saved - runs scraped
+        without a scheduler - then re-saves it.  Without a stats file, builds
+        from all of that history.
+        """
+        stats_file = Path(checkpoint_dir) / STATS_FILENAME
+        if not stats_file.exists():
+            scheduler = cls(prior_weight=prior_weight)
+            scheduler.load_checkpoint_dir(checkpoint_dir)
+            if db_path and scraper_name:
+                scheduler.load_scraper_runs(db_path, scraper_name)
+            return scheduler
+
+        scheduler = cls.load(str(stats_file), prior_weight=prior_weight)
+        saved_at = stats_file.stat().st_mtime
+        recorded = scheduler.load_checkpoint_dir(checkpoint_dir, since=saved_at)
+        if db_path and scraper_name:
+            recorded += scheduler.load_scraper_runs(
+                db_path, scraper_name, since=datetime.fromtimestamp(saved_at))
+        if recorded:
+            scheduler.save(str(stats_file))
+        return scheduler
+
+    # ========================================================================
+    # PERSISTENCE
+    # ========================================================================
+
+    def save(self, path: str) -> None:
+        """Write per-ZIP stats to JSON."""
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            'updated_at': datetime.now().isoformat(),
+            'zips': {z: asdict(s) for z, s in sorted(self.stats.items())},
+        }
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=2)
+
+    @classmethod
+    def load(cls, path: str, prior_weight: float = 1.0) -> "ZipScheduler":
+        """Read per-ZIP stats written by save()."""
+        with open(path, 'r') as f:
+            data = json.load(f)
+
+        scheduler = cls(prior_weight=prior_weight)
+        for zip_code, values in data.get('zips', {}).items():
+            scheduler.stats[zip_code] = ZipYieldStats(**values)
+        return scheduler
@@ -9,8 +9,17 @@ Scoring Dimensions:
 """
 import csv
 import re
+import sys
 from datetime import datetime
-from typing import Dict, Tuple
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, FrozenSet, Tuple
+
+# Project paths
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from utils.keyword_matcher import KeywordMatcher
 
 # Keyword patterns for capability detection
 RESIMERCIAL_KEYWORDS = [
@@ -30,6 +39,24 @@ OM_KEYWORDS = [
     'warranty', 'inspection', 'preventive', 'scheduled', '24/7', 'emergency'
 ]
 
+# Every name keyword the scorers look for, compiled into one matcher so each
+# contractor name is scanned once (see name_keywords)
+NAME_KEYWORDS = KeywordMatcher(
+    ['commercial', 'industrial', 'business', 'residential', 'home', 'house']
+    + [kw for keywords in MEP_KEYWORDS.values() for kw in keywords]
+    + ['all trades', 'full service', 'all phase', 'complete', 'total']
+    + OM_KEYWORDS + ['solutions']
+)
+ELITE_TIERS = KeywordMatcher(['elite', 'premier', 'platinum', 'certified'])
+GENERATOR_OEMS = KeywordMatcher(['generac', 'cummins', 'briggs', 'kohler'])
+
+
+@lru_cache(maxsize=1024)
+def name_keywords(name: str) -> FrozenSet[str]:
+    """Keywords present in a normalized name (the four scorers share one scan)."""
+    return frozenset(NAME_KEYWORDS.keywords(name))
+
+
 def normalize_text(text: str) -> str:
     """Normalize text for keyword matching"""
     if not text:
@@ -45,15 +72,16 @@ def score_resimercial(contractor: Dict) -> Tuple[int, str]:
     tier = normalize_text(contractor.get('tier', ''))
 
     # Check for explicit resimercial indicators
-    has_commercial = any(kw in name for kw in ['commercial', 'industrial', 'business'])
-    has_residential = any(kw in name for kw in ['residential', 'home', 'house'])
+    found = name_keywords(name)
+    has_commercial = not found.isdisjoint(['commercial', 'industrial', 'business'])
+    has_residential = not found.isdisjoint(['residential', 'home', 'house'])
 
     # Elite/Premier tiers often serve both markets
-    is_elite = any(t in tier for t in ['elite', 'premier', 'platinum', 'certified'])
+    is_elite = ELITE_TIERS.search(tier)
 
     # Generator dealers often serve both residential and commercial
     oems = normalize_text(contractor.get('OEMs_Certified', ''))
-    has_generators = any(g in oems for g in ['generac', 'cummins', 'briggs', 'kohler'])
+    has_generators = GENERATOR_OEMS.search(oems)
 
     evidence = []
 
@@ -117,24 +145,26 @@ def score_mepr(contractor: Dict) -> Tuple[int, str]:
         'Roofing': False
     }
 
+    found = name_keywords(name)
+
     # Detect mechanical (HVAC)
-    if any(kw in name for kw in MEP_KEYWORDS['mechanical']):
+    if not found.isdisjoint(MEP_KEYWORDS['mechanical']):
         trades['Mechanical'] = True
 
     # Detect electrical
-    if any(kw in name for kw in MEP_KEYWORDS['electrical']):
+    if not found.isdisjoint(MEP_KEYWORDS['electrical']):
         trades['Electrical'] = True
 
     # Detect plumbing
-    if any(kw in name for kw in MEP_KEYWORDS['plumbing']):
+    if not found.isdisjoint(MEP_KEYWORDS['plumbing']):
         trades['Plumbing'] = True
 
     # Detect roofing
-    if any(kw in name for kw in MEP_KEYWORDS['roofing']):
+    if not found.isdisjoint(MEP_KEYWORDS['roofing']):
         trades['Roofing'] = True
 
     # Multi-trade indicators
-    is_multi_trade = any(phrase in name for phrase in [
+    is_multi_trade = not found.isdisjoint([
         'all trades', 'full service', 'all phase', 'complete', 'total'
     ])
 
@@ -167,7 +197,8 @@ def score_om(contractor: Dict) -> Tuple[int, str]:
     tier = normalize_text(contractor.get('tier', ''))
 
     # Check for O&M keywords
-    om_indicators = [kw for kw in OM_KEYWORDS if kw in name]
+    found = name_keywords(name)
+    om_indicators = [kw for kw in OM_KEYWORDS if kw in found]
 
     # Elite tiers often include maintenance contracts
     is_elite = any(t in tier for t in ['elite', 'premier', 'platinum'])
@@ -181,7 +212,7 @@ def score_om(contractor: Dict) -> Tuple[int, str]:
     elif is_elite:
         score = 60
         evidence = f"Elite tier (likely offers maintenance)"
-    elif 'service' in name or 'solutions' in name:
+    elif 'service' in found or 'solutions' in found:
         score = 50
         evidence = "Service-oriented name"
     else:
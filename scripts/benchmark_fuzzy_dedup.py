@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Benchmark BaseDealerScraper.deduplicate_by_phone on a synthetic OEM sweep.
+
+Generates dealers the way a 264-ZIP sweep returns them (the same dealer seen
+from several ZIPs, name variants like "X LLC" / "X Inc", shared domains), runs
+the indexed deduplication, and checks it against the original pairwise
+SequenceMatcher loop on the first --verify records (all records with --full).
+
+With --workers N it also times the sharded mode (states scored across N
+processes) and checks it returns the same result as the single-process run.
+
+Usage:
+    python3 scripts/benchmark_fuzzy_dedup.py                 # 25,000 records
+    python3 scripts/benchmark_fuzzy_dedup.py --records 5000 --full
+    python3 scripts/benchmark_fuzzy_dedup.py --records 200000 --workers 8
+"""
+
+import argparse
+import contextlib
+import io
+import random
+import sys
+import time
+from difflib import SequenceMatcher
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from scrapers.base_scraper import BaseDealerScraper, StandardizedDealer
+
+SURNAMES = [
+    "Johnson", "Smith", "Garcia", "Martinez", "Lee", "Brown", "Miller", "Davis",
+    "Wilson", "Anderson", "Taylor", "Thomas", "Moore", "Jackson", "Martin", "White",
+    "Harris", "Clark", "Lewis", "Robinson", "Walker", "Young", "Allen", "King",
+    "Wright", "Scott", "Green", "Baker", "Adams", "Nelson", "Hill", "Campbell",
+    "Mitchell", "Roberts", "Carter", "Phillips", "Evans", "Turner", "Torres", "Parker",
+]
+PLACES = [
+    "Tri-State", "Sunshine", "Elite", "Premier", "Allied", "American", "Superior",
+    "Quality", "Reliable", "Metro", "Capital", "Coastal", "Mountain", "Valley",
+]
+TRADES = [
+    "Electric", "Electrical Services", "Solar", "Solar & Electric", "Heating & Air",
+    "Plumbing", "HVAC", "Mechanical", "Energy", "Power Systems", "Generators",
+    "Home Services", "Roofing", "Comfort Systems",
+]
+SUFFIXES = ["", "", " LLC", " Inc", " Inc.", " Co", " Corp"]
+# Rough share of dealers per state for a national OEM
+STATES = ["CA"] * 12 + ["TX"] * 9 + ["FL"] * 7 + ["NY"] * 5 + ["PA", "IL", "OH", "GA", "NC", "MI",
+          "NJ", "VA", "WA", "AZ", "MA", "TN", "IN", "MO", "MD", "WI", "CO", "MN", "SC", "AL"] * 2
+
+
+def generate_dealers(count: int, seed: int = 7):
+    """Synthetic dealers with ZIP-overlap repeats and name variants."""
+    rng = random.Random(seed)
+    companies = []
+    dealers = []
+
+    while len(dealers) < count:
+        if companies and rng.random() < 0.45:
+            # Seen again from a neighbouring ZIP - same phone, maybe a variant name
+            base, state, phone, domain = rng.choice(companies)
+            if rng.random() < 0.3:
+                phone = f"{rng.randint(200, 999)}{rng.randint(0, 9999999):07d}"
+        else:
+            if rng.random() < 0.5:
+                base = f"{rng.choice(SURNAMES)} {rng.choice(TRADES)}"
+            else:
+                base = f"{rng.choice(PLACES)} {rng.choice(SURNAMES)} {rng.choice(TRADES)}"
+            state = rng.choice(STATES)
+            phone = f"{rng.randint(200, 999)}{rng.randint(0, 9999999):07d}"
+            domain = f"{base.lower().replace(' ', '').replace('&', '')}{rng.randint(1, 99)}.com" \
+                if rng.random() < 0.6 else ""
+            companies.append((base, state, phone, domain))
+
+        dealers.append(StandardizedDealer(
+            name=base + rng.choice(SUFFIXES), phone=phone, domain=domain,
+            website=f"https://{domain}" if domain else "", street="", city="",
+            state=state, zip="", address_full="", oem_source="Benchmark",
+        ))
+
+    return dealers
+
+
+def legacy_dedup(dealers):
+    """The original pairwise loop, kept here as the reference implementation."""
+    seen_phones = set()
+    seen_domains = set()
+    seen_names_by_state = {}
+    unique_dealers = []
+    duplicates = []
+
+    for dealer in dealers:
+        duplicate_reason = ""
+        if dealer.phone and dealer.phone in seen_phones:
+            duplicate_reason = f"phone={dealer.phone}"
+        elif dealer.domain and dealer.domain in seen_domains:
+            duplicate_reason = f"domain={dealer.domain}"
+        elif dealer.name and dealer.state:
+            normalized_name = BaseDealerScraper._normalize_company_name(dealer.name)
+            for existing_norm_name, existing_dealer in seen_names_by_state.get(dealer.state, []):
+                similarity = SequenceMatcher(None, normalized_name, existing_norm_name).ratio()
+                if similarity >= 0.85:
+                    duplicate_reason = f"fuzzy_name={similarity:.2f} ('{dealer.name}' ≈ '{existing_dealer.name}')"
+                    break
+
+        if duplicate_reason:
+            duplicates.append((dealer, duplicate_reason))
+            continue
+
+        unique_dealers.append(dealer)
+        if dealer.phone:
+            seen_phones.add(dealer.phone)
+        if dealer.domain:
+            seen_domains.add(dealer.domain)
+        if dealer.name and dealer.state:
+            normalized_name = BaseDealerScraper._normalize_company_name(dealer.name)
+            seen_names_by_state.setdefault(dealer.state, []).append((normalized_name, dealer))
+
+    return unique_dealers, duplicates
+
+
+class _BenchmarkScraper(BaseDealerScraper):
+    OEM_NAME = "Benchmark"
+    DEALER_LOCATOR_URL = ""
+
+    def get_extraction_script(self):
+        return ""
+
+    def detect_capabilities(self, raw_dealer_data):
+        return None
+
+    def parse_dealer_data(self, raw_dealer_data, zip_code):
+        return []
+
+    def _scrape_with_playwright(self, zip_code):
+        return []
+
+    def _scrape_with_runpod(self, zip_code):
+        return []
+
+    def _scrape_with_patchright(self, zip_code):
+        return []
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark indexed fuzzy deduplication")
+    parser.add_argument('--records', type=int, default=25_000, help="Synthetic dealers to generate")
+    parser.add_argument('--verify', type=int, default=3_000,
+                        help="Check the first N records against the pairwise loop")
+    parser.add_argument('--full', action='store_true', help="Check all records against the pairwise loop (slow)")
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Also time sharded matching across N processes")
+    args = parser.parse_args()
+
+    dealers = generate_dealers(args.records, seed=args.seed)
+    scraper = _BenchmarkScraper()
+
+    print("=" * 70)
+    print(f"FUZZY DEDUP BENCHMARK - {len(dealers):,} records")
+    print("=" * 70)
+
+    start = time.perf_counter()
+    unique_dealers, duplicates = scraper._find_duplicates(dealers)
+    indexed_seconds = time.perf_counter() - start
+    fuzzy = sum(1 for _, reason in duplicates if reason.startswith("fuzzy_name="))
+
+    print(f"\nIndexed:  {indexed_seconds:8.2f}s  unique={len(unique_dealers):,}  "
+          f"duplicates={len(duplicates):,} (fuzzy={fuzzy:,})")
+
+    if args.workers:
+        start = time.perf_counter()
+        sharded = scraper._find_duplicates(dealers, workers=args.workers)
+        sharded_seconds = time.perf_counter() - start
+        same = (
+            [id(d) for d in sharded[0]] == [id(d) for d in unique_dealers]
+            and [(id(d), r) for d, r in sharded[1]] == [(id(d), r) for d, r in duplicates]
+        )
+        print(f"Sharded:  {sharded_seconds:8.2f}s  workers={args.workers}  "
+              f"same as single process: {'YES' if same else 'NO'}")
+        if not same:
+            return 1
+
+    sample = dealers if args.full else dealers[:args.verify]
+    start = time.perf_counter()
+    expected = legacy_dedup(sample)
+    legacy_seconds = time.perf_counter() - start
+    actual = scraper._find_duplicates(sample)
+
+    print(f"Pairwise: {legacy_seconds:8.2f}s  on {len(sample):,} records")
+    if len(sample) < len(dealers):
+        # Indexed time on the same sample, for a like-for-like comparison
+        start = time.perf_counter()
+        scraper._find_duplicates(sample)
+        print(f"Indexed:  {time.perf_counter() - start:8.2f}s  on {len(sample):,} records")
+
+    identical = (
+        [id(d) for d in actual[0]] == [id(d) for d in expected[0]]
+        and [(id(d), r) for d, r in actual[1]] == [(id(d), r) for d, r in expected[1]]
+    )
+    print(f"\nResults identical to pairwise loop: {'YES' if identical else 'NO'}")
+
+    # deduplicate_by_phone prints its own breakdown - keep the benchmark output short
+    scraper.dealers = list(dealers)
+    with contextlib.redirect_stdout(io.StringIO()):
+        scraper.deduplicate_by_phone()
+    assert len(scraper.dealers) == len(unique_dealers)
+
+    return 0 if identical else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
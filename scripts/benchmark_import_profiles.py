@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Benchmark PipelineDB performance profiles on a synthetic license file.
+
+Writes a license-file style CSV (default 2,000,000 rows), imports it with
+add_contractors_bulk() twice - default connection settings vs the
+'bulk_import' profile (fast pragmas, deferred index builds, ANALYZE) - and
+checks both databases come out identical.  Then times typical dashboard and
+agent-tool lookups on the imported database through a default connection
+and through a 'serving' profile connection.
+
+Usage:
+    python3 scripts/benchmark_import_profiles.py                   # 2,000,000 rows
+    python3 scripts/benchmark_import_profiles.py --rows 200000 --queries 500
+"""
+
+import argparse
+import csv
+import logging
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from database import PipelineDB
+from scripts.benchmark_fuzzy_dedup import PLACES, STATES, SUFFIXES, SURNAMES, TRADES
+from scripts.benchmark_import_session import table_dump
+
+LICENSE_COLUMNS = [
+    'company_name', 'contact_name', 'email', 'phone', 'city', 'state', 'zip',
+    'license_type', 'license_category', 'license_number',
+]
+
+
+def write_license_file(path: Path, rows: int, seed: int = 7) -> None:
+    """Synthetic license CSV with phone/email/name repeats (one row per license)."""
+    rng = random.Random(seed)
+    companies = []
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(LICENSE_COLUMNS)
+        for i in range(rows):
+            if companies and rng.random() < 0.45:
+                # Same company licensed again, sometimes under a new phone
+                base, state, phone, domain = rng.choice(companies)
+                if rng.random() < 0.3:
+                    phone = f"{rng.randint(200, 999)}{rng.randint(0, 9999999):07d}"
+            else:
+                base = f"{rng.choice(PLACES)} {rng.choice(SURNAMES)} {rng.choice(TRADES)}"
+                state = rng.choice(STATES)
+                phone = f"{rng.randint(200, 999)}{rng.randint(0, 9999999):07d}"
+                domain = f"{base.lower().replace(' ', '').replace('&', '')}{rng.randint(1, 99)}.com" \
+                    if rng.random() < 0.6 else ""
+                companies.append((base, state, phone, domain))
+            writer.writerow([
+                base + rng.choice(SUFFIXES),
+                rng.choice(['', 'John Smith', 'Ana Lopez', 'Lee Chen']),
+                f"info@{domain}" if domain and i % 3 else '',
+                phone, '', state, '',
+                ['CAC', 'CFC', 'EC', 'ER'][i % 4], 'HVAC', str(i),
+            ])
+
+
+def read_license_file(path: Path):
+    """Stream records from the license CSV."""
+    with open(path, newline='') as f:
+        yield from csv.DictReader(f)
+
+
+def import_file(db_path: Path, license_file: Path, profile=None) -> float:
+    """Import the file into a fresh database; returns seconds taken."""
+    db = PipelineDB(db_path)
+    db.initialize()
+    start = time.perf_counter()
+    db.add_contractors_bulk(read_license_file(license_file), source='Benchmark',
+                            batch_size=20000, profile=profile)
+    seconds = time.perf_counter() - start
+    db.close()
+    return seconds
+
+
+def time_lookups(db: PipelineDB, queries: int, seed: int = 11):
+    """Median and p95 milliseconds per lookup type."""
+    rng = random.Random(seed)
+    with db._get_connection() as conn:
+        max_id = conn.execute("SELECT MAX(id) FROM contractors").fetchone()[0]
+        phones = [row[0] for row in conn.execute(
+            "SELECT primary_phone FROM contractors WHERE primary_phone != '' "
+            "ORDER BY RANDOM() LIMIT ?", (queries,))]
+
+    lookups = {
+        'get_contractor_by_id': lambda i: db.get_contractor_by_id(rng.randint(1, max_id)),
+        'search_contractors(phone)': lambda i: db.search_contractors(phones[i % len(phones)], limit=10),
+        'get_stats(state)': lambda i: db.get_stats(state=STATES[i % len(STATES)]),
+    }
+    timings = {}
+    for label, lookup in lookups.items():
+        runs = queries if label != 'get_stats(state)' else max(queries // 50, 5)
+        lookup(0)  # Warm the connection
+        samples = []
+        for i in range(runs):
+            start = time.perf_counter()
+            lookup(i)
+            samples.append((time.perf_counter() - start) * 1000)
+        samples.sort()
+        timings[label] = (statistics.median(samples), samples[int(len(samples) * 0.95) - 1])
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PipelineDB performance profiles")
+    parser.add_argument('--rows', type=int, default=2_000_000, help="Synthetic license rows")
+    parser.add_argument('--queries', type=int, default=2_000, help="Lookups per query type")
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    # Per-session progress logging would dominate the output
+    logging.getLogger('pipeline_db').setLevel(logging.WARNING)
+
+    workdir = Path(tempfile.mkdtemp(prefix="profile_bench_"))
+    license_file = workdir / "licenses.csv"
+    write_license_file(license_file, args.rows, seed=args.seed)
+
+    print("=" * 70)
+    print(f"PERFORMANCE PROFILE BENCHMARK - {args.rows:,} license rows")
+    print("=" * 70)
+
+    print("\nImport throughput:")
+    default_seconds = import_file(workdir / "default.db", license_file)
+    print(f"  default:     {default_seconds:8.2f}s  {args.rows / default_seconds:10,.0f} rows/sec")
+    bulk_seconds = import_file(workdir / "bulk.db", license_file, profile='bulk_import')
+    print(f"  bulk_import: {bulk_seconds:8.2f}s  {args.rows / bulk_seconds:10,.0f} rows/sec  "
+          f"({default_seconds / bulk_seconds:.2f}x, includes index rebuild + ANALYZE)")
+
+    identical = table_dump(PipelineDB(workdir / "default.db")) == table_dump(PipelineDB(workdir / "bulk.db"))
+    print(f"  Tables identical: {'YES' if identical else 'NO'}")
+
+    print("\nLookup latency on the imported database (median / p95 ms):")
+    default_timings = time_lookups(PipelineDB(workdir / "bulk.db"), args.queries)
+    serving_timings = time_lookups(PipelineDB(workdir / "bulk.db", profile='serving'), args.queries)
+    for label, (median, p95) in default_timings.items():
+        serving_median, serving_p95 = serving_timings[label]
+        print(f"  {label:<28} default {median:7.3f} / {p95:7.3f}   "
+              f"serving {serving_median:7.3f} / {serving_p95:7.3f}")
+
+    return 0 if identical else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
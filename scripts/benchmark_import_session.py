@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Benchmark PipelineDB bulk imports: add_contractor() loop vs import_session().
+
+Builds license-file style records from the synthetic dealer generator in
+benchmark_fuzzy_dedup.py, imports them into fresh temporary databases both
+ways, and checks that the contractors, contacts, licenses and dedup_matches
+tables come out identical for the first --verify records.
+
+Usage:
+    python3 scripts/benchmark_import_session.py                  # 100,000 records
+    python3 scripts/benchmark_import_session.py --records 20000 --verify 5000
+"""
+
+import argparse
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from database import PipelineDB
+from scripts.benchmark_fuzzy_dedup import generate_dealers
+
+
+def generate_records(count: int, seed: int = 7):
+    """add_contractor() records with phone/email/name repeats."""
+    records = []
+    for i, dealer in enumerate(generate_dealers(count, seed=seed)):
+        records.append({
+            'company_name': dealer.name,
+            'contact_name': '',
+            'email': f"info@{dealer.domain}" if dealer.domain and i % 3 else '',
+            'phone': dealer.phone,
+            'state': dealer.state,
+            'license_type': ['CAC', 'CFC', 'EC', 'ER'][i % 4],
+            'license_category': 'HVAC',
+        })
+    return records
+
+
+def table_dump(db: PipelineDB):
+    """Everything an import writes, minus timestamps."""
+    queries = [
+        "SELECT id, company_name, normalized_name, state, primary_phone, primary_email, "
+        "primary_domain FROM contractors ORDER BY id",
+        "SELECT contractor_id, name, email, phone, confidence FROM contacts ORDER BY id",
+        "SELECT contractor_id, state, license_type, license_number FROM licenses ORDER BY id",
+        "SELECT master_contractor_id, match_type, match_value FROM dedup_matches ORDER BY id",
+    ]
+    with db._get_connection() as conn:
+        return [[tuple(row) for row in conn.execute(query)] for query in queries]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PipelineDB import sessions")
+    parser.add_argument('--records', type=int, default=100_000, help="Synthetic records to import")
+    parser.add_argument('--verify', type=int, default=3_000,
+                        help="Import the first N records with add_contractor() for comparison")
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    # Per-session progress logging would dominate the output
+    logging.getLogger('pipeline_db').setLevel(logging.WARNING)
+
+    records = generate_records(args.records, seed=args.seed)
+    workdir = Path(tempfile.mkdtemp(prefix="import_bench_"))
+
+    print("=" * 70)
+    print(f"IMPORT SESSION BENCHMARK - {len(records):,} records")
+    print("=" * 70)
+
+    db = PipelineDB(workdir / "session.db")
+    db.initialize()
+    start = time.perf_counter()
+    with db.import_session(source='Benchmark') as session:
+        for record in records:
+            session.add_contractor(record)
+    session_seconds = time.perf_counter() - start
+    print(f"\nimport_session: {session_seconds:8.2f}s  {len(records) / session_seconds:10,.0f} rows/sec  "
+          f"new={session.stats['records_new']:,} merged={session.stats['records_merged']:,}")
+
+    sample = records[:args.verify]
+    reference = PipelineDB(workdir / "reference.db")
+    reference.initialize()
+    start = time.perf_counter()
+    for record in sample:
+        reference.add_contractor(record, source='Benchmark')
+    loop_seconds = time.perf_counter() - start
+    print(f"add_contractor: {loop_seconds:8.2f}s  {len(sample) / loop_seconds:10,.0f} rows/sec  "
+          f"(first {len(sample):,} records)")
+
+    check = PipelineDB(workdir / "check.db")
+    check.initialize()
+    with check.import_session(source='Benchmark') as session:
+        for record in sample:
+            session.add_contractor(record)
+    identical = table_dump(check) == table_dump(reference)
+    print(f"\nTables identical to add_contractor loop: {'YES' if identical else 'NO'}")
+
+    return 0 if identical else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -19,17 +19,21 @@ Output: Prioritized lead list ready for BDR outreach
 
 import csv
 import os
+import re
+import sys
 from pathlib import Path
 from datetime import datetime
-from collections import defaultdict
-import re
-from difflib import SequenceMatcher
 
 # Paths
 PROJECT_ROOT = Path(__file__).parent.parent
 OUTPUT_DIR = PROJECT_ROOT / "output" / "enrichment"
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from database.dedup import DedupIndex, ExactKeySignal, FUZZY_THRESHOLD, default_signals, name_similarity
+from database.entity_index import EntityIndex
+
 DOWNLOADS = Path.home() / "Downloads"
 
 # Input files
@@ -37,6 +41,13 @@ FL_ENPHASE_FILE = DOWNLOADS / "Enphase Installers FL - Sheet1.csv"
 CA_OUTREACH_FILE = DOWNLOADS / "CA_outreach - Sheet1.csv"
 FL_ROOFERS_FILE = DOWNLOADS / "Contractor List.xlsx - Roofers.csv"
 
+# Persisted companies from earlier runs (database.entity_index)
+ENTITY_INDEX_FILE = OUTPUT_DIR / "lead_entity_index.db"
+
+# Exact keys matched before domain / fuzzy name; 'name' keeps the same
+# normalized company name in different states' lists cross-referenced
+EXACT_KEYS = ("phone", "email", "name")
+
 # SPW 2025 Data (embedded from web extraction)
 SPW_COMMERCIAL = """rank,company_name,state,kw_installed
 1,DCE Services,NC,116909.53
@@ -190,14 +201,9 @@ def normalize_company_name(name: str) -> str:
     return name
 
 
-def fuzzy_match(name1: str, name2: str, threshold: float = 0.85) -> bool:
+def fuzzy_match(name1: str, name2: str, threshold: float = FUZZY_THRESHOLD) -> bool:
     """Check if two company names match fuzzy."""
-    n1 = normalize_company_name(name1)
-    n2 = normalize_company_name(name2)
-    if not n1 or not n2:
-        return False
-    ratio = SequenceMatcher(None, n1, n2).ratio()
-    return ratio >= threshold
+    return name_similarity(normalize_company_name(name1), normalize_company_name(name2)) >= threshold
 
 
 def parse_fl_enphase(filepath: Path) -> list:
@@ -335,30 +341,56 @@ def parse_spw_data(data_str: str, source_name: str) -> list:
     return records
 
 
-def cross_reference_leads(all_leads: dict) -> dict:
+def cross_reference_leads(all_leads: dict, entity_index: EntityIndex = None) -> dict:
     """
     Cross-reference leads across data sources to find:
     - Multi-trade contractors
     - Companies appearing in multiple lists
     - Matches with existing emails
+
+    With an entity_index, leads are matched incrementally against the
+    companies persisted by earlier runs, and sources seen in those runs
+    count toward a company's cross-references (so a new list does not
+    require reloading every earlier one).
     """
-    # Build company name index
-    company_index = defaultdict(list)
+    # Group leads into companies with the shared dedup engine
+    # (phone / email / exact name in any state / domain / fuzzy name within the same state)
+    if entity_index is None:
+        signals = [ExactKeySignal(key) for key in EXACT_KEYS] + default_signals()[2:]
+        index = DedupIndex(signals=signals, normalize_name=normalize_company_name)
+    else:
+        index = entity_index
+    companies = {}
 
     for source, leads in all_leads.items():
         for lead in leads:
-            normalized = normalize_company_name(lead.get("company_name", ""))
-            if normalized:
-                company_index[normalized].append({
-                    "source": source,
-                    "data": lead
-                })
+            keys = index.keys(lead)
+            if not keys.name:
+                continue
+            if entity_index is not None:
+                entity, _ = entity_index.resolve(lead, source=source)
+            else:
+                match = index.find(keys)
+                entity = match.entity if match else len(companies)
+                if not match:
+                    index.add(keys, entity)
+            company = companies.setdefault(entity, {"name": keys.name, "matches": [], "earlier_sources": []})
+            company["matches"].append({"source": source, "data": lead})
+
+    if entity_index is not None:
+        entity_index.commit()
+        for entity, company in companies.items():
+            company["earlier_sources"] = [
+                source for source in entity_index.sources(entity) if source not in all_leads
+            ]
+    companies = list(companies.values())
 
     # Find cross-references
     cross_refs = []
-    for name, matches in company_index.items():
-        if len(matches) > 1:
-            sources = [m["source"] for m in matches]
+    for company in companies:
+        name, matches = company["name"], company["matches"]
+        if len(matches) + len(company["earlier_sources"]) > 1:
+            sources = [m["source"] for m in matches] + company["earlier_sources"]
             emails = [m["data"].get("email", "") for m in matches if m["data"].get("email")]
 
             # Merge license types
@@ -449,7 +481,9 @@ def main():
 
     # Cross-reference
     print("\n🔗 Cross-referencing leads...")
-    cross_refs = cross_reference_leads(all_leads)
+    with EntityIndex(ENTITY_INDEX_FILE, normalize_name=normalize_company_name,
+                     exact_keys=EXACT_KEYS) as entity_index:
+        cross_refs = cross_reference_leads(all_leads, entity_index=entity_index)
     print(f"   Found {len(cross_refs)} companies appearing in multiple sources")
 
     # Find FL companies that are both roofers AND Enphase installers (GOLD!)
@@ -21,14 +21,22 @@ Outputs:
     - output/california_unmatched_licenses_20251101.csv (licenses NOT in dealer networks)
 """
 
+import numpy as np
+import os
 import pandas as pd
 import re
+import sys
 from pathlib import Path
 from datetime import datetime
-from rapidfuzz import fuzz
 
 # Project paths
 PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from database.dedup import FUZZY_THRESHOLD, map_shards
+from database.models import normalize_city, normalize_zip
+from utils.fuzzy_index import find_all_matches
+
 LICENSE_FILE = PROJECT_ROOT / "output/california_icp_master_20251101.csv"
 DEALER_FILE = PROJECT_ROOT / "output/grandmaster_list_expanded_20251029.csv"
 OUTPUT_DIR = PROJECT_ROOT / "output"
@@ -53,6 +61,14 @@ def normalize_phone(phone_str):
     return None
 
 
+# Removed in order by normalize_company_name (compiled once - it runs per license row)
+COMPANY_SUFFIX_PATTERNS = [re.compile(pattern) for pattern in (
+    r'\bINC\.?$', r'\bINCORPORATED$', r'\bLLC\.?$', r'\bL\.L\.C\.?$',
+    r'\bCORP\.?$', r'\bCORPORATION$', r'\bLTD\.?$', r'\bLIMITED$',
+    r'\bCO\.?$', r'\bCOMPANY$', r'\bDBA\b', r'\bD/B/A\b'
+)]
+
+
 def normalize_company_name(name):
     """Normalize company name for fuzzy matching (same as processing script)."""
     if pd.isna(name):
@@ -60,14 +76,8 @@ def normalize_company_name(name):
 
     name = str(name).strip().upper()
 
-    suffixes = [
-        r'\bINC\.?$', r'\bINCORPORATED$', r'\bLLC\.?$', r'\bL\.L\.C\.?$',
-        r'\bCORP\.?$', r'\bCORPORATION$', r'\bLTD\.?$', r'\bLIMITED$',
-        r'\bCO\.?$', r'\bCOMPANY$', r'\bDBA\b', r'\bD/B/A\b'
-    ]
-
-    for suffix in suffixes:
-        name = re.sub(suffix, '', name)
+    for suffix in COMPANY_SUFFIX_PATTERNS:
+        name = suffix.sub('', name)
 
     name = ' '.join(name.split())
 
@@ -108,14 +118,51 @@ def extract_domain(website_str):
     return domain if domain else None
 
 
-def match_dealers_to_licenses(dealers_df, licenses_df):
+# Output columns taken from each side of a match
+DEALER_COLUMNS = ['name', 'phone', 'website', 'street', 'city', 'state', 'zip', 'oem_source']
+LICENSE_COLUMNS = {
+    'LicenseNo': 'license_number',
+    'Classifications': 'license_classifications',
+    'PrimaryStatus': 'license_status',
+    'IssueDate': 'license_issue_date',
+    'ExpirationDate': 'license_expiration_date',
+    'license_count': 'license_count',
+    'has_electrical': 'has_electrical',
+    'has_hvac': 'has_hvac',
+    'has_solar': 'has_solar',
+    'has_plumbing': 'has_plumbing',
+    'is_gc': 'is_gc',
+    'is_engineering_gc': 'is_engineering_gc',
+    'resimercial_score': 'resimercial_score',
+    'multi_oem_score': 'multi_oem_score',
+    'mep_score': 'mep_score',
+    'om_score': 'om_score',
+    'coperniq_total_score': 'coperniq_total_score',
+    'icp_tier': 'icp_tier',
+}
+
+
+def first_index_by_key(keys):
+    """Map each non-null key to the index label of its first row (hash-join lookup table)."""
+    keys = keys[keys.notna()]
+    keys = keys[~keys.duplicated()]
+    return pd.Series(keys.index, index=keys.values)
+
+
+def match_dealers_to_licenses(dealers_df, licenses_df, workers=None):
     """
     Match dealers to license records using multi-signal approach.
 
     Matching hierarchy:
     1. Phone number (normalized to 10 digits)
     2. Domain (extracted from website)
-    3. Fuzzy name matching (85% threshold + same city/ZIP)
+    3. Fuzzy name matching (85% threshold + same city/area, shared database.dedup rules)
+
+    Phone and domain are hash joins against the first license per key.
+    Fuzzy matching indexes license names once per city and ZIP block
+    (normalized city; normalized 5-digit ZIP) and scores each distinct
+    (name, city, ZIP) dealer query once.  Blocks are
+    independent, so with workers > 1 they are scored in a process pool.
 
     Returns DataFrame with matched dealers and their license info.
     """
@@ -129,179 +176,117 @@ def match_dealers_to_licenses(dealers_df, licenses_df):
     dealers_df['domain_normalized'] = dealers_df['website'].apply(extract_domain)
     dealers_df['name_normalized'] = dealers_df['name'].apply(normalize_company_name)
 
-    # Index licenses by phone and domain for fast lookup
-    licenses_by_phone = licenses_df[licenses_df['phone_normalized'].notna()].set_index('phone_normalized')
-    licenses_by_domain = licenses_df[licenses_df.get('domain_normalized', pd.Series()).notna()].set_index('domain_normalized') if 'domain_normalized' in licenses_df.columns else pd.DataFrame()
-
-    # Track matches
-    matches = []
-    match_methods = []
+    # License index label per dealer (NaN = not matched yet), plus method/confidence
+    license_idx = pd.Series(pd.NA, index=dealers_df.index, dtype=object)
+    match_method = pd.Series('', index=dealers_df.index, dtype=object)
+    match_confidence = pd.Series(0.0, index=dealers_df.index)
 
     # Phase 1: Phone matching
     print("Phase 1: Phone number matching...")
-    phone_matches = 0
-
-    for idx, dealer in dealers_df.iterrows():
-        phone = dealer['phone_normalized']
-
-        if pd.notna(phone) and phone in licenses_by_phone.index:
-            license_row = licenses_by_phone.loc[phone]
-
-            # Handle multiple matches (take first)
-            if isinstance(license_row, pd.DataFrame):
-                license_row = license_row.iloc[0]
-
-            matches.append({
-                'dealer_idx': idx,
-                'license_idx': license_row.name,
-                'match_method': 'phone',
-                'match_confidence': 100
-            })
-            phone_matches += 1
-
-    print(f"  Phone matches: {phone_matches:,}")
+    by_phone = dealers_df['phone_normalized'].map(first_index_by_key(licenses_df['phone_normalized']))
+    hit = by_phone.notna()
+    license_idx[hit] = by_phone[hit]
+    match_method[hit] = 'phone'
+    match_confidence[hit] = 100
+    print(f"  Phone matches: {int(hit.sum()):,}")
 
     # Phase 2: Domain matching (for dealers not matched by phone)
     print("Phase 2: Domain matching...")
     domain_matches = 0
-
-    matched_dealer_idx = {m['dealer_idx'] for m in matches}
-
-    for idx, dealer in dealers_df.iterrows():
-        if idx in matched_dealer_idx:
-            continue  # Already matched by phone
-
-        domain = dealer['domain_normalized']
-
-        if pd.notna(domain) and not licenses_by_domain.empty and domain in licenses_by_domain.index:
-            license_row = licenses_by_domain.loc[domain]
-
-            # Handle multiple matches (take first)
-            if isinstance(license_row, pd.DataFrame):
-                license_row = license_row.iloc[0]
-
-            matches.append({
-                'dealer_idx': idx,
-                'license_idx': license_row.name,
-                'match_method': 'domain',
-                'match_confidence': 90
-            })
-            domain_matches += 1
-            matched_dealer_idx.add(idx)
-
+    if 'domain_normalized' in licenses_df.columns:
+        by_domain = dealers_df['domain_normalized'].map(first_index_by_key(licenses_df['domain_normalized']))
+        hit = by_domain.notna() & license_idx.isna()
+        license_idx[hit] = by_domain[hit]
+        match_method[hit] = 'domain'
+        match_confidence[hit] = 90
+        domain_matches = int(hit.sum())
     print(f"  Domain matches: {domain_matches:,}")
 
-    # Phase 3: Fuzzy name matching (for dealers not matched yet, same city/ZIP)
+    # Phase 3: Fuzzy name matching (for dealers not matched yet, same city/area)
+    # Distinct dealer queries are grouped by normalized city and by normalized
+    # ZIP ('St. Petersburg' == 'Saint Petersburg', '33701-1234' == '33701'),
+    # and each group is scored in bulk against the license names in that block
     print("Phase 3: Fuzzy name matching...")
     fuzzy_matches = 0
 
-    for idx, dealer in dealers_df.iterrows():
-        if idx in matched_dealer_idx:
-            continue  # Already matched
-
-        dealer_name = dealer['name_normalized']
-        dealer_city = str(dealer.get('city', '')).upper()
-        dealer_zip = str(dealer.get('zip', '')).strip()
-
-        if not dealer_name:
-            continue
-
-        # Filter licenses to same city or ZIP
-        city_licenses = licenses_df[
-            (licenses_df['City'].str.upper() == dealer_city) |
-            (licenses_df['ZIPCode'].astype(str).str.strip() == dealer_zip)
-        ]
-
-        if city_licenses.empty:
-            continue
-
-        # Find best fuzzy match
-        best_match = None
-        best_score = 0
-
-        for lic_idx, lic_row in city_licenses.iterrows():
-            lic_name = normalize_company_name(lic_row['BusinessName'])
-
-            if not lic_name:
+    license_names = licenses_df['BusinessName'].apply(normalize_company_name).reset_index(drop=True)
+    license_blocks = pd.DataFrame({
+        'city': licenses_df['City'].map(normalize_city).values,
+        'zip': licenses_df['ZIPCode'].map(normalize_zip).values,
+    })[license_names != '']
+
+    unmatched = dealers_df[license_idx.isna() & (dealers_df['name_normalized'] != '')]
+    queries = pd.DataFrame({
+        'name': unmatched['name_normalized'],
+        'city': unmatched.get('city', pd.Series('', index=unmatched.index)).map(normalize_city),
+        'zip': unmatched.get('zip', pd.Series('', index=unmatched.index)).map(normalize_zip),
+    })
+
+    # The grandmaster lists a dealer once per OEM - score each distinct query once
+    distinct = queries.drop_duplicates().reset_index(drop=True)
+    block_rows = []
+    shards = []
+    for block in ('city', 'zip'):
+        license_groups = license_blocks.groupby(block).indices
+        for key, query_rows in distinct.groupby(block).indices.items():
+            positions = license_groups.get(key)
+            if positions is None or not key:
                 continue
-
-            score = fuzz.ratio(dealer_name, lic_name)
-
-            if score > best_score:
-                best_score = score
-                best_match = lic_idx
-
-        # Threshold: 85% similarity
-        if best_match and best_score >= 85:
-            matches.append({
-                'dealer_idx': idx,
-                'license_idx': best_match,
-                'match_method': 'fuzzy_name',
-                'match_confidence': best_score
-            })
+            # groupby indices are offsets into license_blocks, not license positions
+            positions = license_blocks.index[positions]
+            block_rows.append((query_rows, positions))
+            shards.append((
+                distinct['name'].iloc[query_rows].tolist(), license_names[positions].tolist(), FUZZY_THRESHOLD
+            ))
+
+    candidates = [[] for _ in range(len(distinct))]
+    for (query_rows, positions), block_matches in zip(block_rows, map_shards(find_all_matches, shards, workers)):
+        for query_row, found in zip(query_rows, block_matches):
+            candidates[query_row].extend((positions[j], similarity) for j, similarity in found)
+
+    best_by_query = {}
+    for query, found in zip(distinct.itertuples(index=False), candidates):
+        if found:
+            # Best match in the same city or area (ties go to the earlier license row)
+            best_position, best_score = min(found, key=lambda c: (-c[1], c[0]))
+            best_by_query[tuple(query)] = (licenses_df.index[best_position], round(best_score * 100, 1))
+
+    for idx, query in zip(queries.index, queries.itertuples(index=False)):
+        best = best_by_query.get(tuple(query))
+        if best is not None:
+            license_idx[idx], match_confidence[idx] = best
+            match_method[idx] = 'fuzzy_name'
             fuzzy_matches += 1
-            matched_dealer_idx.add(idx)
 
     print(f"  Fuzzy name matches: {fuzzy_matches:,}")
     print()
 
     # Build matched DataFrame
-    total_matches = len(matches)
+    matched = license_idx.notna()
+    total_matches = int(matched.sum())
     print(f"Total matches: {total_matches:,} ({(total_matches/len(dealers_df))*100:.1f}% of dealers)")
     print()
 
-    if not matches:
+    if not total_matches:
         print("⚠️  No matches found")
         return pd.DataFrame()
 
-    # Create matched dataset
-    matched_data = []
-
-    for match in matches:
-        dealer = dealers_df.loc[match['dealer_idx']]
-        license_row = licenses_df.loc[match['license_idx']]
-
-        matched_data.append({
-            # Dealer info (from OEM data)
-            'name': dealer['name'],
-            'phone': dealer['phone'],
-            'website': dealer.get('website', ''),
-            'street': dealer.get('street', ''),
-            'city': dealer.get('city', ''),
-            'state': dealer.get('state', ''),
-            'zip': dealer.get('zip', ''),
-            'oem_source': dealer.get('oem_source', ''),
-
-            # License info (from CSLB)
-            'license_number': license_row['LicenseNo'],
-            'license_classifications': license_row['Classifications'],
-            'license_status': license_row['PrimaryStatus'],
-            'license_issue_date': license_row['IssueDate'],
-            'license_expiration_date': license_row['ExpirationDate'],
-            'license_count': license_row['license_count'],
-
-            # Capability flags
-            'has_electrical': license_row['has_electrical'],
-            'has_hvac': license_row['has_hvac'],
-            'has_solar': license_row['has_solar'],
-            'has_plumbing': license_row['has_plumbing'],
-            'is_gc': license_row['is_gc'],
-            'is_engineering_gc': license_row['is_engineering_gc'],
-
-            # ICP scores
-            'resimercial_score': license_row['resimercial_score'],
-            'multi_oem_score': license_row['multi_oem_score'],
-            'mep_score': license_row['mep_score'],
-            'om_score': license_row['om_score'],
-            'coperniq_total_score': license_row['coperniq_total_score'],
-            'icp_tier': license_row['icp_tier'],
-
-            # Match metadata
-            'match_method': match['match_method'],
-            'match_confidence': match['match_confidence']
-        })
-
-    matched_df = pd.DataFrame(matched_data)
+    # Matches in phase order (phone, domain, fuzzy), then dealer order
+    phase_order = match_method[matched].map({'phone': 0, 'domain': 1, 'fuzzy_name': 2})
+    dealer_labels = phase_order.sort_values(kind='stable').index
+
+    dealer_part = dealers_df.reindex(columns=DEALER_COLUMNS, fill_value='').loc[dealer_labels]
+    license_part = licenses_df.loc[license_idx[dealer_labels].tolist(), list(LICENSE_COLUMNS)]
+    license_part = license_part.rename(columns=LICENSE_COLUMNS)
+
+    matched_df = pd.concat([
+        dealer_part.reset_index(drop=True),
+        license_part.reset_index(drop=True),
+        pd.DataFrame({
+            'match_method': match_method[dealer_labels].values,
+            'match_confidence': match_confidence[dealer_labels].values,
+        }),
+    ], axis=1)
 
     return matched_df
 
@@ -320,48 +305,28 @@ def update_multi_oem_scores(matched_df):
     """
     print("Updating Multi-OEM scores...")
 
-    # Count OEMs per contractor (by phone)
-    oem_counts = matched_df.groupby('phone')['oem_source'].nunique().to_dict()
-
-    def calculate_multi_oem_score(oem_count):
-        if oem_count >= 4:
-            return 25
-        elif oem_count == 3:
-            return 19
-        elif oem_count == 2:
-            return 12
-        else:
-            return 6
-
-    # Update scores
-    for idx, row in matched_df.iterrows():
-        phone = row['phone']
-        oem_count = oem_counts.get(phone, 1)
-
-        new_multi_oem_score = calculate_multi_oem_score(oem_count)
-
-        # Recalculate total score
-        new_total = (
-            row['resimercial_score'] +
-            new_multi_oem_score +
-            row['mep_score'] +
-            row['om_score']
-        )
-
-        # Update ICP tier
-        if new_total >= 80:
-            new_tier = 'PLATINUM'
-        elif new_total >= 60:
-            new_tier = 'GOLD'
-        elif new_total >= 40:
-            new_tier = 'SILVER'
-        else:
-            new_tier = 'BRONZE'
-
-        # Update row
-        matched_df.at[idx, 'multi_oem_score'] = new_multi_oem_score
-        matched_df.at[idx, 'coperniq_total_score'] = new_total
-        matched_df.at[idx, 'icp_tier'] = new_tier
+    # Count OEMs per contractor (by phone); rows without a phone count as 1 OEM
+    oem_counts = matched_df.groupby('phone')['oem_source'].transform('nunique').fillna(1)
+
+    new_multi_oem_score = np.select(
+        [oem_counts >= 4, oem_counts == 3, oem_counts == 2], [25, 19, 12], default=6
+    )
+
+    # Recalculate total score
+    new_total = (
+        matched_df['resimercial_score'] +
+        new_multi_oem_score +
+        matched_df['mep_score'] +
+        matched_df['om_score']
+    )
+
+    # Update scores and ICP tier
+    matched_df['multi_oem_score'] = new_multi_oem_score
+    matched_df['coperniq_total_score'] = new_total
+    matched_df['icp_tier'] = np.select(
+        [new_total >= 80, new_total >= 60, new_total >= 40],
+        ['PLATINUM', 'GOLD', 'SILVER'], default='BRONZE'
+    )
 
     # Tier distribution after update
     print(f"  PLATINUM (80-100): {(matched_df['icp_tier'] == 'PLATINUM').sum():,}")
@@ -413,7 +378,7 @@ def main():
     print()
 
     # Match dealers to licenses
-    matched_df = match_dealers_to_licenses(dealers_df, licenses_df)
+    matched_df = match_dealers_to_licenses(dealers_df, licenses_df, workers=os.cpu_count())
 
     if matched_df.empty:
         print("No matches found. Exiting.")
@@ -34,6 +34,7 @@ Outputs:
 
 import pandas as pd
 import re
+import tempfile
 from pathlib import Path
 from datetime import datetime
 
@@ -52,6 +53,80 @@ OEM_DEALER_FILE = OUTPUT_DIR / "grandmaster_list_expanded_20251029.csv"
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
 
+# Rows read per CSV chunk - peak memory is bounded by this and by one phone partition
+CHUNK_ROWS = 100_000
+
+# Phone-hash partitions for the out-of-core join
+PHONE_PARTITIONS = 64
+
+# State license sources, in registry order. Each maps a license CSV onto the
+# standard license columns; new states only need an entry here.
+LICENSE_SOURCES = [
+    {
+        'file': CA_LICENSE_FILE,
+        'state': 'CA',
+        'license_source': 'CA-CSLB',
+        'columns': {
+            'phone': 'phone_normalized',
+            'business_name': 'BusinessName',
+            'city': 'City',
+            'license_number': 'LicenseNo',
+            'license_status': 'PrimaryStatus',
+            'license_classifications': 'Classifications(s)',
+        },
+        'exclude_duplicates': True,
+    },
+    {
+        'file': TX_LICENSE_FILE,
+        'state': 'TX',
+        'license_source': 'TX-TDLR',
+        'columns': {
+            'phone': 'phone',
+            'business_name': 'business_name',
+            'city': 'city',
+            'license_number': 'license_number',
+            'license_status': 'license_status',
+            'license_classifications': 'license_type',
+        },
+    },
+    {
+        'file': FL_LICENSE_FILE,
+        'state': 'FL',
+        'license_source': 'FL-DBPR',
+        'columns': {
+            'phone': 'phone',
+            'business_name': 'business_name',
+            'city': 'city',
+            'license_number': 'license_number',
+            'license_status': 'license_status',
+            'license_classifications': 'license_type',
+        },
+    },
+    {
+        'file': NYC_LICENSE_FILE,
+        'state': 'NY',
+        'license_source': 'NYC-DOB',
+        'columns': {
+            'phone': 'phone',
+            'business_name': 'business_name',
+            'city': 'city',
+            'license_number': 'license_number',
+            'license_status': 'license_status',
+            'license_classifications': 'license_type',
+        },
+    },
+]
+
+# Columns of the normalized record stream written to the phone partitions
+STREAM_COLUMNS = ['seq', 'phone_normalized', 'kind', 'source', 'name', 'city', 'state', 'phone', 'website']
+
+# Columns of the merged contractor list (seq = first-seen order, dropped at the end)
+RESULT_COLUMNS = [
+    'seq', 'phone', 'name', 'city', 'state', 'website', 'num_oems', 'num_licenses',
+    'num_overlaps', 'oem_sources', 'license_sources', 'overlap_sources',
+]
+
+
 def normalize_phone(phone_str):
     """Normalize phone number to 10 digits."""
     if pd.isna(phone_str):
@@ -68,11 +143,18 @@ def normalize_phone(phone_str):
     return None
 
 
-def load_all_licenses():
+def normalize_phones(phones):
+    """Vectorized normalize_phone for a Series (None where invalid)."""
+    digits = phones.astype(str).str.replace(r'\D', '', regex=True)
+    digits = digits.where(~(digits.str.len().eq(11) & digits.str.startswith('1')), digits.str[1:])
+    return digits.where(phones.notna() & digits.str.len().eq(10), None)
+
+
+def iter_license_chunks(chunksize=CHUNK_ROWS):
     """
-    Load and normalize all state license data.
+    Stream all state license data as normalized chunks.
 
-    Returns DataFrame with columns:
+    Yields DataFrames with columns:
         - phone_normalized
         - business_name
         - city
@@ -82,99 +164,173 @@ def load_all_licenses():
         - license_status
         - license_classifications
     """
-    all_licenses = []
-
-    # California (CSLB)
-    if CA_LICENSE_FILE.exists():
-        print(f"Loading California licenses: {CA_LICENSE_FILE.name}")
-        ca_df = pd.read_csv(CA_LICENSE_FILE)
-        ca_df = ca_df[~ca_df['is_duplicate']].copy()  # Exclude duplicates
-
-        ca_licenses = pd.DataFrame({
-            'phone_normalized': ca_df['phone_normalized'],
-            'business_name': ca_df['BusinessName'],
-            'city': ca_df['City'],
-            'state': 'CA',
-            'license_source': 'CA-CSLB',
-            'license_number': ca_df['LicenseNo'],
-            'license_status': ca_df['PrimaryStatus'],
-            'license_classifications': ca_df['Classifications(s)']
-        })
-        all_licenses.append(ca_licenses)
-        print(f"  Loaded {len(ca_licenses):,} CA licenses")
-
-    # Texas (TDLR)
-    if TX_LICENSE_FILE.exists():
-        print(f"Loading Texas licenses: {TX_LICENSE_FILE.name}")
-        tx_df = pd.read_csv(TX_LICENSE_FILE)
-        tx_df['phone_normalized'] = tx_df['phone'].apply(normalize_phone)
-
-        tx_licenses = pd.DataFrame({
-            'phone_normalized': tx_df['phone_normalized'],
-            'business_name': tx_df['business_name'],
-            'city': tx_df['city'],
-            'state': 'TX',
-            'license_source': 'TX-TDLR',
-            'license_number': tx_df['license_number'],
-            'license_status': tx_df['license_status'],
-            'license_classifications': tx_df['license_type']
-        })
-        all_licenses.append(tx_licenses)
-        print(f"  Loaded {len(tx_licenses):,} TX licenses")
-
-    # Florida (DBPR)
-    if FL_LICENSE_FILE.exists():
-        print(f"Loading Florida licenses: {FL_LICENSE_FILE.name}")
-        fl_df = pd.read_csv(FL_LICENSE_FILE, low_memory=False)
-        fl_df['phone_normalized'] = fl_df['phone'].apply(normalize_phone)
-
-        fl_licenses = pd.DataFrame({
-            'phone_normalized': fl_df['phone_normalized'],
-            'business_name': fl_df['business_name'],
-            'city': fl_df['city'],
-            'state': 'FL',
-            'license_source': 'FL-DBPR',
-            'license_number': fl_df['license_number'],
-            'license_status': fl_df['license_status'],
-            'license_classifications': fl_df['license_type']
-        })
-        all_licenses.append(fl_licenses)
-        print(f"  Loaded {len(fl_licenses):,} FL licenses")
-
-    # NYC (DOB)
-    if NYC_LICENSE_FILE.exists():
-        print(f"Loading NYC licenses: {NYC_LICENSE_FILE.name}")
-        nyc_df = pd.read_csv(NYC_LICENSE_FILE)
-        nyc_df['phone_normalized'] = nyc_df['phone'].apply(normalize_phone)
-
-        nyc_licenses = pd.DataFrame({
-            'phone_normalized': nyc_df['phone_normalized'],
-            'business_name': nyc_df['business_name'],
-            'city': nyc_df['city'],
-            'state': 'NY',
-            'license_source': 'NYC-DOB',
-            'license_number': nyc_df['license_number'],
-            'license_status': nyc_df['license_status'],
-            'license_classifications': nyc_df['license_type']
-        })
-        all_licenses.append(nyc_licenses)
-        print(f"  Loaded {len(nyc_licenses):,} NYC licenses")
-
-    # Combine all licenses
-    if not all_licenses:
+    for spec in LICENSE_SOURCES:
+        path = spec['file']
+        if not path.exists():
+            continue
+
+        print(f"Loading {spec['state']} licenses: {path.name}")
+        columns = spec['columns']
+        usecols = list(columns.values()) + (['is_duplicate'] if spec.get('exclude_duplicates') else [])
+        loaded = 0
+
+        # Phones as text - numeric parsing turns them into floats ("5551234567.0")
+        for chunk in pd.read_csv(path, usecols=usecols, dtype={columns['phone']: str},
+                                 chunksize=chunksize, low_memory=False):
+            if spec.get('exclude_duplicates'):
+                chunk = chunk[~chunk['is_duplicate'].astype(bool)]
+
+            loaded += len(chunk)
+            yield pd.DataFrame({
+                'phone_normalized': normalize_phones(chunk[columns['phone']]),
+                'business_name': chunk[columns['business_name']],
+                'city': chunk[columns['city']],
+                'state': spec['state'],
+                'license_source': spec['license_source'],
+                'license_number': chunk[columns['license_number']],
+                'license_status': chunk[columns['license_status']],
+                'license_classifications': chunk[columns['license_classifications']],
+            })
+
+        print(f"  Loaded {loaded:,} {spec['state']} licenses")
+
+
+def load_all_licenses():
+    """
+    Load and normalize all state license data into one DataFrame.
+
+    In-memory convenience for small runs - the cross-reference itself streams
+    iter_license_chunks() instead.
+    """
+    chunks = list(iter_license_chunks())
+    if not chunks:
         print("⚠️  No license files found")
         return pd.DataFrame()
+    return pd.concat(chunks, ignore_index=True)
+
 
-    combined_df = pd.concat(all_licenses, ignore_index=True)
-    print(f"\nTotal licenses loaded: {len(combined_df):,}")
-    print(f"  Valid phones: {combined_df['phone_normalized'].notna().sum():,}")
+def iter_dealer_chunks(dealer_file, chunksize=CHUNK_ROWS):
+    """Stream OEM dealer rows with a normalized phone column."""
+    for chunk in pd.read_csv(dealer_file, dtype={'phone': str}, chunksize=chunksize, low_memory=False):
+        chunk['phone_normalized'] = normalize_phones(chunk['phone'])
+        yield chunk
 
-    return combined_df
 
+def _partition_stream(dealer_chunks, license_chunks, workdir, partitions):
+    """
+    Write every row with a phone to one of `partitions` CSV files by phone hash.
 
-def match_contractors_across_all_sources(licenses_df, dealers_df):
+    Rows get a global sequence number (dealers first, then licenses in
+    LICENSE_SOURCES order) so the streaming merge can rebuild first-seen order.
+    """
+    paths = [workdir / f"phones_{i:03d}.csv" for i in range(partitions)]
+    for path in paths:
+        pd.DataFrame(columns=STREAM_COLUMNS).to_csv(path, index=False)
+
+    seq = 0
+    stats = {'dealers': 0, 'licenses': 0, 'license_phones': 0}
+
+    def write(stream):
+        nonlocal seq
+        stream.insert(0, 'seq', range(seq, seq + len(stream)))
+        seq += len(stream)
+        stream = stream[stream['phone_normalized'].notna()]
+        buckets = pd.util.hash_array(stream['phone_normalized'].to_numpy(dtype=object)) % partitions
+        for bucket, rows in stream.groupby(buckets):
+            rows[STREAM_COLUMNS].to_csv(paths[bucket], mode='a', header=False, index=False)
+        return len(stream)
+
+    for chunk in dealer_chunks:
+        stats['dealers'] += len(chunk)
+        write(pd.DataFrame({
+            'phone_normalized': chunk['phone_normalized'],
+            'kind': 'oem',
+            'source': chunk['oem_source'] if 'oem_source' in chunk else None,
+            'name': chunk['name'],
+            'city': chunk['city'] if 'city' in chunk else '',
+            'state': chunk['state'] if 'state' in chunk else '',
+            'phone': chunk['phone'],
+            'website': chunk['website'] if 'website' in chunk else '',
+        }))
+
+    for chunk in license_chunks:
+        stats['licenses'] += len(chunk)
+        stats['license_phones'] += write(pd.DataFrame({
+            'phone_normalized': chunk['phone_normalized'],
+            'kind': 'license',
+            'source': chunk['license_source'],
+            'name': chunk['business_name'],
+            'city': chunk['city'],
+            'state': chunk['state'],
+            'phone': chunk['phone_normalized'],
+            'website': '',
+        }))
+
+    return paths, stats
+
+
+def _merge_partition(path):
+    """
+    Registry rows for one phone partition.
+
+    Same rules as the original in-memory registry: the first row seen for a
+    phone supplies name/city/state/phone/website, every OEM dealer row adds
+    its OEM to overlap_sources, and each license source counts once per phone.
+    """
+    rows = pd.read_csv(path, dtype={'phone_normalized': str, 'phone': str})
+    if rows.empty:
+        return pd.DataFrame(columns=RESULT_COLUMNS)
+    rows = rows.sort_values('seq', kind='stable')
+
+    first = rows.drop_duplicates('phone_normalized').set_index('phone_normalized')
+
+    oem = rows[(rows['kind'] == 'oem') & rows['source'].notna()]
+    licenses = rows[rows['kind'] == 'license'].drop_duplicates(['phone_normalized', 'source'])
+    sources = pd.concat([oem, licenses])
+
+    def joined(frame):
+        """Sorted, comma-joined sources per phone."""
+        ordered = frame.sort_values(['phone_normalized', 'source'], kind='stable')
+        by_phone = {}
+        for phone, source in zip(ordered['phone_normalized'], ordered['source']):
+            by_phone.setdefault(phone, []).append(source)
+        return pd.Series({phone: ', '.join(values) for phone, values in by_phone.items()}, dtype=object)
+
+    num_oems = oem.groupby('phone_normalized')['source'].nunique()
+    num_licenses = licenses.groupby('phone_normalized')['source'].nunique()
+
+    result = pd.DataFrame({
+        'seq': first['seq'],
+        'phone': first.index,
+        'name': first['name'],
+        'city': first['city'],
+        'state': first['state'],
+        'website': first['website'].fillna(''),
+        'num_oems': num_oems.reindex(first.index, fill_value=0),
+        'num_licenses': num_licenses.reindex(first.index, fill_value=0),
+    })
+    result['num_overlaps'] = result['num_oems'] + result['num_licenses']
+    result['oem_sources'] = joined(oem.drop_duplicates(['phone_normalized', 'source'])).reindex(first.index, fill_value='')
+    result['license_sources'] = joined(licenses).reindex(first.index, fill_value='')
+    result['overlap_sources'] = joined(sources).reindex(first.index, fill_value='')
+    return result[RESULT_COLUMNS].reset_index(drop=True)
+
+
+def match_contractors_across_all_sources(dealer_chunks, license_chunks,
+                                         partitions=PHONE_PARTITIONS, workdir=None):
     """
-    Match contractors across all sources (licenses + OEM dealers).
+    Match contractors across all sources (licenses + OEM dealers) by phone.
+
+    Out-of-core: both inputs are streamed in chunks, rows are partitioned into
+    phone-hash files on disk, and each partition is merged on its own, so peak
+    memory is one chunk or one partition plus the resulting contractor list -
+    not the total license count.
+
+    Args:
+        dealer_chunks: Iterable of dealer DataFrames (see iter_dealer_chunks)
+        license_chunks: Iterable of license DataFrames (see iter_license_chunks)
+        partitions: Number of phone partitions
+        workdir: Directory for partition files (default: a temporary directory)
 
     Returns DataFrame with overlap tracking:
         - num_overlaps: Count of sources
@@ -182,97 +338,24 @@ def match_contractors_across_all_sources(licenses_df, dealers_df):
     """
     print("\nMatching contractors across all sources...")
 
-    # Normalize dealer phone numbers
-    dealers_df['phone_normalized'] = dealers_df['phone'].apply(normalize_phone)
+    with tempfile.TemporaryDirectory(dir=workdir, prefix="crossref_phones_") as tmp:
+        print("  Partitioning dealers and licenses by phone...")
+        paths, stats = _partition_stream(dealer_chunks, license_chunks, Path(tmp), partitions)
+        print(f"    {stats['dealers']:,} OEM dealer rows, {stats['licenses']:,} license rows "
+              f"({stats['license_phones']:,} with valid phones)")
 
-    # Build contractor registry by phone
-    contractor_registry = {}
+        print("  Merging phone partitions...")
+        merged = [_merge_partition(path) for path in paths]
 
-    # Add all dealers to registry
-    print("  Processing OEM dealers...")
-    for idx, dealer in dealers_df.iterrows():
-        phone = dealer['phone_normalized']
-        if not phone:
-            continue
+    contractors_df = pd.concat(merged, ignore_index=True).sort_values('seq', kind='stable')
+    contractors_df = contractors_df.drop(columns='seq').reset_index(drop=True)
+    if contractors_df.empty:
+        print("⚠️  No contractors with valid phones")
+        return contractors_df
 
-        if phone not in contractor_registry:
-            contractor_registry[phone] = {
-                'name': dealer['name'],
-                'city': dealer.get('city', ''),
-                'state': dealer.get('state', ''),
-                'phone': dealer.get('phone', ''),
-                'website': dealer.get('website', ''),
-                'oem_sources': set(),
-                'license_sources': set(),
-                'all_sources': []
-            }
-
-        # Add OEM source
-        oem_source = dealer.get('oem_source', '')
-        if oem_source:
-            contractor_registry[phone]['oem_sources'].add(oem_source)
-            contractor_registry[phone]['all_sources'].append(oem_source)
-
-    print(f"    {len(contractor_registry):,} unique phone numbers from OEM data")
-
-    # Add all licenses to registry
-    print("  Processing state licenses...")
-    license_matches = 0
-
-    for idx, lic in licenses_df.iterrows():
-        phone = lic['phone_normalized']
-        if not phone:
-            continue
-
-        if phone not in contractor_registry:
-            contractor_registry[phone] = {
-                'name': lic['business_name'],
-                'city': lic['city'],
-                'state': lic['state'],
-                'phone': phone,
-                'website': '',
-                'oem_sources': set(),
-                'license_sources': set(),
-                'all_sources': []
-            }
-
-        # Add license source
-        license_source = lic['license_source']
-        if license_source not in contractor_registry[phone]['license_sources']:
-            contractor_registry[phone]['license_sources'].add(license_source)
-            contractor_registry[phone]['all_sources'].append(license_source)
-            license_matches += 1
-
-    print(f"    {license_matches:,} license records matched to contractors")
-    print(f"    {len(contractor_registry):,} total unique contractors")
-
-    # Convert to DataFrame
-    print("\n  Calculating overlap statistics...")
-    contractors_list = []
-
-    for phone, data in contractor_registry.items():
-        num_oems = len(data['oem_sources'])
-        num_licenses = len(data['license_sources'])
-        num_overlaps = num_oems + num_licenses
-
-        # Format overlap sources
-        overlap_sources = ', '.join(sorted(data['all_sources']))
-
-        contractors_list.append({
-            'phone': phone,
-            'name': data['name'],
-            'city': data['city'],
-            'state': data['state'],
-            'website': data['website'],
-            'num_oems': num_oems,
-            'num_licenses': num_licenses,
-            'num_overlaps': num_overlaps,
-            'oem_sources': ', '.join(sorted(data['oem_sources'])),
-            'license_sources': ', '.join(sorted(data['license_sources'])),
-            'overlap_sources': overlap_sources
-        })
-
-    contractors_df = pd.DataFrame(contractors_list)
+    print(f"    {(contractors_df['num_oems'] > 0).sum():,} contractors in OEM data")
+    print(f"    {contractors_df['num_licenses'].sum():,} license records matched to contractors")
+    print(f"    {len(contractors_df):,} total unique contractors")
 
     # Statistics
     print(f"\n  Overlap distribution:")
@@ -298,25 +381,20 @@ def main():
     print("="*80)
     print()
 
-    # Load all license data
-    licenses_df = load_all_licenses()
-
-    if licenses_df.empty:
+    if not any(spec['file'].exists() for spec in LICENSE_SOURCES):
         print("❌ No license data found. Exiting.")
         return
 
-    # Load OEM dealer data
-    print(f"\nLoading OEM dealer data: {OEM_DEALER_FILE.name}")
+    print(f"Loading OEM dealer data: {OEM_DEALER_FILE.name}")
 
     if not OEM_DEALER_FILE.exists():
         print(f"❌ OEM dealer file not found: {OEM_DEALER_FILE}")
         return
 
-    dealers_df = pd.read_csv(OEM_DEALER_FILE)
-    print(f"  Loaded {len(dealers_df):,} OEM dealers")
-
-    # Match contractors across all sources
-    contractors_df = match_contractors_across_all_sources(licenses_df, dealers_df)
+    # Match contractors across all sources (streamed - bounded memory)
+    contractors_df = match_contractors_across_all_sources(
+        iter_dealer_chunks(OEM_DEALER_FILE), iter_license_chunks()
+    )
 
     # Export results
     print("\n" + "="*80)
@@ -6,17 +6,18 @@ Multi-signal deduplication for contractor data:
 1. Phone normalization (primary - 96%+ accuracy)
 2. Email domain matching
 3. Fuzzy company name matching (85% threshold)
-4. Address matching (city + zip)
+
+Matching uses the shared engine in database/dedup.py.
 
 Prevents triplicating/duplicating company records across all data sources.
 """
 
 import csv
+import os
 import re
+import sys
 from pathlib import Path
 from datetime import datetime
-from collections import defaultdict
-from difflib import SequenceMatcher
 from typing import Dict, List, Set, Optional, Tuple
 
 # Paths
@@ -24,6 +25,12 @@ PROJECT_ROOT = Path(__file__).parent.parent
 OUTPUT_DIR = PROJECT_ROOT / "output" / "enrichment"
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from database.dedup import DedupIndex, FUZZY_THRESHOLD, cluster_records, name_similarity
+from database.entity_index import EntityIndex
+from database.models import normalize_phone, normalize_email, extract_domain
+
 
 class DeduplicationEngine:
     """
@@ -34,47 +41,46 @@ class DeduplicationEngine:
     2. Email match (exact)
     3. Email domain match (same company domain)
     4. Fuzzy name match (85%+ similarity + same state)
-    5. Address match (same city + zip + partial street)
+
+    Matching is delegated to database.dedup.DedupIndex, the same engine
+    PipelineDB and the other merge scripts use.  Names are keyed with this
+    script's own normalize_company_name (substring suffix removal), which
+    differs from database.models.normalize_company_name.
     """
 
-    FUZZY_THRESHOLD = 0.85
+    FUZZY_THRESHOLD = FUZZY_THRESHOLD
 
-    def __init__(self):
-        # Dedup indexes
-        self.phone_index: Dict[str, List[dict]] = defaultdict(list)
-        self.email_index: Dict[str, List[dict]] = defaultdict(list)
-        self.domain_index: Dict[str, List[dict]] = defaultdict(list)
-        self.name_state_index: Dict[str, List[dict]] = defaultdict(list)
+    def __init__(self, workers: Optional[int] = None, entity_index: Optional[EntityIndex] = None):
+        """
+        Args:
+            workers: Worker processes for transitive fuzzy name scoring
+                in add_records (None = this process)
+            entity_index: Open EntityIndex persisted by earlier runs.  When
+                set, records are matched incrementally against it (first
+                match wins) and each master carries its stable entity_id.
+        """
+        self.workers = workers
+        self.entity_index = entity_index
+
+        # Dedup index (phone, email, domain, fuzzy name by state)
+        self.index = DedupIndex(normalize_name=self.normalize_company_name)
 
         # Master records
         self.master_records: List[dict] = []
         self.duplicate_groups: List[List[dict]] = []
+        self._masters_by_entity: Dict[int, dict] = {}
 
     def normalize_phone(self, phone: str) -> str:
         """Normalize phone to 10 digits."""
-        if not phone:
-            return ""
-        digits = re.sub(r'\D', '', str(phone))
-        if len(digits) == 11 and digits.startswith('1'):
-            digits = digits[1:]
-        return digits if len(digits) == 10 else ""
+        return normalize_phone(phone)
 
     def normalize_email(self, email: str) -> str:
         """Normalize email to lowercase."""
-        if not email:
-            return ""
-        return email.lower().strip()
+        return normalize_email(email)
 
     def extract_domain(self, email: str) -> str:
         """Extract domain from email, excluding common webmail."""
-        if not email or '@' not in email:
-            return ""
-        domain = email.split('@')[1].lower().strip()
-        # Exclude common webmail domains
-        webmail = {'gmail.com', 'yahoo.com', 'hotmail.com', 'aol.com',
-                   'outlook.com', 'icloud.com', 'comcast.net', 'att.net',
-                   'bellsouth.net', 'verizon.net', 'msn.com', 'live.com'}
-        return "" if domain in webmail else domain
+        return extract_domain(email)
 
     def normalize_company_name(self, name: str) -> str:
         """Normalize company name for matching."""
@@ -95,11 +101,7 @@ class DeduplicationEngine:
 
     def fuzzy_match(self, name1: str, name2: str) -> float:
         """Calculate fuzzy match ratio between two names."""
-        n1 = self.normalize_company_name(name1)
-        n2 = self.normalize_company_name(name2)
-        if not n1 or not n2:
-            return 0.0
-        return SequenceMatcher(None, n1, n2).ratio()
+        return name_similarity(self.normalize_company_name(name1), self.normalize_company_name(name2))
 
     def add_record(self, record: dict) -> Tuple[bool, Optional[dict]]:
         """
@@ -108,59 +110,84 @@ class DeduplicationEngine:
         Returns:
             (is_duplicate, matching_master_record)
         """
-        # Extract matching signals
-        phone = self.normalize_phone(record.get('phone', ''))
-        email = self.normalize_email(record.get('email', ''))
-        domain = self.extract_domain(email)
-        company = record.get('company_name', '')
-        state = record.get('state', '').upper()
-        name_key = f"{self.normalize_company_name(company)}|{state}"
-
-        # Check for duplicates in order of reliability
-
-        # 1. Phone match (highest confidence)
-        if phone and phone in self.phone_index:
-            existing = self.phone_index[phone][0]
-            self._merge_record(existing, record)
-            return True, existing
-
-        # 2. Exact email match
-        if email and email in self.email_index:
-            existing = self.email_index[email][0]
-            self._merge_record(existing, record)
-            return True, existing
-
-        # 3. Domain match (same company email domain)
-        if domain and domain in self.domain_index:
-            existing = self.domain_index[domain][0]
-            # Only match if names are somewhat similar (50%+)
-            if self.fuzzy_match(company, existing.get('company_name', '')) >= 0.5:
-                self._merge_record(existing, record)
-                return True, existing
-
-        # 4. Fuzzy name match (same state, 85%+ similarity)
-        if name_key:
-            for existing in self.name_state_index.get(name_key, []):
-                if self.fuzzy_match(company, existing.get('company_name', '')) >= self.FUZZY_THRESHOLD:
-                    self._merge_record(existing, record)
-                    return True, existing
+        key_fields = {
+            'company_name': record.get('company_name', ''),
+            'phone': record.get('phone', ''),
+            'email': record.get('email', ''),
+            'state': record.get('state', ''),
+        }
+        if self.entity_index is not None:
+            return self._add_to_entity(key_fields, record)
+
+        keys = self.index.keys(key_fields)
+        match = self.index.find(keys)
+        if match:
+            self._merge_record(match.entity, record)
+            return True, match.entity
 
         # No match - new master record
         master = self._create_master(record)
         self.master_records.append(master)
-
-        # Index the new record
-        if phone:
-            self.phone_index[phone].append(master)
-        if email:
-            self.email_index[email].append(master)
-        if domain:
-            self.domain_index[domain].append(master)
-        if name_key:
-            self.name_state_index[name_key].append(master)
+        self.index.add(keys, master)
 
         return False, master
 
+    def _add_to_entity(self, key_fields: dict, record: dict) -> Tuple[bool, Optional[dict]]:
+        """add_record against the persisted entity index."""
+        entity_id, match = self.entity_index.resolve(key_fields, source=record.get('source', ''))
+        master = self._masters_by_entity.get(entity_id) if entity_id is not None else None
+        if master is not None:
+            self._merge_record(master, record)
+            return True, master
+
+        master = self._create_master(record)
+        master['entity_id'] = entity_id
+        self.master_records.append(master)
+        if entity_id is not None:
+            self._masters_by_entity[entity_id] = master
+        # A match here is an entity from an earlier run
+        return match is not None, master
+
+    def add_records(self, records: List[dict], transitive: bool = True) -> None:
+        """
+        Add many records at once.
+
+        With transitive=True, records are first resolved into entities with
+        union-find over every match edge (cluster_records), so A~B by phone
+        and B~C by domain end up in one master regardless of input order.
+        Otherwise each record goes through add_record (first match wins).
+        Fuzzy name blocks are scored across self.workers processes.
+        With an entity_index, records are always matched one at a time
+        against the persisted index, so the cost is proportional to the
+        new records rather than to everything indexed before.
+        """
+        if not transitive or self.entity_index is not None:
+            for record in records:
+                self.add_record(record)
+            return
+
+        keys = [self.index.keys({
+            'company_name': record.get('company_name', ''),
+            'phone': record.get('phone', ''),
+            'email': record.get('email', ''),
+            'state': record.get('state', ''),
+        }) for record in records]
+
+        clusters = cluster_records(records, keys=keys, workers=self.workers)
+        for members in clusters.groups():
+            # Any member may match a master from an earlier add_records call
+            match = next(filter(None, (self.index.find(keys[position]) for position in members)), None)
+            if match:
+                master = match.entity
+                rest = members
+            else:
+                master = self._create_master(records[members[0]])
+                self.master_records.append(master)
+                self.index.add(keys[members[0]], master)
+                rest = members[1:]
+            for position in rest:
+                self._merge_record(master, records[position])
+
     def _create_master(self, record: dict) -> dict:
         """Create a master record from input."""
         return {
@@ -176,6 +203,7 @@ class DeduplicationEngine:
             'license_types': set(record.get('license_types', [])) if isinstance(record.get('license_types'), (list, set)) else set([record.get('license_types', '')]) if record.get('license_types') else set(),
             'categories': set(record.get('categories', [])) if isinstance(record.get('categories'), (list, set)) else set(),
             'kw_installed': record.get('kw_installed', 0),
+            'entity_id': None,
             'duplicate_count': 1,
             'raw_records': [record]
         }
@@ -189,19 +217,13 @@ class DeduplicationEngine:
         if record.get('contact_name'):
             master['contact_names'].add(record['contact_name'])
 
-        # Merge phones
-        phone = self.normalize_phone(record.get('phone', ''))
-        if phone:
-            master['phones'].add(phone)
-            if phone not in self.phone_index:
-                self.phone_index[phone].append(master)
-
-        # Merge emails
-        email = self.normalize_email(record.get('email', ''))
-        if email:
-            master['emails'].add(email)
-            if email not in self.email_index:
-                self.email_index[email].append(master)
+        # Merge phones and emails (new ones also point at this master)
+        keys = self.index.keys({'phone': record.get('phone', ''), 'email': record.get('email', '')})
+        if keys.phone:
+            master['phones'].add(keys.phone)
+        if keys.email:
+            master['emails'].add(keys.email)
+        self.index.add(keys, master, match_types=('phone', 'email'))
 
         # Merge sources
         if record.get('source'):
@@ -247,7 +269,7 @@ class DeduplicationEngine:
             writer = csv.DictWriter(f, fieldnames=[
                 'company_name', 'contact_names', 'emails', 'phones',
                 'city', 'state', 'zip', 'sources', 'license_types',
-                'categories', 'category_count', 'duplicate_count', 'kw_installed'
+                'categories', 'category_count', 'duplicate_count', 'kw_installed', 'entity_id'
             ])
             writer.writeheader()
 
@@ -265,11 +287,13 @@ class DeduplicationEngine:
                     'categories': '|'.join(filter(None, master['categories'])),
                     'category_count': len(master['categories']),
                     'duplicate_count': master['duplicate_count'],
-                    'kw_installed': master.get('kw_installed', '')
+                    'kw_installed': master.get('kw_installed', ''),
+                    'entity_id': master.get('entity_id') or ''
                 })
 
 
-def load_fl_everyone(filepath: Path, engine: DeduplicationEngine, limit: int = None):
+def load_fl_everyone(filepath: Path, engine: DeduplicationEngine, limit: int = None,
+                     transitive: bool = True):
     """Load FL contractor data with deduplication."""
 
     LICENSE_CATEGORIES = {
@@ -281,6 +305,8 @@ def load_fl_everyone(filepath: Path, engine: DeduplicationEngine, limit: int = N
         "CUC": "UTILITY", "SCC": "SPECIALTY",
     }
 
+    records = []
+
     with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
         reader = csv.reader(f)
         next(reader)  # Skip header
@@ -299,7 +325,7 @@ def load_fl_everyone(filepath: Path, engine: DeduplicationEngine, limit: int = N
             name = row[1].strip() if len(row) > 1 else ""
             company = row[2].strip() if len(row) > 2 else ""
 
-            engine.add_record({
+            records.append({
                 'company_name': company if company else name,
                 'contact_name': name,
                 'address': row[3].strip() if len(row) > 3 else "",
@@ -312,6 +338,8 @@ def load_fl_everyone(filepath: Path, engine: DeduplicationEngine, limit: int = N
                 'categories': [category]
             })
 
+    engine.add_records(records, transitive=transitive)
+
 
 def main():
     print("\n" + "=" * 70)
@@ -320,7 +348,7 @@ def main():
 
     timestamp = datetime.now().strftime("%Y%m%d_%H%M")
 
-    engine = DeduplicationEngine()
+    engine = DeduplicationEngine(workers=os.cpu_count())
 
     # Load FL Everyone data
     fl_file = Path.home() / "Downloads" / "Contractor List.xlsx - Everyone.csv"
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Export a columnar (Parquet) snapshot of pipeline.db for analytics jobs.
+
+Writes contractors, licenses, contacts, OEM certifications and dedup matches
+as typed Parquet files with dictionary-encoded categories (see
+database/columnar.py).  Analysis scripts then load just the columns they need:
+
+    from database.columnar import load_snapshot_table
+    df = load_snapshot_table('output/snapshot', 'licenses',
+                             columns=['contractor_id', 'state', 'license_category']).to_pandas()
+
+Usage:
+    python3 scripts/export_columnar_snapshot.py
+    python3 scripts/export_columnar_snapshot.py --db output/pipeline.db --out output/snapshot
+    python3 scripts/export_columnar_snapshot.py --tables contractors licenses
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from database import PipelineDB
+from database.columnar import SNAPSHOT_TABLES
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export a Parquet snapshot of pipeline.db")
+    parser.add_argument('--db', type=Path, default=project_root / "output" / "pipeline.db")
+    parser.add_argument('--out', type=Path, default=project_root / "output" / "snapshot")
+    parser.add_argument('--tables', nargs='+', choices=sorted(SNAPSHOT_TABLES), help="Default: all")
+    parser.add_argument('--compression', default='zstd', help="Parquet codec (zstd, snappy, gzip, none)")
+    args = parser.parse_args()
+
+    if not args.db.exists():
+        print(f"Database not found: {args.db}")
+        return 1
+
+    start = time.perf_counter()
+    with PipelineDB(args.db) as db:
+        counts = db.export_columnar_snapshot(args.out, tables=args.tables, compression=args.compression)
+
+    for table, count in counts.items():
+        size = (args.out / f"{table}.parquet").stat().st_size
+        print(f"  {table:<20} {count:>10,} rows  {size / 1e6:8.2f} MB")
+    print(f"Snapshot written to {args.out} in {time.perf_counter() - start:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
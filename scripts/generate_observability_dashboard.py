@@ -25,12 +25,12 @@ from datetime import datetime
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from database.replica import connect_reader
+
 
 def get_db_connection(db_path: str) -> sqlite3.Connection:
-    """Get database connection."""
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    return conn
+    """Get a read-only connection (the published replica when there is one)."""
+    return connect_reader(Path(db_path))
 
 
 def get_roi_metrics(conn: sqlite3.Connection) -> dict:
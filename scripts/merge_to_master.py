@@ -22,6 +22,7 @@ Date: 2025-11-26
 import json
 import re
 import sqlite3
+import sys
 from datetime import datetime
 from pathlib import Path
 from urllib.parse import urlparse
@@ -29,6 +30,9 @@ from collections import defaultdict
 
 # Paths
 PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from database.dedup import FUZZY_THRESHOLD, NameBlockIndex
 DB_PATH = PROJECT_ROOT / "output" / "master" / "pipeline.db"
 SPW_DIR = PROJECT_ROOT / "output" / "sources" / "spw_2025"
 AMICUS_DIR = PROJECT_ROOT / "output" / "sources" / "amicus"
@@ -152,16 +156,8 @@ def load_amicus_data() -> dict:
     return amicus_by_domain
 
 
-def get_contractor_capabilities(cursor, contractor_id: int) -> dict:
-    """Get capability flags from license types"""
-    cursor.execute("""
-        SELECT DISTINCT license_category
-        FROM licenses
-        WHERE contractor_id = ?
-    """, (contractor_id,))
-
-    categories = [row[0] for row in cursor.fetchall()]
-
+def capabilities_from_categories(categories: list) -> dict:
+    """Capability flags from a contractor's license categories"""
     capabilities = {
         "has_solar": False,
         "has_electrical": False,
@@ -181,6 +177,17 @@ def get_contractor_capabilities(cursor, contractor_id: int) -> dict:
     return capabilities
 
 
+def get_contractor_capabilities(cursor, contractor_id: int) -> dict:
+    """Get capability flags from license types"""
+    cursor.execute("""
+        SELECT DISTINCT license_category
+        FROM licenses
+        WHERE contractor_id = ?
+    """, (contractor_id,))
+
+    return capabilities_from_categories([row[0] for row in cursor.fetchall()])
+
+
 def get_contractor_states(cursor, contractor_id: int) -> list:
     """Get all states where contractor is licensed"""
     cursor.execute("""
@@ -192,6 +199,61 @@ def get_contractor_states(cursor, contractor_id: int) -> list:
     return [row[0] for row in cursor.fetchall()]
 
 
+def load_license_summary(cursor) -> tuple:
+    """
+    License categories and licensed states for every contractor in two queries.
+
+    Replaces two queries per contractor (get_contractor_capabilities /
+    get_contractor_states) during the full merge.
+
+    Returns:
+        (categories_by_id, states_by_id)
+    """
+    categories_by_id = defaultdict(list)
+    cursor.execute("SELECT DISTINCT contractor_id, license_category FROM licenses")
+    for contractor_id, category in cursor.fetchall():
+        categories_by_id[contractor_id].append(category)
+
+    states_by_id = defaultdict(list)
+    cursor.execute("""
+        SELECT DISTINCT contractor_id, state
+        FROM licenses
+        WHERE state IS NOT NULL AND LENGTH(state) = 2
+    """)
+    for contractor_id, state in cursor.fetchall():
+        states_by_id[contractor_id].append(state)
+
+    return categories_by_id, states_by_id
+
+
+class SPWMatcher:
+    """
+    Matches company names to SPW rankings: exact normalized name first, then
+    the shared fuzzy name rule (database.dedup, 85%+ similarity).
+    """
+
+    def __init__(self, spw_data: dict):
+        self.spw_data = spw_data
+        self.names = NameBlockIndex(threshold=FUZZY_THRESHOLD)
+        self.names.prime(None, spw_data.keys())
+        for norm_name in spw_data:
+            self.names.add(None, norm_name, value=norm_name)
+        self.matched = set()
+
+    def match(self, norm_name: str):
+        """SPW company for a normalized name (or None); remembers what matched."""
+        if not norm_name:
+            return None
+        key = norm_name if norm_name in self.spw_data else None
+        if key is None:
+            fuzzy = self.names.find_first(None, norm_name)
+            key = fuzzy[0] if fuzzy else None
+        if key is None:
+            return None
+        self.matched.add(key)
+        return self.spw_data[key]
+
+
 def calculate_icp_score(record: dict) -> int:
     """Calculate ICP score (0-100) based on multiple signals"""
     score = 0
@@ -268,24 +330,28 @@ def build_master_list():
         ORDER BY c.company_name
     """)
 
+    contractor_rows = cursor.fetchall()
+    categories_by_id, states_by_id = load_license_summary(cursor)
+    spw_matcher = SPWMatcher(spw_data)
+
     master_records = []
     stats = defaultdict(int)
 
-    for row in cursor.fetchall():
+    for row in contractor_rows:
         contractor_id = row["id"]
 
         # Get capabilities from licenses
-        capabilities = get_contractor_capabilities(cursor, contractor_id)
+        capabilities = capabilities_from_categories(categories_by_id.get(contractor_id, []))
 
         # Get licensed states
-        licensed_states = get_contractor_states(cursor, contractor_id)
+        licensed_states = states_by_id.get(contractor_id, [])
 
         # Normalize for matching
         norm_name = normalize_company_name(row["company_name"] or "")
         domain = normalize_domain(row["primary_domain"] or row["website_url"] or "")
 
         # Check SPW match
-        spw_match = spw_data.get(norm_name)
+        spw_match = spw_matcher.match(norm_name)
         in_spw = spw_match is not None
 
         # Check Amicus match
@@ -364,7 +430,7 @@ def build_master_list():
         if domain not in existing_domains:
             # Check SPW match by name
             norm_name = normalize_company_name(amicus_member.get("company_name", ""))
-            spw_match = spw_data.get(norm_name)
+            spw_match = spw_matcher.match(norm_name)
 
             record = {
                 "id": None,
@@ -431,7 +497,7 @@ def build_master_list():
     existing_names = {r["normalized_name"] for r in master_records if r["normalized_name"]}
 
     for norm_name, spw_company in spw_data.items():
-        if norm_name not in existing_names:
+        if norm_name not in existing_names and norm_name not in spw_matcher.matched:
             record = {
                 "id": None,
                 "company_name": spw_company.get("company_name"),
@@ -110,7 +110,8 @@ def migrate_ca_data(limit: int = None, mep_only: bool = True):
     skipped_count = 0
 
     # Process CSV
-    with open(CA_FILE, 'r', encoding='utf-8', errors='ignore') as f:
+    with db.import_session(source='CA_CSLB') as session, \
+            open(CA_FILE, 'r', encoding='utf-8', errors='ignore') as f:
         reader = csv.DictReader(f)
 
         # Progress tracking
@@ -180,7 +181,7 @@ def migrate_ca_data(limit: int = None, mep_only: bool = True):
 
                 # Add to database with deduplication
                 try:
-                    contractor_id, is_new = db.add_contractor(record, source='CA_CSLB')
+                    contractor_id, is_new = session.add_contractor(record)
                     if is_new:
                         new_count += 1
                     else:
@@ -96,7 +96,8 @@ def migrate_fl_data(limit: int = None, reset: bool = False):
     skipped_count = 0
 
     # Process CSV
-    with open(FL_EVERYONE_FILE, 'r', encoding='utf-8', errors='ignore') as f:
+    with db.import_session(source='FL_License') as session, \
+            open(FL_EVERYONE_FILE, 'r', encoding='utf-8', errors='ignore') as f:
         reader = csv.reader(f)
         header = next(reader, None)
 
@@ -154,7 +155,7 @@ def migrate_fl_data(limit: int = None, reset: bool = False):
 
             # Add to database with deduplication
             try:
-                _, is_new = db.add_contractor(record, source='FL_License')
+                _, is_new = session.add_contractor(record)
                 if is_new:
                     new_count += 1
                 else:
@@ -134,7 +134,8 @@ def migrate_tx_data(limit: int = None, mep_only: bool = True):
     license_type_counts = {}
 
     # Process CSV
-    with open(TX_FILE, 'r', encoding='utf-8', errors='ignore') as f:
+    with db.import_session(source='TX_TDLR') as session, \
+            open(TX_FILE, 'r', encoding='utf-8', errors='ignore') as f:
         reader = csv.DictReader(f)
 
         # Progress tracking
@@ -220,7 +221,7 @@ def migrate_tx_data(limit: int = None, mep_only: bool = True):
 
             # Add to database with deduplication
             try:
-                contractor_id, is_new = db.add_contractor(record, source='TX_TDLR')
+                contractor_id, is_new = session.add_contractor(record)
                 if is_new:
                     new_count += 1
                 else:
@@ -43,6 +43,7 @@ sys.path.insert(0, str(PROJECT_ROOT))
 # Import scraper factory
 from scrapers.scraper_factory import ScraperFactory
 from scrapers.base_scraper import ScraperMode
+from scrapers.zip_scheduler import ZipScheduler
 
 # OEM Priority Order (HVAC → Generators → Solar → Battery)
 # Updated to reflect 18 production-ready OEMs (22 planned, 4 not yet implemented)
@@ -489,15 +490,34 @@ def parse_args():
         action='store_true',
         help='List all available OEMs and exit'
     )
+    parser.add_argument(
+        '--prioritize-zips',
+        action='store_true',
+        help='Scrape ZIPs with the most new dealers per second (from past runs) first'
+    )
+    parser.add_argument(
+        '--time-budget',
+        type=float,
+        default=None,
+        help='Per-OEM time budget in minutes; stops starting new ZIPs once exceeded '
+             '(ZIPs run in config order unless --prioritize-zips is also given)'
+    )
     return parser.parse_args()
 
 
-def main(target_oem: Optional[str] = None):
+def main(
+    target_oem: Optional[str] = None,
+    prioritize_zips: bool = False,
+    time_budget_minutes: Optional[float] = None
+):
     """
     Main execution loop: Run all OEMs sequentially with user confirmation.
 
     Args:
         target_oem: If specified, run only this OEM non-interactively
+        prioritize_zips: Order ZIPs by historical yield (ZipScheduler)
+        time_budget_minutes: Per-OEM wall-clock budget for scraping (ZIPs stay in
+            config order unless prioritize_zips is set)
     """
     # Filter to target OEM if specified
     oems_to_run = [target_oem] if target_oem else OEM_PRIORITY_ORDER
@@ -619,11 +639,23 @@ def main(target_oem: Optional[str] = None):
             print(f"\n  → Scraping {len(ALL_ZIP_CODES)} ZIP codes...")
             print(f"     (Checkpoint saves every {CHECKPOINT_INTERVAL} ZIPs)")
 
+            scheduler = None
+            if prioritize_zips:
+                oem_dir = PROJECT_ROOT / "output" / "oem_data" / oem_name.lower().replace(" ", "_")
+                scheduler = ZipScheduler.from_history(
+                    str(oem_dir),
+                    db_path=str(PROJECT_ROOT / "output" / "pipeline.db"),
+                    scraper_name=oem_name
+                )
+                print(f"     (ZIP order: yield-prioritized from {len(scheduler.stats)} ZIPs of history)")
+
             try:
                 raw_dealers = scraper.scrape_multiple(
                     zip_codes=ALL_ZIP_CODES,
                     verbose=True,
-                    checkpoint_interval=CHECKPOINT_INTERVAL
+                    checkpoint_interval=CHECKPOINT_INTERVAL,
+                    scheduler=scheduler,
+                    time_budget_seconds=time_budget_minutes * 60 if time_budget_minutes else None
                 )
                 print(f"  ✓ Scraping complete: {len(raw_dealers)} dealers collected")
             except Exception as e:
@@ -764,4 +796,8 @@ if __name__ == "__main__":
         sys.exit(0)
 
     # Run main with optional target OEM
-    main(target_oem=args.oem)
+    main(
+        target_oem=args.oem,
+        prioritize_zips=args.prioritize_zips,
+        time_budget_minutes=args.time_budget
+    )
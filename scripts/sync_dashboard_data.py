@@ -15,13 +15,17 @@ This script:
 4. Optionally deploys to Vercel if --deploy flag is passed
 """
 
-import sqlite3
+import sys
 import json
 from datetime import datetime
 from pathlib import Path
 import argparse
 import subprocess
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from database.replica import connect_reader
+
 
 class DashboardSync:
     """Sync dashboard data with SQLite database."""
@@ -32,11 +36,10 @@ class DashboardSync:
         self.conn = None
 
     def connect(self):
-        """Connect to SQLite database."""
+        """Connect read-only to the database (its published replica when there is one)."""
         if not self.db_path.exists():
             raise FileNotFoundError(f"Database not found: {self.db_path}")
-        self.conn = sqlite3.connect(str(self.db_path))
-        self.conn.row_factory = sqlite3.Row
+        self.conn = connect_reader(self.db_path)
 
     def close(self):
         """Close database connection."""
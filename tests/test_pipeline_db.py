@@ -6,17 +6,24 @@ Tests deduplication logic, multi-license detection, and exports.
 Run with: pytest tests/test_pipeline_db.py -v
 """
 
+import asyncio
 import pytest
+import sqlite3
 import tempfile
+import time
 from pathlib import Path
 
 from database import (
     PipelineDB,
+    AsyncPipelineDB,
     normalize_phone,
     normalize_email,
     extract_domain,
     normalize_company_name,
-    fuzzy_match_ratio
+    fuzzy_match_ratio,
+    normalize_city,
+    normalize_street,
+    normalize_zip
 )
 
 
@@ -152,6 +159,31 @@ class TestNormalization:
         ratio = fuzzy_match_ratio('ABC Solar', 'XYZ Plumbing')
         assert ratio < 0.5
 
+    def test_normalize_city(self):
+        """City abbreviations are spelled out."""
+        assert normalize_city('St. Petersburg') == normalize_city('SAINT PETERSBURG') == 'saint petersburg'
+        assert normalize_city('Ft Myers') == 'fort myers'
+        assert normalize_city(None) == ''
+
+    def test_normalize_street(self):
+        """Street suffixes/directionals abbreviated, units dropped."""
+        assert normalize_street('123 North Main Street, Suite 200') == '123 n main st'
+        assert normalize_street('123 N. Main St #200') == '123 n main st'
+        assert normalize_street('9 Oak Dr Apt B') == '9 oak dr'
+
+    def test_normalize_street_keeps_designator_street_names(self):
+        """A unit designator without a unit number is part of the street name."""
+        assert normalize_street('123 No Name Rd') == '123 no name rd'
+        assert normalize_street('45 Fl Ave') == '45 fl ave'
+        assert normalize_street('7 Unit Street') == '7 unit st'
+
+    def test_normalize_zip(self):
+        """ZIP+4, lost leading zeros and float artifacts."""
+        assert normalize_zip('33701-1234') == '33701'
+        assert normalize_zip('2134') == '02134'
+        assert normalize_zip(33701.0) == '33701'
+        assert normalize_zip('n/a') == ''
+
 
 # ============================================
 # DATABASE INITIALIZATION TESTS
@@ -352,6 +384,64 @@ class TestDeduplication:
         assert id1 != id2
         assert new2 is True
 
+    def test_dedup_fuzzy_name_different_prefix(self, temp_db):
+        """A leading word no longer hides a fuzzy duplicate."""
+        id1, _ = temp_db.add_contractor({'company_name': 'ABC Electric', 'state': 'FL'})
+        id2, new2 = temp_db.add_contractor({'company_name': 'The ABC Electric', 'state': 'FL'})
+
+        assert id1 == id2
+        assert new2 is False
+
+    def test_dedup_fuzzy_name_dense_prefix(self, temp_db):
+        """Matches are found past the first 100 names sharing a prefix."""
+        for i in range(150):
+            temp_db.add_contractor({'company_name': f'Sun {i:03d} Zq{i * 7919:07d}', 'state': 'FL'})
+        target_id, _ = temp_db.add_contractor({'company_name': 'Sunrise Mechanical Heating', 'state': 'FL'})
+
+        contractor_id, is_new = temp_db.add_contractor(
+            {'company_name': 'Sunrise Mechanical Heatin', 'state': 'FL'})
+
+        assert (contractor_id, is_new) == (target_id, False)
+
+    def test_name_trigrams_follow_updates(self, temp_db):
+        """Trigram rows track inserts, renames, deletes and schema backfill."""
+        contractor_id, _ = temp_db.add_contractor({'company_name': 'Abcd', 'state': 'FL'})
+
+        def trigrams():
+            with temp_db._get_connection() as conn:
+                return sorted(tuple(row) for row in conn.execute(
+                    "SELECT state, trigram, occurrences FROM contractor_name_trigrams "
+                    "WHERE contractor_id = ?", (contractor_id,)))
+
+        assert trigrams() == [('FL', 'abc', 1), ('FL', 'bcd', 1)]
+
+        with temp_db._get_connection() as conn:
+            conn.execute("UPDATE contractors SET normalized_name = 'aaaa', state = 'TX' WHERE id = ?",
+                         (contractor_id,))
+        assert trigrams() == [('TX', 'aaa', 2)]
+
+        with temp_db._get_connection() as conn:
+            conn.execute("DELETE FROM contractor_name_trigrams")
+        temp_db.initialize()
+        assert trigrams() == [('TX', 'aaa', 2)]
+
+        with temp_db._get_connection() as conn:
+            conn.execute("DELETE FROM contractors WHERE id = ?", (contractor_id,))
+        assert trigrams() == []
+
+    def test_name_trigram_backfill_runs_once(self, temp_db):
+        """initialize() skips the trigram backfill once the index has rows."""
+        temp_db.add_contractor({'company_name': 'Abcd', 'state': 'FL'})
+        contractor_id, _ = temp_db.add_contractor({'company_name': 'Wxyz', 'state': 'FL'})
+        with temp_db._get_connection() as conn:
+            conn.execute("DELETE FROM contractor_name_trigrams WHERE contractor_id = ?", (contractor_id,))
+
+        temp_db.initialize()
+
+        with temp_db._get_connection() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM contractor_name_trigrams "
+                                "WHERE contractor_id = ?", (contractor_id,)).fetchone()[0] == 0
+
 
 # ============================================
 # MULTI-LICENSE TESTS
@@ -392,6 +482,54 @@ class TestMultiLicense:
         assert any('Triple' in u['company_name'] for u in unicorns)
 
 
+class TestEntityLinks:
+    """Tests for cross-state MinHash/LSH entity linkage."""
+
+    def _add(self, db, name, phone, state, category, city=''):
+        contractor_id, _ = db.add_contractor({
+            'company_name': name, 'phone': phone, 'state': state, 'city': city,
+            'license_type': category[:3], 'license_category': category,
+        })
+        return contractor_id
+
+    def test_links_same_company_across_states(self, temp_db):
+        """Same name in two states is linked and pooled into an entity unicorn."""
+        fl = self._add(temp_db, 'Gulfstream Mechanical', '555-100-0001', 'FL', 'HVAC', 'Tampa')
+        temp_db.add_license(fl, 'FL', 'CPC', 'PLUMBING', '', 'test')
+        tx = self._add(temp_db, 'Gulfstream Mechanical LLC', '555-200-0002', 'TX', 'ELECTRICAL', 'Austin')
+        self._add(temp_db, 'Zephyr Roofing', '555-400-0004', 'TX', 'ROOFING', 'Austin')
+
+        assert temp_db.link_cross_state_contractors() == 1
+        # Rebuilding replaces the previous links
+        assert temp_db.link_cross_state_contractors() == 1
+
+        with temp_db._get_connection() as conn:
+            link = conn.execute("SELECT * FROM entity_links").fetchone()
+            unicorns = conn.execute("SELECT * FROM v_entity_unicorns").fetchall()
+            cross_state = conn.execute("SELECT * FROM v_entity_cross_state").fetchall()
+            assert conn.execute("SELECT COUNT(*) FROM v_unicorns").fetchone()[0] == 0
+
+        assert (link['contractor_id'], link['linked_contractor_id']) == (fl, tx)
+        assert link['name_similarity'] == 1.0
+        assert [(row['id'], row['category_count']) for row in unicorns] == [(fl, 3)]
+        assert [(row['id'], row['state_count']) for row in cross_state] == [(fl, 2)]
+
+    def test_entities_follow_link_chains(self, temp_db):
+        """A-B and B-C links put all three contractors in one entity."""
+        ids = [self._add(temp_db, name, f'555-500-000{i}', 'FL', 'HVAC')
+               for i, name in enumerate(['Alpha Air', 'Bolt Electric', 'Cobalt Plumbing'])]
+        with temp_db._get_connection() as conn:
+            conn.executemany(
+                "INSERT INTO entity_links (contractor_id, linked_contractor_id) VALUES (?, ?)",
+                [(ids[1], ids[2]), (ids[0], ids[1])]
+            )
+            entities = conn.execute(
+                "SELECT contractor_id, entity_id FROM v_contractor_entities ORDER BY contractor_id"
+            ).fetchall()
+
+        assert [tuple(row) for row in entities] == [(i, ids[0]) for i in ids]
+
+
 # ============================================
 # STATS TESTS
 # ============================================
@@ -467,6 +605,106 @@ class TestExport:
 
         assert count == 0
 
+    def test_streamed_matches_list(self, populated_db):
+        """iter_multi_license_contractors yields what get_multi_license_contractors returns."""
+        rows = populated_db.iter_multi_license_contractors(min_categories=1)
+        assert list(rows) == populated_db.get_multi_license_contractors(min_categories=1)
+
+    def test_writes_during_open_iterator_persist(self, populated_db):
+        """Writes made while an iterator is open commit even if it is abandoned."""
+        import gc
+
+        rows = populated_db.iter_contractors(batch_size=1)
+        next(rows)
+        contractor_id, is_new = populated_db.add_contractor(
+            {'company_name': 'Midstream Electric', 'state': 'FL', 'phone': '305-555-0199'})
+        assert is_new
+        del rows
+        gc.collect()
+
+        with sqlite3.connect(populated_db.db_path) as conn:
+            assert conn.execute("SELECT company_name FROM contractors WHERE id = ?",
+                                (contractor_id,)).fetchone() == ('Midstream Electric',)
+
+    def test_export_formats_and_gzip(self, populated_db, tmp_path):
+        """CSV, JSONL and JSON exports hold the same rows, gzipped by .gz suffix."""
+        import csv
+        import gzip
+        import json
+
+        expected = list(populated_db.iter_contractors())
+        assert populated_db.export_contractors(tmp_path / 'all.csv.gz') == len(expected)
+        assert populated_db.export_contractors(tmp_path / 'all.jsonl') == len(expected)
+        assert populated_db.export_contractors(tmp_path / 'all.json', state='FL') == len(expected)
+
+        with gzip.open(tmp_path / 'all.csv.gz', 'rt', newline='') as f:
+            assert [row['company_name'] for row in csv.DictReader(f)] == \
+                [row['company_name'] for row in expected]
+        with open(tmp_path / 'all.jsonl') as f:
+            assert [json.loads(line) for line in f] == json.loads(json.dumps(expected, default=str))
+        with open(tmp_path / 'all.json') as f:
+            document = json.load(f)
+        assert document['state'] == 'FL'
+        assert document['total_count'] == len(expected)
+        assert [row['id'] for row in document['contractors']] == [row['id'] for row in expected]
+
+        with pytest.raises(ValueError):
+            populated_db.export_contractors(tmp_path / 'all.xml')
+
+    def test_export_to_json_streams(self, populated_db, tmp_path):
+        """export_to_json writes the multi-license rows; empty results give an empty array."""
+        import json
+
+        count = populated_db.export_to_json(tmp_path / 'ml.json', state='FL', require_email=False)
+        with open(tmp_path / 'ml.json') as f:
+            document = json.load(f)
+        assert count == document['total_count'] == len(document['contractors']) >= 1
+        assert document['contractors'] == populated_db.get_multi_license_contractors(state='FL')
+
+        assert populated_db.export_to_json(tmp_path / 'none.json', state='ZZ') == 0
+        with open(tmp_path / 'none.json') as f:
+            assert json.load(f)['contractors'] == []
+
+
+class TestColumnarSnapshot:
+    """Tests for the Parquet snapshot export (needs pyarrow)."""
+
+    def test_snapshot_round_trip(self, populated_db, tmp_path):
+        """Every snapshot table holds the database rows, with typed columns."""
+        pa = pytest.importorskip("pyarrow", exc_type=ImportError)
+        from database.columnar import SNAPSHOT_TABLES, load_snapshot_table
+
+        populated_db.add_oem_certification(1, 'Generac', certification_tier='Elite')
+        counts = populated_db.export_columnar_snapshot(tmp_path / 'snap', compression='snappy')
+
+        with populated_db._get_connection() as conn:
+            for table in SNAPSHOT_TABLES:
+                assert counts[table] == conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+            licenses = load_snapshot_table(tmp_path / 'snap', 'licenses',
+                                           columns=['contractor_id', 'license_category', 'created_at'])
+            assert licenses.column_names == ['contractor_id', 'license_category', 'created_at']
+            assert pa.types.is_dictionary(licenses.schema.field('license_category').type)
+            assert pa.types.is_timestamp(licenses.schema.field('created_at').type)
+            assert sorted(licenses.column('license_category').to_pylist()) == sorted(
+                row[0] for row in conn.execute("SELECT license_category FROM licenses"))
+
+        contractors = load_snapshot_table(tmp_path / 'snap', 'contractors')
+        assert contractors.column('id').to_pylist() == [row['id'] for row in populated_db.iter_contractors()]
+
+    def test_incomplete_snapshot_is_not_read(self, populated_db, tmp_path):
+        """Tables outside SNAPSHOT_TABLES are rejected; no manifest means no snapshot."""
+        pytest.importorskip("pyarrow", exc_type=ImportError)
+        from database.columnar import MANIFEST_NAME, load_snapshot_table
+
+        with pytest.raises(ValueError):
+            populated_db.export_columnar_snapshot(tmp_path / 'snap', tables=['pipeline_runs'])
+
+        populated_db.export_columnar_snapshot(tmp_path / 'snap', tables=['contractors'])
+        (tmp_path / 'snap' / MANIFEST_NAME).unlink()
+        with pytest.raises(FileNotFoundError):
+            load_snapshot_table(tmp_path / 'snap', 'contractors')
+
 
 # ============================================
 # PIPELINE RUN TESTS
@@ -516,6 +754,57 @@ class TestSearch:
 
         assert len(results) >= 1
 
+    def test_search_ranked_prefix(self, populated_db):
+        """Word prefixes match any indexed field; company name ranks first."""
+        populated_db.add_contractor({'company_name': 'Miami Air', 'city': 'Miami', 'state': 'TX',
+                                     'phone': '555-999-0000'}, source='test')
+
+        names = [r['company_name'] for r in populated_db.search_contractors('mia')]
+        assert names == ['Miami Air', 'ABC HVAC LLC']
+        assert [r['company_name'] for r in populated_db.search_contractors('mia', state='FL')] == \
+            ['ABC HVAC LLC']
+        assert [r['company_name'] for r in populated_db.search_contractors('jane doe')] == \
+            ['XYZ Plumbing Inc']
+        assert 'HVAC' in populated_db.search_contractors('abc')[0]['categories'].split(',')
+        assert populated_db.search_contractors('"OR NEAR(') == []
+
+    def test_search_index_follows_writes(self, populated_db):
+        """Renames, new contacts and deletes are searchable immediately."""
+        contractor_id = populated_db.search_contractors('sunshine')[0]['id']
+        with populated_db._get_connection() as conn:
+            conn.execute("UPDATE contractors SET company_name = 'Tropic Roofing', "
+                         "normalized_name = 'tropic roofing' WHERE id = ?", (contractor_id,))
+            conn.execute("INSERT INTO contacts (contractor_id, name, email) VALUES (?, 'Ana Lopez', 'ana@x.com')",
+                         (contractor_id,))
+        assert [r['id'] for r in populated_db.search_contractors('tropic')] == [contractor_id]
+        assert [r['id'] for r in populated_db.search_contractors('lopez')] == [contractor_id]
+
+        with populated_db._get_connection() as conn:
+            conn.execute("DELETE FROM contacts WHERE contractor_id = ?", (contractor_id,))
+        assert populated_db.search_contractors('lopez') == []
+
+        with populated_db._get_connection() as conn:
+            conn.execute("DELETE FROM contractors_fts")
+        populated_db.initialize()
+        assert [r['id'] for r in populated_db.search_contractors('tropic')] == [contractor_id]
+
+    def test_search_index_backfill_runs_once(self, populated_db):
+        """initialize() skips the FTS backfill once the index has rows."""
+        contractor_id = populated_db.search_contractors('hvac', state='FL')[0]['id']
+        with populated_db._get_connection() as conn:
+            conn.execute("DELETE FROM contractors_fts WHERE rowid = ?", (contractor_id,))
+
+        populated_db.initialize()
+
+        assert contractor_id not in [r['id'] for r in populated_db.search_contractors('hvac', state='FL')]
+
+    def test_search_like_fallback(self, populated_db):
+        """Without the FTS index, search falls back to LIKE scans."""
+        with populated_db._get_connection() as conn:
+            conn.execute("DROP TABLE contractors_fts")
+        results = populated_db.search_contractors('hvac', state='FL')
+        assert [r['company_name'] for r in results] == ['ABC HVAC LLC']
+
 
 # ============================================
 # RESET TEST
@@ -616,5 +905,478 @@ class TestIntegration:
         assert cool_air['category_count'] == 3  # UNICORN!
 
 
+
+# ============================================
+# IMPORT SESSION TESTS
+# ============================================
+
+def _import_records(count, seed=5):
+    """License-file style rows with phone, email, contact, domain and name repeats."""
+    import random
+    rng = random.Random(seed)
+    names = ['Cool Air', 'Bolt Electric', 'Sunshine Plumbing', 'Apex Mechanical', 'Allied Fire']
+    companies = []
+    records = []
+    for i in range(count):
+        if companies and rng.random() < 0.5:
+            base, state, phone, email = rng.choice(companies)
+            roll = rng.random()
+            if roll < 0.3:
+                phone = f"555{rng.randint(0, 9999999):07d}"
+            elif roll < 0.5 and email:
+                email = f"x{i}@{email.split('@')[1]}"
+            elif roll < 0.6:
+                phone, email = '', ''
+            name = base + rng.choice(['', ' LLC', ' Inc', 's'])
+        else:
+            name = f"{rng.choice(names)} {rng.randint(1, 60)}"
+            state = rng.choice(['FL', 'CA', 'TX'])
+            phone = f"555{rng.randint(0, 9999999):07d}" if rng.random() < 0.7 else ''
+            email = f"info@{name.lower().replace(' ', '')}.com" if rng.random() < 0.6 else ''
+            companies.append((name, state, phone, email))
+        records.append({
+            'company_name': name,
+            'contact_name': rng.choice(['', 'John Smith', 'Ana Lopez']),
+            'email': email,
+            'phone': phone,
+            'state': state,
+            'license_type': rng.choice(['CAC', 'CFC', 'EC']),
+            'license_category': 'HVAC',
+            'license_number': str(rng.randint(1, 40)),
+        })
+    return records
+
+
+def _table_dump(db):
+    with db._get_connection() as conn:
+        return {
+            'contractors': [tuple(row) for row in conn.execute(
+                "SELECT id, company_name, normalized_name, state, primary_phone, primary_email, "
+                "primary_domain FROM contractors ORDER BY id")],
+            'contacts': [tuple(row) for row in conn.execute(
+                "SELECT contractor_id, name, email, phone, confidence FROM contacts ORDER BY id")],
+            'licenses': [tuple(row) for row in conn.execute(
+                "SELECT contractor_id, state, license_type, license_number FROM licenses ORDER BY id")],
+            'dedup_matches': [tuple(row) for row in conn.execute(
+                "SELECT master_contractor_id, match_type, match_value FROM dedup_matches ORDER BY id")],
+        }
+
+
+class TestImportSession:
+    """Test bulk imports with in-memory deduplication."""
+
+    def test_matches_add_contractor(self, temp_db, tmp_path):
+        """Session import writes exactly what add_contractor would."""
+        records = _import_records(600)
+        existing, new = records[:200], records[200:]
+
+        reference = PipelineDB(tmp_path / 'reference.db')
+        reference.initialize()
+        results = []
+        for record in records:
+            results.append(reference.add_contractor(record, source='FL_License'))
+
+        # Existing rows must be picked up from the database, not just the session
+        for record in existing:
+            temp_db.add_contractor(record, source='FL_License')
+        with temp_db.import_session(source='FL_License', batch_size=50) as session:
+            session_results = [session.add_contractor(record) for record in new]
+
+        assert session_results == results[200:]
+        assert _table_dump(temp_db) == _table_dump(reference)
+        assert session.stats['records_input'] == 400
+        assert session.stats['records_new'] == sum(1 for _, is_new in results[200:] if is_new)
+
+    def test_matches_contact_phone(self, temp_db):
+        """A merged row's phone matches later rows through the contacts table."""
+        with temp_db.import_session(source='SPW') as session:
+            first_id, _ = session.add_contractor({
+                'company_name': 'ABC HVAC', 'email': 'info@abchvac.com', 'state': 'FL'})
+            session.add_contractor({
+                'company_name': 'ABC HVAC', 'email': 'john@abchvac.com',
+                'phone': '555-000-1111', 'state': 'FL'})
+            contractor_id, is_new = session.add_contractor({
+                'company_name': 'Totally Different', 'phone': '5550001111', 'state': 'TX'})
+
+        assert (contractor_id, is_new) == (first_id, False)
+
+    def test_rollback_on_error(self, temp_db):
+        """Rows in an unfinished batch are rolled back when the import fails."""
+        with pytest.raises(RuntimeError):
+            with temp_db.import_session(source='FL_License', batch_size=2) as session:
+                for i, name in enumerate(['Alpha Air', 'Bolt Electric', 'Cobalt Plumbing']):
+                    session.add_contractor({'company_name': name, 'state': 'FL',
+                                            'phone': f'555000000{i}'})
+                raise RuntimeError("import failed")
+
+        assert temp_db.get_stats()['total_contractors'] == 2
+
+    def test_nested_in_caller_transaction(self, temp_db):
+        """Batch commits inside an outer transaction leave it to the caller."""
+        names = ['Alpha Air', 'Bolt Electric', 'Cobalt Plumbing']
+        with temp_db._get_connection() as conn:
+            with temp_db.import_session(source='FL_License', batch_size=1) as session:
+                for i, name in enumerate(names[:2]):
+                    session.add_contractor({'company_name': name, 'state': 'FL',
+                                            'phone': f'555000000{i}'})
+            assert conn.in_transaction
+            conn.execute("INSERT INTO contractors (company_name, state) VALUES ('Delta Roofing', 'FL')")
+
+        assert temp_db.get_stats()['total_contractors'] == 3
+
+        with pytest.raises(RuntimeError):
+            with temp_db._get_connection():
+                with temp_db.import_session(source='FL_License', batch_size=1) as session:
+                    session.add_contractor({'company_name': names[2], 'state': 'FL'})
+                raise RuntimeError("outer block failed")
+
+        assert temp_db.get_stats()['total_contractors'] == 3
+
+    def test_audit_trail(self, temp_db, tmp_path):
+        """file_import_id writes INSERT and MERGE history rows."""
+        source_file = tmp_path / 'fl.csv'
+        source_file.write_text('company_name\nABC HVAC\n')
+        file_import_id = temp_db.start_file_import(source_file, 'FL_License')
+        with temp_db.import_session(source='FL_License', file_import_id=file_import_id) as session:
+            session.add_contractor({'company_name': 'ABC HVAC', 'phone': '5551234567', 'state': 'FL'})
+            session.add_contractor({'company_name': 'ABC HVAC', 'phone': '5551234567', 'state': 'FL'})
+
+        with temp_db._get_connection() as conn:
+            rows = conn.execute(
+                "SELECT change_type, file_import_id FROM contractor_history ORDER BY id").fetchall()
+        assert [tuple(row) for row in rows] == [('INSERT', file_import_id), ('MERGE', file_import_id)]
+
+
+def _scanned_stats(db, state=None):
+    """get_stats() computed with full scans (the pre-aggregate queries)."""
+    with db._get_connection() as conn:
+        where = "WHERE state = ?" if state else ""
+        lic_where = "WHERE l.state = ?" if state else ""
+        params = (state,) if state else ()
+
+        def count(sql, args=params):
+            return conn.execute(sql, args).fetchone()[0]
+
+        multi = """
+            SELECT COUNT(*) FROM (
+                SELECT c.id FROM contractors c JOIN licenses l ON c.id = l.contractor_id
+                {where} GROUP BY c.id HAVING COUNT(DISTINCT l.license_category) >= {n}
+            )"""
+        email_where = "WHERE c.primary_email IS NOT NULL AND c.primary_email != ''"
+        return {
+            'total_contractors': count(f"SELECT COUNT(*) FROM contractors {where}"),
+            'with_email': count(f"SELECT COUNT(*) FROM contractors {where + ' AND' if state else 'WHERE'} "
+                                "primary_email IS NOT NULL AND primary_email != ''"),
+            'with_phone': count(f"SELECT COUNT(*) FROM contractors {where + ' AND' if state else 'WHERE'} "
+                                "primary_phone IS NOT NULL AND primary_phone != ''"),
+            'multi_license': count(multi.format(where=lic_where, n=2)),
+            'unicorns': count(multi.format(where=lic_where, n=3)),
+            'multi_license_with_email': count(multi.format(
+                where=email_where + (" AND l.state = ?" if state else ""), n=2)),
+            'total_dedup_matches': count("SELECT COUNT(*) FROM dedup_matches", ()),
+            'categories': {row[0]: row[1] for row in conn.execute(f"""
+                SELECT l.license_category, COUNT(DISTINCT c.id) FROM contractors c
+                JOIN licenses l ON c.id = l.contractor_id {lic_where}
+                GROUP BY l.license_category""", params)},
+            'state': state or 'ALL',
+        }
+
+
+class TestStatsAggregates:
+    """Test the trigger-maintained get_stats() aggregates."""
+
+    STATES = [None, 'FL', 'TX', 'CA', 'ZZ']
+
+    def _random_writes(self, db, seed):
+        import random
+        rng = random.Random(seed)
+        categories = ['HVAC', 'PLUMBING', 'ELECTRICAL', 'ROOFING', '', None]
+        with db._get_connection() as conn:
+            for i in range(150):
+                conn.execute(
+                    "INSERT INTO contractors (company_name, state, primary_email, primary_phone) "
+                    "VALUES (?, ?, ?, ?)",
+                    (f"Co {i}", rng.choice(['FL', 'TX', 'CA', None]),
+                     rng.choice(['', None, f'x{i}@co.com']), rng.choice(['', f'555{i:07d}'])))
+            ids = [row[0] for row in conn.execute("SELECT id FROM contractors")]
+            for i in range(500):
+                conn.execute(
+                    "INSERT OR IGNORE INTO licenses (contractor_id, state, license_type, "
+                    "license_category, license_number) VALUES (?, ?, ?, ?, ?)",
+                    (rng.choice(ids), rng.choice(['FL', 'TX', 'CA']), 'X',
+                     rng.choice(categories), str(rng.randint(1, 300))))
+                if i % 3 == 0:
+                    conn.execute("INSERT INTO dedup_matches (master_contractor_id, match_type) "
+                                 "VALUES (?, 'phone')", (rng.choice(ids),))
+            for _ in range(60):
+                op = rng.random()
+                cid = rng.choice(ids)
+                if op < 0.25:
+                    conn.execute("UPDATE contractors SET primary_email = ? WHERE id = ?",
+                                 (rng.choice(['', 'new@co.com', None]), cid))
+                elif op < 0.45:
+                    conn.execute("UPDATE contractors SET state = ? WHERE id = ?",
+                                 (rng.choice(['FL', 'TX', None]), cid))
+                elif op < 0.65:
+                    conn.execute("UPDATE licenses SET license_category = ? WHERE id = "
+                                 "(SELECT id FROM licenses ORDER BY RANDOM() LIMIT 1)",
+                                 (rng.choice(categories),))
+                elif op < 0.85:
+                    conn.execute("DELETE FROM licenses WHERE id = "
+                                 "(SELECT id FROM licenses ORDER BY RANDOM() LIMIT 1)")
+                elif cid in ids:
+                    conn.execute("DELETE FROM contractors WHERE id = ?", (cid,))
+                    ids.remove(cid)
+
+    def test_matches_full_scans(self, temp_db):
+        """Aggregates equal the scan queries after inserts, updates and deletes."""
+        assert temp_db.get_stats() == _scanned_stats(temp_db)
+        self._random_writes(temp_db, seed=1)
+        for state in self.STATES:
+            assert temp_db.get_stats(state) == _scanned_stats(temp_db, state)
+
+    def test_backfill_existing_database(self, temp_db):
+        """initialize() fills the aggregates of a database created before them."""
+        self._random_writes(temp_db, seed=2)
+        expected = [_scanned_stats(temp_db, state) for state in self.STATES]
+        with temp_db._get_connection() as conn:
+            objects = conn.execute(
+                "SELECT type, name FROM sqlite_master WHERE name LIKE 'trg_stats_%' "
+                "OR (type = 'table' AND name LIKE 'stats_%')").fetchall()
+            for kind, name in objects:
+                conn.execute(f"DROP {kind.upper()} IF EXISTS {name}")
+
+        temp_db.initialize()
+        assert [temp_db.get_stats(state) for state in self.STATES] == expected
+        temp_db.initialize()
+        assert [temp_db.get_stats(state) for state in self.STATES] == expected
+
+
+class TestConnectionReuse:
+    """Test the persistent per-thread connection."""
+
+    def test_reused_within_thread(self, temp_db):
+        """Calls on one thread share a connection; other threads get their own."""
+        import threading
+
+        with temp_db._get_connection() as first:
+            pass
+        temp_db.get_stats()
+        with temp_db._get_connection() as second:
+            assert second is first
+
+        other = []
+        thread = threading.Thread(target=lambda: other.append(temp_db.get_stats()['total_contractors']))
+        thread.start()
+        thread.join()
+        assert other == [0]
+
+        temp_db.close()
+        with temp_db._get_connection() as reopened:
+            assert reopened is not first
+
+    def test_nested_rollback(self, temp_db):
+        """A failing nested block rolls back only its own writes."""
+        with temp_db._get_connection() as conn:
+            conn.execute("INSERT INTO contractors (company_name, state) VALUES ('Outer Air', 'FL')")
+            with pytest.raises(ValueError):
+                with temp_db._get_connection() as nested:
+                    nested.execute("INSERT INTO contractors (company_name, state) VALUES ('Inner Air', 'FL')")
+                    raise ValueError("nested failure")
+
+        with temp_db._get_connection() as conn:
+            names = [row[0] for row in conn.execute("SELECT company_name FROM contractors")]
+        assert names == ['Outer Air']
+
+
+class TestBulkIngest:
+    """Test add_contractors_bulk against the per-row path."""
+
+    def test_matches_add_contractor(self, temp_db, tmp_path):
+        """Bulk ingest writes what add_contractor would and reports match types."""
+        records = _import_records(500, seed=11)
+
+        reference = PipelineDB(tmp_path / 'reference.db')
+        reference.initialize()
+        results = [reference.add_contractor(record, source='FL_License') for record in records]
+
+        for record in records[:100]:
+            temp_db.add_contractor(record, source='FL_License')
+        progress = []
+        bulk_results = temp_db.add_contractors_bulk(
+            iter(records[100:]), source='FL_License', batch_size=150, progress=progress.append)
+
+        assert [(cid, is_new) for cid, is_new, _ in bulk_results] == results[100:]
+        reference_dump = _table_dump(reference)
+        assert _table_dump(temp_db) == reference_dump
+        match_types = [match_type for _, match_type, _ in reference_dump['dedup_matches']]
+        bulk_match_types = [match_type for _, is_new, match_type in bulk_results if not is_new]
+        assert bulk_match_types == match_types[-len(bulk_match_types):]
+        assert all(match_type == '' for _, is_new, match_type in bulk_results if is_new)
+        assert progress == [150, 300, 400]
+
+
+class TestPerformanceProfiles:
+    """Test the bulk_import and serving connection profiles."""
+
+    @staticmethod
+    def _indexes(db):
+        with db._get_connection() as conn:
+            return sorted(tuple(row) for row in conn.execute(
+                "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL"))
+
+    def test_bulk_import_profile(self, temp_db, tmp_path):
+        """Deferred indexes come back, pragmas are restored and results match."""
+        records = _import_records(300, seed=3)
+        indexes = self._indexes(temp_db)
+
+        reference = PipelineDB(tmp_path / 'reference.db')
+        reference.initialize()
+        expected = reference.add_contractors_bulk(records, source='FL_License')
+
+        with temp_db.performance_profile('bulk_import'):
+            assert 'idx_contractors_phone' not in dict(self._indexes(temp_db))
+            with temp_db._get_connection() as conn:
+                assert conn.execute("PRAGMA synchronous").fetchone()[0] == 0
+            results = temp_db.add_contractors_bulk(records, source='FL_License')
+
+        assert results == expected
+        assert _table_dump(temp_db) == _table_dump(reference)
+        assert self._indexes(temp_db) == indexes
+        with temp_db._get_connection() as conn:
+            assert conn.execute("PRAGMA synchronous").fetchone()[0] == 2
+            assert conn.execute("SELECT COUNT(*) FROM sqlite_stat1").fetchone()[0] > 0
+
+    def test_serving_profile(self, tmp_path):
+        """Connections of a serving PipelineDB use the serving pragmas."""
+        db = PipelineDB(tmp_path / 'serving.db', profile='serving')
+        db.initialize()
+        with db._get_connection() as conn:
+            assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1
+            assert conn.execute("PRAGMA cache_size").fetchone()[0] == -65536
+
+        with pytest.raises(ValueError):
+            PipelineDB(tmp_path / 'other.db', profile='turbo')
+
+
+class TestReadReplica:
+    """Test publishing and reading the read-only replica."""
+
+    def test_publish_and_read(self, populated_db, tmp_path):
+        """The replica has the committed data, statistics, and rejects writes."""
+        result = populated_db.publish_replica()
+        assert result['path'] == populated_db.db_path.with_name(f"{populated_db.db_path.stem}_replica.db")
+
+        reader = populated_db.open_replica()
+        assert reader.get_stats() == populated_db.get_stats()
+        assert reader.search_contractors('ABC') == populated_db.search_contractors('ABC')
+        with reader._get_connection() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM sqlite_stat1").fetchone()[0] > 0
+            with pytest.raises(sqlite3.OperationalError):
+                conn.execute("DELETE FROM contractors")
+
+        with pytest.raises(ValueError):
+            reader.publish_replica()
+        with pytest.raises(FileNotFoundError):
+            populated_db.open_replica(tmp_path / 'missing.db')
+
+    def test_reader_sees_next_publish(self, temp_db):
+        """An open reader switches to a newly published replica; writers are not blocked."""
+        temp_db.add_contractor({'company_name': 'First Air', 'state': 'FL'})
+        temp_db.publish_replica()
+        reader = temp_db.open_replica()
+        assert reader.get_stats()['total_contractors'] == 1
+
+        with temp_db.import_session(source='FL_License', publish_replica=True) as session:
+            session.add_contractor({'company_name': 'Second Air', 'state': 'FL'})
+            # Replica readers don't touch the primary's locks mid-import
+            assert reader.get_stats()['total_contractors'] == 1
+
+        assert reader.get_stats()['total_contractors'] == 2
+
+    def test_scheduled_publisher(self, temp_db):
+        """ReplicaPublisher publishes immediately and stops cleanly."""
+        from database.replica import ReplicaPublisher
+
+        temp_db.add_contractor({'company_name': 'First Air', 'state': 'FL'})
+        with ReplicaPublisher(temp_db, interval=60) as publisher:
+            for _ in range(500):
+                if publisher.published:
+                    break
+                time.sleep(0.01)
+        assert publisher.published == 1
+        assert temp_db.open_replica().get_stats()['total_contractors'] == 1
+
+
+class TestAsyncPipelineDB:
+    """Test the async facade and its read batching."""
+
+    @pytest.mark.asyncio
+    async def test_batched_reads_match_sync(self, populated_db):
+        """Concurrent reads run as one batch and return what the sync calls return."""
+        async with AsyncPipelineDB(populated_db) as db:
+            stats, search, first, again, missing = await asyncio.gather(
+                db.get_stats(state='FL'),
+                db.search_contractors('ABC'),
+                db.get_contractor_by_id(1),
+                db.get_contractor_by_id(1),
+                db.get_contractor_by_id(999),
+            )
+            assert db.stats['read_batches'] == 1
+            assert db.stats['reads'] == 5
+
+        assert stats == populated_db.get_stats(state='FL')
+        assert search == populated_db.search_contractors('ABC')
+        assert first == again == populated_db.get_contractor_by_id(1)
+        assert missing is None
+
+    @pytest.mark.asyncio
+    async def test_failing_read_keeps_batch(self, populated_db):
+        """A read that raises fails only its own caller, not the rest of its batch."""
+        async with AsyncPipelineDB(populated_db) as db:
+            stats, failed, search, first = await asyncio.gather(
+                db.get_stats(state='FL'),
+                db.get_pipeline_runs(limit='not a number'),
+                db.search_contractors('ABC'),
+                db.get_contractor_by_id(1),
+                return_exceptions=True,
+            )
+            assert db.stats['read_batches'] == 1
+
+        assert isinstance(failed, sqlite3.Error)
+        assert stats == populated_db.get_stats(state='FL')
+        assert search == populated_db.search_contractors('ABC')
+        assert first == populated_db.get_contractor_by_id(1)
+
+    @pytest.mark.asyncio
+    async def test_writes_not_batched(self, temp_db):
+        """Each write is its own job, run in submission order."""
+        names = ['Async Air', 'Bolt Electric', 'Cobalt Plumbing']
+        async with AsyncPipelineDB(temp_db) as db:
+            results = await asyncio.gather(*[
+                db.add_contractor({'company_name': name, 'phone': f'555700100{i}', 'state': 'FL'})
+                for i, name in enumerate(names)
+            ])
+            assert db.stats['writes'] == 3
+            assert db.stats['read_batches'] == 0
+
+            found = await db.find_matching_contractor('5557001000', '', 'Async Air', 'FL')
+            assert db.stats['read_batches'] == 1
+
+        assert [contractor_id for contractor_id, _ in results] == [1, 2, 3]
+        assert all(is_new for _, is_new in results)
+        assert found == 1
+        assert [temp_db.get_contractor_by_id(i)['company_name'] for i in (1, 2, 3)] == names
+
+    @pytest.mark.asyncio
+    async def test_unavailable_methods(self, temp_db):
+        """Generators and context managers are not proxied."""
+        async with AsyncPipelineDB(temp_db) as db:
+            with pytest.raises(AttributeError):
+                await db.call('import_session')
+            with pytest.raises(AttributeError):
+                db.iter_contractors
+
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
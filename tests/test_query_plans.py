@@ -0,0 +1,213 @@
+"""
+Query-Plan Regression Tests for pipeline.db
+
+Seeds a synthetic database, captures EXPLAIN QUERY PLAN and timings for the
+schema views and PipelineDB's hot queries, and fails when a query starts
+scanning a table it used to search (a dropped or unusable index) or gets
+much slower.  Timings are budgeted as multiples of a calibration scan on the
+same database, so the limits hold on slow and fast machines alike.
+
+PipelineDB methods are traced with sqlite3's trace callback, so the plans
+checked are those of the SQL the methods actually run.
+"""
+
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from database.pipeline_db import PipelineDB
+
+
+SEED_CONTRACTORS = 20000
+STATES = ['FL', 'TX', 'CA', 'NY', 'GA', 'NC']
+CATEGORIES = ['HVAC', 'PLUMBING', 'ELECTRICAL', 'ROOFING', 'SOLAR', 'FIRE']
+
+
+# ============================================
+# Test Fixtures
+# ============================================
+
+@pytest.fixture(scope="module")
+def plan_db(tmp_path_factory):
+    """Synthetic pipeline.db: contractors with 1-4 licenses, contacts and OEM certifications."""
+    db = PipelineDB(tmp_path_factory.mktemp("plans") / "plans.db")
+    db.initialize()
+    rng = random.Random(3)
+
+    with db._get_connection() as conn:
+        conn.executemany("""
+            INSERT INTO contractors
+            (company_name, normalized_name, city, state, zip, primary_phone, primary_email, primary_domain)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, [(
+            f"Co {i} LLC", f"co {i}", 'Miami', rng.choice(STATES), f"{rng.randint(10000, 99999)}",
+            f"555{i:07d}" if rng.random() < 0.8 else '',
+            f"x{i}@co{i}.com" if rng.random() < 0.5 else '', f"co{i}.com",
+        ) for i in range(SEED_CONTRACTORS)])
+
+        licenses = []
+        for contractor_id in range(1, SEED_CONTRACTORS + 1):
+            for k in range(rng.choice([1, 1, 1, 2, 2, 3, 4])):
+                licenses.append((contractor_id, rng.choice(STATES), f"T{k}",
+                                 rng.choice(CATEGORIES), f"{contractor_id}-{k}"))
+        conn.executemany("""
+            INSERT OR IGNORE INTO licenses
+            (contractor_id, state, license_type, license_category, license_number)
+            VALUES (?, ?, ?, ?, ?)
+        """, licenses)
+
+        conn.executemany(
+            "INSERT OR IGNORE INTO oem_certifications (contractor_id, oem_name) VALUES (?, ?)",
+            [(rng.randint(1, SEED_CONTRACTORS), rng.choice(['Generac', 'Tesla', 'Enphase', 'Kohler']))
+             for _ in range(SEED_CONTRACTORS // 2)])
+        conn.executemany(
+            "INSERT OR IGNORE INTO contacts (contractor_id, name, email, phone) VALUES (?, ?, ?, ?)",
+            [(rng.randint(1, SEED_CONTRACTORS), 'Ann Lee', f"c{i}@x.com", f"556{i:07d}")
+             for i in range(SEED_CONTRACTORS)])
+
+        # Imports run ANALYZE (bulk_import profile), so plan against real statistics
+        conn.execute("ANALYZE")
+
+    return db
+
+
+def _find_duplicate_miss(db):
+    """Every dedup step, for a record that matches nothing."""
+    with db._get_connection() as conn:
+        db._find_duplicate(conn.cursor(), '5559999999', 'nobody@nomatch.com', 'nomatch.com',
+                           'zephyr quantum mechanical', 'FL')
+
+
+# name: (SQL or PipelineDB call, tables allowed to be fully scanned, plan must mention, budget)
+# Budgets are multiples of the calibration scan (one pass over contractors).
+# Queries returning most of the table are bounded by row materialization
+# (~40-70 scans here), so their budgets only catch plan-level regressions.
+HOT_QUERIES = {
+    # Views list every qualifying contractor, so scanning contractors is by design
+    'v_multi_license': ("SELECT * FROM v_multi_license", {'c'}, 'COVERING INDEX idx_licenses_contractor_cover', 150),
+    'v_unicorns': ("SELECT * FROM v_unicorns", {'c'}, 'COVERING INDEX idx_licenses_contractor_cover', 150),
+    'v_multi_oem': ("SELECT * FROM v_multi_oem", {'c'}, 'COVERING INDEX', 30),
+    'v_cross_state': ("SELECT * FROM v_cross_state", {'c'}, 'COVERING INDEX idx_licenses_contractor_cover', 150),
+    'v_state_stats': ("SELECT * FROM v_state_stats", set(), 'USING INDEX', 15),
+    'v_pipeline_health': ("SELECT * FROM v_pipeline_health", {'c'}, 'idx_contractors_deleted_contact', 40),
+    'get_multi_license_contractors': (
+        lambda db: db.get_multi_license_contractors(), {'c'}, 'COVERING INDEX', 150),
+    'get_multi_license_contractors(state)': (
+        lambda db: db.get_multi_license_contractors(state='FL', require_email=True), {'c'}, 'COVERING INDEX', 30),
+    'get_stats': (lambda db: db.get_stats(), set(), 'stats_states', 1),
+    'get_stats(state)': (lambda db: db.get_stats(state='FL'), set(), 'stats_states', 1),
+    'get_contractor_by_id': (lambda db: db.get_contractor_by_id(1234), set(), 'INTEGER PRIMARY KEY', 1),
+    'search_contractors(name)': (lambda db: db.search_contractors('co 1234'), set(), 'VIRTUAL TABLE', 5),
+    'search_contractors(phone)': (lambda db: db.search_contractors('555-000-1234'), set(), 'idx_contractors_phone', 2),
+    # q is the incoming name's own trigram list (a VALUES CTE)
+    '_find_duplicate': (_find_duplicate_miss, {'q'}, 'idx_contacts_email', 2),
+}
+
+
+# ============================================
+# Helpers
+# ============================================
+
+def _statements(db, query):
+    """SELECTs a hot query runs (traced for PipelineDB calls)."""
+    if isinstance(query, str):
+        return [query]
+    statements = []
+    connect = db._connect
+
+    def traced_connect():  # Streaming reads open their own connections
+        conn = connect()
+        conn.set_trace_callback(statements.append)
+        return conn
+
+    with db._get_connection() as conn:
+        conn.set_trace_callback(statements.append)
+        db._connect = traced_connect
+        try:
+            query(db)
+        finally:
+            del db._connect
+            conn.set_trace_callback(None)
+    return [sql for sql in statements if sql.lstrip().upper().startswith(('SELECT', 'WITH'))]
+
+
+def _plan(db, sql):
+    """EXPLAIN QUERY PLAN detail lines."""
+    with db._get_connection() as conn:
+        return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}")]
+
+
+def _full_scans(plan):
+    """Tables read without an index (view and subquery co-routines excluded)."""
+    coroutines = {match.group(2) for line in plan
+                  for match in [re.match(r'(CO-ROUTINE|MATERIALIZE) (\w+)', line)] if match}
+    scans = {match.group(1) for line in plan for match in [re.fullmatch(r'SCAN (\w+)', line)] if match}
+    return scans - coroutines - {'sqlite_master', 'sqlite_schema'}
+
+
+def _elapsed(run, repeat=3):
+    """Best-of-N wall time in seconds."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+@pytest.fixture(scope="module")
+def calibration(plan_db):
+    """Time of one unindexed pass over contractors on this machine."""
+    with plan_db._get_connection() as conn:
+        return _elapsed(lambda: conn.execute(
+            "SELECT COUNT(*) FROM contractors WHERE company_name LIKE '%zz%'").fetchall(), repeat=5)
+
+
+# ============================================
+# Plans
+# ============================================
+
+@pytest.mark.parametrize("name", list(HOT_QUERIES))
+def test_query_plan(plan_db, name):
+    """No unexpected full scans; the index the query relies on is used."""
+    query, allowed_scans, expected, _ = HOT_QUERIES[name]
+    plans = {sql: _plan(plan_db, sql) for sql in _statements(plan_db, query)}
+    assert plans, f"{name} ran no SELECT"
+
+    for sql, plan in plans.items():
+        report = f"{name}\n{sql}\n  " + "\n  ".join(plan)
+        assert _full_scans(plan) <= allowed_scans, f"Unexpected full scan:\n{report}"
+    assert any(expected in line for plan in plans.values() for line in plan), \
+        f"{name} no longer uses {expected!r}:\n" + "\n".join(
+            "  " + "\n  ".join(plan) for plan in plans.values())
+
+
+# ============================================
+# Latency
+# ============================================
+
+@pytest.mark.slow
+@pytest.mark.parametrize("name", list(HOT_QUERIES))
+def test_query_latency(plan_db, calibration, name):
+    """Each hot query stays within its budget of calibration scans."""
+    query, _, _, budget = HOT_QUERIES[name]
+    if isinstance(query, str):
+        def run():
+            with plan_db._get_connection() as conn:
+                conn.execute(query).fetchall()
+    else:
+        def run():
+            query(plan_db)
+
+    run()  # Warm the page cache
+    elapsed = _elapsed(run)
+    # Sub-millisecond calibrations are dominated by timer noise
+    limit = budget * max(calibration, 0.002)
+    assert elapsed <= limit, (
+        f"{name}: {elapsed * 1000:.1f}ms > {budget} x {calibration * 1000:.2f}ms calibration scan")
@@ -0,0 +1,239 @@
+"""
+Unit Tests for Browser Memory Governor
+
+Uses fake browser/context/page objects - no browser is launched.
+"""
+
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from scrapers.browser_governor import BrowserGovernor, GovernorLimits, browser_memory
+
+
+# ============================================
+# Test Fixtures
+# ============================================
+
+class FakePage:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class FakeContext:
+    def __init__(self):
+        self.closed = False
+        self.pages = []
+
+    def new_page(self):
+        page = FakePage()
+        self.pages.append(page)
+        return page
+
+    def close(self):
+        self.closed = True
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.closed = False
+        self.contexts = []
+
+    def new_context(self):
+        context = FakeContext()
+        self.contexts.append(context)
+        return context
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def browsers():
+    return []
+
+
+@pytest.fixture
+def memory():
+    """Mutable RSS reading used by the governor's memory probe."""
+    return {'browser_rss_mb': 100.0, 'renderer_rss_mb': 60.0, 'renderer_count': 1}
+
+
+def make_governor(browsers, memory, **limits):
+    def launch():
+        browser = FakeBrowser()
+        browsers.append(browser)
+        return browser
+
+    return BrowserGovernor(
+        launch_browser=launch,
+        limits=GovernorLimits(**limits),
+        memory_probe=lambda: dict(memory),
+        verbose=False,
+    )
+
+
+# ============================================
+# Recycling
+# ============================================
+
+def test_page_reused_until_context_limit(browsers, memory):
+    governor = make_governor(browsers, memory, max_pages_per_context=3)
+
+    first = governor.acquire_page()
+    governor.release()
+    assert governor.acquire_page() is first
+    governor.release()
+    governor.acquire_page()
+    assert governor.release() == 'context'
+
+    assert first.closed is False
+    assert browsers[0].contexts[0].closed is True
+    assert governor.acquire_page() is not first
+    assert len(browsers) == 1
+
+
+def test_browser_recycled_on_rss(browsers, memory):
+    governor = make_governor(browsers, memory, max_browser_rss_mb=500)
+
+    governor.acquire_page()
+    assert governor.release() is None
+
+    memory['browser_rss_mb'] = 800.0
+    governor.acquire_page()
+    assert governor.release() == 'browser'
+    assert browsers[0].closed is True
+
+    governor.acquire_page()
+    assert len(browsers) == 2
+    assert governor.metrics()['browser_recycles'] == 1
+    assert 'RSS' in governor.metrics()['last_recycle_reason']
+
+
+def test_browser_recycled_on_error_rate(browsers, memory):
+    governor = make_governor(browsers, memory, max_error_rate=0.5, error_window=4)
+
+    for success in (True, False, True):
+        governor.acquire_page()
+        assert governor.release(success=success) is None
+
+    governor.acquire_page()
+    assert governor.release(success=False) == 'browser'
+    assert governor.metrics()['errors'] == 2
+
+
+def test_browser_recycled_after_max_contexts(browsers, memory):
+    governor = make_governor(browsers, memory, max_pages_per_context=1, max_contexts_per_browser=2)
+
+    governor.acquire_page()
+    assert governor.release() == 'context'
+    governor.acquire_page()
+    assert governor.release() == 'browser'
+    assert len(browsers) == 1
+    governor.acquire_page()
+    assert len(browsers) == 2
+
+
+def test_keep_remote_context_open(browsers, memory):
+    governor = make_governor(browsers, memory, max_pages_per_context=1)
+    governor.close_contexts = False
+
+    page = governor.acquire_page()
+    governor.release()
+
+    assert page.closed is True
+    assert browsers[0].contexts[0].closed is False
+
+
+def test_limits_can_be_disabled(browsers, memory):
+    governor = make_governor(browsers, memory, max_pages_per_context=None,
+                             max_contexts_per_browser=None, max_browser_rss_mb=None,
+                             max_error_rate=None)
+    memory['browser_rss_mb'] = 10_000.0
+    for _ in range(50):
+        governor.acquire_page()
+        assert governor.release(success=False) is None
+    assert len(browsers) == 1
+
+
+# ============================================
+# Metrics
+# ============================================
+
+def test_metrics_export(tmp_path, browsers, memory):
+    metrics_file = tmp_path / "metrics.jsonl"
+    governor = make_governor(browsers, memory, max_pages_per_context=2)
+    governor.metrics_file = str(metrics_file)
+
+    for _ in range(4):
+        governor.acquire_page()
+        governor.release()
+
+    lines = [json.loads(line) for line in metrics_file.read_text().splitlines()]
+    assert len(lines) == 2
+    assert lines[-1]['pages_served'] == 4
+    assert lines[-1]['context_recycles'] == 2
+    assert lines[-1]['browser_rss_mb'] == 100.0
+    assert lines[-1]['avg_latency_seconds'] is not None
+
+
+def test_context_manager_closes_browser(browsers, memory):
+    with make_governor(browsers, memory) as governor:
+        governor.acquire_page()
+    assert browsers[0].closed is True
+    assert governor.browser is None
+
+
+@pytest.mark.skipif(not os.path.isdir('/proc'), reason="needs /proc or psutil")
+def test_browser_memory_reads_process_tree():
+    usage = browser_memory()
+    assert usage is not None
+    assert usage['browser_rss_mb'] >= 0
+    assert usage['renderer_count'] >= 0
+
+
+# ============================================
+# RunPod Service
+# ============================================
+
+SERVICE_DIR = Path(__file__).resolve().parents[2] / "runpod-playwright-api"
+
+
+def test_runpod_service_skips_scrapers_package():
+    """The worker image has no scraper dependencies, so the service must not import them."""
+    script = (
+        "import sys\n"
+        "import playwright_service\n"
+        "assert not [m for m in sys.modules if m == 'scrapers' or m.startswith('scrapers.')]\n"
+    )
+    pytest.importorskip("playwright")
+    subprocess.run([sys.executable, "-c", script], check=True, cwd=SERVICE_DIR, capture_output=True)
+
+
+def test_runpod_service_metrics_after_release(browsers, memory):
+    """Job responses report the governor state after the page was released."""
+    pytest.importorskip("playwright")
+    spec = importlib.util.spec_from_file_location("playwright_service", SERVICE_DIR / "playwright_service.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    service = module.PlaywrightService.__new__(module.PlaywrightService)
+    service.playwright = None
+    service.governor = make_governor(browsers, memory, max_pages_per_context=1)
+
+    ok = service.execute_workflow([])
+    failed = service.execute_workflow([{'action': 'unknown'}])
+
+    assert ok['status'] == 'success'
+    assert ok['browser_metrics']['pages_served'] == 1
+    assert 'error' in failed
+    assert failed['browser_metrics']['pages_served'] == 2
+    assert failed['browser_metrics']['errors'] == 1
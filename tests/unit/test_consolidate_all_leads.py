@@ -0,0 +1,45 @@
+"""
+Unit Tests for Lead Cross-Referencing (scripts/consolidate_all_leads.py)
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "scripts"))
+
+import consolidate_all_leads
+from database.entity_index import EntityIndex
+
+
+# ============================================
+# Test Fixtures
+# ============================================
+
+@pytest.fixture
+def two_state_leads():
+    return {
+        "FL_Enphase": [{"company_name": "Bright Path Solar LLC", "state": "FL"}],
+        "CA_Outreach": [{"company_name": "Bright Path Solar", "state": "CA"}],
+    }
+
+
+# ============================================
+# Cross-References
+# ============================================
+
+def test_same_name_in_two_states_cross_referenced(two_state_leads):
+    cross_refs = consolidate_all_leads.cross_reference_leads(two_state_leads)
+
+    assert len(cross_refs) == 1
+    assert sorted(cross_refs[0]["sources"]) == ["CA_Outreach", "FL_Enphase"]
+
+
+def test_same_name_in_two_states_cross_referenced_with_entity_index(two_state_leads, tmp_path):
+    with EntityIndex(tmp_path / "entity_index.db",
+                     normalize_name=consolidate_all_leads.normalize_company_name,
+                     exact_keys=consolidate_all_leads.EXACT_KEYS) as entity_index:
+        cross_refs = consolidate_all_leads.cross_reference_leads(two_state_leads, entity_index)
+
+    assert len(cross_refs) == 1
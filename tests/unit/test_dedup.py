@@ -0,0 +1,270 @@
+"""
+Unit Tests for the Shared Deduplication Engine (database/dedup.py)
+"""
+
+import random
+
+import pytest
+
+from database.dedup import (
+    DedupIndex, DedupKeys, ExactKeySignal, FuzzyNameSignal, NameBlockIndex, ShardedNameBlockIndex,
+    UnionFind, cluster_records, first_name_match, map_shards, match_name_blocks, min_shared_trigrams,
+    name_similarity, name_trigrams, normalize_domain, partner_length_range
+)
+
+
+# ============================================
+# Test Fixtures
+# ============================================
+
+@pytest.fixture
+def index():
+    return DedupIndex()
+
+
+def _add(index, record):
+    """Match-or-add one record; returns the match (or None when added)."""
+    keys = index.keys(record)
+    match = index.find(keys)
+    if match is None:
+        index.add(keys, record)
+    return match
+
+
+# ============================================
+# Keys
+# ============================================
+
+def test_keys_normalize_record(index):
+    keys = index.keys({
+        'company_name': 'ABC Solar, LLC',
+        'phone': '+1 (555) 123-4567',
+        'email': ' Info@ABCSolar.com ',
+        'state': 'fl',
+    })
+
+    assert keys == DedupKeys(phone='5551234567', email='info@abcsolar.com',
+                             domain='abcsolar.com', name='abc solar', state='FL')
+
+
+def test_keys_prefer_website_domain(index):
+    keys = index.keys({'name': 'ABC Solar', 'website': 'https://www.abc-solar.com/about',
+                       'email': 'owner@gmail.com'})
+    assert keys.domain == 'abc-solar.com'
+    assert normalize_domain('WWW.Example.com:8080/x') == 'example.com'
+
+
+# ============================================
+# Signals
+# ============================================
+
+def test_signal_priority(index):
+    first = {'company_name': 'ABC Solar', 'phone': '5551234567', 'email': 'a@abc.com', 'state': 'FL'}
+    assert _add(index, first) is None
+
+    assert _add(index, {'company_name': 'Other', 'phone': '555-123-4567', 'state': 'TX'}).match_type == 'phone'
+    assert _add(index, {'company_name': 'Other', 'email': 'A@abc.com', 'state': 'TX'}).match_type == 'email'
+    assert _add(index, {'company_name': 'ABC Solar Co', 'email': 'b@abc.com', 'state': 'TX'}).match_type == 'domain'
+    match = _add(index, {'company_name': 'ABC Solar Inc', 'state': 'FL'})
+    assert match.match_type == 'fuzzy_name'
+    assert match.entity is first
+
+
+def test_domain_requires_similar_name(index):
+    _add(index, {'company_name': 'ABC Solar', 'email': 'a@franchise.com', 'state': 'FL'})
+    assert _add(index, {'company_name': 'Zephyr Plumbing', 'email': 'z@franchise.com', 'state': 'FL'}) is None
+
+
+def test_fuzzy_name_scoped_by_state(index):
+    _add(index, {'company_name': 'Sunshine Electric', 'state': 'FL'})
+    assert _add(index, {'company_name': 'Sunshine Electric', 'state': 'TX'}) is None
+    assert _add(index, {'company_name': 'Sunshine Electric'}) is None
+    assert _add(index, {'company_name': 'Sunshine Electrics', 'state': 'FL'}) is not None
+
+
+def test_custom_signals():
+    index = DedupIndex(signals=[ExactKeySignal('phone'), FuzzyNameSignal(scope=None)])
+    _add(index, {'company_name': 'Sunshine Electric', 'email': 'a@sun.com', 'state': 'FL'})
+
+    assert _add(index, {'company_name': 'Zed', 'email': 'a@sun.com'}) is None
+    assert _add(index, {'company_name': 'Sunshine Electric', 'state': 'TX'}).match_type == 'fuzzy_name'
+
+
+def test_add_selected_signals(index):
+    master = {'company_name': 'ABC Solar', 'phone': '5551234567', 'state': 'FL'}
+    _add(index, master)
+    alias = index.keys({'company_name': 'Unrelated', 'phone': '5559999999', 'state': 'GA'})
+    index.add(alias, master, match_types=('phone', 'email'))
+
+    assert index.find(index.keys({'phone': '5559999999'})).entity is master
+    assert index.find(index.keys({'company_name': 'Unrelated', 'state': 'GA'})) is None
+
+
+# ============================================
+# Name Matching Helpers
+# ============================================
+
+def test_first_name_match_in_candidate_order():
+    candidates = [(1, 'zephyr plumbing'), (2, 'abc solar energy'), (3, 'abc solar')]
+    assert first_name_match('abc solar', candidates) == (3, 1.0)
+    assert first_name_match('abc solar energ', candidates)[0] == 2
+    assert first_name_match('', candidates) is None
+
+
+def test_name_block_index():
+    blocks = NameBlockIndex()
+    blocks.prime('FL', ['abc solar', 'abc solar energy'])
+    blocks.add('FL', 'abc solar', value=1)
+    blocks.add('FL', 'abc solars', value=2)
+
+    assert [value for value, _ in blocks.find_all('FL', 'abc solar')] == [1, 2]
+    assert blocks.find_first('TX', 'abc solar') is None
+    assert len(blocks) == 2
+
+
+def test_name_similarity_empty():
+    assert name_similarity('', 'abc') == 0.0
+    assert name_similarity('abc', 'abc') == 1.0
+
+
+def test_min_shared_trigrams_is_a_lower_bound():
+    rng = random.Random(11)
+    for _ in range(3000):
+        a = "".join(rng.choice("ab c") for _ in range(rng.randint(1, 24)))
+        b = list(a)
+        for _ in range(rng.randint(0, 4)):
+            position = rng.randint(0, len(b))
+            if b and rng.random() < 0.5:
+                del b[min(position, len(b) - 1)]
+            else:
+                b.insert(position, rng.choice("ab c"))
+        b = "".join(b)
+        if name_similarity(a, b) < 0.85:
+            continue
+
+        lo, hi = partner_length_range(len(a))
+        assert lo <= len(b) <= hi
+        shared = sum((name_trigrams(a) & name_trigrams(b)).values())
+        assert shared >= min_shared_trigrams(len(a), len(b))
+
+# ============================================
+# Sharded Matching
+# ============================================
+
+def _name_blocks(seed):
+    rng = random.Random(seed)
+    words = ['Sunshine', 'Bolt', 'Apex', 'Tri-State', 'Metro', 'Coastal']
+    trades = ['Electric', 'Electrics', 'Solar', 'Solar Co', 'HVAC']
+    return {state: [f"{rng.choice(words)} {rng.choice(trades)}".lower() for _ in range(60)]
+            for state in ['FL', 'TX', 'GA']}
+
+
+def test_map_shards_keeps_shard_order():
+    shards = [(str(i), '0') for i in range(10)]
+    assert map_shards(max, shards, workers=2) == [max(*shard) for shard in shards]
+    with pytest.raises(ValueError):
+        map_shards(max, shards, workers=0)
+
+
+def test_match_name_blocks_sharded_equals_serial():
+    blocks = _name_blocks(1)
+    serial = match_name_blocks(blocks)
+
+    assert serial == match_name_blocks(blocks, workers=2, shard_size=7)
+    assert [len(found) for found in serial['FL']] == [
+        sum(name_similarity(name, other) >= 0.85 for other in blocks['FL']) for name in blocks['FL']
+    ]
+
+
+def test_sharded_name_block_index_first_match():
+    blocks = _name_blocks(2)
+    serial, sharded = NameBlockIndex(), ShardedNameBlockIndex(blocks, workers=2)
+    entries = [(block, name) for block, names in blocks.items() for name in names]
+    random.Random(2).shuffle(entries)
+
+    for position, (block, name) in enumerate(entries):
+        match = serial.find_first(block, name)
+        assert sharded.find_first(block, name) == match
+        if match is None:
+            serial.add(block, name, value=position)
+            sharded.add(block, name, value=position)
+    assert len(sharded) == len(serial)
+
+
+# ============================================
+# Union-Find Clustering
+# ============================================
+
+def _partition(records, clusters):
+    return {frozenset(records[i]['id'] for i in members) for members in clusters.groups()}
+
+
+def test_union_find_smallest_root():
+    sets = UnionFind(4)
+    assert sets.union(3, 2)
+    assert sets.union(2, 1)
+    assert not sets.union(3, 1)
+    assert sets.labels() == [0, 1, 1, 1]
+
+
+def test_cluster_records_is_transitive():
+    records = [
+        {'id': 'a', 'company_name': 'Alpha Solar', 'phone': '5550000001', 'state': 'FL'},
+        {'id': 'b', 'company_name': 'Alpha Solar Energy', 'phone': '5550000001',
+         'email': 'b@alphasolar.com', 'state': 'FL'},
+        {'id': 'c', 'company_name': 'Alpha Solar & Energy', 'email': 'c@alphasolar.com', 'state': 'TX'},
+        {'id': 'd', 'company_name': 'Zephyr Plumbing', 'state': 'FL'},
+    ]
+
+    clusters = cluster_records(records)
+
+    assert clusters.labels == [0, 0, 0, 3]
+    assert clusters.cluster_count == 2
+    assert clusters.merges['phone'] == 1
+    assert clusters.merges['domain'] == 1
+
+
+def test_cluster_records_order_independent():
+    rng = random.Random(3)
+    words = ['Sunshine', 'Bolt', 'Apex', 'Tri-State', 'Metro', 'Coastal', 'Allied', 'Summit']
+    trades = ['Electric', 'Electrics', 'Solar', 'Solar Co', 'HVAC', 'Plumbing']
+    records = [{
+        'id': i,
+        'company_name': f"{rng.choice(words)} {rng.choice(trades)}",
+        'phone': f"555000{rng.randint(0, 2000):04d}",
+        'email': f"x{i}@{rng.choice(['bolt.com', 'apex.com'] + ['gmail.com'] * 8)}",
+        'state': rng.choice(['FL', 'TX', 'GA', 'CA']),
+    } for i in range(200)]
+
+    clusters = cluster_records(records)
+    expected = _partition(records, clusters)
+    assert 10 < clusters.cluster_count < 200
+
+    for _ in range(3):
+        shuffled = records[:]
+        rng.shuffle(shuffled)
+        assert _partition(shuffled, cluster_records(shuffled)) == expected
+
+
+def test_cluster_records_repeated_names():
+    records = [{'id': i, 'company_name': 'Acme Electric', 'state': 'CA'} for i in range(500)]
+    clusters = cluster_records(records)
+    assert clusters.cluster_count == 1
+    assert clusters.merges == {'fuzzy_name': 499}
+
+
+def test_cluster_records_sharded_equals_serial():
+    records = [{
+        'id': i,
+        'company_name': name,
+        'email': f"x{i}@{['bolt.com', 'apex.com', 'gmail.com'][i % 3]}",
+        'state': state,
+    } for i, (state, name) in enumerate(
+        (state, name) for state, names in _name_blocks(3).items() for name in names
+    )]
+
+    serial = cluster_records(records)
+    sharded = cluster_records(records, workers=2)
+
+    assert sharded.labels == serial.labels
+    assert sharded.merges == serial.merges
@@ -0,0 +1,39 @@
+"""
+Unit Tests for the Master Deduplication Engine (scripts/deduplicate_master_list.py)
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "scripts"))
+
+from deduplicate_master_list import DeduplicationEngine
+
+
+# ============================================
+# Transitive add_records
+# ============================================
+
+def test_cluster_second_member_matches_earlier_master():
+    engine = DeduplicationEngine()
+    engine.add_records([{'company_name': 'Gulf Coast Roofing', 'phone': '813-555-0100', 'state': 'FL'}])
+
+    # Clustered by email; only the second member shares the earlier phone
+    engine.add_records([
+        {'company_name': 'Bayside Builders', 'email': 'ops@bayside-builders.com', 'state': 'FL'},
+        {'company_name': 'GCR Inc', 'phone': '(813) 555-0100', 'email': 'ops@bayside-builders.com', 'state': 'FL'},
+    ])
+
+    assert len(engine.master_records) == 1
+    assert engine.master_records[0]['duplicate_count'] == 3
+
+
+def test_cluster_without_earlier_match_creates_one_master():
+    engine = DeduplicationEngine()
+    engine.add_records([{'company_name': 'Gulf Coast Roofing', 'phone': '813-555-0100', 'state': 'FL'}])
+    engine.add_records([
+        {'company_name': 'Bayside Builders', 'email': 'ops@bayside-builders.com', 'state': 'FL'},
+        {'company_name': 'Bayside Builders LLC', 'email': 'info@bayside-builders.com', 'state': 'FL'},
+    ])
+
+    assert [master['duplicate_count'] for master in engine.master_records] == [1, 2]
@@ -0,0 +1,86 @@
+"""
+Unit Tests for the Persisted Entity Index (database/entity_index.py)
+"""
+
+import random
+
+import pytest
+
+from database.dedup import DedupIndex
+from database.entity_index import EntityIndex
+
+
+# ============================================
+# Test Fixtures
+# ============================================
+
+@pytest.fixture
+def index_path(tmp_path):
+    return tmp_path / "entity_index.db"
+
+
+def _records(seed, count):
+    rng = random.Random(seed)
+    words = ['Sunshine', 'Bolt', 'Apex', 'Tri-State', 'Metro', 'Coastal', 'Allied', 'Summit']
+    trades = ['Electric', 'Electrics', 'Solar', 'Solar Co', 'HVAC', 'Plumbing']
+    return [{
+        'company_name': f"{rng.choice(words)} {rng.choice(trades)}",
+        'phone': f"555000{rng.randint(0, 300):04d}" if rng.random() < 0.5 else '',
+        'email': f"x{i}@{rng.choice(['bolt.com', 'apex.com'] + ['gmail.com'] * 6)}",
+        'state': rng.choice(['FL', 'TX', 'GA']),
+    } for i in range(count)]
+
+
+# ============================================
+# Matching
+# ============================================
+
+def test_signals(index_path):
+    with EntityIndex(index_path) as index:
+        first, match = index.resolve({'company_name': 'ABC Solar', 'phone': '555-123-4567',
+                                      'email': 'a@abcsolar.com', 'state': 'FL'}, source='FL_License')
+        assert match is None
+
+        assert index.resolve({'company_name': 'Other', 'phone': '5551234567'})[1].match_type == 'phone'
+        assert index.resolve({'company_name': 'ABC Solar Co', 'email': 'b@abcsolar.com'})[1].match_type == 'domain'
+        entity, match = index.resolve({'company_name': 'ABC Solar Inc', 'state': 'FL'}, source='Generac')
+        assert (entity, match.match_type) == (first, 'fuzzy_name')
+
+        assert index.resolve({'company_name': 'ABC Solar Inc', 'state': 'TX'})[1] is None
+        assert index.resolve({'company_name': ''}) == (None, None)
+        assert index.sources(first) == {'FL_License': 1, 'Generac': 1}
+
+
+def test_incremental_runs_match_single_pass(index_path):
+    records = _records(5, 400)
+
+    expected = DedupIndex()
+    labels = []
+    for position, record in enumerate(records):
+        keys = expected.keys(record)
+        match = expected.find(keys)
+        if match is None:
+            expected.add(keys, position)
+        else:
+            expected.add(keys, match.entity, match_types=('phone', 'email'))
+        labels.append(position if match is None else match.entity)
+
+    entity_ids = []
+    for batch in (records[:250], records[250:]):
+        with EntityIndex(index_path) as index:
+            entity_ids.extend(index.resolve_all(batch))
+
+    first_record = {}
+    for position, entity_id in enumerate(entity_ids):
+        first_record.setdefault(entity_id, position)
+    assert [first_record[entity_id] for entity_id in entity_ids] == labels
+
+
+def test_exact_name_key_matches_across_states(index_path):
+    with EntityIndex(index_path, exact_keys=('phone', 'email', 'name')) as index:
+        first, _ = index.resolve({'company_name': 'ABC Solar', 'state': 'FL'}, source='FL_License')
+        entity, match = index.resolve({'company_name': 'ABC Solar', 'state': 'CA'}, source='CA_Outreach')
+        assert (entity, match.match_type) == (first, 'name')
+
+    with EntityIndex(index_path) as index:
+        assert index.resolve({'company_name': 'ABC Solar', 'state': 'TX'})[1] is None
@@ -0,0 +1,90 @@
+"""
+Unit Tests for Cross-State Entity Linkage (database/entity_links.py)
+"""
+
+import random
+
+import pytest
+
+from database import entity_links
+from database.entity_links import (
+    MinHasher, contractor_shingles, find_entity_links, jaccard, lsh_candidate_pairs
+)
+
+
+# ============================================
+# Test Fixtures
+# ============================================
+
+def _random_sets(rng, count):
+    return [{f"s{rng.randint(0, 200)}" for _ in range(rng.randint(0, 25))} for _ in range(count)]
+
+
+# ============================================
+# MinHash
+# ============================================
+
+def test_signatures_without_numpy(monkeypatch):
+    rng = random.Random(4)
+    sets = _random_sets(rng, 300)
+    hasher = MinHasher(num_permutations=32)
+    expected = hasher.signatures(sets)
+
+    monkeypatch.setattr(entity_links, "np", None)
+    assert hasher.signatures(sets) == expected
+    assert expected[0] == hasher.signature(sets[0])
+
+
+def test_signature_estimates_jaccard():
+    hasher = MinHasher(num_permutations=256)
+    a = {f"x{i}" for i in range(100)}
+    b = {f"x{i}" for i in range(40, 140)}
+    sig_a, sig_b = hasher.signatures([a, b])
+
+    estimate = sum(x == y for x, y in zip(sig_a, sig_b)) / len(sig_a)
+    assert estimate == pytest.approx(jaccard(a, b), abs=0.1)
+
+
+# ============================================
+# LSH
+# ============================================
+
+def test_lsh_finds_similar_pairs_and_respects_groups():
+    rng = random.Random(9)
+    base = _random_sets(rng, 200)
+    near = [s | {"extra"} for s in base if len(s) >= 15]
+    signatures = MinHasher().signatures(base + near)
+
+    pairs = lsh_candidate_pairs(signatures)
+    expected = {(i, len(base) + k) for k, i in enumerate(i for i, s in enumerate(base) if len(s) >= 15)}
+    assert expected <= pairs
+    assert len(pairs) < len(signatures) * (len(signatures) - 1) // 20
+
+    groups = ['same'] * len(signatures)
+    assert lsh_candidate_pairs(signatures, groups=groups) == set()
+
+
+# ============================================
+# Linkage
+# ============================================
+
+def test_contractor_shingles():
+    assert contractor_shingles('ab') == {'ab'}
+    assert contractor_shingles('', street='12 Main St.', zip_code='33101-1234') == {'@12', '@main', '@st', '@33101'}
+
+
+def test_find_entity_links_cross_state_only():
+    records = [
+        {'normalized_name': 'gulfstream mechanical services', 'city': 'Tampa', 'state': 'FL'},
+        {'normalized_name': 'gulfstream mechanical service', 'city': 'Austin', 'state': 'TX'},
+        {'normalized_name': 'gulfstream mechanical services', 'city': 'Miami', 'state': 'FL'},
+        {'normalized_name': 'zephyr roofing', 'city': 'Austin', 'state': 'TX'},
+    ]
+
+    links = find_entity_links(records)
+
+    assert [(link.first, link.second) for link in links] == [(0, 1), (1, 2)]
+    assert links[0].name_similarity > 0.9
+    assert [(l.first, l.second) for l in find_entity_links(records, cross_state_only=False)] == [
+        (0, 1), (0, 2), (1, 2)
+    ]
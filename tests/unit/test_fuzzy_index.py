@@ -0,0 +1,187 @@
+"""
+Unit Tests for Indexed Fuzzy Name Matching
+"""
+
+import random
+from difflib import SequenceMatcher
+
+import pytest
+
+from scrapers.base_scraper import BaseDealerScraper, StandardizedDealer
+from utils import fuzzy_index
+from utils.fuzzy_index import FuzzyNameIndex, find_all_matches
+
+
+# ============================================
+# Test Fixtures
+# ============================================
+
+def _random_names(rng, count):
+    """Short names over a tiny alphabet - maximizes near-threshold pairs."""
+    names = []
+    for _ in range(count):
+        if names and rng.random() < 0.5:
+            name = list(rng.choice(names))
+            for _ in range(rng.randint(0, 3)):
+                position = rng.randint(0, len(name))
+                if name and rng.random() < 0.5:
+                    del name[min(position, len(name) - 1)]
+                else:
+                    name.insert(position, rng.choice("abc "))
+            names.append("".join(name))
+        else:
+            names.append("".join(rng.choice("abc ") for _ in range(rng.randint(0, 14))))
+    return names
+
+
+def _brute_force_first(names, threshold):
+    seen = []
+    results = []
+    for name in names:
+        match = None
+        for existing in seen:
+            similarity = SequenceMatcher(None, name, existing).ratio()
+            if similarity >= threshold:
+                match = (existing, similarity)
+                break
+        results.append(match)
+        if match is None:
+            seen.append(name)
+    return results
+
+
+def _indexed_first(names, threshold, corpus=None):
+    index = FuzzyNameIndex(threshold=threshold, corpus=corpus)
+    results = []
+    for name in names:
+        match = index.find_first(name)
+        results.append(match)
+        if match is None:
+            index.add(name)
+    return results
+
+
+class FakeScraper(BaseDealerScraper):
+    OEM_NAME = "Acme"
+    DEALER_LOCATOR_URL = "https://example.com"
+
+    def get_extraction_script(self):
+        return ""
+
+    def detect_capabilities(self, raw_dealer_data):
+        return None
+
+    def parse_dealer_data(self, raw_dealer_data, zip_code):
+        return []
+
+    def _scrape_with_playwright(self, zip_code):
+        return []
+
+    def _scrape_with_runpod(self, zip_code):
+        return []
+
+    def _scrape_with_patchright(self, zip_code):
+        return []
+
+
+def _dealer(name, phone="", domain="", state="CA"):
+    return StandardizedDealer(name=name, phone=phone, domain=domain, website="",
+                              street="", city="", state=state, zip="",
+                              address_full="", oem_source="Acme")
+
+
+# ============================================
+# Exactness
+# ============================================
+
+@pytest.mark.parametrize("threshold", [0.5, 0.7, 0.85, 0.9, 1.0])
+def test_find_first_matches_brute_force(threshold):
+    rng = random.Random(threshold)
+    names = _random_names(rng, 400)
+
+    expected = _brute_force_first(names, threshold)
+    assert _indexed_first(names, threshold) == expected
+    assert _indexed_first(names, threshold, corpus=names) == expected
+
+
+def test_find_first_without_rapidfuzz(monkeypatch):
+    monkeypatch.setattr(fuzzy_index, "rf_process", None)
+    names = _random_names(random.Random(1), 300)
+    assert _indexed_first(names, 0.85) == _brute_force_first(names, 0.85)
+
+
+def test_find_all_in_insertion_order():
+    index = FuzzyNameIndex(threshold=0.85)
+    for name in ["acme electric", "bolt solar", "acme electrics", "acme electric co"]:
+        index.add(name, value=name.upper())
+
+    matches = index.find_all("acme electric")
+    assert [value for value, _ in matches] == ["ACME ELECTRIC", "ACME ELECTRICS", "ACME ELECTRIC CO"]
+    assert matches[0][1] == 1.0
+    assert index.find_first("zzz") is None
+
+
+@pytest.mark.parametrize("use_rapidfuzz", [True, False])
+def test_find_all_matches_equals_index(monkeypatch, use_rapidfuzz):
+    if not use_rapidfuzz:
+        monkeypatch.setattr(fuzzy_index, "rf_process", None)
+    rng = random.Random(4)
+    names = _random_names(rng, 300)
+    queries = _random_names(rng, 300)[::2]
+
+    index = FuzzyNameIndex(threshold=0.85)
+    for position, name in enumerate(names):
+        index.add(name, value=position)
+
+    assert find_all_matches(queries, names, 0.85) == [index.find_all(query) for query in queries]
+    assert find_all_matches([], names) == []
+    assert find_all_matches(["abc"], []) == [[]]
+
+def test_invalid_threshold():
+    with pytest.raises(ValueError):
+        FuzzyNameIndex(threshold=0)
+
+
+# ============================================
+# BaseDealerScraper Integration
+# ============================================
+
+def test_deduplicate_by_phone_signals():
+    scraper = FakeScraper()
+    scraper.dealers = [
+        _dealer("Tri-State Power & Pump", phone="5550000001"),
+        _dealer("Tri-State Power & Pump LLC", phone="5550000002"),
+        _dealer("Other Name", phone="5550000001"),
+        _dealer("Bolt Solar", phone="5550000003", domain="bolt.com"),
+        _dealer("Bolt Energy", phone="5550000004", domain="bolt.com"),
+        _dealer("Tri-State Power & Pump", phone="5550000005", state="TX"),
+    ]
+
+    unique_dealers, duplicates = scraper._find_duplicates(scraper.dealers)
+
+    assert [d.phone for d in unique_dealers] == ["5550000001", "5550000003", "5550000005"]
+    assert [reason for _, reason in duplicates] == [
+        "fuzzy_name=1.00 ('Tri-State Power & Pump LLC' ≈ 'Tri-State Power & Pump')",
+        "phone=5550000001",
+        "domain=bolt.com",
+    ]
+
+    scraper.deduplicate_by_phone()
+    assert scraper.dealers == unique_dealers
+
+
+def test_find_duplicates_sharded_matches_single_process():
+    rng = random.Random(5)
+    names = _random_names(rng, 300)
+    dealers = [
+        _dealer(name, phone=f"555000{rng.randint(0, 150):04d}" if rng.random() < 0.3 else "",
+                state=rng.choice(["CA", "TX", "FL"]))
+        for name in names
+    ]
+    scraper = FakeScraper()
+
+    expected = scraper._find_duplicates(dealers)
+    actual = scraper._find_duplicates(dealers, workers=2)
+
+    assert [id(d) for d in actual[0]] == [id(d) for d in expected[0]]
+    assert [(id(d), r) for d, r in actual[1]] == [(id(d), r) for d, r in expected[1]]
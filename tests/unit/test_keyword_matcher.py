@@ -0,0 +1,64 @@
+"""
+Unit Tests for the Compiled Keyword Matcher (utils/keyword_matcher.py)
+"""
+
+import random
+from pathlib import Path
+
+import pytest
+
+from utils.keyword_matcher import KeywordMatcher
+
+
+# ============================================
+# Matching
+# ============================================
+
+def test_labels_include_overlapping_keywords():
+    matcher = KeywordMatcher({
+        'om': ['operations', 'maintenance', 'service'],
+        'mep': ['mep', 'full-service'],
+        'fire': ['fire', 'fire alarm', 'alarm'],
+    })
+
+    assert matcher.labels("acme full-service hvac") == {'om', 'mep'}
+    assert matcher.keywords("bolt fire alarm co") == {'fire', 'fire alarm', 'alarm'}
+    assert matcher.labels("zephyr plumbing") == set()
+    assert matcher.labels("") == set()
+    assert matcher.search("24/7 service") and not matcher.search("solar")
+
+
+def test_plain_keyword_list_and_ignore_case():
+    matcher = KeywordMatcher(['BAS', 'control'], ignore_case=True)
+    assert matcher.keywords("Building BAS Controls") == {'bas', 'control'}
+    with pytest.raises(ValueError):
+        KeywordMatcher({'empty': ['']})
+
+
+def test_equals_substring_checks():
+    rng = random.Random(7)
+    alphabet = "abc -"
+    groups = {
+        f"label{i}": ["".join(rng.choice(alphabet) for _ in range(rng.randint(1, 4))) for _ in range(3)]
+        for i in range(6)
+    }
+    matcher = KeywordMatcher(groups)
+
+    for _ in range(2000):
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 12)))
+        assert matcher.labels(text) == {
+            label for label, keywords in groups.items() if any(keyword in text for keyword in keywords)
+        }
+
+
+# ============================================
+# RunPod Image
+# ============================================
+
+def test_runpod_image_copies_utils():
+    """The RunPod worker image ships scrapers/, which import the matcher from utils/."""
+    root = Path(__file__).resolve().parents[2]
+    dockerfile = (root / "runpod-playwright-api" / "Dockerfile").read_text()
+
+    assert "from utils.keyword_matcher import" in (root / "scrapers" / "base_scraper.py").read_text()
+    assert "COPY utils/ ./utils/" in dockerfile
@@ -0,0 +1,102 @@
+"""
+Unit Tests for streaming scrape results (stream_multiple / astream_multiple)
+"""
+
+import pytest
+
+from scrapers.base_scraper import BaseDealerScraper, ScrapeBatch, StandardizedDealer
+
+
+# ============================================
+# Test Fixtures
+# ============================================
+
+class FakeScraper(BaseDealerScraper):
+    OEM_NAME = "Acme"
+    DEALER_LOCATOR_URL = "https://example.com"
+
+    def __init__(self, results):
+        super().__init__()
+        self.results = results
+
+    def get_extraction_script(self):
+        return ""
+
+    def detect_capabilities(self, raw_dealer_data):
+        return None
+
+    def parse_dealer_data(self, raw_dealer_data, zip_code):
+        return []
+
+    def _scrape_with_playwright(self, zip_code):
+        return []
+
+    def _scrape_with_runpod(self, zip_code):
+        return []
+
+    def _scrape_with_patchright(self, zip_code):
+        return []
+
+    def scrape_zip_code(self, zip_code):
+        result = self.results[zip_code]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+def _dealer(name, phone):
+    return StandardizedDealer(name=name, phone=phone, domain="", website="",
+                              street="", city="", state="CA", zip="",
+                              address_full="", oem_source="Acme")
+
+
+@pytest.fixture
+def scraper():
+    return FakeScraper({
+        '11111': [_dealer('A', '5550000001'), _dealer('B', '5550000002')],
+        '22222': RuntimeError("locator timeout"),
+        '33333': [_dealer('C', '5550000003')],
+    })
+
+
+# ============================================
+# Tests
+# ============================================
+
+def test_stream_yields_batch_per_zip(scraper):
+    batches = list(scraper.stream_multiple(['11111', '22222', '33333'], verbose=False))
+
+    assert [b.zip_code for b in batches] == ['11111', '22222', '33333']
+    assert [len(b.dealers) for b in batches] == [2, 0, 1]
+    assert [b.index for b in batches] == [1, 2, 3]
+    assert all(b.total == 3 for b in batches)
+    assert batches[1].error == "locator timeout"
+    assert batches[0].error is None
+
+
+def test_stream_is_lazy(scraper):
+    stream = scraper.stream_multiple(['11111', '22222'], verbose=False)
+    first = next(stream)
+
+    assert isinstance(first, ScrapeBatch)
+    assert first.zip_code == '11111'
+    # Nothing is accumulated on the scraper while streaming
+    assert scraper.dealers == []
+
+
+def test_scrape_multiple_collects_stream(scraper, tmp_path):
+    dealers = scraper.scrape_multiple(['11111', '22222', '33333'], verbose=False,
+                                      checkpoint_dir=str(tmp_path))
+
+    assert [d.name for d in dealers] == ['A', 'B', 'C']
+    assert scraper.dealers == dealers
+    assert (tmp_path / "acme_checkpoint_0003.json").exists()
+
+
+@pytest.mark.asyncio
+async def test_astream_yields_batches(scraper):
+    names = []
+    async for batch in scraper.astream_multiple(['11111', '33333'], verbose=False):
+        names.extend(d.name for d in batch.dealers)
+
+    assert names == ['A', 'B', 'C']
@@ -0,0 +1,261 @@
+"""
+Unit Tests for Yield-Prioritized ZIP Scheduler
+"""
+
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from scrapers.base_scraper import BaseDealerScraper, StandardizedDealer
+from scrapers.zip_scheduler import STATS_FILENAME, ZipScheduler
+
+
+# ============================================
+# Test Fixtures
+# ============================================
+
+@pytest.fixture
+def history_dir(tmp_path):
+    """OEM output directory with one checkpoint and one run log."""
+    checkpoint = {
+        'dealers': (
+            [{'name': f'Metro {i}', 'scraped_from_zip': '10001'} for i in range(2)]
+            + [{'name': f'Suburb {i}', 'scraped_from_zip': '06830'} for i in range(12)]
+        ),
+        'failed_zips': ['33480'],
+        'completed_zips': 3,
+        'total_zips': 3,
+    }
+    (tmp_path / "acme_checkpoint_0003.json").write_text(json.dumps(checkpoint))
+
+    (tmp_path / "acme_run_20250101_000000.log").write_text("\n".join([
+        "[2025-01-01 10:00:00,000] Starting Acme scraper with 3 ZIP codes",
+        "[2025-01-01 10:00:00,000] [1/3] ZIP 10001: Starting",
+        "[2025-01-01 10:00:20,000] [1/3] ZIP 10001: Found 40 dealers",
+        "[2025-01-01 10:00:20,000] [2/3] ZIP 06830: Starting",
+        "[2025-01-01 10:00:30,000] [2/3] ZIP 06830: Found 25 dealers",
+        "[2025-01-01 10:00:30,000] [3/3] ZIP 33480: Starting",
+        "[2025-01-01 10:01:30,000] [3/3] ZIP 33480: ERROR - timeout",
+    ]))
+    return tmp_path
+
+
+class FakeScraper(BaseDealerScraper):
+    OEM_NAME = "Acme"
+    DEALER_LOCATOR_URL = "https://example.com"
+    PRODUCT_LINES = []
+
+    def __init__(self, results):
+        super().__init__()
+        self.results = results
+        self.calls = []
+
+    def get_extraction_script(self):
+        return ""
+
+    def detect_capabilities(self, raw_dealer_data):
+        return None
+
+    def parse_dealer_data(self, raw_dealer_data, zip_code):
+        return []
+
+    def _scrape_with_playwright(self, zip_code):
+        return []
+
+    def _scrape_with_runpod(self, zip_code):
+        return []
+
+    def _scrape_with_patchright(self, zip_code):
+        return []
+
+    def scrape_zip_code(self, zip_code):
+        self.calls.append(zip_code)
+        return self.results.get(zip_code, [])
+
+
+def _dealer(name, phone, zip_code):
+    return StandardizedDealer(name=name, phone=phone, domain="", website="",
+                              street="", city="", state="CA", zip="",
+                              address_full="", oem_source="Acme",
+                              scraped_from_zip=zip_code)
+
+
+# ============================================
+# Ordering
+# ============================================
+
+def test_no_history_keeps_input_order():
+    scheduler = ZipScheduler()
+    assert scheduler.order(['3', '1', '2']) == ['3', '1', '2']
+
+
+def test_high_yield_zip_ranked_first():
+    scheduler = ZipScheduler()
+    scheduler.record('10001', new_dealers=1, seconds=20)
+    scheduler.record('06830', new_dealers=15, seconds=10)
+    assert scheduler.order(['10001', '06830']) == ['06830', '10001']
+
+
+def test_failures_lower_priority():
+    scheduler = ZipScheduler()
+    for _ in range(3):
+        scheduler.record('11111', new_dealers=5, seconds=10)
+        scheduler.record('22222', failed=True, seconds=10)
+    scheduler.record('22222', new_dealers=5, seconds=10)
+    assert scheduler.order(['22222', '11111']) == ['11111', '22222']
+
+
+def test_plan_respects_time_budget():
+    scheduler = ZipScheduler(prior_weight=0.001)
+    scheduler.record('A', new_dealers=10, seconds=10)
+    scheduler.record('B', new_dealers=9, seconds=100)
+    scheduler.record('C', new_dealers=5, seconds=10)
+
+    assert scheduler.plan(['A', 'B', 'C'], time_budget_seconds=30) == ['A', 'C']
+    assert scheduler.plan(['A', 'B', 'C']) == ['A', 'C', 'B']
+
+
+# ============================================
+# Learning From History
+# ============================================
+
+def test_load_checkpoint_dir(history_dir):
+    scheduler = ZipScheduler()
+    scheduler.load_checkpoint_dir(str(history_dir))
+
+    assert scheduler.stats['06830'].new_dealers == 12
+    assert scheduler.stats['10001'].new_dealers == 2
+    assert scheduler.stats['33480'].failures == 1
+    assert scheduler.stats['10001'].avg_seconds == pytest.approx(20.0)
+    assert scheduler.stats['33480'].avg_seconds == pytest.approx(60.0)
+    assert scheduler.order(['33480', '10001', '06830']) == ['06830', '10001', '33480']
+
+
+def test_load_checkpoint_records_empty_zips(tmp_path):
+    checkpoint = tmp_path / "acme_checkpoint_0004.json"
+    checkpoint.write_text(json.dumps({
+        'dealers': [{'name': 'Suburb', 'scraped_from_zip': '06830'}],
+        'failed_zips': ['33480'],
+        'scraped_zips': ['10001', '06830', '33480', '94105'],
+    }))
+
+    scheduler = ZipScheduler()
+    assert scheduler.load_checkpoint(str(checkpoint)) == 4
+    assert scheduler.stats['10001'].new_dealers == 0
+    assert scheduler.stats['10001'].successes == 1
+    assert scheduler.stats['33480'].failures == 1
+    # Scraped-but-empty ZIPs rank below a ZIP with no history
+    assert scheduler.order(['10001', '06830', '77777']) == ['06830', '77777', '10001']
+
+
+def test_load_scraper_runs(tmp_path):
+    db_path = tmp_path / "pipeline.db"
+    conn = sqlite3.connect(db_path)
+    conn.execute("""
+        CREATE TABLE scraper_runs (
+            id INTEGER PRIMARY KEY, scraper_name TEXT, run_started_at TIMESTAMP,
+            run_completed_at TIMESTAMP, status TEXT, records_new INTEGER,
+            run_parameters TEXT
+        )
+    """)
+    conn.execute(
+        "INSERT INTO scraper_runs (scraper_name, run_started_at, run_completed_at, status, records_new, run_parameters) "
+        "VALUES ('Acme', '2025-01-01 10:00:00', '2025-01-01 10:01:00', 'SUCCESS', 30, ?)",
+        (json.dumps({'zips': ['11111', '22222', '33333']}),)
+    )
+    conn.commit()
+    conn.close()
+
+    scheduler = ZipScheduler()
+    assert scheduler.load_scraper_runs(str(db_path), 'Acme') == 3
+    assert scheduler.stats['22222'].new_dealers == 10
+    assert scheduler.stats['22222'].avg_seconds == pytest.approx(20.0)
+    assert scheduler.load_scraper_runs(str(db_path), 'Other') == 0
+    assert scheduler.load_scraper_runs(str(db_path), 'Acme', since=datetime(2025, 1, 1, 10, 1)) == 0
+    assert scheduler.load_scraper_runs(str(db_path), 'Acme', since=datetime(2025, 1, 1, 9)) == 3
+
+
+def test_save_and_load_roundtrip(tmp_path):
+    scheduler = ZipScheduler()
+    scheduler.record('94102', new_dealers=7, seconds=12.5)
+    path = tmp_path / STATS_FILENAME
+    scheduler.save(str(path))
+
+    loaded = ZipScheduler.from_history(str(tmp_path))
+    assert loaded.stats['94102'].new_dealers == 7
+    assert loaded.stats['94102'].total_seconds == pytest.approx(12.5)
+
+
+def test_from_history_folds_in_newer_runs(history_dir):
+    """Checkpoints and logs written after the stats file are not ignored."""
+    scheduler = ZipScheduler()
+    scheduler.record('94102', new_dealers=7, seconds=12.5)
+    stats_file = history_dir / STATS_FILENAME
+    scheduler.save(str(stats_file))
+    saved_at = datetime(2024, 12, 31).timestamp()  # Before the fixture run
+    os.utime(stats_file, (saved_at, saved_at))
+
+    loaded = ZipScheduler.from_history(str(history_dir))
+    assert loaded.stats['94102'].new_dealers == 7
+    assert loaded.stats['06830'].new_dealers == 12
+    assert loaded.stats['10001'].avg_seconds == pytest.approx(20.0)
+
+    # Folded history is persisted, so it is not counted twice
+    again = ZipScheduler.from_history(str(history_dir))
+    assert again.stats['06830'].attempts == 1
+    assert again.stats['10001'].timed_attempts == 1
+
+
+# ============================================
+# scrape_multiple Integration
+# ============================================
+
+def test_scrape_multiple_uses_scheduler_order(tmp_path):
+    scheduler = ZipScheduler()
+    scheduler.record('22222', new_dealers=20, seconds=5)
+    scheduler.record('11111', new_dealers=1, seconds=5)
+
+    scraper = FakeScraper({
+        '11111': [_dealer('A', '5550000001', '11111')],
+        '22222': [_dealer('A', '5550000001', '22222'), _dealer('B', '5550000002', '22222')],
+    })
+    scraper.scrape_multiple(['11111', '22222'], verbose=False,
+                            checkpoint_dir=str(tmp_path), scheduler=scheduler)
+
+    assert scraper.calls == ['22222', '11111']
+    # 11111 only returned a dealer already found in 22222
+    assert scheduler.stats['11111'].new_dealers == 1
+    assert scheduler.stats['11111'].attempts == 2
+    assert (tmp_path / STATS_FILENAME).exists()
+
+    checkpoint = json.loads((tmp_path / "acme_checkpoint_0002.json").read_text())
+    assert checkpoint['scraped_zips'] == ['22222', '11111']
+
+
+def test_scrape_multiple_stops_at_time_budget(tmp_path):
+    scraper = FakeScraper({})
+    scraper.scrape_multiple(['11111', '22222'], verbose=False,
+                            checkpoint_dir=str(tmp_path), time_budget_seconds=0)
+    assert scraper.calls == []
+
+
+def test_scrape_multiple_writes_run_log(tmp_path):
+    """Importing the scraper must leave root logging to scrape_multiple, whose
+    run log is where load_run_log learns per-ZIP latency."""
+    script = (
+        "import sys\n"
+        "from tests.unit.test_zip_scheduler import FakeScraper\n"
+        "FakeScraper({}).scrape_multiple(['11111'], verbose=False, checkpoint_dir=sys.argv[1])\n"
+    )
+    subprocess.run([sys.executable, "-c", script, str(tmp_path)], check=True,
+                   cwd=Path(__file__).resolve().parents[2], capture_output=True)
+
+    scheduler = ZipScheduler()
+    assert scheduler.load_checkpoint_dir(str(tmp_path)) >= 1
+    assert scheduler.stats['11111'].timed_attempts == 1
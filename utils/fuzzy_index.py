@@ -0,0 +1,345 @@
+"""
+Indexed fuzzy name matching.
+
+Finds every stored name whose difflib.SequenceMatcher ratio against a query is
+>= a threshold WITHOUT comparing the query against every stored name.  Results
+are identical to the brute-force loop
+
+    for existing in names:
+        if SequenceMatcher(None, query, existing).ratio() >= threshold: ...
+
+because candidates are pruned only by bounds that a matching pair can never
+violate:
+
+1. Length: ratio = 2*M / (len(a) + len(b)) and M <= min(len(a), len(b)).
+2. Bigram overlap: M matched characters form k non-adjacent matching blocks
+   with k - 1 <= (len(a) - M) + (len(b) - M), and a block of length L shares
+   L - 1 bigrams between the strings.  So a matching pair shares at least
+   3*M - len(a) - len(b) - 1 bigrams (as multisets).
+3. Prefix filtering: if two bigram sets must share >= T tokens, their first
+   |set| - T + 1 tokens under any fixed global order intersect.  Only those
+   prefixes are indexed/probed, rarest bigrams first.
+
+Length pairs where bound 2 gives nothing (very short names) fall back to a scan
+of just the names with that length.  When rapidfuzz is installed, candidates
+are then screened in bulk with its Indel similarity 2*LCS/(len(a)+len(b)),
+an upper bound on the difflib ratio since difflib's matched characters form a
+common subsequence.  Survivors are verified with the real SequenceMatcher, in
+insertion order, so "first match wins" callers see the same match they always
+did.
+"""
+
+from collections import Counter
+from difflib import SequenceMatcher
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+    from rapidfuzz import process as rf_process
+    from rapidfuzz.distance import Indel
+except ImportError:  # pragma: no cover - depends on environment
+    np = None
+    rf_process = None
+    Indel = None
+
+# Query rows scored per rapidfuzz cdist call in find_all_matches (bounds matrix memory)
+_CDIST_CHUNK = 256
+
+# Slack so float rounding in the bound (ours or rapidfuzz's cutoff handling) never
+# drops a true match - far smaller than one character of similarity
+_BOUND_EPSILON = 1e-4
+
+
+def _bigram_tokens(name: str) -> List[str]:
+    """Bigrams of name as a multiset encoded into unique tokens ('ab', 'ab1', ...)."""
+    seen: Dict[str, int] = {}
+    tokens = []
+    for i in range(len(name) - 1):
+        bigram = name[i:i + 2]
+        occurrence = seen.get(bigram, 0)
+        seen[bigram] = occurrence + 1
+        tokens.append(bigram if occurrence == 0 else f"{bigram}{occurrence}")
+    return tokens
+
+
+class FuzzyNameIndex:
+    """
+    Incremental index of names for exact-threshold SequenceMatcher lookups.
+
+    Example:
+        >>> index = FuzzyNameIndex(threshold=0.85)
+        >>> index.add("tri-state power & pump", value=dealer)
+        >>> index.find_first("tri-state power & pump llc")
+        (dealer, 0.93)
+    """
+
+    def __init__(self, threshold: float = 0.85, corpus: Optional[Iterable[str]] = None):
+        """
+        Args:
+            threshold: Minimum SequenceMatcher ratio for a match (0 < threshold <= 1)
+            corpus: Optional names used only to learn bigram frequencies so the
+                rarest bigrams are indexed first (faster, same results).  Pass
+                the names you are about to add when they are known up front.
+        """
+        if not 0 < threshold <= 1:
+            raise ValueError(f"threshold must be in (0, 1], got {threshold}")
+        self.threshold = threshold
+
+        self._names: List[str] = []
+        self._values: List[Any] = []
+        self._tokens: List[frozenset] = []
+        self._postings: Dict[str, List[int]] = {}
+        self._by_length: Dict[int, List[int]] = {}
+
+        self._frequency: Dict[str, int] = {}
+        if corpus is not None:
+            counts = Counter()
+            for name in corpus:
+                counts.update(_bigram_tokens(name))
+            self._frequency = dict(counts)
+
+        # Per-length-pair bounds are reused constantly - cache them
+        self._min_matches_cache: Dict[int, int] = {}
+        self._length_range_cache: Dict[int, Tuple[int, int]] = {}
+        self._store_prefix_cache: Dict[int, Optional[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    # ------------------------------------------------------------------------
+    # Bounds
+    # ------------------------------------------------------------------------
+
+    def _min_matches(self, total_length: int) -> int:
+        """Smallest matched-char count M with 2*M/total_length >= threshold."""
+        cached = self._min_matches_cache.get(total_length)
+        if cached is None:
+            m = max(int(self.threshold * total_length / 2) - 1, 0)
+            # Same float expression difflib uses, so boundary cases agree
+            while 2.0 * m / total_length < self.threshold:
+                m += 1
+            self._min_matches_cache[total_length] = cached = m
+        return cached
+
+    def _length_range(self, length: int) -> Tuple[int, int]:
+        """Partner lengths that can reach the threshold with a name of this length."""
+        cached = self._length_range_cache.get(length)
+        if cached is None:
+            lo = length
+            while lo > 1 and 2.0 * (lo - 1) / (length + lo - 1) >= self.threshold:
+                lo -= 1
+            hi = length
+            while 2.0 * length / (length + hi + 1) >= self.threshold:
+                hi += 1
+            self._length_range_cache[length] = cached = (lo, hi)
+        return cached
+
+    def _required_overlap(self, len_a: int, len_b: int) -> Optional[int]:
+        """
+        Minimum shared bigrams for a match between these lengths.
+
+        Returns None when no match is possible, 0 when the bigram bound is
+        uninformative (pair must be checked directly).
+        """
+        total = len_a + len_b
+        if total == 0:
+            return 0
+        m = self._min_matches(total)
+        if m > min(len_a, len_b):
+            return None
+        return max(3 * m - total - 1, 0)
+
+    def _store_prefix_length(self, length: int) -> Optional[int]:
+        """
+        How many of a stored name's tokens must be indexed.
+
+        None means the name is only reachable by length scan.
+        """
+        if length in self._store_prefix_cache:
+            return self._store_prefix_cache[length]
+
+        lo, hi = self._length_range(length)
+        overlaps = [self._required_overlap(other, length) for other in range(lo, hi + 1)]
+        positive = [t for t in overlaps if t]
+        prefix = (length - 1) - min(positive) + 1 if positive else None
+        self._store_prefix_cache[length] = prefix
+        return prefix
+
+    def _ordered(self, tokens: List[str]) -> List[str]:
+        frequency = self._frequency
+        return sorted(tokens, key=lambda t: (frequency.get(t, 0), t))
+
+    # ------------------------------------------------------------------------
+    # Add / lookup
+    # ------------------------------------------------------------------------
+
+    def add(self, name: str, value: Any = None) -> int:
+        """
+        Store a name.
+
+        Args:
+            name: Name exactly as it should be compared (already normalized)
+            value: Payload returned by lookups (default: the name)
+
+        Returns:
+            Entry id (insertion order)
+        """
+        entry_id = len(self._names)
+        tokens = _bigram_tokens(name)
+
+        self._names.append(name)
+        self._values.append(name if value is None else value)
+        self._tokens.append(frozenset(tokens))
+        self._by_length.setdefault(len(name), []).append(entry_id)
+
+        prefix = self._store_prefix_length(len(name))
+        if prefix:
+            postings = self._postings
+            for token in self._ordered(tokens)[:prefix]:
+                bucket = postings.get(token)
+                if bucket is None:
+                    postings[token] = [entry_id]
+                else:
+                    bucket.append(entry_id)
+
+        return entry_id
+
+    def _candidates(self, name: str) -> List[int]:
+        """Entry ids that pass the length and bigram bounds, in insertion order."""
+        length = len(name)
+        lo, hi = self._length_range(length)
+
+        required: Dict[int, int] = {}
+        scan_lengths = []
+        for other in range(lo, hi + 1):
+            if other not in self._by_length:
+                continue
+            overlap = self._required_overlap(length, other)
+            if overlap is None:
+                continue
+            if overlap == 0:
+                scan_lengths.append(other)
+            else:
+                required[other] = overlap
+
+        candidates = set()
+        for other in scan_lengths:
+            candidates.update(self._by_length[other])
+
+        if required:
+            tokens = _bigram_tokens(name)
+            prefix = len(tokens) - min(required.values()) + 1
+            probed = set()
+            postings = self._postings
+            for token in self._ordered(tokens)[:max(prefix, 0)]:
+                probed.update(postings.get(token, ()))
+            probed -= candidates
+
+            if rf_process is not None:
+                # The Indel screen below subsumes the length/overlap checks
+                candidates |= probed
+            else:
+                token_set = frozenset(tokens)
+                names = self._names
+                entry_tokens = self._tokens
+                for entry_id in probed:
+                    need = required.get(len(names[entry_id]))
+                    if need is not None and len(token_set & entry_tokens[entry_id]) >= need:
+                        candidates.add(entry_id)
+
+        if rf_process is not None and candidates:
+            ids = list(candidates)
+            names = self._names
+            screened = rf_process.extract(
+                name, [names[i] for i in ids],
+                scorer=Indel.normalized_similarity,
+                score_cutoff=self.threshold - _BOUND_EPSILON,
+                limit=None,
+            )
+            return sorted(ids[index] for _, _, index in screened)
+
+        return sorted(candidates)
+
+    def find_first(self, name: str) -> Optional[Tuple[Any, float]]:
+        """
+        Earliest-added entry with SequenceMatcher(None, name, entry).ratio() >= threshold.
+
+        Returns:
+            (value, similarity) or None
+        """
+        for entry_id in self._candidates(name):
+            similarity = SequenceMatcher(None, name, self._names[entry_id]).ratio()
+            if similarity >= self.threshold:
+                return self._values[entry_id], similarity
+        return None
+
+    def find_all(self, name: str, symmetric: bool = False) -> List[Tuple[Any, float]]:
+        """
+        All entries at or above the threshold, in insertion order.
+
+        Args:
+            name: Query name
+            symmetric: Score each pair in sorted string order, so the result
+                does not depend on which of the two names is the query
+                (SequenceMatcher is not strictly symmetric)
+        """
+        matches = []
+        for entry_id in self._candidates(name):
+            stored = self._names[entry_id]
+            if symmetric and stored < name:
+                similarity = SequenceMatcher(None, stored, name).ratio()
+            else:
+                similarity = SequenceMatcher(None, name, stored).ratio()
+            if similarity >= self.threshold:
+                matches.append((self._values[entry_id], similarity))
+        return matches
+
+
+def find_all_matches(
+    queries: Sequence[str],
+    names: Sequence[str],
+    threshold: float = 0.85
+) -> List[List[Tuple[int, float]]]:
+    """
+    Score many queries against one block of names at once.
+
+    Same results as FuzzyNameIndex(names).find_all(query) for each query, but
+    for a one-off block it skips building an index: every query/name pair is
+    screened in C with rapidfuzz's Indel bound (cdist), and only survivors
+    are verified with SequenceMatcher.  Falls back to a FuzzyNameIndex when
+    rapidfuzz is not installed.
+
+    Args:
+        queries: Query names (already normalized)
+        names: Block of names to search (already normalized)
+        threshold: Minimum SequenceMatcher ratio
+
+    Returns:
+        For each query, [(name position, similarity), ...] in position order
+    """
+    if not 0 < threshold <= 1:
+        raise ValueError(f"threshold must be in (0, 1], got {threshold}")
+    if not queries or not names:
+        return [[] for _ in queries]
+
+    if rf_process is None:
+        index = FuzzyNameIndex(threshold=threshold)
+        for position, name in enumerate(names):
+            index.add(name, value=position)
+        return [index.find_all(query) for query in queries]
+
+    results: List[List[Tuple[int, float]]] = [[] for _ in queries]
+    for start in range(0, len(queries), _CDIST_CHUNK):
+        chunk = queries[start:start + _CDIST_CHUNK]
+        screened = rf_process.cdist(
+            chunk, names,
+            scorer=Indel.normalized_similarity,
+            score_cutoff=threshold - _BOUND_EPSILON,
+        )
+        rows, columns = np.nonzero(screened)
+        for row, column in zip(rows.tolist(), columns.tolist()):
+            query = chunk[row]
+            similarity = SequenceMatcher(None, query, names[column]).ratio()
+            if similarity >= threshold:
+                results[start + row].append((column, similarity))
+    return results
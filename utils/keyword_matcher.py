@@ -0,0 +1,114 @@
+"""
+Compiled multi-keyword matching.
+
+Capability and contractor-type detection checks a lowercased text against
+several keyword lists:
+
+    has_om = any(keyword in text for keyword in om_keywords)
+    has_mep = any(keyword in text for keyword in mep_keywords)
+    ...
+
+which is one substring search per keyword per record.  A KeywordMatcher
+compiles every keyword of every list into ONE regex alternation (longest
+keywords first) and finds all labels present in a single scan.
+
+Results equal the `keyword in text` checks exactly, overlaps included:
+
+1. At any position the alternation takes the longest keyword that starts
+   there, and every keyword that is a substring of it is credited along
+   with it (so "full-service" also reports "service").
+2. After a hit at position p the scan resumes at p + 1, not at the end of
+   the hit, so a keyword starting inside another hit is still found.
+"""
+
+import re
+from typing import Dict, FrozenSet, Iterable, Mapping, Set, Union
+
+
+class KeywordMatcher:
+    """
+    Precompiled substring matcher over labeled keyword lists.
+
+    Example:
+        >>> matcher = KeywordMatcher({
+        ...     'om': ['operations', 'maintenance', 'service'],
+        ...     'mep': ['mep', 'full-service'],
+        ... })
+        >>> matcher.labels("acme full-service hvac")
+        {'om', 'mep'}
+        >>> matcher.keywords("acme full-service hvac")
+        {'full-service', 'service'}
+    """
+
+    def __init__(
+        self,
+        groups: Union[Mapping[str, Iterable[str]], Iterable[str]],
+        ignore_case: bool = False
+    ):
+        """
+        Args:
+            groups: {label: keywords}, or a plain keyword list (each keyword
+                is its own label)
+            ignore_case: Lowercase keywords and text before matching (leave
+                off when callers already pass lowercased text)
+        """
+        if not isinstance(groups, Mapping):
+            groups = {keyword: [keyword] for keyword in groups}
+
+        self.ignore_case = ignore_case
+        self._labels: Dict[str, Set[str]] = {}
+        for label, keywords in groups.items():
+            for keyword in keywords:
+                if ignore_case:
+                    keyword = keyword.lower()
+                if keyword:
+                    self._labels.setdefault(keyword, set()).add(label)
+
+        if not self._labels:
+            raise ValueError("KeywordMatcher needs at least one non-empty keyword")
+
+        # Every keyword credited by a hit on each keyword (itself + its substrings)
+        keywords = sorted(self._labels, key=lambda k: (-len(k), k))
+        self._contained: Dict[str, FrozenSet[str]] = {
+            keyword: frozenset(other for other in keywords if other in keyword)
+            for keyword in keywords
+        }
+        self._contained_labels: Dict[str, FrozenSet[str]] = {
+            keyword: frozenset(label for other in contained for label in self._labels[other])
+            for keyword, contained in self._contained.items()
+        }
+        self._pattern = re.compile("|".join(re.escape(keyword) for keyword in keywords))
+
+    def _hits(self, text: str) -> Iterable[str]:
+        """Longest keyword matched at each position that starts a hit."""
+        if not text:
+            return
+        if self.ignore_case:
+            text = text.lower()
+        search = self._pattern.search
+        match = search(text)
+        while match is not None:
+            yield match.group()
+            match = search(text, match.start() + 1)
+
+    def keywords(self, text: str) -> Set[str]:
+        """Every keyword that occurs in text."""
+        found: Set[str] = set()
+        for hit in self._hits(text):
+            found |= self._contained[hit]
+        return found
+
+    def labels(self, text: str) -> Set[str]:
+        """Every label with at least one keyword in text."""
+        found: Set[str] = set()
+        for hit in self._hits(text):
+            found |= self._contained_labels[hit]
+        return found
+
+    def search(self, text: str) -> bool:
+        """True if any keyword occurs in text."""
+        if not text:
+            return False
+        if self.ignore_case:
+            text = text.lower()
+        return self._pattern.search(text) is not None